@@ -5,16 +5,27 @@ Works with your existing FortiGate at 192.168.0.254
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import threading
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from urllib.parse import urljoin
 import xml.etree.ElementTree as ET
 
+try:
+    from src.enhanced_network_api.concurrency_limit import limit_for
+except ImportError:  # pragma: no cover - imported without the project root on sys.path
+    from concurrency_limit import limit_for
+
 logger = logging.getLogger(__name__)
 
+# Upper bound for concurrent per-switch client queries against one FortiGate
+SWITCH_CLIENT_CONCURRENCY = max(1, int(os.getenv("FORTIGATE_SWITCH_CLIENT_CONCURRENCY", "8")))
+
 @dataclass
 class FortiGateDevice:
     """Represents a FortiGate device and its configuration"""
@@ -43,6 +54,82 @@ class FortiGateInterface:
     mtu: int
     connected_devices: List[str]
 
+@dataclass
+class FortiGateAuthState:
+    """An authenticated session and the auth method that produced it"""
+    session: requests.Session
+    method: str
+    use_query_token: bool = False
+    generation: int = 0  # bumped by every successful authentication for the key
+
+
+class FortiGateAuthBroker:
+    """Process-wide cache of authenticated FortiGate sessions.
+
+    Keyed on host, port and credentials, so collectors built per request share
+    one ``requests.Session`` (keep-alive connections, login cookies, CSRF
+    header) instead of re-probing the auth methods every time. A session is
+    trusted until a request gets a 401; the collector then re-authenticates,
+    trying the method that worked last time first. Authentication for one key
+    runs under ``auth_lock``, so when many callers hit the same 401 only the
+    first re-probes and the others adopt the session it produced.
+    """
+
+    def __init__(self):
+        self._states: Dict[Tuple, FortiGateAuthState] = {}
+        self._generations: Dict[Tuple, int] = {}
+        self._auth_locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reauths = 0
+
+    def lookup(self, key: Tuple) -> Optional[FortiGateAuthState]:
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return state
+
+    def peek(self, key: Tuple) -> Optional[FortiGateAuthState]:
+        with self._lock:
+            return self._states.get(key)
+
+    def remember(self, key: Tuple, state: FortiGateAuthState) -> FortiGateAuthState:
+        with self._lock:
+            generation = self._generations[key] = self._generations.get(key, 0) + 1
+            state.generation = generation
+            self._states[key] = state
+            return state
+
+    def auth_lock(self, key: Tuple) -> threading.Lock:
+        with self._lock:
+            return self._auth_locks.setdefault(key, threading.Lock())
+
+    def invalidate(self, key: Tuple) -> None:
+        with self._lock:
+            if self._states.pop(key, None) is not None:
+                self.reauths += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            sessions = [state.session for state in self._states.values()]
+            self._states.clear()
+            self._generations.clear()
+            self.hits = self.misses = self.reauths = 0
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "reauths": self.reauths, "sessions": len(self._states)}
+
+
+AUTH_BROKER = FortiGateAuthBroker()
+
+
 class FortiGateTopologyCollector:
     """Collects topology data directly from FortiGate API"""
     
@@ -66,100 +153,81 @@ class FortiGateTopologyCollector:
         self.wifi_host = wifi_host
         self.wifi_token = wifi_token
         self.base_url = f"https://{host}:{port}/api/v2/"
-        self.session = requests.Session()
-        self.session.verify = verify_ssl
         self._warned_endpoints = set()
+        secret = hashlib.sha256(f"{token or ''}\0{password or ''}".encode("utf-8")).hexdigest()
+        self._auth_key = (host, port, username, secret, bool(verify_ssl))
+        self._auth_method: Optional[str] = None
         self._use_query_token = False  # Track if we need to use access_token query param
+        self._auth_generation = 0
+        state = AUTH_BROKER.peek(self._auth_key)
+        if state is not None:
+            self._adopt(state)
+        else:
+            self.session = requests.Session()
+            self.session.verify = verify_ssl
         
         # Disable SSL warnings for self-signed certs
         if not verify_ssl:
             requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
-        
-    async def authenticate(self) -> bool:
-        """Authenticate with FortiGate API using token or session credentials."""
-        status_url = urljoin(self.base_url, "monitor/system/status")
-        params = {'vdom': 'root'}
 
-        try:
-            # Attempt API token authentication first (try multiple formats)
-            if self.api_token:
-                # Try 1: Standard Bearer token
-                bearer_headers = {
-                    'Authorization': f'Bearer {self.api_token}',
-                    'Content-Type': 'application/json',
-                }
-                response = self.session.get(
-                    status_url,
-                    headers=bearer_headers,
-                    params=params,
-                    timeout=10,
-                )
-                if response.status_code == 200:
-                    logger.info("✅ Authenticated with FortiGate using Bearer token")
-                    self.session.headers.update(bearer_headers)
-                    return True
+    def _adopt(self, state: FortiGateAuthState) -> None:
+        self.session = state.session
+        self._auth_method = state.method
+        self._use_query_token = state.use_query_token
+        self._auth_generation = state.generation
 
-                # Try 2: Bearer with FG_API_KEY= prefix
-                if not self.api_token.startswith('FG_API_KEY='):
-                    bearer_headers_fg = {
-                        'Authorization': f'Bearer FG_API_KEY={self.api_token}',
-                        'Content-Type': 'application/json',
-                    }
-                    response = self.session.get(
-                        status_url,
-                        headers=bearer_headers_fg,
-                        params=params,
-                        timeout=10,
-                    )
-                    if response.status_code == 200:
-                        logger.info("✅ Authenticated with FortiGate using Bearer FG_API_KEY token")
-                        self.session.headers.update(bearer_headers_fg)
-                        return True
-
-                # Try 3: X-API-Key header
-                alt_headers = {
-                    'X-API-Key': self.api_token,
-                    'Content-Type': 'application/json',
-                }
-                response = self.session.get(
-                    status_url,
-                    headers=alt_headers,
-                    params=params,
-                    timeout=10,
-                )
-                if response.status_code == 200:
-                    logger.info("✅ Authenticated with FortiGate using X-API-Key header")
-                    self.session.headers.update(alt_headers)
-                    return True
-                
-                # Try 4: Access token as query parameter
-                params_with_token = params.copy()
-                params_with_token['access_token'] = self.api_token
-                response = self.session.get(
-                    status_url,
-                    headers={'Content-Type': 'application/json'},
-                    params=params_with_token,
-                    timeout=10,
-                )
-                if response.status_code == 200:
-                    logger.info("✅ Authenticated with FortiGate using access_token query parameter")
-                    # Store token for future requests
-                    self.session.headers.update({'Content-Type': 'application/json'})
-                    # Note: We'll need to add access_token to each request
-                    self._use_query_token = True
-                    return True
+    def _reset_auth_headers(self) -> None:
+        """Drop credentials added by earlier auth methods before probing again."""
+        for header in ("Authorization", "X-API-Key", "X-CSRFTOKEN"):
+            self.session.headers.pop(header, None)
+        self._use_query_token = False
 
-            # Fall back to session-based authentication if a password is provided
-            if self.password:
-                if self._session_login():
-                    # Even if CSRF token extraction failed, try to continue - some endpoints work without it
-                    csrf = self._extract_csrf()
-                    if csrf:
-                        self.session.headers.update({"X-CSRFTOKEN": csrf})
-                        logger.info("✅ Authenticated with FortiGate using session login (with CSRF token)")
-                    else:
-                        logger.warning("⚠️  Session login succeeded but CSRF token not found - continuing anyway")
-                        logger.info("✅ Authenticated with FortiGate using session login (no CSRF token)")
+    async def authenticate(self, force: bool = False) -> bool:
+        """Authenticate with FortiGate API using token or session credentials.
+
+        A session already authenticated for this host and credentials (see
+        ``AUTH_BROKER``) is reused without a round-trip. ``force`` discards it
+        and authenticates again; callers do that after a 401. If another
+        caller re-authenticated since this collector adopted its session,
+        that newer session is used instead of probing again.
+        """
+        if not force:
+            state = AUTH_BROKER.lookup(self._auth_key)
+            if state is not None:
+                self._adopt(state)
+                return True
+
+        # Blocking on purpose: the probes below are blocking requests too, and
+        # nothing awaits while the lock is held.
+        with AUTH_BROKER.auth_lock(self._auth_key):
+            state = AUTH_BROKER.peek(self._auth_key)
+            if state is not None and state.generation != self._auth_generation:
+                self._adopt(state)
+                return True
+            if force:
+                AUTH_BROKER.invalidate(self._auth_key)
+            self._reset_auth_headers()
+            return self._probe_auth_methods()
+
+    def _probe_auth_methods(self) -> bool:
+        try:
+            methods = [
+                ("bearer", self._auth_bearer),
+                ("bearer_fg_api_key", self._auth_bearer_fg_api_key),
+                ("x_api_key", self._auth_x_api_key),
+                ("access_token", self._auth_query_token),
+                ("session", self._auth_session),
+            ]
+            # Try the method that worked last time first
+            methods.sort(key=lambda item: item[0] != self._auth_method)
+            for method, attempt in methods:
+                if attempt():
+                    self._auth_method = method
+                    state = AUTH_BROKER.remember(
+                        self._auth_key,
+                        FortiGateAuthState(self.session, method, self._use_query_token),
+                    )
+                    self._auth_generation = state.generation
                     return True
 
             logger.error("❌ FortiGate authentication failed: token and session methods exhausted")
@@ -168,6 +236,102 @@ class FortiGateTopologyCollector:
         except Exception as exc:
             logger.error(f"❌ Authentication error: {exc}")
             return False
+
+    def _probe_status(self, headers: Dict[str, str], params: Optional[Dict[str, str]] = None) -> bool:
+        response = self.session.get(
+            urljoin(self.base_url, "monitor/system/status"),
+            headers=headers,
+            params={'vdom': 'root', **(params or {})},
+            timeout=10,
+            verify=self.verify_ssl,
+        )
+        return response.status_code == 200
+
+    def _auth_bearer(self) -> bool:
+        # Try 1: Standard Bearer token
+        if not self.api_token:
+            return False
+        bearer_headers = {
+            'Authorization': f'Bearer {self.api_token}',
+            'Content-Type': 'application/json',
+        }
+        if self._probe_status(bearer_headers):
+            logger.info("✅ Authenticated with FortiGate using Bearer token")
+            self.session.headers.update(bearer_headers)
+            return True
+        return False
+
+    def _auth_bearer_fg_api_key(self) -> bool:
+        # Try 2: Bearer with FG_API_KEY= prefix
+        if not self.api_token or self.api_token.startswith('FG_API_KEY='):
+            return False
+        bearer_headers_fg = {
+            'Authorization': f'Bearer FG_API_KEY={self.api_token}',
+            'Content-Type': 'application/json',
+        }
+        if self._probe_status(bearer_headers_fg):
+            logger.info("✅ Authenticated with FortiGate using Bearer FG_API_KEY token")
+            self.session.headers.update(bearer_headers_fg)
+            return True
+        return False
+
+    def _auth_x_api_key(self) -> bool:
+        # Try 3: X-API-Key header
+        if not self.api_token:
+            return False
+        alt_headers = {
+            'X-API-Key': self.api_token,
+            'Content-Type': 'application/json',
+        }
+        if self._probe_status(alt_headers):
+            logger.info("✅ Authenticated with FortiGate using X-API-Key header")
+            self.session.headers.update(alt_headers)
+            return True
+        return False
+
+    def _auth_query_token(self) -> bool:
+        # Try 4: Access token as query parameter
+        if not self.api_token:
+            return False
+        if self._probe_status({'Content-Type': 'application/json'}, {'access_token': self.api_token}):
+            logger.info("✅ Authenticated with FortiGate using access_token query parameter")
+            self.session.headers.update({'Content-Type': 'application/json'})
+            # Every later request carries the token too (see _get)
+            self._use_query_token = True
+            return True
+        return False
+
+    def _auth_session(self) -> bool:
+        # Fall back to session-based authentication if a password is provided
+        if not self.password or not self._session_login():
+            return False
+        # Even if CSRF token extraction failed, try to continue - some endpoints work without it
+        csrf = self._extract_csrf()
+        if csrf:
+            self.session.headers.update({"X-CSRFTOKEN": csrf})
+            logger.info("✅ Authenticated with FortiGate using session login (with CSRF token)")
+        else:
+            logger.warning("⚠️  Session login succeeded but CSRF token not found - continuing anyway")
+            logger.info("✅ Authenticated with FortiGate using session login (no CSRF token)")
+        return True
+
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        params = dict(params or {})
+        if self._use_query_token and self.api_token:
+            params["access_token"] = self.api_token
+        # verify is passed per call: REQUESTS_CA_BUNDLE would otherwise override session.verify
+        return self.session.get(url, params=params, timeout=10, verify=self.verify_ssl)
+
+    async def _get_authenticated(self, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET ``url``; on a 401, re-authenticate once and retry."""
+        response = self._get(url, params)
+        if response.status_code == 401:
+            logger.warning(f"Got 401 from {url}, attempting re-authentication...")
+            if await self.authenticate(force=True):
+                response = self._get(url, params)
+            else:
+                logger.error(f"Re-authentication failed for {url}")
+        return response
     
     def _extract_csrf(self) -> Optional[str]:
         """Extract CSRF token from cookies or response headers"""
@@ -195,7 +359,7 @@ class FortiGateTopologyCollector:
     def _session_login(self) -> bool:
         login_base = f"https://{self.host}:{self.port}"
         try:
-            self.session.get(f"{login_base}/login", timeout=10)
+            self.session.get(f"{login_base}/login", timeout=10, verify=self.verify_ssl)
         except requests.RequestException as exc:
             logger.error(f"Session login initial GET failed: {exc}")
             return False
@@ -213,6 +377,7 @@ class FortiGateTopologyCollector:
                 json=payload,
                 headers=json_headers,
                 timeout=10,
+                verify=self.verify_ssl,
             )
             response.raise_for_status()
         except requests.RequestException as exc:
@@ -259,7 +424,7 @@ class FortiGateTopologyCollector:
         """Get FortiGate system status"""
         try:
             url = urljoin(self.base_url, "monitor/system/status")
-            response = self.session.get(url, params={"vdom": "root"}, timeout=10)
+            response = await self._get_authenticated(url, params={"vdom": "root"})
             
             if response.status_code == 200:
                 data = response.json()
@@ -282,7 +447,7 @@ class FortiGateTopologyCollector:
         """Get network interface configuration"""
         try:
             url = urljoin(self.base_url, "cmdb/system/interface")
-            response = self.session.get(url, timeout=10)
+            response = await self._get_authenticated(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -332,19 +497,8 @@ class FortiGateTopologyCollector:
         try:
             url = urljoin(self.base_url, "monitor/wifi/client")
             logger.info(f"Trying endpoint: /api/v2/monitor/wifi/client")
-            params = {"vdom": "root"}
-            # Add access_token to query if that's how we authenticated
-            if self._use_query_token and self.api_token:
-                params["access_token"] = self.api_token
-            response = self.session.get(url, params=params, timeout=10)
-            
-            # If we get 401, try to re-authenticate and retry once
-            if response.status_code == 401:
-                logger.warning("Got 401 from wifi/client, attempting re-authentication...")
-                if await self.authenticate():
-                    response = self.session.get(url, params={"vdom": "root"}, timeout=10)
-                else:
-                    logger.error("Re-authentication failed, skipping wifi/client endpoint")
+            # Re-authenticates and retries once on 401
+            response = await self._get_authenticated(url, params={"vdom": "root"})
             
             logger.info(f"Response status: {response.status_code}")
             if response.status_code == 200:
@@ -396,7 +550,7 @@ class FortiGateTopologyCollector:
         try:
             # First get list of managed switches
             switch_url = urljoin(self.base_url, "monitor/switch-controller/managed-switch/status")
-            switch_response = self.session.get(switch_url, params={"vdom": "root"}, timeout=10)
+            switch_response = await self._get_authenticated(switch_url, params={"vdom": "root"})
             
             if switch_response.status_code == 200:
                 switch_data = switch_response.json()
@@ -404,17 +558,26 @@ class FortiGateTopologyCollector:
                 if isinstance(switches, dict):
                     switches = switches.get("entries", [])
                 
-                # For each switch, try to get connected clients
-                for switch in switches[:5]:  # Limit to first 5 switches to avoid too many requests
-                    switch_id = switch.get("switch-id") or switch.get("id") or switch.get("serial")
-                    if not switch_id:
-                        continue
-                    
+                # Query every switch's clients concurrently; the limit adapts to FortiGate latency
+                clients_url = urljoin(self.base_url, "monitor/switch-controller/managed-switch/clients")
+                switch_ids = [(switch, switch.get("switch-id") or switch.get("id") or switch.get("serial"))
+                              for switch in switches]
+                switch_ids = [(switch, switch_id) for switch, switch_id in switch_ids if switch_id]
+
+                def fetch_clients(switch_id: str) -> Any:
+                    try:
+                        return self._get(clients_url, params={"switch_id": switch_id, "vdom": "root"})
+                    except Exception as exc:
+                        return exc
+
+                limit = limit_for(f"{self.host}:{self.port}", max_limit=SWITCH_CLIENT_CONCURRENCY)
+                responses = await asyncio.to_thread(limit.map, fetch_clients, [switch_id for _, switch_id in switch_ids])
+                logger.debug(f"Fetched clients for {len(switch_ids)} switches (peak concurrency {limit.peak})")
+
+                for (switch, switch_id), clients_response in zip(switch_ids, responses):
                     try:
-                        # Try switch clients endpoint
-                        clients_url = urljoin(self.base_url, f"monitor/switch-controller/managed-switch/clients")
-                        clients_response = self.session.get(clients_url, params={"switch_id": switch_id, "vdom": "root"}, timeout=10)
-                        
+                        if isinstance(clients_response, Exception):
+                            raise clients_response
                         if clients_response.status_code == 200:
                             clients_data = clients_response.json()
                             clients = clients_data.get('results') or clients_data.get('data') or []
@@ -453,23 +616,12 @@ class FortiGateTopologyCollector:
             try:
                 url = urljoin(self.base_url, endpoint_path)
                 logger.info(f"Trying endpoint: /api/v2/{endpoint_path}")
-                params = {"vdom": "root"}
-                # Add access_token to query if that's how we authenticated
-                if self._use_query_token and self.api_token:
-                    params["access_token"] = self.api_token
-                response = self.session.get(url, params=params, timeout=10)
+                # Re-authenticates and retries once on 401
+                response = await self._get_authenticated(url, params={"vdom": "root"})
                 
                 logger.info(f"Response status for {endpoint_name}: {response.status_code}")
-                
-                # If we get 401, try to re-authenticate and retry once
                 if response.status_code == 401:
-                    logger.warning(f"Got 401 from {endpoint_name}, attempting re-authentication...")
-                    if await self.authenticate():
-                        response = self.session.get(url, params={"vdom": "root"}, timeout=10)
-                        logger.info(f"Retry response status for {endpoint_name}: {response.status_code}")
-                    else:
-                        logger.error(f"Re-authentication failed, skipping {endpoint_name}")
-                        continue
+                    continue
                 
                 if response.status_code == 200:
                     try:
@@ -536,7 +688,7 @@ class FortiGateTopologyCollector:
         """Get VIP (Virtual IP) configuration"""
         try:
             url = urljoin(self.base_url, "cmdb/firewall/vip")
-            response = self.session.get(url, timeout=10)
+            response = await self._get_authenticated(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -553,7 +705,7 @@ class FortiGateTopologyCollector:
         """Get count of firewall policies"""
         try:
             url = urljoin(self.base_url, "cmdb/firewall/policy")
-            response = self.session.get(url, timeout=10)
+            response = await self._get_authenticated(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -571,7 +723,7 @@ class FortiGateTopologyCollector:
         try:
             # Get system resource usage
             url = urljoin(self.base_url, "monitor/system/resource/usage")
-            response = self.session.get(url, params={"vdom": "root"}, timeout=10)
+            response = await self._get_authenticated(url, params={"vdom": "root"})
             
             if response.status_code == 200:
                 data = response.json()
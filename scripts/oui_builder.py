@@ -1,50 +1,96 @@
 #!/usr/bin/env python3
-"""Download and build a local IEEE OUI database for fast MAC lookups."""
+"""Download and build a local IEEE OUI database for fast MAC lookups.
+
+The primary output is a compact binary index (MA-L, MA-M and MA-S
+registries) that the API memory-maps at startup; see
+src/enhanced_network_api/oui_index.py. The legacy JSON lookup is still
+available with --json.
+"""
 
 import argparse
 import csv
 import json
+import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, List
 
 import requests
 
+# Add the repository root to the path so `python scripts/oui_builder.py` works
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.enhanced_network_api.oui_index import Entry, build_oui_index
+
 OUI_CSV_URL = "https://standards-oui.ieee.org/oui/oui.csv"
+REGISTRY_CSV_URLS = {
+    'MA-L': OUI_CSV_URL,
+    'MA-M': "https://standards-oui.ieee.org/oui28/mam.csv",
+    'MA-S': "https://standards-oui.ieee.org/oui36/oui36.csv",
+}
 
 
-def download_oui_csv(destination: Path) -> None:
+def download_oui_csv(destination: Path, url: str = OUI_CSV_URL) -> None:
     destination.parent.mkdir(parents=True, exist_ok=True)
-    response = requests.get(OUI_CSV_URL, timeout=60)
+    response = requests.get(url, timeout=60)
     response.raise_for_status()
     destination.write_bytes(response.content)
 
 
-def build_lookup(csv_path: Path, json_path: Path) -> None:
-    lookup: Dict[str, Dict[str, str]] = {}
+def iter_entries(csv_path: Path) -> Iterator[Entry]:
     with csv_path.open('r', encoding='utf-8', newline='') as handle:
         reader = csv.DictReader(handle)
         for row in reader:
             assignment = row.get('Assignment')
             if not assignment:
                 continue
-            oui = assignment.replace('-', ':').upper()
-            lookup[oui] = {
-                'vendor': row.get('Organization Name', '').strip(),
-                'address': row.get('Organization Address', '').strip(),
-            }
+            yield (
+                assignment,
+                row.get('Organization Name', '').strip(),
+                row.get('Organization Address', '').strip(),
+            )
+
+
+def build_lookup(csv_path: Path, json_path: Path) -> None:
+    lookup: Dict[str, Dict[str, str]] = {}
+    for assignment, vendor, address in iter_entries(csv_path):
+        oui = assignment.replace('-', ':').upper()
+        lookup[oui] = {'vendor': vendor, 'address': address}
     json_path.parent.mkdir(parents=True, exist_ok=True)
     json_path.write_text(json.dumps(lookup, indent=2), encoding='utf-8')
 
 
+def build_index(csv_paths: List[Path], index_path: Path) -> int:
+    """Merge registry CSVs (MA-L first, so finer MA-M/MA-S blocks are added on top)."""
+    def entries() -> Iterator[Entry]:
+        for csv_path in csv_paths:
+            yield from iter_entries(csv_path)
+
+    return build_oui_index(entries(), index_path)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build local OUI lookup")
-    parser.add_argument('--csv', type=Path, default=Path('data/oui/oui.csv'))
-    parser.add_argument('--json', type=Path, default=Path('data/oui/lookup.json'))
+    parser.add_argument('--csv-dir', type=Path, default=Path('data/oui'))
+    parser.add_argument('--index', type=Path, default=Path('data/oui/oui.idx'))
+    parser.add_argument('--json', type=Path, default=None, help="Also write the legacy MA-L JSON lookup")
+    parser.add_argument('--offline', action='store_true', help="Reuse CSVs already in --csv-dir")
     args = parser.parse_args()
 
-    download_oui_csv(args.csv)
-    build_lookup(args.csv, args.json)
-    print(f"Built OUI lookup with {len(json.loads(args.json.read_text()))} entries -> {args.json}")
+    csv_paths = []
+    for registry, url in REGISTRY_CSV_URLS.items():
+        csv_path = args.csv_dir / Path(url).name
+        if not args.offline:
+            download_oui_csv(csv_path, url)
+        if csv_path.exists():
+            csv_paths.append(csv_path)
+        else:
+            print(f"Skipping {registry}: {csv_path} not found")
+
+    count = build_index(csv_paths, args.index)
+    print(f"Built OUI index with {count} assignments -> {args.index} ({args.index.stat().st_size} bytes)")
+    if args.json and csv_paths:
+        build_lookup(csv_paths[0], args.json)
+        print(f"Built OUI lookup with {len(json.loads(args.json.read_text()))} entries -> {args.json}")
 
 
 if __name__ == '__main__':
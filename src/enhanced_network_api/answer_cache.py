@@ -0,0 +1,173 @@
+"""Response cache for LLM-generated answers (docs QA, troubleshooting).
+
+Answers are keyed on the *normalized* question (lowercased, with whitespace
+and punctuation collapsed, so "What is FortiLink?" and "what is  fortilink"
+share an entry; every word is kept, since "how" and "when" ask different
+questions) together with the retrieved source set, the model name and the prompt
+template version. Any change to what the model would actually see therefore
+produces a new key; bump the template version when a prompt is edited.
+
+Entries live in a bounded TTL/LRU map and, when ``path`` is given, in a small
+SQLite file so answers survive restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_question(question: str) -> str:
+    words = _WORD_RE.findall(question.lower())
+    if words:
+        return " ".join(words)
+    return " ".join(question.lower().split())
+
+
+def answer_cache_key(question: str, sources: Iterable[str], model: str, template_version: str) -> str:
+    """Stable key for an answer; the order in which sources were retrieved does not matter."""
+    material = json.dumps(
+        [normalize_question(question), sorted({str(source) for source in sources}), model, template_version]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Bounded TTL/LRU cache of JSON-serializable answers with optional SQLite persistence."""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 512, path: Optional[str] = None) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._values: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path:
+            try:
+                Path(path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(Path(path).expanduser()), check_same_thread=False)
+                with self._conn:
+                    self._conn.execute(
+                        "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, expires REAL NOT NULL, payload TEXT NOT NULL)"
+                    )
+                    self._conn.execute("DELETE FROM answers WHERE expires <= ?", (time.time(),))
+            except (OSError, sqlite3.Error) as exc:
+                log.warning("Answer cache persistence disabled, cannot open %s: %s", path, exc)
+                self._conn = None
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[0] <= now:
+                del self._values[key]
+                cached = None
+            if cached is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires, payload FROM answers WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+                if row:
+                    cached = (row[0], json.loads(row[1]))
+                    self._remember_locked(key, cached)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._values.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+    def put(self, key: str, value: Any) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        entry = (time.time() + self.ttl, value)
+        with self._lock:
+            self._remember_locked(key, entry)
+            if self._conn is not None:
+                try:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO answers (key, expires, payload) VALUES (?, ?, ?)",
+                            (key, entry[0], json.dumps(value)),
+                        )
+                except sqlite3.Error as exc:
+                    log.warning("Failed to persist cached answer: %s", exc)
+
+    def _remember_locked(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._values[key] = entry
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM answers")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._values),
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_CACHES: Dict[str, AnswerCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_answer_cache(name: str) -> AnswerCache:
+    """Process-wide cache for ``name``.
+
+    Configured from ANSWER_CACHE_TTL (seconds, default 3600; 0 disables),
+    ANSWER_CACHE_MAX_ENTRIES (default 512) and ANSWER_CACHE_DIR, which when
+    set persists each named cache to ``<dir>/<name>.sqlite3``.
+    """
+    with _CACHES_LOCK:
+        cache = _CACHES.get(name)
+        if cache is None:
+            cache_dir = os.getenv("ANSWER_CACHE_DIR")
+            cache = AnswerCache(
+                ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+                max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512")),
+                path=str(Path(cache_dir) / f"{name}.sqlite3") if cache_dir else None,
+            )
+            _CACHES[name] = cache
+        return cache
+
+
+def answer_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _CACHES_LOCK:
+        return {name: cache.stats() for name, cache in _CACHES.items()}
+
+
+def close_answer_caches() -> None:
+    """Close and forget every named cache (shutdown hook and tests)."""
+    with _CACHES_LOCK:
+        for cache in _CACHES.values():
+            cache.close()
+        _CACHES.clear()
@@ -3,12 +3,23 @@ Fortinet LLM Integration Endpoints
 Custom LLM model integration for Fortinet device analysis and troubleshooting
 """
 
+import asyncio
+import hashlib
 import httpx
+import json
 import logging
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+try:
+    from ...answer_cache import answer_cache_key, get_answer_cache
+    from ...openmetrics import instrument_httpx_client
+except ImportError:
+    from answer_cache import answer_cache_key, get_answer_cache
+    from openmetrics import instrument_httpx_client
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -19,6 +30,42 @@ FORTINET_LLM_CONFIG = {
     "timeout": 30.0,
     "max_tokens": 2048
 }
+# Bump whenever the troubleshooting prompt changes so cached answers are not reused.
+TROUBLESHOOT_PROMPT_VERSION = "1"
+
+_LLM_CLIENT_LOCK = asyncio.Lock()
+_LLM_CLIENT: Optional[httpx.AsyncClient] = None
+_LLM_CLIENT_KEY: Optional[tuple] = None
+
+
+async def _get_llm_client() -> httpx.AsyncClient:
+    """Reuse a single AsyncClient when contacting the LLM backend."""
+    global _LLM_CLIENT, _LLM_CLIENT_KEY
+    key = (FORTINET_LLM_CONFIG["base_url"], FORTINET_LLM_CONFIG["timeout"], asyncio.get_running_loop())
+    async with _LLM_CLIENT_LOCK:
+        if _LLM_CLIENT and _LLM_CLIENT_KEY == key:
+            return _LLM_CLIENT
+        if _LLM_CLIENT:
+            try:
+                await _LLM_CLIENT.aclose()
+            except RuntimeError:
+                pass
+        _LLM_CLIENT = instrument_httpx_client(httpx.AsyncClient(base_url=key[0], timeout=key[1]), "fortinet_llm")
+        _LLM_CLIENT_KEY = key
+        return _LLM_CLIENT
+
+
+async def close_llm_client() -> None:
+    """Close the pooled LLM client (called from the application shutdown hook)."""
+    global _LLM_CLIENT, _LLM_CLIENT_KEY
+    if _LLM_CLIENT:
+        try:
+            await _LLM_CLIENT.aclose()
+        except RuntimeError as exc:  # pragma: no cover - best-effort cleanup
+            logger.debug("Ignoring event loop error while closing LLM client: %s", exc)
+        finally:
+            _LLM_CLIENT = None
+            _LLM_CLIENT_KEY = None
 
 class ChatRequest(BaseModel):
     prompt: str
@@ -40,48 +87,44 @@ class TroubleshootingRequest(BaseModel):
     device_data: Dict[str, Any]
     topology_context: Optional[Dict[str, Any]] = {}
 
+def _generate_payload(request: ChatRequest, stream: bool) -> Dict[str, Any]:
+    # Prepare the prompt with Fortinet context
+    system_prompt = build_system_prompt(request.context, request.device_type)
+    full_prompt = f"{system_prompt}\n\nUser: {request.prompt}\n\nAssistant:"
+
+    # Ollama /api/generate payload (adjust for your LLM backend)
+    return {
+        "model": FORTINET_LLM_CONFIG["model"],
+        "prompt": full_prompt,
+        "stream": stream,
+        "options": {
+            "temperature": request.temperature,
+            "num_predict": FORTINET_LLM_CONFIG["max_tokens"]
+        }
+    }
+
+def _chat_response(request: ChatRequest, llm_response: str) -> ChatResponse:
+    # Parse the response and extract recommendations
+    return ChatResponse(
+        response=llm_response,
+        model=FORTINET_LLM_CONFIG["model"],
+        context=request.context or "general",
+        recommendations=extract_recommendations(llm_response),
+        analysis=parse_analysis(llm_response)
+    )
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_fortinet_llm(request: ChatRequest):
     """
     Chat with the custom Fortinet LLM model
     """
     try:
-        async with httpx.AsyncClient(timeout=FORTINET_LLM_CONFIG["timeout"]) as client:
-            # Prepare the prompt with Fortinet context
-            system_prompt = build_system_prompt(request.context, request.device_type)
-            full_prompt = f"{system_prompt}\n\nUser: {request.prompt}\n\nAssistant:"
+        client = await _get_llm_client()
+        response = await client.post("/api/generate", json=_generate_payload(request, stream=False))
+        response.raise_for_status()
 
-            # Call Ollama API (adjust for your LLM backend)
-            payload = {
-                "model": FORTINET_LLM_CONFIG["model"],
-                "prompt": full_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": request.temperature,
-                    "num_predict": FORTINET_LLM_CONFIG["max_tokens"]
-                }
-            }
-
-            response = await client.post(
-                f"{FORTINET_LLM_CONFIG['base_url']}/api/generate",
-                json=payload
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            
-            # Parse the response and extract recommendations
-            llm_response = result.get("response", "")
-            recommendations = extract_recommendations(llm_response)
-            analysis = parse_analysis(llm_response)
-
-            return ChatResponse(
-                response=llm_response,
-                model=FORTINET_LLM_CONFIG["model"],
-                context=request.context or "general",
-                recommendations=recommendations,
-                analysis=analysis
-            )
+        result = response.json()
+        return _chat_response(request, result.get("response", ""))
 
     except httpx.HTTPError as e:
         logger.error(f"LLM HTTP error: {e}")
@@ -90,6 +133,64 @@ async def chat_with_fortinet_llm(request: ChatRequest):
         logger.error(f"LLM error: {e}")
         raise HTTPException(status_code=500, detail=f"LLM processing error: {e}")
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _relay_generate_stream(request: ChatRequest, response: httpx.Response):
+    """
+    Relay Ollama's NDJSON stream as SSE ``token`` events, then a ``done`` event
+    carrying the same recommendations/analysis the non-streaming route returns
+    """
+    parts: List[str] = []
+    try:
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            try:
+                chunk = json.loads(line)
+            except ValueError:
+                continue
+            if chunk.get("error"):
+                yield _sse("error", {"detail": chunk["error"]})
+                return
+            text = chunk.get("response")
+            if text:
+                parts.append(text)
+                yield _sse("token", {"text": text})
+            if chunk.get("done"):
+                break
+        yield _sse("done", _chat_response(request, "".join(parts)).model_dump())
+    except httpx.HTTPError as e:
+        logger.error(f"LLM stream error: {e}")
+        yield _sse("error", {"detail": f"LLM stream failed: {e}"})
+    finally:
+        await response.aclose()
+
+@router.post("/chat/stream")
+async def stream_chat_with_fortinet_llm(request: ChatRequest):
+    """
+    Chat with the custom Fortinet LLM model, streaming tokens as Server-Sent Events
+    """
+    try:
+        client = await _get_llm_client()
+        upstream = client.build_request("POST", "/api/generate", json=_generate_payload(request, stream=True))
+        response = await client.send(upstream, stream=True)
+    except httpx.HTTPError as e:
+        logger.error(f"LLM HTTP error: {e}")
+        raise HTTPException(status_code=503, detail=f"LLM service unavailable: {e}")
+
+    if response.status_code != 200:
+        body = (await response.aread()).decode("utf-8", errors="replace")
+        await response.aclose()
+        logger.error(f"LLM HTTP error: {response.status_code} {body}")
+        raise HTTPException(status_code=503, detail=f"LLM service unavailable: HTTP {response.status_code}")
+
+    return StreamingResponse(
+        _relay_generate_stream(request, response),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.post("/troubleshoot", response_model=ChatResponse)
 async def troubleshoot_with_llm(request: TroubleshootingRequest):
     """
@@ -105,6 +206,21 @@ async def troubleshoot_with_llm(request: TroubleshootingRequest):
             request.topology_context
         )
 
+        # The issue is the question; the device data and topology context are its sources
+        context_digest = hashlib.sha256(
+            (format_device_data(request.device_data) + "\n" + format_topology_context(request.topology_context)).encode("utf-8")
+        ).hexdigest()
+        cache = get_answer_cache("llm_troubleshoot")
+        cache_key = answer_cache_key(
+            request.issue,
+            [request.device_id, request.device_type, context_digest],
+            FORTINET_LLM_CONFIG["model"],
+            TROUBLESHOOT_PROMPT_VERSION
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return ChatResponse(**cached)
+
         chat_request = ChatRequest(
             prompt=prompt,
             context="troubleshooting",
@@ -112,7 +228,10 @@ async def troubleshoot_with_llm(request: TroubleshootingRequest):
             temperature=0.3  # Lower temperature for more consistent troubleshooting
         )
 
-        return await chat_with_fortinet_llm(chat_request)
+        result = await chat_with_fortinet_llm(chat_request)
+        if result.response:
+            cache.put(cache_key, result.model_dump())
+        return result
 
     except Exception as e:
         logger.error(f"Troubleshooting error: {e}")
@@ -124,7 +243,7 @@ async def list_available_models():
     List available Fortinet LLM models
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with instrument_httpx_client(httpx.AsyncClient(timeout=10.0), "fortinet_llm") as client:
             response = await client.get(f"{FORTINET_LLM_CONFIG['base_url']}/api/tags")
             response.raise_for_status()
             
@@ -153,7 +272,7 @@ async def health_check():
     Check if Fortinet LLM service is healthy
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with instrument_httpx_client(httpx.AsyncClient(timeout=5.0), "fortinet_llm") as client:
             response = await client.get(f"{FORTINET_LLM_CONFIG['base_url']}/api/tags")
             response.raise_for_status()
             
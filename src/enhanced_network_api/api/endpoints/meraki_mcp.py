@@ -9,6 +9,11 @@ from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+try:
+    from src.enhanced_network_api.openmetrics import instrument_httpx_client
+except ImportError:  # pragma: no cover - imported without the project root on sys.path
+    from openmetrics import instrument_httpx_client
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -43,7 +48,7 @@ async def call_meraki_mcp_tool(request: MCPRequest):
     Call a tool on the Meraki MCP server
     """
     try:
-        async with httpx.AsyncClient(timeout=MERAKI_MCP_CONFIG["timeout"]) as client:
+        async with instrument_httpx_client(httpx.AsyncClient(timeout=MERAKI_MCP_CONFIG["timeout"]), "meraki_mcp") as client:
             payload = {
                 "name": request.tool_name,
                 "arguments": request.arguments
@@ -199,7 +204,7 @@ async def meraki_mcp_health():
     Check if Meraki MCP server is healthy
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with instrument_httpx_client(httpx.AsyncClient(timeout=5.0), "meraki_mcp") as client:
             response = await client.get(f"{MERAKI_MCP_CONFIG['base_url']}/health")
             
             if response.status_code == 200:
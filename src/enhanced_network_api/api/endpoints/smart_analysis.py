@@ -15,6 +15,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from shared.mcp_base import FortiGateManager, MerakiManager
 
+try:
+    from src.enhanced_network_api.openmetrics import instrument_httpx_client
+except ImportError:  # pragma: no cover - imported without the project root on sys.path
+    from openmetrics import instrument_httpx_client
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -350,7 +355,9 @@ async def fetch_device_logs_shared(device_id: str, severity: str) -> List[str]:
 
 async def call_fortinet_llm(prompt: str, context: str, device_type: str) -> Dict[str, Any]:
     """Call the Fortinet LLM endpoint"""
-    async with httpx.AsyncClient(timeout=FORTINET_LLM_CONFIG["timeout"]) as client:
+    async with instrument_httpx_client(
+        httpx.AsyncClient(timeout=FORTINET_LLM_CONFIG["timeout"]), "fortinet_llm"
+    ) as client:
         payload = {
             "prompt": prompt,
             "context": context,
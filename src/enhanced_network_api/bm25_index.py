@@ -0,0 +1,173 @@
+"""
+Compact BM25 inverted index for the local documentation search.
+
+The index is built once from the extracted page texts and written as a
+single binary file that is memory-mapped for queries, so no per-query
+lowercasing or scanning of page text is needed. Layout (little endian,
+8-byte aligned sections)::
+
+    header    "<4sHHIIId64s"  magic, version, reserved, n_docs, n_terms, n_postings, avgdl, source_id
+    doc_len   uint32[n_docs]
+    term_off  uint32[n_terms + 1], term blob (UTF-8, sorted bytewise)
+    post_off  uint32[n_terms + 1]
+    doc_ids   uint32[n_postings], tfs uint32[n_postings]
+"""
+
+import heapq
+import math
+import mmap
+import re
+import struct
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+MAGIC = b"BM25"
+VERSION = 2
+K1 = 1.2
+B = 0.75
+_HEADER = struct.Struct("<4sHHIIId64s")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it of on or that the this to "
+    "what when where which with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def build_bm25_bytes(documents: Iterable[str], source_id: str = "") -> bytes:
+    """Serialize an index over ``documents`` (doc id = position in the iterable).
+
+    ``source_id`` (up to 64 ASCII chars) identifies the corpus version the
+    index was built from, so callers can tell when it is stale.
+    """
+    postings: Dict[bytes, List[Tuple[int, int]]] = {}
+    doc_lengths: List[int] = []
+    for doc_id, text in enumerate(documents):
+        counts = Counter(tokenize(text))
+        doc_lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings.setdefault(term.encode("utf-8"), []).append((doc_id, tf))
+
+    terms = sorted(postings)
+    term_offsets = [0]
+    post_offsets = [0]
+    doc_ids: List[int] = []
+    tfs: List[int] = []
+    for term in terms:
+        term_offsets.append(term_offsets[-1] + len(term))
+        for doc_id, tf in postings[term]:
+            doc_ids.append(doc_id)
+            tfs.append(tf)
+        post_offsets.append(len(doc_ids))
+
+    avgdl = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+    sections = [
+        struct.pack(f"<{len(doc_lengths)}I", *doc_lengths),
+        struct.pack(f"<{len(term_offsets)}I", *term_offsets),
+        b"".join(terms),
+        struct.pack(f"<{len(post_offsets)}I", *post_offsets),
+        struct.pack(f"<{len(doc_ids)}I", *doc_ids),
+        struct.pack(f"<{len(tfs)}I", *tfs),
+    ]
+    header = _HEADER.pack(
+        MAGIC, VERSION, 0, len(doc_lengths), len(terms), len(doc_ids), avgdl, source_id.encode("ascii")
+    )
+    out = bytearray(header)
+    for section in sections:
+        out.extend(b"\0" * (_align(len(out)) - len(out)))
+        out.extend(section)
+    return bytes(out)
+
+
+def write_bm25_index(documents: Iterable[str], path: Union[str, Path], source_id: str = "") -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(build_bm25_bytes(documents, source_id))
+    tmp_path.replace(path)
+
+
+class _Terms:
+    """Sequence view of the sorted term blob so ``bisect`` can search it in place."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]])
+
+
+class BM25Index:
+    """Query side of the index; ``data`` is an mmap or bytes from ``build_bm25_bytes``."""
+
+    def __init__(self, data: Union[bytes, mmap.mmap]):
+        self._data = data
+        view = memoryview(data)
+        if len(view) < _HEADER.size:
+            raise ValueError("not a BM25 index")
+        magic, version, _, n_docs, n_terms, n_postings, avgdl, source_id = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a BM25 index (version %d)" % VERSION)
+        self.n_docs = n_docs
+        self.avgdl = avgdl
+        self.source_id = source_id.rstrip(b"\0").decode("ascii")
+
+        offset = _HEADER.size
+
+        def take(size: int, fmt: Optional[str]) -> memoryview:
+            nonlocal offset
+            offset = _align(offset)
+            section = view[offset:offset + size]
+            offset += size
+            return section.cast(fmt) if fmt else section
+
+        self._doc_len = take(4 * n_docs, "I")
+        term_offsets = take(4 * (n_terms + 1), "I")
+        self._terms = _Terms(term_offsets, take(term_offsets[-1] if n_terms else 0, None))
+        self._post_off = take(4 * (n_terms + 1), "I")
+        self._doc_ids = take(4 * n_postings, "I")
+        self._tfs = take(4 * n_postings, "I")
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "BM25Index":
+        with open(path, "rb") as handle:
+            return cls(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def postings(self, term: str) -> List[Tuple[int, int]]:
+        key = term.encode("utf-8")
+        position = bisect_left(self._terms, key)
+        if position >= len(self._terms) or self._terms[position] != key:
+            return []
+        start, end = self._post_off[position], self._post_off[position + 1]
+        return list(zip(self._doc_ids[start:end], self._tfs[start:end]))
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Return ``(doc_id, score)`` pairs, best first."""
+        scores: Dict[int, float] = {}
+        avgdl = self.avgdl or 1.0
+        for term in set(tokenize(query)):
+            matches = self.postings(term)
+            if not matches:
+                continue
+            df = len(matches)
+            idf = math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in matches:
+                norm = K1 * (1.0 - B + B * self._doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1.0) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
@@ -0,0 +1,109 @@
+"""Latency-driven concurrency limits for fan-out against one upstream device.
+
+``AdaptiveConcurrencyLimit`` is an AIMD limit: it grows by one after a fast
+response and halves after a slow one or a failure. ``limit_for`` keeps one
+limit per host for the whole process, so what a limit learned in one
+collection carries over to the next one against the same device.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+# HTTP statuses that mean the upstream is shedding load
+OVERLOAD_STATUSES = (429, 503)
+
+
+def is_overload(result: Any) -> bool:
+    """Whether ``result`` signals a failed or overloaded call.
+
+    Callers that swallow errors return the exception, ``None`` or the
+    429/503 response instead of raising, so those count as failures too.
+    """
+    if result is None or isinstance(result, BaseException):
+        return True
+    return getattr(result, "status_code", None) in OVERLOAD_STATUSES
+
+
+class AdaptiveConcurrencyLimit:
+    """Concurrency limit for API calls to one device that follows response latency.
+
+    Management planes slow down well before they start failing, so latency
+    is the overload signal (AIMD): the limit grows by one after a response no
+    slower than ``tolerance`` times the fastest successful response seen, and
+    halves (at most once per window of ``limit`` completions) after a slower
+    one or a failure (see ``is_overload``, or an exception raised by the
+    call). Thread-safe; ``map`` runs a function over many items under the
+    limit.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 8, tolerance: float = 2.0):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = max(self.min_limit, min(initial, self.max_limit))
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.peak = 0
+        self.min_latency: Optional[float] = None
+        self._completions = 0
+        self._last_decrease = 0
+        self._cond = threading.Condition()
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        started = time.perf_counter()
+        overloaded = True
+        try:
+            result = func(*args, **kwargs)
+            overloaded = is_overload(result)
+            return result
+        finally:
+            self._release(time.perf_counter() - started, overloaded)
+
+    def _release(self, latency: float, overloaded: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._completions += 1
+            # Failures can be fast (refused connections), so only successes set the baseline
+            if not overloaded and (self.min_latency is None or latency < self.min_latency):
+                self.min_latency = latency
+            slow = self.min_latency is not None and latency > self.min_latency * self.tolerance
+            if overloaded or slow:
+                if self._completions - self._last_decrease >= self.limit:
+                    self.limit = max(self.min_limit, self.limit // 2)
+                    self._last_decrease = self._completions
+            elif self.limit < self.max_limit:
+                self.limit += 1
+            self._cond.notify_all()
+
+    def map(self, func: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """``[func(item) for item in items]``, run concurrently under the limit."""
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_limit, len(items)),
+                                thread_name_prefix="adaptive-limited") as pool:
+            return list(pool.map(lambda item: self.call(func, item), items))
+
+
+_LIMITS: Dict[Hashable, AdaptiveConcurrencyLimit] = {}
+_LIMITS_LOCK = threading.Lock()
+
+
+def limit_for(key: Hashable, **kwargs: Any) -> AdaptiveConcurrencyLimit:
+    """The process-wide limit for ``key`` (e.g. ``"host:port"``), created with ``kwargs`` on first use."""
+    with _LIMITS_LOCK:
+        limit = _LIMITS.get(key)
+        if limit is None:
+            limit = _LIMITS[key] = AdaptiveConcurrencyLimit(**kwargs)
+        return limit
+
+
+def reset_limits() -> None:
+    with _LIMITS_LOCK:
+        _LIMITS.clear()
@@ -7,13 +7,25 @@ Implements OUI lookup and device classification for Enhanced Network API
 import json
 import re
 import csv
+import hashlib
+import multiprocessing
 import requests
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, List, Any
-from dataclasses import dataclass
+from typing import Callable, Dict, Optional, List, Any, Tuple
+from dataclasses import asdict, dataclass, replace
 import logging
 
+try:
+    from .oui_index import OUIIndex
+except ImportError:
+    from oui_index import OUIIndex
+
 log = logging.getLogger(__name__)
 
 DEVICE_TYPES = {
@@ -37,6 +49,25 @@ OUI_DEVICE_TYPES = {
     '00:13:10': 'voip_phone',        # Cisco IP Phone
 }
 
+_NON_HEX = re.compile(r'[^0-9A-Fa-f]')
+
+# Bump when classification rules change so persisted match caches are discarded.
+MATCHER_RULES_VERSION = 1
+
+DEFAULT_OUI_INDEX_PATH = Path(__file__).resolve().parents[2] / 'data' / 'oui' / 'oui.idx'
+
+_OUI_INDEXES: Dict[Tuple[str, int], OUIIndex] = {}
+_OUI_INDEX_LOCK = threading.Lock()
+
+def _open_oui_index(path: str) -> OUIIndex:
+    """One mapping per index file (and mtime) per process, shared by every OUILookup"""
+    key = (str(Path(path).resolve()), Path(path).stat().st_mtime_ns)
+    with _OUI_INDEX_LOCK:
+        index = _OUI_INDEXES.get(key)
+        if index is None:
+            index = _OUI_INDEXES[key] = OUIIndex(path)
+        return index
+
 @dataclass
 class DeviceInfo:
     mac_address: str
@@ -47,22 +78,172 @@ class DeviceInfo:
     pos_system: Optional[str] = None
     details: Optional[Dict[str, Any]] = None
 
+class OUIResolver:
+    """Resolve unknown OUIs off the request path.
+
+    Misses are queued (deduplicated per OUI) and resolved by a daemon thread,
+    at most ``rate`` remote lookups per second. OUIs that no source knows are
+    kept in a negative cache for ``negative_ttl`` seconds so they are not
+    retried on every scene load. Successful results go to ``on_resolved``.
+    """
+
+    def __init__(
+        self,
+        resolve: Callable[[str], Dict[str, str]],
+        on_resolved: Optional[Callable[[str, Dict[str, str]], None]] = None,
+        rate: float = 1.0,
+        negative_ttl: float = 86400.0,
+        max_pending: int = 1024,
+        background: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._resolve = resolve
+        self._on_resolved = on_resolved
+        self.rate = rate
+        self.negative_ttl = negative_ttl
+        self.max_pending = max_pending
+        self.background = background
+        self._clock = clock
+        self._sleep = sleep
+        self._pending: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: set = set()
+        self._negative: Dict[str, float] = {}
+        self._next_slot = 0.0
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {'queued': 0, 'resolved': 0, 'negative': 0, 'dropped': 0}
+
+    def submit(self, oui: str, mac_address: str) -> bool:
+        """Queue ``oui`` for resolution; returns False if it is known-bad or already queued"""
+        with self._cond:
+            expiry = self._negative.get(oui)
+            if expiry is not None:
+                if expiry > self._clock():
+                    return False
+                del self._negative[oui]
+            if oui in self._pending or oui in self._inflight:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.stats['dropped'] += 1
+                return False
+            self._pending[oui] = mac_address
+            self.stats['queued'] += 1
+            if self.background and (self._worker is None or not self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="oui-resolver", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+            return True
+
+    def pending(self) -> List[str]:
+        with self._cond:
+            return list(self._pending)
+
+    def resolve_pending(self, limit: Optional[int] = None) -> int:
+        """Resolve queued OUIs on the calling thread; the worker loop uses this too"""
+        done = 0
+        while limit is None or done < limit:
+            with self._cond:
+                if not self._pending:
+                    break
+                oui, mac_address = self._pending.popitem(last=False)
+                self._inflight.add(oui)
+            self._throttle()
+            try:
+                result = self._resolve(mac_address)
+            except Exception as e:
+                log.debug(f"OUI resolution failed for {oui}: {e}")
+                result = {'vendor': 'Unknown', 'address': ''}
+            resolved = result.get('vendor', 'Unknown') not in ('Unknown', '')
+            with self._cond:
+                self._inflight.discard(oui)
+                if resolved:
+                    self.stats['resolved'] += 1
+                else:
+                    self._negative[oui] = self._clock() + self.negative_ttl
+                    self.stats['negative'] += 1
+            if resolved and self._on_resolved:
+                try:
+                    self._on_resolved(oui, result)
+                except Exception as e:
+                    log.warning(f"Failed to backfill OUI {oui}: {e}")
+            done += 1
+        return done
+
+    def _throttle(self) -> None:
+        if self.rate <= 0:
+            return
+        now = self._clock()
+        if self._next_slot > now:
+            self._sleep(self._next_slot - now)
+            now = self._next_slot
+        self._next_slot = now + 1.0 / self.rate
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            self.resolve_pending()
+
 class OUILookup:
-    """Enhanced OUI database with macaddress.io API integration"""
+    """Enhanced OUI database with macaddress.io API integration
+
+    Lookup modes (``mode`` or OUI_LOOKUP_MODE):
+      background - local table only on the request path; misses are resolved by
+                   an OUIResolver thread and backfilled for later lookups (default)
+      offline    - local table only, never touches the network (air-gapped sites)
+      online     - legacy synchronous internet fallback on every miss
+
+    ``oui_csv_path`` may also point at a binary index built by
+    scripts/oui_builder.py; otherwise OUI_INDEX_PATH (default data/oui/oui.idx)
+    is memory-mapped when present and the CSV/built-in tables are skipped.
+    """
     
-    def __init__(self, oui_csv_path: Optional[str] = None):
+    def __init__(self, oui_csv_path: Optional[str] = None, mode: Optional[str] = None):
         self.oui_dict: Dict[str, Dict[str, str]] = {}
+        self.index: Optional[OUIIndex] = None
         self.macaddress_io_api_key = os.getenv('MACADDRESS_IO_API_KEY')
         self.macaddress_io_base_url = os.getenv('MACADDRESS_IO_BASE_URL', 'https://api.macaddress.io/v1')
+        self.mode = (mode or os.getenv('OUI_LOOKUP_MODE', 'background')).lower()
+        self.backfill_listeners: List[Callable[[str, Dict[str, str]], None]] = []
+        self.resolver: Optional[OUIResolver] = None
+        if self.mode == 'background':
+            self.resolver = OUIResolver(
+                self.lookup_remote,
+                on_resolved=self._backfill,
+                rate=float(os.getenv('OUI_RESOLVER_RATE', '1.0')),
+                negative_ttl=float(os.getenv('OUI_NEGATIVE_TTL', '86400')),
+            )
+        
+        index_path = Path(os.getenv('OUI_INDEX_PATH', DEFAULT_OUI_INDEX_PATH))
+        if oui_csv_path and Path(oui_csv_path).suffix == '.idx':
+            index_path, oui_csv_path = Path(oui_csv_path), None
         
         if oui_csv_path and Path(oui_csv_path).exists():
             self.load_oui_csv(oui_csv_path)
+        elif index_path.exists() and self.load_oui_index(index_path):
+            pass
         else:
             log.warning("OUI database not found, using built-in vendor mappings")
             self._load_builtin_ouis()
     
+    def load_oui_index(self, index_path: Path) -> bool:
+        """Memory-map a binary OUI index (shared across worker processes)"""
+        try:
+            self.index = _open_oui_index(str(index_path))
+        except (OSError, ValueError) as e:
+            log.error(f"Failed to open OUI index {index_path}: {e}")
+            return False
+        log.info(f"Mapped OUI index with {len(self.index)} assignments")
+        return True
+    
     def lookup(self, mac_address: str) -> Dict[str, str]:
-        """Lookup vendor information for a MAC address with macaddress.io API fallback"""
+        """Lookup vendor information for a MAC address from the local table.
+
+        Only ``online`` mode calls the internet APIs inline; otherwise a miss
+        returns Unknown immediately and is queued for background resolution.
+        """
         # Normalize MAC address
         mac_clean = mac_address.replace(':', '').replace('-', '').replace('.', '').upper()
         
@@ -77,7 +258,27 @@ class OUILookup:
         if local_result:
             return local_result
         
-        # If not found locally and API key is available, use macaddress.io
+        if self.index is not None:
+            indexed = self.index.lookup(mac_clean)
+            if indexed:
+                return indexed
+        
+        if self.mode == 'online':
+            return self.lookup_remote(mac_address)
+        
+        # Locally administered (randomized) MACs have no registered vendor
+        if self.resolver is not None and mac_clean[1] not in '26AE':
+            self.resolver.submit(oui, mac_address)
+        return {'vendor': 'Unknown', 'address': ''}
+    
+    def _backfill(self, oui: str, vendor_info: Dict[str, str]) -> None:
+        self.oui_dict[oui] = vendor_info
+        for listener in self.backfill_listeners:
+            listener(oui, vendor_info)
+    
+    def lookup_remote(self, mac_address: str) -> Dict[str, str]:
+        """Resolve a MAC vendor through the internet APIs (blocking)"""
+        # If API key is available, use macaddress.io
         if self.macaddress_io_api_key:
             return self._lookup_macaddress_io(mac_address)
         
@@ -207,7 +408,8 @@ class OUILookup:
 class DeviceClassifier:
     """Classify devices based on vendor and context"""
     
-    def __init__(self):
+    def __init__(self, oui_lookup: Optional[OUILookup] = None):
+        self.oui_lookup = oui_lookup
         self.device_classifications = {
             'cisco meraki': {
                 'mr': 'Wireless Access Point',
@@ -378,7 +580,9 @@ class DeviceClassifier:
                 return self._format_device_type(device_type)
         
         # Special POS system detection
-        pos_system = self.identify_pos_device(mac, OUILookup(), context)
+        if self.oui_lookup is None:
+            self.oui_lookup = OUILookup()
+        pos_system = self.identify_pos_device(mac, self.oui_lookup, context)
         if pos_system:
             return 'POS Terminal'
         
@@ -435,18 +639,200 @@ class DeviceClassifier:
             return 'random_mac'
         return 'static_mac'
 
+class MatchCacheStore:
+    """SQLite-backed persistent store for DeviceModelMatcher results.
+
+    Rows are tagged with the matcher fingerprint (model library + OUI source +
+    rules version); opening the store with a different fingerprint discards
+    the old rows. Writes are buffered and committed in batches.
+
+    The store is a best-effort cache: several workers may share the file, so
+    a lookup or write that fails (e.g. "database is locked" after waiting
+    ``busy_timeout`` seconds) is logged and treated as a miss or dropped.
+    """
+
+    def __init__(self, path: str, fingerprint: str, batch_size: int = 512, busy_timeout: float = 5.0):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.batch_size = batch_size
+        self._pending: List[Tuple[str, str, str, str]] = []
+        self._lock = threading.Lock()
+        Path(path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(Path(path).expanduser()), timeout=busy_timeout, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                "mac TEXT NOT NULL, hostname TEXT NOT NULL, model TEXT NOT NULL, payload TEXT NOT NULL, "
+                "PRIMARY KEY (mac, hostname, model))"
+            )
+            # Resolved OUIs do not depend on the fingerprint and survive it changing
+            self._conn.execute("CREATE TABLE IF NOT EXISTS ouis (oui TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if not row or row[0] != fingerprint:
+                if row:
+                    log.info("Device match cache fingerprint changed, discarding %s", path)
+                self._conn.execute("DELETE FROM matches")
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[DeviceInfo]:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT payload FROM matches WHERE mac = ? AND hostname = ? AND model = ?", key
+                ).fetchone()
+        except sqlite3.Error as e:
+            log.warning(f"Device match cache lookup failed in {self.path}: {e}")
+            return None
+        if not row:
+            return None
+        return DeviceInfo(**json.loads(row[0]))
+
+    def put(self, key: Tuple[str, str, str], info: DeviceInfo) -> None:
+        with self._lock:
+            self._pending.append((*key, json.dumps(asdict(info))))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO matches (mac, hostname, model, payload) VALUES (?, ?, ?, ?)",
+                    pending,
+                )
+        except sqlite3.Error as e:
+            # Dropping the batch keeps later puts from retrying it forever
+            log.warning(f"Dropped {len(pending)} device match cache writes to {self.path}: {e}")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def load_ouis(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with self._lock:
+                rows = self._conn.execute("SELECT oui, payload FROM ouis").fetchall()
+        except sqlite3.Error as e:
+            log.warning(f"Could not load cached OUIs from {self.path}: {e}")
+            return {}
+        return {oui: json.loads(payload) for oui, payload in rows}
+
+    def put_oui(self, oui: str, vendor_info: Dict[str, str]) -> None:
+        """Persist a resolved OUI and drop cached matches made before it was known"""
+        prefix = oui.replace(':', '')
+        with self._lock:
+            self._flush_locked()
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO ouis (oui, payload) VALUES (?, ?)", (oui, json.dumps(vendor_info))
+                    )
+                    self._conn.execute("DELETE FROM matches WHERE substr(mac, 1, 6) = ?", (prefix,))
+            except sqlite3.Error as e:
+                log.warning(f"Could not persist OUI {oui} to {self.path}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
 class DeviceModelMatcher:
     """Match devices to 3D models based on MAC and classification - Following iconlab.md architecture"""
     
-    def __init__(self, model_library_path: Optional[str] = None, oui_database_path: Optional[str] = None):
+    def __init__(
+        self,
+        model_library_path: Optional[str] = None,
+        oui_database_path: Optional[str] = None,
+        cache_size: int = 4096,
+        cache_path: Optional[str] = None,
+    ):
+        """
+        cache_size: entries kept in the in-memory LRU of match results (0 disables)
+        cache_path: optional SQLite file persisting match results across restarts;
+                    defaults to DEVICE_MATCH_CACHE_DB when set
+        """
+        self.model_library_path = model_library_path
+        self.oui_database_path = oui_database_path
         self.oui_dict = self.load_oui_database(oui_database_path)
         self.model_library = self.load_model_library(model_library_path)
         self.oui_lookup = OUILookup(oui_database_path)
-        self.classifier = DeviceClassifier()
+        self.classifier = DeviceClassifier(self.oui_lookup)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str, str], DeviceInfo]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._vendor_models: Dict[str, Optional[str]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fingerprint = self._compute_fingerprint(oui_database_path)
+        cache_path = cache_path or os.getenv('DEVICE_MATCH_CACHE_DB')
+        self.store: Optional[MatchCacheStore] = None
+        if cache_path:
+            try:
+                self.store = MatchCacheStore(cache_path, self.fingerprint)
+            except sqlite3.Error as e:
+                log.warning(f"Device match cache disabled, cannot open {cache_path}: {e}")
+        if self.store is not None:
+            self.oui_lookup.oui_dict.update(self.store.load_ouis())
+        self.oui_lookup.backfill_listeners.append(self._on_oui_backfilled)
+
+    def _compute_fingerprint(self, oui_database_path: Optional[str]) -> str:
+        """Identify the model library + OUI data a cached match was computed against"""
+        digest = hashlib.sha256()
+        digest.update(f"rules:{MATCHER_RULES_VERSION}".encode())
+        digest.update(json.dumps(self.model_library, sort_keys=True).encode())
+        digest.update(json.dumps(self.oui_lookup.oui_dict, sort_keys=True).encode())
+        source_paths = [oui_database_path]
+        if self.oui_lookup.index is not None:
+            source_paths.append(self.oui_lookup.index.path)
+        for source_path in source_paths:
+            if source_path and Path(source_path).exists():
+                stat = Path(source_path).stat()
+                digest.update(f"{source_path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _cache_key(mac_address: str, additional_context: Optional[Dict]) -> Tuple[str, str, str]:
+        context = additional_context or {}
+        mac = _NON_HEX.sub('', mac_address or '').upper()
+        return (mac, str(context.get('hostname') or ''), str(context.get('model') or ''))
+
+    @staticmethod
+    def _canonical_mac(mac_address: str) -> str:
+        """Upper-case colon form the classifier rules expect; anything that is not a MAC is returned unchanged"""
+        mac_clean = _NON_HEX.sub('', mac_address or '').upper()
+        if len(mac_clean) != 12:
+            return mac_address
+        return ':'.join(mac_clean[i:i + 2] for i in range(0, 12, 2))
+
+    def _on_oui_backfilled(self, oui: str, vendor_info: Dict[str, str]) -> None:
+        """Forget matches classified while ``oui`` was unknown and persist the vendor"""
+        prefix = oui.replace(':', '')
+        with self._cache_lock:
+            for key in [key for key in self._cache if key[0].startswith(prefix)]:
+                del self._cache[key]
+        if self.store is not None:
+            self.store.put_oui(oui, vendor_info)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._cache)}
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+            self._vendor_models.clear()
     
     def load_oui_database(self, path: Optional[str]) -> Dict[str, Dict[str, str]]:
         """Load pre-built OUI lookup as described in iconlab.md"""
-        if path and Path(path).exists():
+        if path and Path(path).exists() and Path(path).suffix != '.idx':
             try:
                 with open(path, 'r') as f:
                     return json.load(f)
@@ -520,7 +906,74 @@ class DeviceModelMatcher:
         """
         Given MAC address, return vendor, device type, and 3D model path
         Following iconlab.md architecture exactly
+
+        Results are cached by (MAC, hostname, model) in a bounded LRU and, when
+        configured, in the persistent MatchCacheStore. The MAC is classified in
+        canonical colon form, so every notation of one address matches the same.
         """
+        canonical = self._canonical_mac(mac_address)
+        if self.cache_size <= 0 and self.store is None:
+            info = self._match_uncached(canonical, additional_context)
+        else:
+            info = self._cached_match(canonical, additional_context)
+            if info is None:
+                info = self._match_uncached(canonical, additional_context)
+                self._store_match(self._cache_key(canonical, additional_context), info)
+        if info.mac_address != mac_address:
+            info = DeviceInfo(
+                mac_address, info.vendor, info.device_type, info.confidence, info.model_path,
+                info.pos_system, dict(info.details) if info.details is not None else None,
+            )
+        return info
+
+    def _cached_match(self, mac_address: str, additional_context: Optional[Dict]) -> Optional[DeviceInfo]:
+        """Cached result for this MAC/context (counted as a hit or miss), or None"""
+        if self.cache_size <= 0 and self.store is None:
+            return None
+        key = self._cache_key(mac_address, additional_context)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is None and self.store is not None:
+            cached = self.store.get(key)
+            if cached is not None:
+                self._remember(key, cached)
+        if cached is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        if cached.mac_address == mac_address:
+            return cached
+        return replace(cached, mac_address=mac_address)
+
+    def _store_match(self, key: Tuple[str, str, str], info: DeviceInfo) -> None:
+        self._remember(key, info)
+        if self.store is not None:
+            self.store.put(key, info)
+
+    def _remember(self, key: Tuple[str, str, str], info: DeviceInfo) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = info
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _model_for_vendor(self, vendor: str) -> Optional[str]:
+        """First library entry whose key contains the vendor name (memoized per vendor)"""
+        if vendor in self._vendor_models:
+            return self._vendor_models[vendor]
+        vendor_lower = vendor.lower()
+        model_path = next(
+            (path for key, path in self.model_library.items() if vendor_lower in key.lower()),
+            None,
+        )
+        self._vendor_models[vendor] = model_path
+        return model_path
+
+    def _match_uncached(self, mac_address: str, additional_context: Optional[Dict] = None) -> DeviceInfo:
         # Step 1: Lookup vendor from MAC
         vendor_info = self.oui_lookup.lookup(mac_address)
         vendor = vendor_info.get('vendor', 'Unknown')
@@ -536,10 +989,7 @@ class DeviceModelMatcher:
         
         # Try partial matches
         if not model_path:
-            for key in self.model_library.keys():
-                if vendor.lower() in key.lower():
-                    model_path = self.model_library[key]
-                    break
+            model_path = self._model_for_vendor(vendor)
         
         # Default generic model if no match
         if not model_path:
@@ -555,7 +1005,7 @@ class DeviceModelMatcher:
             'pos_system': pos_system,
             'random_mac': self.classifier._detect_random_mac(mac_address) == 'random_mac',
             'model_key': model_key,
-            'lookup_method': 'macaddress.io' if self.oui_lookup.macaddress_io_api_key else 'local'
+            'lookup_method': 'macaddress.io' if self.oui_lookup.mode == 'online' and self.oui_lookup.macaddress_io_api_key else 'local'
         }
         
         return DeviceInfo(
@@ -585,18 +1035,117 @@ class DeviceModelMatcher:
         }
         return generic_models.get(device_type, '/static/3d-models/generated/models/Laptop.obj')
     
-    def bulk_match(self, mac_addresses: List[str], context_map: Optional[Dict[str, Dict]] = None) -> List[DeviceInfo]:
-        """Match multiple MAC addresses to models - from iconlab.md usage example"""
-        results = []
-        for mac in mac_addresses:
+    def _assignment_digits(self, mac_clean: str) -> int:
+        """Hex digits of the IEEE assignment a MAC falls in (6, or 7/9 for MA-M/MA-S blocks)"""
+        index = self.oui_lookup.index
+        if index is None or not (index.counts[28] or index.counts[36]):
+            return 6
+        block = (index.lookup(mac_clean) or {}).get('block')
+        return {'MA-S': 9, 'MA-M': 7}.get(block, 6)
+
+    def bulk_match(
+        self,
+        mac_addresses: List[str],
+        context_map: Optional[Dict[str, Dict]] = None,
+        processes: Optional[int] = None,
+        pool_threshold: Optional[int] = None,
+    ) -> List[DeviceInfo]:
+        """Match multiple MAC addresses to models - from iconlab.md usage example
+
+        MACs are normalized to colon form and grouped by (IEEE assignment,
+        hostname, model); classification only depends on those, so each group
+        is classified once and the result fanned back out to every member.
+        When there are at least ``pool_threshold`` uncached groups and
+        ``processes`` > 1 (DEVICE_MATCH_PROCESSES / DEVICE_MATCH_POOL_THRESHOLD),
+        groups are classified on a process pool.
+        """
+        if processes is None:
+            processes = int(os.getenv('DEVICE_MATCH_PROCESSES', '0'))
+        if pool_threshold is None:
+            pool_threshold = int(os.getenv('DEVICE_MATCH_POOL_THRESHOLD', '5000'))
+
+        groups: "OrderedDict[Tuple[str, str, str], Tuple[str, Optional[Dict], List[int]]]" = OrderedDict()
+        for position, mac in enumerate(mac_addresses):
             context = context_map.get(mac) if context_map else None
-            device_info = self.match_mac_to_model(mac, context)
-            results.append(device_info)
+            mac_clean = _NON_HEX.sub('', mac or '').upper()
+            valid = len(mac_clean) == 12
+            prefix = mac_clean[:self._assignment_digits(mac_clean)] if valid else (mac_clean or mac)
+            if context:
+                group_key = (prefix, str(context.get('hostname') or '').lower(), str(context.get('model') or '').lower())
+            else:
+                group_key = (prefix, '', '')
+            group = groups.get(group_key)
+            if group is not None:
+                group[2].append(position)
+            else:
+                canonical = self._canonical_mac(mac)
+                groups[group_key] = (canonical, context, [position])
+
+        representatives: Dict[Tuple[str, str, str], DeviceInfo] = {}
+        uncached = []
+        for group_key, (canonical, context, _) in groups.items():
+            cached = self._cached_match(canonical, context)
+            if cached is not None:
+                representatives[group_key] = cached
+            else:
+                uncached.append(group_key)
+
+        if processes > 1 and len(uncached) >= pool_threshold:
+            work = [(groups[key][0], groups[key][1]) for key in uncached]
+            chunk = max(1, len(work) // (processes * 4))
+            # Spawned, not forked: the OUI resolver and server threads may hold locks
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_pool_matcher,
+                initargs=(self.model_library_path, self.oui_database_path),
+            ) as pool:
+                matched = list(pool.map(_pool_match, work, chunksize=chunk))
+            for group_key, info in zip(uncached, matched):
+                canonical, context, _ = groups[group_key]
+                self._store_match(self._cache_key(canonical, context), info)
+                if info.vendor == 'Unknown':
+                    # Workers run offline; queue misses on this process's resolver
+                    self.oui_lookup.lookup(canonical)
+                representatives[group_key] = info
+        else:
+            for group_key in uncached:
+                canonical, context, _ = groups[group_key]
+                representatives[group_key] = self.match_mac_to_model(canonical, context)
+
+        results: List[Optional[DeviceInfo]] = [None] * len(mac_addresses)
+        for group_key, (_, _, positions) in groups.items():
+            info = representatives[group_key]
+            for position in positions:
+                mac = mac_addresses[position]
+                if info.mac_address == mac:
+                    results[position] = info
+                else:
+                    # Direct construction is several times cheaper than dataclasses.replace
+                    results[position] = DeviceInfo(
+                        mac, info.vendor, info.device_type, info.confidence, info.model_path,
+                        info.pos_system, dict(info.details) if info.details is not None else None,
+                    )
         return results
 
+
+_POOL_MATCHER: Optional[DeviceModelMatcher] = None
+
+def _init_pool_matcher(model_library_path: Optional[str], oui_database_path: Optional[str]) -> None:
+    global _POOL_MATCHER
+    os.environ['OUI_LOOKUP_MODE'] = 'offline'
+    os.environ.pop('DEVICE_MATCH_CACHE_DB', None)
+    logging.getLogger(__name__).setLevel(logging.ERROR)
+    _POOL_MATCHER = DeviceModelMatcher(model_library_path, oui_database_path, cache_size=0)
+
+def _pool_match(item: Tuple[str, Optional[Dict]]) -> DeviceInfo:
+    mac_address, context = item
+    return _POOL_MATCHER.match_mac_to_model(mac_address, context)
+
 # API integration functions
-def create_device_matching_api(app):
+def create_device_matching_api(app, matcher: Optional[DeviceModelMatcher] = None):
     """Create FastAPI endpoints for device matching"""
+    import asyncio
     from fastapi import HTTPException
     from pydantic import BaseModel
     
@@ -608,13 +1157,13 @@ def create_device_matching_api(app):
         matches: List[DeviceInfo]
         total: int
     
-    matcher = DeviceModelMatcher()
+    matcher = matcher or DeviceModelMatcher()
     
     @app.post("/api/devices/match-macs", response_model=MACMatchResponse)
     async def match_mac_addresses(request: MACMatchRequest):
         """Match MAC addresses to device types and 3D models"""
         try:
-            matches = matcher.bulk_match(request.mac_addresses, request.context)
+            matches = await asyncio.to_thread(matcher.bulk_match, request.mac_addresses, request.context)
             return MACMatchResponse(matches=matches, total=len(matches))
         except Exception as e:
             log.error(f"MAC matching error: {e}")
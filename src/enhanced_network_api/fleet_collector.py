@@ -0,0 +1,498 @@
+"""Fleet-wide discovery across many FortiGates (one per site).
+
+``FleetCollector`` runs discovery against every configured FortiGate
+concurrently on ``AsyncFortiGateMonitor``. Fleet-wide concurrency is bounded
+by a global semaphore and each site gets its own small connection pool
+(``per_host_concurrency``), so one large fleet cannot flood a single
+FortiGate and a slow site only occupies its own slots. First collections are
+spread at random over ``startup_spread`` seconds (default: one interval), and
+successful sites are scheduled again after ``interval`` seconds, jittered so
+sites do not synchronise; failing sites back off exponentially (also
+jittered) up to ``backoff_max``.
+
+Each collection is written to ``SiteSnapshotStore`` as one JSON file per site
+(written to a temp file, then renamed), and ``merge_fleet`` combines the stored
+snapshots into one topology with site-prefixed node ids. API handlers only
+read snapshots and never contact the devices themselves; ``trigger`` asks the
+scheduler to collect every site now. A site is never collected twice at once:
+concurrent requests for it share the collection in flight.
+
+Sites come from ``FORTIGATE_HOSTS`` (``host[:port]``, comma separated), using
+the same per-host variables as ``config_manager``:
+``FORTIGATE_{host}_TOKEN``, ``FORTIGATE_{host}_NAME`` and ``FORTIGATE_{host}_PORT``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+try:
+    from .fortigate_monitor import AsyncFortiGateMonitor, create_monitor_client
+    from .openmetrics import instrument_httpx_client
+except ImportError:  # pragma: no cover - flat imports when run from this directory
+    from fortigate_monitor import AsyncFortiGateMonitor, create_monitor_client
+    from openmetrics import instrument_httpx_client
+
+logger = logging.getLogger(__name__)
+
+# Monitor sections needed to build a site topology.
+FLEET_SECTIONS = ("system_status", "interfaces", "switch_status", "switch_clients", "wifi_clients")
+
+_SITE_ID_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class FleetSite:
+    """One FortiGate to collect from."""
+
+    site_id: str
+    host: str
+    token: str
+    port: int = 10443
+    name: Optional[str] = None
+    ca_bundle: Optional[Union[bool, str]] = None
+
+    @property
+    def label(self) -> str:
+        return self.name or self.site_id
+
+
+def _host_env_key(host: str) -> str:
+    return host.replace(".", "_").replace("-", "_").replace(":", "_")
+
+
+def site_id_for(host: str, port: int) -> str:
+    """Filesystem-safe id for a FortiGate endpoint."""
+    return _SITE_ID_RE.sub("_", f"{host}_{port}")
+
+
+def sites_from_env(environ: Optional[Dict[str, str]] = None) -> List[FleetSite]:
+    """Build the fleet from ``FORTIGATE_HOSTS``; hosts without a token are skipped."""
+    env = os.environ if environ is None else environ
+    verify = env.get("FORTIGATE_VERIFY_SSL", "").strip().lower() in {"1", "true", "yes", "on"}
+    ca_bundle: Union[bool, str] = (env.get("CA_CERT_PATH") or True) if verify else False
+    default_token = env.get("FORTIGATE_TOKEN") or env.get("FORTIGATE_API_TOKEN") or env.get("FORTIGATE_DEFAULT_TOKEN")
+
+    sites: List[FleetSite] = []
+    seen = set()
+    for entry in env.get("FORTIGATE_HOSTS", "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port_str = entry.partition(":")
+        key = _host_env_key(host)
+        try:
+            port = int(port_str or env.get(f"FORTIGATE_{key}_PORT") or 10443)
+        except ValueError:
+            logger.warning("Ignoring FortiGate %s: invalid port %r", host, port_str)
+            continue
+        token = env.get(f"FORTIGATE_{key}_TOKEN") or default_token
+        if not token:
+            logger.warning("Skipping FortiGate %s: no API token configured", entry)
+            continue
+        site_id = site_id_for(host, port)
+        if site_id in seen:
+            continue
+        seen.add(site_id)
+        sites.append(FleetSite(site_id, host, token, port, env.get(f"FORTIGATE_{key}_NAME"), ca_bundle))
+    return sites
+
+
+def _results(payload: Any) -> Any:
+    if isinstance(payload, dict):
+        if "error" in payload:
+            return None
+        return payload.get("results", payload)
+    return payload
+
+
+def _entries(payload: Any) -> List[Dict[str, Any]]:
+    results = _results(payload)
+    if isinstance(results, dict):
+        results = results.get("entries", list(results.values()))
+    return [item for item in results or [] if isinstance(item, dict)]
+
+
+def site_topology(site: FleetSite, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    """Topology (``devices``/``links`` in the topology workflow format) of one site's dataset."""
+    status_payload = dataset.get("system_status")
+    status = _results(status_payload) or {}
+    # FortiOS reports serial and version in the response envelope, next to ``results``
+    envelope = status_payload if isinstance(status_payload, dict) else {}
+    serial = envelope.get("serial") or status.get("serial")
+    fortigate_id = serial or f"fg-{site.site_id}"
+    devices: List[Dict[str, Any]] = [{
+        "id": fortigate_id,
+        "name": status.get("hostname") or site.label,
+        "type": "fortigate",
+        "ip": site.host,
+        "model": status.get("model_number") or status.get("model"),
+        "serial": serial,
+        "version": envelope.get("version") or status.get("version"),
+        "status": "online" if status else "unknown",
+    }]
+    links: List[Dict[str, Any]] = []
+
+    for switch in _entries(dataset.get("switch_status")):
+        switch_id = switch.get("switch-id") or switch.get("serial") or switch.get("name")
+        if not switch_id:
+            continue
+        devices.append({
+            "id": switch_id,
+            "name": switch.get("name") or switch_id,
+            "type": "fortiswitch",
+            "ip": switch.get("connecting_from"),
+            "serial": switch.get("serial"),
+            "status": switch.get("status"),
+        })
+        links.append({"source": fortigate_id, "target": switch_id, "type": "fortilink",
+                      "interfaces": [switch.get("fgt_peer_intf_name") or "fortilink"]})
+
+    # A client on a bridged SSID is also seen behind its AP's switch port; the
+    # wireless entry wins and every MAC becomes one device.
+    wifi_clients = [client for client in _entries(dataset.get("wifi_clients")) if client.get("mac")]
+    seen = {client["mac"].lower() for client in wifi_clients}
+    for client in _entries(dataset.get("switch_clients")):
+        mac = client.get("mac")
+        if not mac or mac.lower() in seen:
+            continue
+        seen.add(mac.lower())
+        devices.append({
+            "id": mac,
+            "name": client.get("hostname") or client.get("device") or mac,
+            "type": "client",
+            "ip": client.get("ip"),
+            "mac": mac,
+            "os": client.get("os"),
+            "connection_type": "wired",
+        })
+        links.append({"source": client.get("switch_id") or fortigate_id, "target": mac, "type": "wired",
+                      "interfaces": [client["port"]] if client.get("port") else []})
+
+    # FortiAPs are derived from the clients associated with them.
+    aps: Dict[str, Dict[str, Any]] = {}
+    wifi_seen = set()
+    for client in wifi_clients:
+        mac = client["mac"]
+        if mac.lower() in wifi_seen:
+            continue
+        wifi_seen.add(mac.lower())
+        ap_id = client.get("wtp_id") or client.get("ap_sn")
+        if ap_id and ap_id not in aps:
+            aps[ap_id] = {"id": ap_id, "name": client.get("wtp_name") or ap_id, "type": "fortiap",
+                          "serial": ap_id, "status": "online"}
+            devices.append(aps[ap_id])
+            links.append({"source": fortigate_id, "target": ap_id, "type": "wireless", "interfaces": []})
+        devices.append({
+            "id": mac,
+            "name": client.get("hostname") or client.get("host") or mac,
+            "type": "client",
+            "ip": client.get("ip"),
+            "mac": mac,
+            "os": client.get("os"),
+            "connection_type": "wifi",
+            "ssid": client.get("ssid"),
+        })
+        links.append({"source": ap_id or fortigate_id, "target": mac, "type": "wireless", "interfaces": []})
+
+    return {"devices": devices, "links": links}
+
+
+class SiteSnapshotStore:
+    """Latest snapshot per site, persisted as ``<site_id>.json`` under ``root``.
+
+    Reads are served from memory; the directory is loaded once so snapshots
+    survive restarts. Writes go to a temp file that is then renamed, so readers
+    never see a partial file.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._snapshots: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _loaded(self) -> Dict[str, Dict[str, Any]]:
+        if self._snapshots is None:
+            snapshots: Dict[str, Dict[str, Any]] = {}
+            for path in sorted(self.root.glob("*.json")):
+                try:
+                    snapshots[path.stem] = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as exc:
+                    logger.warning("Ignoring unreadable fleet snapshot %s: %s", path, exc)
+            self._snapshots = snapshots
+        return self._snapshots
+
+    def save(self, site_id: str, snapshot: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{site_id}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(snapshot, separators=(",", ":")), encoding="utf-8")
+        tmp_path.replace(path)
+        with self._lock:
+            self._loaded()[site_id] = snapshot
+
+    def get(self, site_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._loaded().get(site_id)
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self._loaded())
+
+
+def site_summaries(snapshots: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """One row per stored site (age, size), without copying any devices."""
+    now = time.time() if now is None else now
+    sites: List[Dict[str, Any]] = []
+    for site_id, snapshot in sorted(snapshots.items()):
+        topology = snapshot.get("topology") or {}
+        sites.append({
+            "site_id": site_id,
+            "name": snapshot.get("name") or site_id,
+            "host": snapshot.get("host"),
+            "collected_at": snapshot.get("collected_at"),
+            "age_seconds": round(now - snapshot["collected_at"], 3) if snapshot.get("collected_at") else None,
+            "partial": snapshot.get("partial", False),
+            "devices": len(topology.get("devices", [])),
+            "links": len(topology.get("links", [])),
+        })
+    return sites
+
+
+def merge_fleet(snapshots: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> Dict[str, Any]:
+    """Merge per-site snapshots into one topology; node ids become ``<site_id>/<id>``."""
+    devices: List[Dict[str, Any]] = []
+    links: List[Dict[str, Any]] = []
+    for site_id, snapshot in sorted(snapshots.items()):
+        topology = snapshot.get("topology") or {}
+        site_name = snapshot.get("name") or site_id
+        for device in topology.get("devices", []):
+            devices.append({**device, "id": f"{site_id}/{device['id']}", "site": site_name, "site_id": site_id})
+        for link in topology.get("links", []):
+            links.append({**link, "source": f"{site_id}/{link['source']}", "target": f"{site_id}/{link['target']}",
+                          "site_id": site_id})
+    return {
+        "devices": devices,
+        "links": links,
+        "sites": site_summaries(snapshots, now),
+        "total_devices": len(devices),
+        "total_links": len(links),
+        "source": "fleet_snapshots",
+    }
+
+
+@dataclass
+class _SiteSchedule:
+    next_due: float = 0.0
+    failures: int = 0
+    collections: int = 0
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class FleetCollector:
+    """Concurrent, scheduled discovery of a FortiGate fleet into a ``SiteSnapshotStore``."""
+
+    def __init__(
+        self,
+        sites: Iterable[FleetSite],
+        store: SiteSnapshotStore,
+        interval: float = 300.0,
+        jitter: float = 0.1,
+        max_concurrency: int = 32,
+        per_host_concurrency: int = 4,
+        backoff_base: float = 30.0,
+        backoff_max: float = 1800.0,
+        section_timeout: float = 10.0,
+        client_factory: Optional[Callable[[FleetSite, int], Any]] = None,
+        rng: Optional[random.Random] = None,
+        startup_spread: Optional[float] = None,
+    ):
+        """Initialize FleetCollector.
+
+        Args:
+            sites: FortiGates to collect from (see ``sites_from_env``)
+            store: Where per-site snapshots are written
+            interval: Seconds between collections of a healthy site
+            jitter: Fraction of ``interval`` (and of each backoff) randomised per schedule
+            max_concurrency: Sites collected at the same time across the fleet
+            per_host_concurrency: In-flight requests per FortiGate
+            backoff_base: First retry delay (seconds) after a failure, doubled per failure
+            backoff_max: Upper bound for the retry delay
+            section_timeout: Deadline per monitor section
+            client_factory: Optional ``(site, max_connections) -> httpx.AsyncClient``
+                            (default: an instrumented ``create_monitor_client``)
+            rng: Random source for jitter
+            startup_spread: Seconds over which first collections are spread at random
+                            (default: ``interval``; 0 collects every site at once)
+        """
+        self.sites = {site.site_id: site for site in sites}
+        self.store = store
+        self.interval = interval
+        self.jitter = max(0.0, min(1.0, jitter))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.section_timeout = section_timeout
+        self._client_factory = client_factory or (
+            lambda site, connections: instrument_httpx_client(
+                create_monitor_client(site.ca_bundle, max_connections=connections), "fortigate"
+            )
+        )
+        self._rng = rng or random.Random()
+        spread = interval if startup_spread is None else max(0.0, startup_spread)
+        now = time.time()
+        self._schedule: Dict[str, _SiteSchedule] = {
+            site_id: _SiteSchedule(next_due=now + self._rng.uniform(0.0, spread)) for site_id in self.sites
+        }
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._collecting: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._triggered: Optional[asyncio.Task] = None
+        self._in_flight = 0
+        self.peak_in_flight = 0
+
+    def _jittered(self, delay: float) -> float:
+        return delay * self._rng.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def _backoff(self, failures: int) -> float:
+        return min(self.backoff_max, self._jittered(self.backoff_base * 2 ** (failures - 1)))
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        return [site_id for site_id, state in self._schedule.items() if state.next_due <= now]
+
+    def next_due(self) -> Optional[float]:
+        return min((state.next_due for state in self._schedule.values()), default=None)
+
+    async def collect_site(self, site: FleetSite) -> Optional[Dict[str, Any]]:
+        """Collect one site now, store its snapshot and reschedule it; None on failure.
+
+        A site already being collected is not collected again; callers share that collection.
+        """
+        task = self._collecting.get(site.site_id)
+        if task is None:
+            task = asyncio.ensure_future(self._collect_site(site))
+            self._collecting[site.site_id] = task
+            task.add_done_callback(lambda done, site_id=site.site_id: self._collecting.pop(site_id, None))
+        return await asyncio.shield(task)
+
+    async def _collect_site(self, site: FleetSite) -> Optional[Dict[str, Any]]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        state = self._schedule.setdefault(site.site_id, _SiteSchedule())
+        async with self._semaphore:
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            start = time.perf_counter()
+            client = self._client_factory(site, self.per_host_concurrency)
+            try:
+                monitor = AsyncFortiGateMonitor(site.host, site.token, port=site.port,
+                                                max_concurrency=self.per_host_concurrency, client=client)
+                dataset = await monitor.build_dataset(FLEET_SECTIONS, section_timeout=self.section_timeout)
+                status = dataset.get("system_status")
+                if not isinstance(status, dict) or "error" in status:
+                    raise RuntimeError((status or {}).get("error") or "system status unavailable")
+                snapshot = {
+                    "site_id": site.site_id,
+                    "name": site.label,
+                    "host": f"{site.host}:{site.port}",
+                    "collected_at": time.time(),
+                    "duration_ms": round((time.perf_counter() - start) * 1000.0, 2),
+                    "partial": dataset["partial"],
+                    "latency_ms": dataset["latency_ms"],
+                    "topology": site_topology(site, dataset),
+                }
+                await asyncio.to_thread(self.store.save, site.site_id, snapshot)
+            except Exception as exc:
+                state.failures += 1
+                state.last_error = str(exc)
+                state.next_due = time.time() + self._backoff(state.failures)
+                logger.warning("Fleet collection failed for %s (failure %d, retry in %.0fs): %s",
+                               site.label, state.failures, state.next_due - time.time(), exc)
+                return None
+            finally:
+                self._in_flight -= 1
+                await client.aclose()
+
+        state.failures = 0
+        state.collections += 1
+        state.last_error = None
+        state.last_success = snapshot["collected_at"]
+        state.next_due = time.time() + self._jittered(self.interval)
+        return snapshot
+
+    async def run_once(self, force: bool = False) -> Dict[str, bool]:
+        """Collect every due site (all sites with ``force``); returns site_id -> success."""
+        site_ids = list(self.sites) if force else self.due()
+        results = await asyncio.gather(*(self.collect_site(self.sites[site_id]) for site_id in site_ids))
+        return {site_id: result is not None for site_id, result in zip(site_ids, results)}
+
+    async def run_forever(self, stop: Optional[asyncio.Event] = None, max_sleep: float = 30.0) -> None:
+        """Collect sites as they become due until ``stop`` is set (or the task is cancelled)."""
+        stop = stop or asyncio.Event()
+        self._wakeup = wakeup = asyncio.Event()
+        try:
+            while not stop.is_set():
+                wakeup.clear()
+                await self.run_once()
+                next_due = self.next_due()
+                delay = max_sleep if next_due is None else min(max_sleep, max(0.0, next_due - time.time()))
+                waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(wakeup.wait())]
+                try:
+                    await asyncio.wait(waiters, timeout=max(delay, 0.05), return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+        finally:
+            self._wakeup = None
+
+    def trigger(self) -> List[str]:
+        """Make every site due now without waiting for the collection; returns the site ids.
+
+        With ``run_forever`` running the scheduler is woken up; otherwise one
+        background ``run_once`` is started (unless one is still running).
+        """
+        now = time.time()
+        for state in self._schedule.values():
+            state.next_due = min(state.next_due, now)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        elif self._triggered is None or self._triggered.done():
+            self._triggered = asyncio.ensure_future(self.run_once())
+        return list(self.sites)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Schedule and health per site (no device access)."""
+        return [
+            {
+                "site_id": site_id,
+                "name": self.sites[site_id].label,
+                "host": f"{self.sites[site_id].host}:{self.sites[site_id].port}",
+                "next_due": state.next_due,
+                "failures": state.failures,
+                "collections": state.collections,
+                "last_success": state.last_success,
+                "last_error": state.last_error,
+            }
+            for site_id, state in self._schedule.items()
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        states = self._schedule.values()
+        return {
+            "sites": len(self.sites),
+            "healthy": sum(1 for state in states if state.last_success and not state.failures),
+            "failing": sum(1 for state in states if state.failures),
+            "collections": sum(state.collections for state in states),
+            "peak_in_flight": self.peak_in_flight,
+        }
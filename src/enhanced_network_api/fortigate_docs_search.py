@@ -1,32 +1,80 @@
+import hashlib
 import json
+import multiprocessing
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from functools import lru_cache
 from html import unescape
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 
-_TREE_MTIME_CACHE: Dict[str, Tuple[float, float]] = {}
+try:
+    from .bm25_index import BM25Index, build_bm25_bytes, tokenize, write_bm25_index
+except ImportError:
+    from bm25_index import BM25Index, build_bm25_bytes, tokenize, write_bm25_index
+
+FileStat = Tuple[float, int]
+
+# root -> (checked_at, tree signature, {relative path: (mtime, size)})
+_TREE_STATE_CACHE: Dict[str, Tuple[float, str, Dict[str, FileStat]]] = {}
 _MTIME_CACHE_TTL = 30.0
-_CACHE_VERSION = 1
+_CACHE_VERSION = 2
 _CACHE_FILENAME = "fortigate_docs_index.json"
+_BM25_FILENAME = "fortigate_docs_bm25.idx"
+# Below this many pages to (re)parse, a process pool costs more than it saves.
+_PARALLEL_PARSE_MIN_FILES = 32
 
 
-def _iter_html_files(root: Path) -> Iterable[Path]:
+def _scan_tree(root: Path) -> Dict[str, FileStat]:
+    """Walk ``root`` once with scandir: relative path -> (mtime, size) of every HTML page."""
+    stats: Dict[str, FileStat] = {}
     if not root.exists():
-        return []
-    for path in root.rglob("*.html"):
-        if path.is_file():
-            yield path
+        return stats
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != ".cache":
+                        pending.append(Path(entry.path))
+                elif entry.name.endswith(".html") and entry.is_file():
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    stats[Path(entry.path).relative_to(root).as_posix()] = (stat.st_mtime, stat.st_size)
+    return stats
+
+
+def _tree_signature(stats: Dict[str, FileStat]) -> str:
+    digest = hashlib.sha256()
+    for rel in sorted(stats):
+        mtime, size = stats[rel]
+        digest.update(f"{rel}\0{mtime!r}\0{size}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _cached_tree_state(root: Path) -> Tuple[str, Dict[str, FileStat]]:
+    key = str(root)
+    now = time.time()
+    cached = _TREE_STATE_CACHE.get(key)
+    if cached and now - cached[0] < _MTIME_CACHE_TTL:
+        return cached[1], cached[2]
+    stats = _scan_tree(root)
+    signature = _tree_signature(stats)
+    _TREE_STATE_CACHE[key] = (now, signature, stats)
+    return signature, stats
 
 
-def _extract_text_from_html(path: Path) -> str:
-    try:
-        content = path.read_text(encoding="utf-8", errors="ignore")
-    except OSError:
-        return ""
+def _html_to_text(content: str) -> str:
     soup = BeautifulSoup(content, "html.parser")
     # Prefer main content if present
     main = soup.find("main") or soup.find("div", {"role": "main"})
@@ -34,60 +82,121 @@ def _extract_text_from_html(path: Path) -> str:
     return unescape(text)
 
 
-def _build_index(root: Path) -> List[Dict[str, Any]]:
+def _extract_text_from_html(path: Path) -> str:
+    try:
+        content = path.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return ""
+    return _html_to_text(content)
+
+
+def _parse_page(job: Tuple[str, Optional[str]]) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(sha256, text)`` for a page; text is None when the hash equals the known one."""
+    path_str, known_hash = job
+    try:
+        raw = Path(path_str).read_bytes()
+    except OSError:
+        return None, ""
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash == known_hash:
+        return content_hash, None
+    return content_hash, _html_to_text(raw.decode("utf-8", errors="ignore"))
+
+
+def _parse_pages(jobs: List[Tuple[str, Optional[str]]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    processes = int(os.getenv("DOCS_INDEX_PROCESSES", str(os.cpu_count() or 1)))
+    if processes > 1 and len(jobs) >= _PARALLEL_PARSE_MIN_FILES:
+        chunksize = max(1, len(jobs) // (processes * 4))
+        # Spawned, not forked: this runs in a worker thread of a multithreaded server
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(_parse_page, jobs, chunksize=chunksize))
+    return [_parse_page(job) for job in jobs]
+
+
+def _entries_from_manifest(root: Path, manifest: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
     index: List[Dict[str, Any]] = []
-    for path in _iter_html_files(root):
-        text = _extract_text_from_html(path)
+    for rel in sorted(manifest):
+        text = manifest[rel]["text"]
         if not text.strip():
             continue
-        title = path.stem.replace("_", " ")
+        path = root / rel
         index.append({
             "path": path,
             "rel_path": str(path.relative_to(root.parent.parent)),
-            "title": title,
+            "title": path.stem.replace("_", " "),
             "text": text,
         })
     return index
 
 
+def _build_index(
+    root: Path,
+    stats: Optional[Dict[str, FileStat]] = None,
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Index every page under ``root``, reusing records from the ``previous`` manifest.
+
+    Pages whose mtime and size are unchanged are reused without being read,
+    pages whose content hash is unchanged are not re-parsed; only the rest go
+    through BeautifulSoup. Returns the search entries and the new manifest.
+    """
+    stats = _scan_tree(root) if stats is None else stats
+    previous = previous or {}
+    manifest: Dict[str, Dict[str, Any]] = {}
+    changed: List[str] = []
+    for rel, (mtime, size) in stats.items():
+        record = previous.get(rel)
+        if record and record["mtime"] == mtime and record["size"] == size:
+            manifest[rel] = record
+        else:
+            changed.append(rel)
+
+    jobs = [(str(root / rel), (previous.get(rel) or {}).get("sha256")) for rel in changed]
+    for rel, (content_hash, text) in zip(changed, _parse_pages(jobs)):
+        mtime, size = stats[rel]
+        if text is None:
+            text = previous[rel]["text"]
+        manifest[rel] = {"mtime": mtime, "size": size, "sha256": content_hash, "text": text}
+    return _entries_from_manifest(root, manifest), manifest
+
+
 @lru_cache(maxsize=2)
-def _cached_index(root_str: str, mtime: float) -> List[Dict[str, Any]]:
+def _cached_index(root_str: str, signature: str) -> List[Dict[str, Any]]:
     root = Path(root_str)
-    persisted = _load_persisted_index(root, mtime)
-    if persisted is not None:
-        return persisted
-    index = _build_index(root)
-    _persist_index(root, mtime, index)
+    data = _read_persisted_payload(root)
+    if data and data.get("signature") == signature:
+        return _entries_from_manifest(root, data["files"])
+    stats = _cached_tree_state(root)[1]
+    if _tree_signature(stats) != signature:
+        stats = _scan_tree(root)
+    index, manifest = _build_index(root, stats, (data or {}).get("files"))
+    _persist_index(root, _tree_signature(stats), manifest)
     return index
 
 
-def _compute_tree_mtime(root: Path) -> float:
-    latest = 0.0
-    if not root.exists():
-        return latest
-    for path in root.rglob("*.html"):
-        try:
-            m = path.stat().st_mtime
-        except OSError:
-            continue
-        if m > latest:
-            latest = m
-    return latest
+def _bm25_documents(index: List[Dict[str, Any]]) -> Iterable[str]:
+    for entry in index:
+        yield f"{entry['title']}\n{entry['text']}"
 
 
-def _cached_tree_mtime(root: Path) -> float:
-    key = str(root)
-    now = time.time()
-    cached = _TREE_MTIME_CACHE.get(key)
-    if cached and now - cached[0] < _MTIME_CACHE_TTL:
-        return cached[1]
-    persisted_mtime = _load_cached_tree_mtime_from_disk(root)
-    if persisted_mtime is not None:
-        _TREE_MTIME_CACHE[key] = (now, persisted_mtime)
-        return persisted_mtime
-    mtime = _compute_tree_mtime(root)
-    _TREE_MTIME_CACHE[key] = (now, mtime)
-    return mtime
+@lru_cache(maxsize=2)
+def _cached_bm25(root_str: str, signature: str) -> BM25Index:
+    """BM25 index over ``_cached_index`` entries, memory-mapped from the cache dir."""
+    root = Path(root_str)
+    index = _cached_index(root_str, signature)
+    path = _cache_dir(root) / _BM25_FILENAME
+    try:
+        persisted = BM25Index.open(path)
+        if persisted.source_id == signature and len(persisted) == len(index):
+            return persisted
+    except (OSError, ValueError):
+        pass
+    try:
+        write_bm25_index(_bm25_documents(index), path, source_id=signature)
+        return BM25Index.open(path)
+    except OSError:
+        # Non-fatal: cache directory may be read-only.
+        return BM25Index(build_bm25_bytes(_bm25_documents(index), source_id=signature))
 
 
 def _cache_dir(root: Path) -> Path:
@@ -111,41 +220,14 @@ def _read_persisted_payload(root: Path) -> Dict[str, Any] | None:
     return data
 
 
-def _load_persisted_index(root: Path, mtime: float) -> List[Dict[str, Any]] | None:
-    data = _read_persisted_payload(root)
-    if not data:
-        return None
-    if abs(data.get("tree_mtime", -1.0) - mtime) > 0.001:
-        return None
-    entries = []
-    for entry in data.get("entries", []):
-        entries.append(
-            {
-                "path": Path(entry["path"]),
-                "rel_path": entry["rel_path"],
-                "title": entry["title"],
-                "text": entry["text"],
-            }
-        )
-    return entries
-
-
-def _persist_index(root: Path, mtime: float, index: List[Dict[str, Any]]) -> None:
+def _persist_index(root: Path, signature: str, manifest: Dict[str, Dict[str, Any]]) -> None:
     try:
         cache_dir = _cache_dir(root)
         cache_dir.mkdir(parents=True, exist_ok=True)
         payload = {
             "version": _CACHE_VERSION,
-            "tree_mtime": mtime,
-            "entries": [
-                {
-                    "path": str(entry["path"]),
-                    "rel_path": entry["rel_path"],
-                    "title": entry["title"],
-                    "text": entry["text"],
-                }
-                for entry in index
-            ],
+            "signature": signature,
+            "files": manifest,
         }
         _cache_file(root).write_text(json.dumps(payload), encoding="utf-8")
     except OSError:
@@ -153,42 +235,59 @@ def _persist_index(root: Path, mtime: float, index: List[Dict[str, Any]]) -> Non
         pass
 
 
-def _load_cached_tree_mtime_from_disk(root: Path) -> float | None:
-    data = _read_persisted_payload(root)
-    if not data:
-        return None
-    return data.get("tree_mtime")
-
-
 def warm_index(root: Path) -> None:
     """Preload the on-disk FortiGate documentation into memory caches."""
-    mtime = _cached_tree_mtime(root)
-    _cached_index(str(root), mtime)
+    signature, _ = _cached_tree_state(root)
+    _cached_bm25(str(root), signature)
 
 
-def search_docs(root: Path, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-    query = query.strip()
-    if not query:
-        return []
-    query_lower = query.lower()
+def _snippet(text: str, terms: List[str]) -> str:
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos != -1]
+    pos = min(positions) if positions else 0
+    start = max(0, pos - 160)
+    end = min(len(text), pos + 160)
+    return text[start:end].replace("\n", " ")
 
-    mtime = _cached_tree_mtime(root)
-    index = _cached_index(str(root), mtime)
 
+def _substring_search(index: List[Dict[str, Any]], query_lower: str, limit: int) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
     for entry in index:
         text = entry["text"]
-        pos = text.lower().find(query_lower)
-        if pos == -1:
+        if text.lower().find(query_lower) == -1:
             continue
-        start = max(0, pos - 160)
-        end = min(len(text), pos + 160)
-        snippet = text[start:end].replace("\n", " ")
         results.append({
             "title": entry["title"],
             "path": entry["rel_path"],
-            "snippet": snippet,
+            "snippet": _snippet(text, [query_lower]),
         })
         if len(results) >= limit:
             break
     return results
+
+
+def search_docs(root: Path, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Rank documentation pages for ``query`` with BM25 over the persisted index.
+
+    Queries made only of stopwords fall back to a plain substring scan.
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    signature, _ = _cached_tree_state(root)
+    index = _cached_index(str(root), signature)
+    terms = tokenize(query)
+    if not terms:
+        return _substring_search(index, query.lower(), limit)
+
+    results: List[Dict[str, Any]] = []
+    for doc_id, score in _cached_bm25(str(root), signature).search(query, limit=limit):
+        entry = index[doc_id]
+        results.append({
+            "title": entry["title"],
+            "path": entry["rel_path"],
+            "snippet": _snippet(entry["text"], terms),
+            "score": round(score, 4),
+        })
+    return results
@@ -1,7 +1,12 @@
+import asyncio
 import requests
+import ssl
 import time
 import logging
-from typing import Optional, Union
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -150,60 +155,405 @@ class FortiGateMonitor:
     # FULL DATASET
     # ====================
     def build_dataset(self):
-        return {
-            "timestamp": int(time.time()),
-
-            # WiFi
-            "wifi_clients": self.wifi_clients(),
-            "wifi_ssids": self.wifi_ssids(),
-            "wifi_radios": self.wifi_radios(),
-            "wifi_neighbors": self.wifi_neighbors(),
-            "wifi_manufacturer": self.wifi_manufacturer(),
-            "wifi_reputation": self.wifi_reputation(),
-            "wifi_channels": self.wifi_channels(),
-
-            # Switch
-            "switch_clients": self.switch_clients(),
-            "switch_ports": self.switch_ports(),
-            "switch_status": self.switch_status(),
-            "switch_vlans": self.switch_vlans(),
-            "switch_poe": self.switch_poe(),
-
-            # Routing
-            "arp_table": self.arp_table(),
-            "dhcp": self.dhcp(),
-            "routing_ipv4": self.routing_ipv4(),
-            "routing_neighbors": self.routing_neighbors(),
-            "ospf": self.ospf(),
-            "bgp": self.bgp(),
-            "nexthop": self.nexthop(),
-
-            # LLDP / Interfaces
-            "lldp": self.lldp(),
-            "interfaces": self.interfaces(),
-
-            # System
-            "system_status": self.system_status(),
-            "cpu": self.cpu(),
-            "memory": self.memory(),
-            "performance": self.performance(),
-            "disk": self.disk(),
-            "lograte": self.lograte(),
-            "sessions": self.sessions(),
-
-            # Firewall / Security
-            "fw_policy_hits": self.fw_policy_hits(),
-            "fw_sessions": self.fw_sessions(),
-            "multicast": self.multicas(),
-
-            # Logs
-            "event_logs": self.event_logs(),
-            "traffic_logs": self.traffic_logs(),
-
-            # Inventory
-            "device_inventory": self.device_inventory(),
-
-            # Diagnostics
-            "ping_google": self.ping(),
-            "trace_google": self.trace()
+        dataset = {"timestamp": int(time.time())}
+        for section, path in DATASET_SECTIONS.items():
+            dataset[section] = self._get(path)
+        return dataset
+
+
+# Section name -> monitor endpoint for the full dataset, in dashboard order.
+DATASET_SECTIONS: Dict[str, str] = {
+    # WiFi
+    "wifi_clients": "monitor/wifi/client",
+    "wifi_ssids": "monitor/wifi/ssid",
+    "wifi_radios": "monitor/wifi/radio",
+    "wifi_neighbors": "monitor/wifi/neighbor",
+    "wifi_manufacturer": "monitor/wifi/manufacturer",
+    "wifi_reputation": "monitor/wifi/reputation",
+    "wifi_channels": "monitor/wifi/channel",
+
+    # Switch
+    "switch_clients": "monitor/switch-controller/managed-switch/clients",
+    "switch_ports": "monitor/switch-controller/managed-switch/ports",
+    "switch_status": "monitor/switch-controller/managed-switch/status",
+    "switch_vlans": "monitor/switch-controller/managed-switch/vlan",
+    "switch_poe": "monitor/switch-controller/managed-switch/poe",
+
+    # Routing
+    "arp_table": "monitor/system/arp",
+    "dhcp": "monitor/router/dhcp/lease",
+    "routing_ipv4": "monitor/router/ipv4",
+    "routing_neighbors": "monitor/router/neighbor",
+    "ospf": "monitor/router/ospf",
+    "bgp": "monitor/router/bgp",
+    "nexthop": "monitor/router/nexthop",
+
+    # LLDP / Interfaces
+    "lldp": "monitor/lldp/neighbor",
+    "interfaces": "monitor/system/interface",
+
+    # System
+    "system_status": "monitor/system/status",
+    "cpu": "monitor/system/resource/cpu",
+    "memory": "monitor/system/resource/memory",
+    "performance": "monitor/system/performance",
+    "disk": "monitor/system/disk",
+    "lograte": "monitor/system/lograte",
+    "sessions": "monitor/system/session",
+
+    # Firewall / Security
+    "fw_policy_hits": "monitor/router/firewall-policy-hitcount",
+    "fw_sessions": "monitor/router/firewall",
+    "multicast": "monitor/router/multicast",
+
+    # Logs
+    "event_logs": "monitor/log/event",
+    "traffic_logs": "monitor/log/traffic",
+
+    # Inventory
+    "device_inventory": "monitor/user/device/query",
+
+    # Diagnostics
+    "ping_google": "monitor/system/diagnose?ping=8.8.8.8&count=5",
+    "trace_google": "monitor/system/diagnose?traceroute=8.8.8.8",
+}
+
+
+def create_monitor_client(
+    ca_bundle: Optional[Union[bool, str]] = None,
+    timeout: float = 10.0,
+    max_connections: int = 8,
+) -> httpx.AsyncClient:
+    """Build a keep-alive AsyncClient suitable for sharing across monitors of one FortiGate.
+
+    ``ca_bundle`` follows the FortiGateMonitor convention: None/False skips
+    verification, True uses the system store, a string is a CA bundle path.
+    """
+    if ca_bundle is None:
+        verify: Union[bool, ssl.SSLContext] = False
+    elif isinstance(ca_bundle, bool):
+        verify = ca_bundle
+    else:
+        verify = ssl.create_default_context(cafile=ca_bundle)
+    return httpx.AsyncClient(
+        verify=verify,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+
+class AsyncFortiGateMonitor:
+    """Non-blocking FortiGateMonitor built on a pooled ``httpx.AsyncClient``.
+
+    ``build_dataset`` fans out over every section in ``DATASET_SECTIONS``
+    concurrently (bounded by ``max_concurrency``). Each section gets its own
+    deadline, so one slow endpoint yields an error entry instead of stalling
+    the whole snapshot, and per-section latency is reported in ``latency_ms``.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        ca_bundle: Optional[Union[bool, str]] = None,
+        port: int = 10443,
+        timeout: float = 10.0,
+        max_concurrency: int = 8,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """Initialize AsyncFortiGateMonitor.
+
+        Args:
+            host: FortiGate hostname or IP address
+            token: API token for authentication
+            ca_bundle: SSL certificate bundle path (str) or verify flag (bool).
+                      If None, defaults to False (skip verification).
+            port: FortiGate API port (default: 10443)
+            timeout: Per-request HTTP timeout in seconds
+            max_concurrency: Maximum number of in-flight requests
+            client: Optional shared AsyncClient (see ``create_monitor_client``);
+                    it is not closed by ``aclose`` when supplied by the caller.
+                    Auth headers are sent per request, so one client can serve
+                    several tokens for the same host.
+        """
+        self.host = host
+        self.port = port
+        self.base = f"https://{host}:{port}/api/v2"
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._owns_client = client is None
+        self._client = client or create_monitor_client(
+            ca_bundle, timeout=timeout, max_connections=self.max_concurrency
+        )
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncFortiGateMonitor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _get(self, path: str, params: Optional[dict] = None):
+        """Async counterpart of ``FortiGateMonitor._get`` (same error contract)."""
+        url = f"{self.base}/{path}"
+        try:
+            r = await self._client.get(url, params=params, headers=self.headers)
+            r.raise_for_status()
+            return r.json()
+        except httpx.HTTPError as e:
+            logger.warning(f"FortiGateMonitor API call failed for {path}: {e}")
+            return {"error": str(e), "endpoint": path}
+        except Exception as e:
+            logger.error(f"Unexpected error in AsyncFortiGateMonitor._get({path}): {e}")
+            return {"error": str(e), "endpoint": path}
+
+    async def section(self, name: str):
+        """Fetch a single dataset section by name (see ``DATASET_SECTIONS``)."""
+        try:
+            path = DATASET_SECTIONS[name]
+        except KeyError:
+            raise ValueError(f"Unknown FortiGate monitor section: {name}") from None
+        return await self._get(path)
+
+    async def build_dataset(
+        self,
+        sections: Optional[Iterable[str]] = None,
+        section_timeout: float = 10.0,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> Dict[str, Any]:
+        """Collect the monitoring dataset concurrently.
+
+        Args:
+            sections: Subset of ``DATASET_SECTIONS`` to fetch (default: all)
+            section_timeout: Deadline in seconds for each section once it has
+                             a concurrency slot; late sections become error entries
+            semaphore: Optional shared semaphore to bound concurrency across
+                       several builds against the same FortiGate
+
+        Returns:
+            Dataset dict with the same section keys as ``FortiGateMonitor.build_dataset``
+            plus ``latency_ms`` (per section) and ``partial`` (True if any section failed).
+        """
+        names = list(sections) if sections is not None else list(DATASET_SECTIONS)
+        limiter = semaphore or asyncio.Semaphore(self.max_concurrency)
+        latency_ms: Dict[str, float] = {}
+
+        async def _fetch(name: str):
+            path = DATASET_SECTIONS[name]
+            async with limiter:
+                start = time.perf_counter()
+                try:
+                    return await asyncio.wait_for(self._get(path), timeout=section_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"FortiGateMonitor section {name} exceeded {section_timeout}s deadline")
+                    return {"error": f"timed out after {section_timeout}s", "endpoint": path}
+                finally:
+                    latency_ms[name] = round((time.perf_counter() - start) * 1000.0, 2)
+
+        timestamp = int(time.time())
+        results = await asyncio.gather(*(_fetch(name) for name in names))
+
+        dataset: Dict[str, Any] = {"timestamp": timestamp}
+        dataset.update(zip(names, results))
+        dataset["latency_ms"] = latency_ms
+        dataset["partial"] = any(isinstance(r, dict) and "error" in r for r in results)
+        return dataset
+
+
+# Freshness budget (seconds) per dataset section for DatasetSnapshotCache.
+# Fast-moving gauges are kept short; tables that change rarely can lag a minute.
+DEFAULT_SECTION_TTLS: Dict[str, float] = {
+    "cpu": 5.0,
+    "memory": 5.0,
+    "performance": 5.0,
+    "sessions": 5.0,
+    "lograte": 5.0,
+    "wifi_clients": 15.0,
+    "switch_clients": 15.0,
+    "switch_status": 15.0,
+    "arp_table": 30.0,
+    "device_inventory": 30.0,
+    "event_logs": 30.0,
+    "traffic_logs": 30.0,
+    "fw_sessions": 30.0,
+    "dhcp": 60.0,
+    "lldp": 60.0,
+    "routing_ipv4": 60.0,
+    "routing_neighbors": 60.0,
+    "ospf": 60.0,
+    "bgp": 60.0,
+    "nexthop": 60.0,
+    "interfaces": 60.0,
+    "ping_google": 120.0,
+    "trace_google": 300.0,
+}
+
+
+@dataclass
+class _SectionEntry:
+    value: Any
+    fetched_at: float
+    timestamp: float
+    latency_ms: Optional[float]
+    ok: bool
+
+
+DatasetFetcher = Callable[[List[str]], Awaitable[Dict[str, Any]]]
+
+
+class DatasetSnapshotCache:
+    """Per-FortiGate dataset cache with per-section TTLs and stale-while-revalidate.
+
+    ``get`` serves fresh sections from memory, serves expired sections as-is
+    while a background refresh runs, and only waits on sections it has never
+    fetched. Concurrent refreshes of the same (key, section) collapse into a
+    single upstream request. A failed refresh never replaces a good value.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttls = dict(DEFAULT_SECTION_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries: Dict[str, Dict[str, _SectionEntry]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def ttl_for(self, section: str) -> float:
+        return self.ttls.get(section, self.default_ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self.hits = self.stale_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+    def _bind_loop(self) -> None:
+        # Refresh tasks belong to one event loop; forget them if the loop changed.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._inflight.clear()
+            self._loop = loop
+
+    async def _refresh(self, key: str, names: List[str], fetch: DatasetFetcher) -> None:
+        task = asyncio.current_task()
+        try:
+            data = await fetch(names)
+            now = self._clock()
+            wall = time.time()
+            latency = data.get("latency_ms") or {}
+            bucket = self._entries.setdefault(key, {})
+            for name in names:
+                value = data.get(name)
+                ok = not (isinstance(value, dict) and "error" in value)
+                previous = bucket.get(name)
+                if ok or previous is None or not previous.ok:
+                    bucket[name] = _SectionEntry(value, now, wall, latency.get(name), ok)
+        finally:
+            for name in names:
+                if self._inflight.get((key, name)) is task:
+                    del self._inflight[(key, name)]
+
+    @staticmethod
+    def _log_background_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background FortiGate dataset refresh failed: {task.exception()}")
+
+    def _schedule(self, key: str, names: List[str], fetch: DatasetFetcher) -> Dict[str, asyncio.Task]:
+        tasks: Dict[str, asyncio.Task] = {}
+        needed = []
+        for name in names:
+            running = self._inflight.get((key, name))
+            if running is not None:
+                tasks[name] = running
+            else:
+                needed.append(name)
+        if needed:
+            task = asyncio.create_task(self._refresh(key, needed, fetch))
+            task.add_done_callback(self._log_background_failure)
+            for name in needed:
+                self._inflight[(key, name)] = task
+                tasks[name] = task
+        return tasks
+
+    async def get(
+        self,
+        key: str,
+        fetch: DatasetFetcher,
+        sections: Optional[Iterable[str]] = None,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """Return a dataset for ``key`` assembled from cached sections.
+
+        Args:
+            key: Cache key, normally ``host:port`` of the FortiGate
+            fetch: Coroutine function fetching the given section names and
+                   returning them in ``AsyncFortiGateMonitor.build_dataset`` format
+            sections: Subset of ``DATASET_SECTIONS`` (default: all)
+            force: Wait for a fresh fetch of every requested section
+
+        Returns:
+            Dataset dict with the usual section keys, ``latency_ms`` and
+            ``partial``, plus ``cache`` metadata: per-section ``ages`` (seconds),
+            the ``stale`` sections served while refreshing, and ``refreshing``.
+        """
+        self._bind_loop()
+        names = list(sections) if sections is not None else list(DATASET_SECTIONS)
+        bucket = self._entries.get(key, {})
+        now = self._clock()
+        missing: List[str] = []
+        stale: List[str] = []
+        for name in names:
+            entry = bucket.get(name)
+            if entry is None or force:
+                missing.append(name)
+            elif not entry.ok or now - entry.fetched_at >= self.ttl_for(name):
+                stale.append(name)
+        self.misses += len(missing)
+        self.stale_hits += len(stale)
+        self.hits += len(names) - len(missing) - len(stale)
+
+        if stale:
+            self._schedule(key, stale, fetch)
+        if missing:
+            # Stale sections refresh in their own task so they never delay this response.
+            tasks = self._schedule(key, missing, fetch)
+            await asyncio.gather(*set(tasks.values()))
+
+        bucket = self._entries.get(key, {})
+        now = self._clock()
+        entries = {name: bucket[name] for name in names if name in bucket}
+        dataset: Dict[str, Any] = {
+            "timestamp": int(min((e.timestamp for e in entries.values()), default=time.time())),
+        }
+        for name in names:
+            entry = entries.get(name)
+            dataset[name] = entry.value if entry else {"error": "not collected", "endpoint": DATASET_SECTIONS.get(name)}
+        dataset["latency_ms"] = {name: e.latency_ms for name, e in entries.items()}
+        dataset["partial"] = len(entries) < len(names) or any(not e.ok for e in entries.values())
+        dataset["cache"] = {
+            "ages": {name: round(now - e.fetched_at, 3) for name, e in entries.items()},
+            "stale": stale,
+            "refreshing": sorted(name for (k, name) in self._inflight if k == key),
         }
+        return dataset
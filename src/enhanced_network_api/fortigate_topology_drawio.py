@@ -209,12 +209,15 @@ def generate_drawio_xml_from_topology(topology_data: Dict[str, Any], layout: str
         node["_cell_id"] = cell_id
         cell_id += 1
 
-    # Link cells
+    # Link cells (first node wins on duplicate ids)
+    nodes_by_id: Dict[str, Dict[str, Any]] = {}
+    for node in nodes:
+        nodes_by_id.setdefault(node["id"], node)
     for link in links:
         src_id = link.get("source")
         tgt_id = link.get("target")
-        src = next((n for n in nodes if n["id"] == src_id), None)
-        tgt = next((n for n in nodes if n["id"] == tgt_id), None)
+        src = nodes_by_id.get(src_id)
+        tgt = nodes_by_id.get(tgt_id)
         if not src or not tgt:
             continue
 
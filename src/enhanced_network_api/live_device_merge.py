@@ -0,0 +1,158 @@
+"""
+Incremental merge of live FortiGate client devices into a topology scene.
+
+Replaces the per-load enrichment loop in ``_load_scene_with_fallback``:
+node ids are indexed once per merge (no O(N·M) duplicate scans), and devices
+whose reported fields have not changed since the previous snapshot reuse
+their previously built node without being classified again. Other devices go
+to the matcher, which caches its own results. When the matcher's OUI resolver
+backfills a vendor, nodes under that OUI are dropped so the next merge
+classifies them again.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+_NON_HEX = re.compile(r"[^0-9A-Fa-f]")
+
+# Raw device fields that feed a merged node; a change in any of them rebuilds the node.
+_DEVICE_FIELDS = (
+    "mac", "host", "hostname", "name", "ip", "os", "os_name", "software_os", "status",
+    "connection_type", "ssid", "ap_name", "ap_sn", "wtp_id", "switch_sn", "port", "vlan",
+)
+
+
+def _device_fingerprint(device: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(str(device.get(key)) for key in _DEVICE_FIELDS)
+
+
+def select_uplink(nodes: List[Dict[str, Any]]) -> Optional[str]:
+    """Pick the node live clients attach to: first switch, else first FortiGate/firewall."""
+    for node in nodes:
+        if "switch" in (node.get("type") or "").lower():
+            return node.get("id")
+    for node in nodes:
+        dtype = (node.get("type") or "").lower()
+        if "fortigate" in dtype or "firewall" in dtype:
+            return node.get("id")
+    return None
+
+
+class LiveDeviceMerger:
+    """Merge live connected devices into scenes, reusing work across snapshots.
+
+    One instance is meant to live for the whole process; ``merge`` is
+    thread-safe so it can run under ``asyncio.to_thread``.
+    """
+
+    def __init__(self, matcher_factory: Optional[Callable[[], Any]] = None):
+        self._matcher_factory = matcher_factory
+        self._matcher = None
+        self._previous: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.last_stats: Dict[str, int] = {}
+
+    def _get_matcher(self):
+        if self._matcher is None:
+            if self._matcher_factory is None:
+                from device_mac_matcher import DeviceModelMatcher
+                self._matcher_factory = DeviceModelMatcher
+            self._matcher = self._matcher_factory()
+            listeners = getattr(getattr(self._matcher, "oui_lookup", None), "backfill_listeners", None)
+            if isinstance(listeners, list):
+                listeners.append(self._on_oui_backfilled)
+        return self._matcher
+
+    def _on_oui_backfilled(self, oui: str, vendor_info: Dict[str, Any]) -> None:
+        """Forget nodes built while ``oui`` was unknown (the matcher drops its own matches)."""
+        prefix = _NON_HEX.sub("", oui).upper()
+        with self._lock:
+            stale = [
+                dev_id for dev_id, (_, node) in self._previous.items()
+                if _NON_HEX.sub("", str(node.get("mac") or "")).upper().startswith(prefix)
+            ]
+            for dev_id in stale:
+                del self._previous[dev_id]
+
+    def _build_node(self, dev_id: str, device: Dict[str, Any]) -> Dict[str, Any]:
+        mac = device.get("mac") or ""
+        host = device.get("host") or device.get("hostname") or device.get("name") or ""
+        match_info = self._get_matcher().match_mac_to_model(mac, {"hostname": host})
+
+        # Preserve all device fields, especially connection_type, ssid, ap_name, os
+        node_data = {
+            "id": dev_id,
+            "name": host or mac or "Unknown Device",
+            "type": match_info.device_type,
+            "ip": device.get("ip"),
+            "mac": mac,
+            "vendor": match_info.vendor,
+            "os": device.get("os") or device.get("os_name") or device.get("software_os"),
+            "status": device.get("status", "online"),
+            "model_path": match_info.model_path,
+            "pos_system": match_info.pos_system,
+            # Preserve connection metadata
+            "connection_type": device.get("connection_type"),
+            "ssid": device.get("ssid"),
+            "ap_name": device.get("ap_name"),
+            "ap_sn": device.get("ap_sn") or device.get("wtp_id"),
+            "switch_sn": device.get("switch_sn"),
+            "port": device.get("port"),
+            "vlan": device.get("vlan"),
+        }
+        # Remove None values to keep the data clean
+        return {k: v for k, v in node_data.items() if v is not None}
+
+    def merge(self, scene: Dict[str, Any], live_devices: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add live devices (and uplink links) to ``scene`` in place and return it.
+
+        Devices whose id already exists in the scene are left alone; the first
+        occurrence wins when the live list repeats a MAC.
+        """
+        nodes = scene.get("nodes", [])
+        links = scene.get("links", [])
+        uplink_id = select_uplink(nodes)
+        if not uplink_id:
+            return scene
+
+        stats = {"devices": len(live_devices), "added": 0, "reused": 0, "classified": 0}
+        with self._lock:
+            known_ids = {node.get("id") for node in nodes}
+            current: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+            for device in live_devices:
+                mac_key = str(device.get("mac") or "unknown")
+                dev_id = f"dev-{mac_key.replace(':', '')}"
+                if dev_id in known_ids:
+                    continue
+                known_ids.add(dev_id)
+
+                fingerprint = _device_fingerprint(device)
+                previous = self._previous.get(dev_id)
+                if previous is not None and previous[0] == fingerprint:
+                    node_data = previous[1]
+                    stats["reused"] += 1
+                else:
+                    node_data = self._build_node(dev_id, device)
+                    stats["classified"] += 1
+                current[dev_id] = (fingerprint, node_data)
+
+                nodes.append(dict(node_data))
+                links.append({"from": uplink_id, "to": dev_id, "status": "active"})
+                stats["added"] += 1
+            self._previous = current
+            self.last_stats = stats
+
+        scene["nodes"] = nodes
+        scene["links"] = links
+        log.debug("Merged live devices: %s", stats)
+        return scene
+
+    def reset(self) -> None:
+        with self._lock:
+            self._previous.clear()
+            self._matcher = None
+            self.last_stats = {}
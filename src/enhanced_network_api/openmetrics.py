@@ -0,0 +1,339 @@
+"""In-process latency histograms rendered in the OpenMetrics text format.
+
+Histograms use HDR-style log-linear buckets: every power of two between
+~61µs and 128s is split into ``SUB_BUCKETS`` equal steps, so any recorded
+latency lands in a bucket at most 1/SUB_BUCKETS wider than itself. Counts are
+kept since process start, which is what Prometheus ``rate()`` and
+``histogram_quantile()`` expect.
+
+Only the bucket range a series has actually used is rendered (plus ``+Inf``),
+which keeps scrapes small while leaving the bucket bounds stable over time.
+
+Upstream HTTP latency is captured with ``httpx_event_hooks`` (for pooled
+``httpx`` clients) or ``requests_response_hook`` (for ``requests`` sessions).
+Both record the time until response headers arrived, labelled by upstream,
+method, normalized endpoint path and status.
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+PREFIX = "enhanced_network_api_"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+SUB_BUCKETS = 4
+_MIN_EXPONENT = -14  # 2**-14 s ~= 61µs
+_MAX_EXPONENT = 7  # 2**7 s = 128s
+
+
+def _bucket_bounds() -> Tuple[float, ...]:
+    bounds = []
+    for exponent in range(_MIN_EXPONENT, _MAX_EXPONENT):
+        base = 2.0 ** exponent
+        for step in range(1, SUB_BUCKETS + 1):
+            bounds.append(base * (1 + step / SUB_BUCKETS))
+    return tuple(bounds)
+
+
+BUCKET_BOUNDS = _bucket_bounds()
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in seconds."""
+
+    __slots__ = ("counts", "count", "sum", "max", "_lo", "_hi")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # last slot is the overflow (+Inf) bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lo = len(self.counts)
+        self._hi = -1
+
+    def observe(self, value: float) -> None:
+        value = max(0.0, value)
+        index = bisect_left(BUCKET_BOUNDS, value)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        if index < self._lo:
+            self._lo = index
+        if index > self._hi:
+            self._hi = index
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (capped at the observed max)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in range(self._lo, self._hi + 1):
+            seen += self.counts[index]
+            if seen >= rank:
+                if index >= len(BUCKET_BOUNDS):
+                    return self.max
+                return min(BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+    def cumulative_buckets(self) -> List[Tuple[str, int]]:
+        """``(le, cumulative count)`` pairs over the used range, ending with ``+Inf``."""
+        buckets: List[Tuple[str, int]] = []
+        running = 0
+        for index in range(self._lo, min(self._hi, len(BUCKET_BOUNDS) - 1) + 1):
+            running += self.counts[index]
+            buckets.append((_format_value(BUCKET_BOUNDS[index]), running))
+        buckets.append(("+Inf", self.count))
+        return buckets
+
+
+class HistogramFamily:
+    """A named set of ``LatencyHistogram`` series keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = self._series[key] = LatencyHistogram()
+            histogram.observe(value)
+
+    def get(self, **labels: Any) -> Optional[LatencyHistogram]:
+        return self._series.get(tuple(str(labels.get(name, "")) for name in self.label_names))
+
+    def series(self) -> List[Tuple[Dict[str, str], LatencyHistogram]]:
+        with self._lock:
+            return [(dict(zip(self.label_names, key)), hist) for key, hist in self._series.items()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# TYPE {self.name} histogram",
+            f"# UNIT {self.name} seconds",
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+        ]
+        with self._lock:
+            snapshot = sorted(self._series.items())
+            for key, histogram in snapshot:
+                labels = list(zip(self.label_names, key))
+                for le, cumulative in histogram.cumulative_buckets():
+                    lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {histogram.count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+        return lines
+
+
+class Sample(NamedTuple):
+    """One counter or gauge value produced by a registry collector."""
+
+    family: str
+    type: str  # "counter" or "gauge"
+    documentation: str
+    labels: Mapping[str, str]
+    value: float
+
+
+Collector = Callable[[], Iterable[Sample]]
+
+
+class MetricsRegistry:
+    """Histogram families plus callbacks that report counters/gauges at scrape time."""
+
+    def __init__(self) -> None:
+        self._families: Dict[str, HistogramFamily] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str]) -> HistogramFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = HistogramFamily(name, documentation, label_names)
+            return family
+
+    def register_collector(self, collector: Collector) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            families = sorted(self._families.values(), key=lambda family: family.name)
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for family in families:
+            lines.extend(family.render())
+
+        grouped: Dict[str, List[Sample]] = {}
+        for collector in collectors:
+            for sample in collector():
+                grouped.setdefault(sample.family, []).append(sample)
+        for name in sorted(grouped):
+            samples = grouped[name]
+            metric_type = samples[0].type
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"# HELP {name} {_escape_help(samples[0].documentation)}")
+            suffix = "_total" if metric_type == "counter" else ""
+            for sample in samples:
+                labels = sorted(sample.labels.items())
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(sample.value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + rendered + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    PREFIX + "upstream_request_duration_seconds",
+    "Time until response headers from upstream FortiGate/Meraki/MCP/LLM APIs",
+    ("upstream", "method", "endpoint", "status"),
+)
+ROUTE_LATENCY = REGISTRY.histogram(
+    PREFIX + "http_request_duration_seconds",
+    "Time spent handling API requests, by route template",
+    ("method", "route", "status"),
+)
+
+# Path segments that identify an object rather than an endpoint.
+_ID_SEGMENT_RE = re.compile(r"^(?:\d+|[0-9a-f]{8,}|[0-9a-f-]{32,36}|(?:[0-9a-f]{2}[:-]){5}[0-9a-f]{2}|[A-Z]_\w+|Q\w{3}-\w{4}-\w{4})$", re.I)
+_ID_PARENTS = frozenset({"networks", "organizations"})
+
+
+def endpoint_label(path: str) -> str:
+    """Reduce a URL path to a low-cardinality endpoint label (object ids become ``{id}``)."""
+    segments = []
+    previous = ""
+    for segment in path.split("?", 1)[0].split("/"):
+        if segment and (previous in _ID_PARENTS or _ID_SEGMENT_RE.match(segment)):
+            segment = "{id}"
+        segments.append(segment)
+        previous = segment.lower()
+    return "/".join(segments) or "/"
+
+
+def record_upstream(upstream: str, method: str, path: str, status: Any, seconds: float) -> None:
+    UPSTREAM_LATENCY.observe(seconds, upstream=upstream, method=method.upper(), endpoint=endpoint_label(path), status=status)
+
+
+def httpx_event_hooks(upstream: str) -> Dict[str, List[Callable]]:
+    """``event_hooks`` for an ``httpx.AsyncClient`` that time every call to ``upstream``."""
+
+    async def on_request(request: Any) -> None:
+        request.extensions["openmetrics_start"] = time.perf_counter()
+
+    async def on_response(response: Any) -> None:
+        request = response.request
+        started = request.extensions.get("openmetrics_start")
+        if started is not None:
+            record_upstream(upstream, request.method, request.url.path, response.status_code, time.perf_counter() - started)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def instrument_httpx_client(client: Any, upstream: str) -> Any:
+    """Add ``httpx_event_hooks`` to an existing ``client`` (objects without ``event_hooks`` are left alone)."""
+    hooks = getattr(client, "event_hooks", None)
+    if isinstance(hooks, dict):
+        added = httpx_event_hooks(upstream)
+        client.event_hooks = {
+            "request": list(hooks.get("request", [])) + added["request"],
+            "response": list(hooks.get("response", [])) + added["response"],
+        }
+    return client
+
+
+def requests_response_hook(upstream: str) -> Callable:
+    """``requests`` response hook (``session.hooks["response"]``) timing calls to ``upstream``."""
+
+    def on_response(response: Any, *args: Any, **kwargs: Any) -> Any:
+        request = response.request
+        path = getattr(request, "path_url", None) or "/"
+        record_upstream(upstream, request.method or "GET", path, response.status_code, response.elapsed.total_seconds())
+        return response
+
+    on_response.upstream = upstream  # type: ignore[attr-defined]
+    return on_response
+
+
+def instrument_requests_session(session: Any, upstream: str) -> Any:
+    """Attach ``requests_response_hook`` to ``session`` (objects without ``hooks`` are left alone).
+
+    Idempotent per upstream, so long-lived sessions reused by several clients
+    are not instrumented twice.
+    """
+    hooks = getattr(session, "hooks", None)
+    if isinstance(hooks, dict):
+        response_hooks = hooks.setdefault("response", [])
+        if not any(getattr(hook, "upstream", None) == upstream for hook in response_hooks):
+            response_hooks.append(requests_response_hook(upstream))
+    return session
+
+
+class RouteTimingMiddleware:
+    """ASGI middleware recording handler time per route template into ``ROUTE_LATENCY``.
+
+    Timing stops when the last body chunk is sent, so streamed responses are
+    measured to completion. Requests that match no route (static mounts,
+    404s) share the ``<unmatched>`` label to keep cardinality bounded.
+    """
+
+    def __init__(self, app: Any, family: HistogramFamily = ROUTE_LATENCY) -> None:
+        self.app = app
+        self.family = family
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500, "recorded": False}
+
+        def record() -> None:
+            if status["recorded"]:
+                return
+            status["recorded"] = True
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            self.family.observe(time.perf_counter() - started, method=scope["method"], route=route, status=status["code"])
+
+        async def timed_send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            record()
@@ -0,0 +1,153 @@
+"""
+Compact, memory-mapped IEEE OUI index.
+
+``scripts/oui_builder.py`` writes the index once; workers ``mmap`` it
+read-only, so every uvicorn worker shares the same page-cache pages instead
+of holding its own dict of dicts. Assignments are kept in three sorted
+arrays (MA-L 24-bit, MA-M 28-bit, MA-S 36-bit prefixes) searched with
+``bisect``; a lookup tries the longest prefix first.
+
+File layout (little endian, every section 8-byte aligned)::
+
+    header   "<4sHHIIIII"  magic, version, reserved, n24, n28, n36, n_strings, blob_len
+    per registry (24, 28, 36):  keys uint64[n], vendor_ids uint32[n]
+    string offsets uint32[n_strings + 1], then the UTF-8 string blob
+
+Strings are ``"vendor\\taddress"`` and are deduplicated across assignments.
+"""
+
+import mmap
+import re
+import struct
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+MAGIC = b"OUIX"
+VERSION = 1
+PREFIX_BITS = (36, 28, 24)  # longest first
+_HEADER = struct.Struct("<4sHHIIIII")
+_HEX = re.compile(r"[^0-9A-Fa-f]")
+
+Entry = Tuple[str, str, str]  # (hex assignment, vendor, address)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def build_oui_index(entries: Iterable[Entry], path: Union[str, Path]) -> int:
+    """Write ``entries`` to ``path`` and return the number of assignments.
+
+    Assignments are 6, 7 or 9 hex digits (MA-L, MA-M, MA-S); anything else
+    is skipped. Later duplicates win.
+    """
+    tables: Dict[int, Dict[int, int]] = {bits: {} for bits in PREFIX_BITS}
+    string_ids: Dict[str, int] = {}
+    strings: List[bytes] = []
+    for assignment, vendor, address in entries:
+        digits = _HEX.sub("", assignment or "")
+        bits = len(digits) * 4
+        if bits not in tables:
+            continue
+        text = f"{vendor.strip()}\t{address.strip()}"
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+        tables[bits][int(digits, 16)] = string_ids[text]
+
+    offsets = [0]
+    for data in strings:
+        offsets.append(offsets[-1] + len(data))
+    blob = b"".join(strings)
+
+    sections = []
+    for bits in (24, 28, 36):
+        items = sorted(tables[bits].items())
+        sections.append(struct.pack(f"<{len(items)}Q", *(key for key, _ in items)))
+        sections.append(struct.pack(f"<{len(items)}I", *(value for _, value in items)))
+    sections.append(struct.pack(f"<{len(offsets)}I", *offsets))
+    sections.append(blob)
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, 0, len(tables[24]), len(tables[28]), len(tables[36]), len(strings), len(blob)
+    )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(header)
+        for section in sections:
+            handle.write(b"\0" * (_align(handle.tell()) - handle.tell()))
+            handle.write(section)
+    tmp_path.replace(path)
+    return sum(len(table) for table in tables.values())
+
+
+class OUIIndex:
+    """Read-only view over an index written by ``build_oui_index``."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        with open(self.path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        header = _HEADER.unpack_from(view, 0) if len(view) >= _HEADER.size else (b"", 0) + (0,) * 6
+        magic, version, _, n24, n28, n36, n_strings, blob_len = header
+        if magic != MAGIC or version != VERSION:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not an OUI index (version {VERSION})")
+
+        offset = _HEADER.size
+        self._tables: Dict[int, Tuple[memoryview, memoryview]] = {}
+        for bits, count in ((24, n24), (28, n28), (36, n36)):
+            offset = _align(offset)
+            keys = view[offset:offset + 8 * count].cast("Q")
+            offset = _align(offset + 8 * count)
+            values = view[offset:offset + 4 * count].cast("I")
+            offset += 4 * count
+            self._tables[bits] = (keys, values)
+        offset = _align(offset)
+        self._offsets = view[offset:offset + 4 * (n_strings + 1)].cast("I")
+        offset = _align(offset + 4 * (n_strings + 1))
+        self._blob = view[offset:offset + blob_len]
+        self._view = view
+        self.counts = {bits: len(keys) for bits, (keys, _) in self._tables.items()}
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def _string(self, index: int) -> Dict[str, str]:
+        raw = bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+        vendor, _, address = raw.partition("\t")
+        return {"vendor": vendor, "address": address}
+
+    def lookup(self, mac_address: str) -> Optional[Dict[str, str]]:
+        """Return vendor info for the longest matching assignment, or None."""
+        digits = _HEX.sub("", mac_address or "")
+        if len(digits) < 6:
+            return None
+        for bits in PREFIX_BITS:
+            nibbles = bits // 4
+            if len(digits) < nibbles:
+                continue
+            keys, values = self._tables[bits]
+            if not len(keys):
+                continue
+            prefix = int(digits[:nibbles], 16)
+            position = bisect_left(keys, prefix)
+            if position < len(keys) and keys[position] == prefix:
+                info = self._string(values[position])
+                info["block"] = f"MA-{'L' if bits == 24 else 'M' if bits == 28 else 'S'}"
+                return info
+        return None
+
+    def close(self) -> None:
+        for keys, values in self._tables.values():
+            keys.release()
+            values.release()
+        self._offsets.release()
+        self._blob.release()
+        self._view.release()
+        self._mmap.close()
@@ -21,13 +21,13 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Deque, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
 from urllib.parse import unquote
 
 import httpx
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.routing import APIRoute
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
@@ -63,19 +63,42 @@ DOCS_DIR = PROJECT_ROOT / "docs"
 
 _DEFAULT_VLLM_BASE_URL = "http://127.0.0.1:8000/v1"
 _DEFAULT_VLLM_MODEL = "codellama-7b_fortinet_meraki_20251107_185952"
+# Bump whenever the /docs/qa prompt changes so cached answers are not reused.
+_DOCS_QA_PROMPT_VERSION = "1"
 
 logger = logging.getLogger(__name__)
 
 from api.endpoints.smart_analysis import router as smart_analysis_router
 from api.endpoints.meraki_mcp import router as meraki_router
-from api.endpoints.fortinet_llm import router as fortinet_llm_router
+from api.endpoints.fortinet_llm import close_llm_client, router as fortinet_llm_router
 from device_mac_matcher import create_device_matching_api, DeviceModelMatcher
 from visio_icon_extractor import create_icon_extraction_api
 from restaurant_icon_downloader import create_restaurant_icon_api
 from src.enhanced_network_api.shared import topology_workflow
+from src.enhanced_network_api.fleet_collector import (
+    FleetCollector,
+    SiteSnapshotStore,
+    merge_fleet,
+    site_summaries,
+    sites_from_env,
+)
 from src.enhanced_network_api.layout_network_tree import calculate_network_tree_layout
+from src.enhanced_network_api.openmetrics import (
+    CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE,
+    PREFIX as METRIC_PREFIX,
+    REGISTRY as METRICS_REGISTRY,
+    RouteTimingMiddleware,
+    Sample,
+    instrument_httpx_client,
+    instrument_requests_session,
+)
+from src.enhanced_network_api.request_timing import ServerTimingMiddleware, add_span, span as request_span
+from src.enhanced_network_api.sampling_profiler import ProfilingMiddleware
+from src.enhanced_network_api.snapshot_refresher import BackgroundRefresher, Snapshot, SnapshotStore
 from fortigate_docs_search import search_docs, warm_index
+from answer_cache import answer_cache_key, answer_cache_stats, close_answer_caches, get_answer_cache
 from mcp_servers.drawio_fortinet_meraki.fortigate_collector import (
+    AUTH_BROKER as FORTIGATE_AUTH_BROKER,
     FortiGateTopologyCollector,
 )
 from mcp_servers.drawio_fortinet_meraki.api_documentation import IntelligentAPIMCP
@@ -83,27 +106,43 @@ from mcp_servers.drawio_fortinet_meraki.fortinet_integration import (
     DrawIOFortinetIntegration,
 )
 from graphml_parser import parse_graphml_topology
+from live_device_merge import LiveDeviceMerger
+from scene_diff import scene_delta
 try:
-    from enhanced_network_api.fortigate_monitor import FortiGateMonitor
+    from enhanced_network_api.fortigate_monitor import AsyncFortiGateMonitor, DatasetSnapshotCache, FortiGateMonitor, create_monitor_client
 except ImportError:
     # Fallback for different import paths
     try:
-        from .fortigate_monitor import FortiGateMonitor
+        from .fortigate_monitor import AsyncFortiGateMonitor, DatasetSnapshotCache, FortiGateMonitor, create_monitor_client
     except ImportError:
         logger.warning("FortiGateMonitor not available - monitoring endpoints will be disabled")
         FortiGateMonitor = None
+        AsyncFortiGateMonitor = None
+        create_monitor_client = None
+        DatasetSnapshotCache = None
 
 
 class PerformanceRecorder:
-    """Collect recent runtime samples for expensive code paths."""
+    """Collect recent runtime samples for expensive code paths.
+
+    The last ``max_samples`` durations per section back avg/min/max; every
+    sample since startup also lands in a log-linear histogram (exported on
+    ``/metrics``) that provides the total count and percentiles.
+    """
 
     def __init__(self, max_samples: int = 64) -> None:
         self._max_samples = max_samples
         self._samples: Dict[str, Deque[Dict[str, float]]] = {}
+        self.histograms = METRICS_REGISTRY.histogram(
+            METRIC_PREFIX + "section_duration_seconds",
+            "Duration of profiled code sections (_profile_section)",
+            ("section",),
+        )
 
     def record(self, name: str, duration: float) -> None:
         bucket = self._samples.setdefault(name, deque(maxlen=self._max_samples))
         bucket.append({"duration": duration, "timestamp": time.time()})
+        self.histograms.observe(duration, section=name)
 
     def summary(self) -> Dict[str, Dict[str, float]]:
         metrics: Dict[str, Dict[str, float]] = {}
@@ -118,21 +157,90 @@ class PerformanceRecorder:
                 "max": max(durations),
                 "last": durations[-1],
             }
+            histogram = self.histograms.get(section=name)
+            if histogram is not None:
+                metrics[name].update(
+                    total=histogram.count,
+                    p50=histogram.quantile(0.5),
+                    p95=histogram.quantile(0.95),
+                    p99=histogram.quantile(0.99),
+                )
         return metrics
 
     def reset(self) -> None:
         self._samples.clear()
+        self.histograms.clear()
 
 
 @contextmanager
 def _profile_section(name: str):
+    """Time a code section into PERF_RECORDER and, inside a request, its Server-Timing spans."""
     start = time.perf_counter()
     try:
-        yield
+        with request_span(name):
+            yield
     finally:
         PERF_RECORDER.record(name, time.perf_counter() - start)
 
 
+class SingleFlightCache:
+    """Share one in-flight async load per key and keep its result for ``ttl`` seconds.
+
+    The first caller for a key starts the loader as a task; concurrent callers
+    await that same task instead of starting their own. A caller that is
+    cancelled (e.g. client disconnect) does not cancel the shared load.
+    Failures are propagated to every waiter and are not cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 16) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._values: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _store(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None or self.ttl <= 0:
+            return
+        self._values[key] = (time.monotonic() + self.ttl, task.result())
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._inflight.clear()
+            self._loop = loop
+        cached = self._values.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._store(key, done))
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
 app = FastAPI(title="Enhanced Network API", version="2.0.0")
 app.add_middleware(
     CORSMiddleware,
@@ -141,6 +249,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RouteTimingMiddleware)
+# Server-Timing spans (see _profile_section); set SERVER_TIMING=0 to omit the header.
+if os.getenv("SERVER_TIMING", "1").strip().lower() not in {"0", "false", "no", "off"}:
+    app.add_middleware(ServerTimingMiddleware)
+# ?profile=1|collapsed|speedscope with X-Profile-Token: <PROFILE_TOKEN> returns a sampling
+# profile instead of the response; add refresh=true on scene routes to profile a cold build.
+app.add_middleware(ProfilingMiddleware)
 
 STATIC_DIR = HERE / "static"
 app.mount("/network-map-files", StaticFiles(directory=HERE), name="network-map-files")
@@ -171,6 +286,12 @@ _ICON_MODELS: Optional[List[Dict[str, Any]]] = None
 _DOCS_INDEX_TASK: Optional[asyncio.Task] = None
 _SCENE_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 _SCENE_CACHE_MAX = 8
+# Keep-alive pools for FortiGateMonitor, one per (host, port, CA setting)
+_MONITOR_POOL_LOCK = asyncio.Lock()
+_MONITOR_POOLS: Dict[Tuple[str, int, str], httpx.AsyncClient] = {}
+_MONITOR_POOL_LOOP: Optional[asyncio.AbstractEventLoop] = None
+# Stale-while-revalidate snapshots backing /api/dataset, keyed by "host:port"
+_DATASET_CACHE = DatasetSnapshotCache() if DatasetSnapshotCache else None
 
 
 class FortiManagerCredentialsModel(BaseModel):
@@ -269,9 +390,14 @@ def _create_fortigate_collector(
         creds.host if creds and creds.host 
         else os.getenv("FORTIGATE_HOST") or os.getenv("FORTIGATE_HOSTS", "192.168.0.254").split(",")[0].strip()
     )
-    # Remove port if present (FortiGateTopologyCollector adds it)
+    # Split off an explicit port (the collector defaults to 10443)
+    port = None
     if ":" in host:
-        host = host.split(":")[0]
+        host, port_str = host.split(":", 1)
+        try:
+            port = int(port_str)
+        except ValueError:
+            port = None
     
     username = (
         creds.username
@@ -318,6 +444,8 @@ def _create_fortigate_collector(
         "token": token,
         "verify_ssl": bool(verify_ssl),
     }
+    if port is not None:
+        collector_kwargs["port"] = port
     # Only add wifi_host/wifi_token if the collector supports them (check by inspecting __init__ signature)
     import inspect
     init_sig = inspect.signature(FortiGateTopologyCollector.__init__)
@@ -326,22 +454,18 @@ def _create_fortigate_collector(
     if "wifi_token" in init_sig.parameters:
         collector_kwargs["wifi_token"] = wifi_token
     
-    return FortiGateTopologyCollector(**collector_kwargs)
+    collector = FortiGateTopologyCollector(**collector_kwargs)
+    instrument_requests_session(collector.session, "fortigate")
+    return collector
 
 
-def _create_fortigate_monitor(
+def _resolve_fortigate_monitor_settings(
     creds: Optional[FortiGateCredentialsModel],
-) -> FortiGateMonitor:
-    """Instantiate a FortiGateMonitor from request credentials or environment.
-    
-    This provides a simple interface to FortiGate monitoring endpoints.
+) -> Dict[str, Any]:
+    """Resolve host/port/token/CA settings for FortiGateMonitor from request or environment.
+
     Uses the same credential resolution logic as _create_fortigate_collector.
     """
-    if FortiGateMonitor is None:
-        raise HTTPException(
-            status_code=503,
-            detail="FortiGateMonitor is not available. Check module imports."
-        )
     # Extract host from creds or environment
     host = (
         creds.host if creds and creds.host 
@@ -386,7 +510,143 @@ def _create_fortigate_monitor(
     else:
         ca_bundle = verify_ssl
     
-    return FortiGateMonitor(host=host, token=token, ca_bundle=ca_bundle, port=port)
+    return {"host": host, "token": token, "ca_bundle": ca_bundle, "port": port}
+
+
+def _create_fortigate_monitor(
+    creds: Optional[FortiGateCredentialsModel],
+) -> FortiGateMonitor:
+    """Instantiate a FortiGateMonitor from request credentials or environment.
+    
+    This provides a simple interface to FortiGate monitoring endpoints.
+    Uses the same credential resolution logic as _create_fortigate_collector.
+    """
+    if FortiGateMonitor is None:
+        raise HTTPException(
+            status_code=503,
+            detail="FortiGateMonitor is not available. Check module imports."
+        )
+    return FortiGateMonitor(**_resolve_fortigate_monitor_settings(creds))
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning("Ignoring non-numeric %s=%r", name, value)
+        return default
+
+
+def _monitor_concurrency() -> int:
+    """Maximum concurrent FortiGate monitor requests per dataset build."""
+    return max(1, int(_env_float("FORTIGATE_MONITOR_CONCURRENCY", 8)))
+
+
+def _monitor_section_timeout() -> float:
+    """Per-section deadline (seconds) for concurrent dataset builds."""
+    return _env_float("FORTIGATE_MONITOR_SECTION_TIMEOUT", 10.0)
+
+
+def _create_monitor_http_client(ca_bundle: Any) -> httpx.AsyncClient:
+    client = create_monitor_client(
+        ca_bundle,
+        timeout=_env_float("FORTIGATE_MONITOR_TIMEOUT", 10.0),
+        max_connections=_monitor_concurrency(),
+    )
+    return instrument_httpx_client(client, "fortigate")
+
+
+async def _get_async_fortigate_monitor(
+    creds: Optional[FortiGateCredentialsModel],
+) -> AsyncFortiGateMonitor:
+    """Return an AsyncFortiGateMonitor backed by the shared keep-alive pool for its host.
+
+    Monitors themselves are cheap; the pooled AsyncClient is what gets reused
+    across requests so dashboard polling does not reconnect/re-handshake.
+    """
+    global _MONITOR_POOL_LOOP
+    if AsyncFortiGateMonitor is None:
+        raise HTTPException(
+            status_code=503,
+            detail="FortiGateMonitor is not available. Check module imports."
+        )
+    settings = _resolve_fortigate_monitor_settings(creds)
+    key = (settings["host"], settings["port"], str(settings["ca_bundle"]))
+    current_loop = asyncio.get_running_loop()
+    async with _MONITOR_POOL_LOCK:
+        if _MONITOR_POOL_LOOP is not current_loop:
+            stale = list(_MONITOR_POOLS.values())
+            _MONITOR_POOLS.clear()
+            for client in stale:
+                try:
+                    await client.aclose()
+                except RuntimeError:
+                    pass
+            _MONITOR_POOL_LOOP = current_loop
+        client = _MONITOR_POOLS.get(key)
+        if client is None or client.is_closed:
+            client = _create_monitor_http_client(settings["ca_bundle"])
+            _MONITOR_POOLS[key] = client
+    return AsyncFortiGateMonitor(
+        **settings,
+        max_concurrency=_monitor_concurrency(),
+        client=client,
+    )
+
+
+async def _close_monitor_pools() -> None:
+    global _MONITOR_POOL_LOOP
+    async with _MONITOR_POOL_LOCK:
+        clients = list(_MONITOR_POOLS.values())
+        _MONITOR_POOLS.clear()
+        _MONITOR_POOL_LOOP = None
+    for client in clients:
+        try:
+            await client.aclose()
+        except RuntimeError as exc:  # pragma: no cover - best-effort cleanup
+            logger.debug("Ignoring event loop error while closing monitor pool: %s", exc)
+
+
+async def _build_monitor_dataset(creds: Optional[FortiGateCredentialsModel]) -> Dict[str, Any]:
+    """Collect the full monitoring dataset concurrently without blocking the event loop."""
+    monitor = await _get_async_fortigate_monitor(creds)
+    with _profile_section("fortigate_monitor_dataset"):
+        return await monitor.build_dataset(section_timeout=_monitor_section_timeout())
+
+
+async def _cached_monitor_dataset(
+    creds: Optional[FortiGateCredentialsModel],
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """Serve the monitoring dataset from the per-host snapshot cache.
+
+    Sections within their TTL come from memory, expired ones are returned
+    stale while a background refresh runs. Disable with FORTIGATE_DATASET_CACHE=0.
+    """
+    if _DATASET_CACHE is None or not _env_bool("FORTIGATE_DATASET_CACHE", True):
+        return await _build_monitor_dataset(creds)
+    monitor = await _get_async_fortigate_monitor(creds)
+
+    async def _fetch(sections: List[str]) -> Dict[str, Any]:
+        with _profile_section("fortigate_monitor_dataset"):
+            return await monitor.build_dataset(
+                sections=sections,
+                section_timeout=_monitor_section_timeout(),
+            )
+
+    return await _DATASET_CACHE.get(f"{monitor.host}:{monitor.port}", _fetch, force=refresh)
+
+
+def _dataset_cache_headers(data: Dict[str, Any]) -> Dict[str, str]:
+    cache_info = data.get("cache") or {}
+    ages = cache_info.get("ages") or {}
+    headers = {"Age": str(int(max(ages.values(), default=0)))}
+    if cache_info.get("stale"):
+        headers["X-Dataset-Stale-Sections"] = ",".join(cache_info["stale"])
+    return headers
 
 
 AI_PLATFORM_ROOT = _path_from_env("AI_PLATFORM_ROOT", Path.home() / "cagent")
@@ -478,8 +738,14 @@ app.include_router(fortinet_llm_router, prefix="/api/fortinet-llm", tags=["Forti
 app.include_router(meraki_router, prefix="/api/meraki-mcp", tags=["Meraki MCP"])
 app.include_router(smart_analysis_router, prefix="/api/smart-analysis", tags=["Smart Analysis"])
 
+@lru_cache(maxsize=1)
+def _get_device_matcher() -> DeviceModelMatcher:
+    """Process-wide matcher so its match cache (and DEVICE_MATCH_CACHE_DB store) is shared."""
+    return DeviceModelMatcher()
+
+
 # Add device matching, icon extraction, and restaurant icon APIs
-create_device_matching_api(app)
+create_device_matching_api(app, _get_device_matcher())
 create_icon_extraction_api(app)
 create_restaurant_icon_api(app)
 
@@ -545,7 +811,7 @@ async def _get_service_http_client() -> httpx.AsyncClient:
             except RuntimeError:
                 pass
 
-        _SERVICE_HTTP_CLIENT = httpx.AsyncClient(timeout=10.0)
+        _SERVICE_HTTP_CLIENT = instrument_httpx_client(httpx.AsyncClient(timeout=10.0), "platform_service")
         _SERVICE_CLIENT_LOOP = current_loop
         return _SERVICE_HTTP_CLIENT
 
@@ -562,7 +828,7 @@ async def _get_vllm_client() -> httpx.AsyncClient:
                 await _VLLM_CLIENT.aclose()
             except RuntimeError:
                 pass
-        _VLLM_CLIENT = httpx.AsyncClient(base_url=base_url, timeout=60.0)
+        _VLLM_CLIENT = instrument_httpx_client(httpx.AsyncClient(base_url=base_url, timeout=60.0), "vllm")
         _VLLM_CLIENT_BASE = base_url
         return _VLLM_CLIENT
 
@@ -1111,17 +1377,8 @@ async def search_fortigate_docs(q: str, limit: int = 10):
     return JSONResponse({"query": q, "results": results})
 
 
-@app.post("/docs/qa")
-async def fortigate_docs_qa(payload: DocsQARequest):
-    """Answer a question using local FortiGate API documentation and the local vLLM model.
-
-    This endpoint performs a simple retrieval over the scraped docs, then calls the
-    OpenAI-compatible vLLM server configured via VLLM_BASE_URL / VLLM_MODEL_NAME.
-    """
-    question = payload.question.strip()
-    if not question:
-        raise HTTPException(status_code=400, detail="Question must not be empty")
-
+def _docs_qa_prompt(question: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """Retrieve doc hits for ``question`` and build the chat messages sent to vLLM."""
     root = _fortigate_docs_root()
     if not root.exists():
         raise HTTPException(status_code=404, detail="FortiGate docs not available on disk")
@@ -1151,9 +1408,38 @@ async def fortigate_docs_qa(payload: DocsQARequest):
             ),
         },
     ]
+    return hits, messages
 
-    base_url = _vllm_base_url()
+
+def _docs_qa_question(payload: DocsQARequest) -> str:
+    question = payload.question.strip()
+    if not question:
+        raise HTTPException(status_code=400, detail="Question must not be empty")
+    return question
+
+
+def _docs_qa_cache_key(question: str, hits: List[Dict[str, Any]], model_name: str) -> str:
+    return answer_cache_key(question, [h["path"] for h in hits], model_name, _DOCS_QA_PROMPT_VERSION)
+
+
+@app.post("/docs/qa")
+async def fortigate_docs_qa(payload: DocsQARequest):
+    """Answer a question using local FortiGate API documentation and the local vLLM model.
+
+    This endpoint performs a simple retrieval over the scraped docs, then calls the
+    OpenAI-compatible vLLM server configured via VLLM_BASE_URL / VLLM_MODEL_NAME.
+    """
+    question = _docs_qa_question(payload)
+    hits, messages = _docs_qa_prompt(question)
     model_name = _vllm_model_name()
+    cache = get_answer_cache("docs_qa")
+    cache_key = _docs_qa_cache_key(question, hits, model_name)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return JSONResponse(
+            {"question": question, "answer": cached, "sources": hits},
+            headers={"X-Answer-Cache": "hit"},
+        )
 
     try:
         client = await _get_vllm_client()
@@ -1181,7 +1467,107 @@ async def fortigate_docs_qa(payload: DocsQARequest):
         raise HTTPException(status_code=500, detail="vLLM server returned no choices")
 
     answer = choices[0].get("message", {}).get("content", "").strip()
-    return JSONResponse({"question": question, "answer": answer, "sources": hits})
+    if answer:
+        cache.put(cache_key, answer)
+    return JSONResponse(
+        {"question": question, "answer": answer, "sources": hits},
+        headers={"X-Answer-Cache": "miss"},
+    )
+
+
+async def _cached_answer_stream(question: str, hits: List[Dict[str, Any]], answer: str):
+    """Replay a cached docs QA answer with the same frames as a live stream."""
+    yield _sse_event("sources", {"question": question, "sources": hits})
+    yield _sse_event("token", {"text": answer})
+    yield _sse_event("done", {"answer": answer})
+
+
+async def _vllm_token_stream(resp: httpx.Response, question: str, hits: List[Dict[str, Any]], cache_key: str):
+    """Relay an OpenAI-style ``chat/completions`` stream as SSE frames.
+
+    Emits ``sources`` first, one ``token`` event per content delta, then
+    ``done`` with the assembled answer (or ``error`` if the upstream breaks).
+    Only answers from streams that ran to completion are cached.
+    """
+    parts: List[str] = []
+    try:
+        yield _sse_event("sources", {"question": question, "sources": hits})
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                continue
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    parts.append(text)
+                    yield _sse_event("token", {"text": text})
+        answer = "".join(parts).strip()
+        if answer:
+            get_answer_cache("docs_qa").put(cache_key, answer)
+        yield _sse_event("done", {"answer": answer})
+    except httpx.HTTPError as exc:
+        yield _sse_event("error", {"detail": f"vLLM stream failed: {exc}"})
+    finally:
+        await resp.aclose()
+
+
+@app.post("/docs/qa/stream")
+async def fortigate_docs_qa_stream(payload: DocsQARequest):
+    """Streaming variant of ``/docs/qa``: relays vLLM tokens as Server-Sent Events.
+
+    Retrieval and upstream errors are still reported as HTTP errors because the
+    vLLM response headers are awaited before the stream starts; after that the
+    first byte goes out as soon as the model emits its first token.
+    """
+    question = _docs_qa_question(payload)
+    hits, messages = _docs_qa_prompt(question)
+    model_name = _vllm_model_name()
+    sse_headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    cache_key = _docs_qa_cache_key(question, hits, model_name)
+    cached = get_answer_cache("docs_qa").get(cache_key)
+    if cached is not None:
+        return StreamingResponse(
+            _cached_answer_stream(question, hits, cached),
+            media_type="text/event-stream",
+            headers={**sse_headers, "X-Answer-Cache": "hit"},
+        )
+
+    try:
+        client = await _get_vllm_client()
+        request = client.build_request(
+            "POST",
+            "/chat/completions",
+            json={
+                "model": model_name,
+                "messages": messages,
+                "temperature": 0.1,
+                "max_tokens": 1024,
+                "stream": True,
+            },
+        )
+        resp = await client.send(request, stream=True)
+    except httpx.RequestError as exc:
+        raise HTTPException(status_code=502, detail=f"Error contacting vLLM server: {exc}") from exc
+
+    if resp.status_code != 200:
+        body = (await resp.aread()).decode("utf-8", errors="replace")
+        await resp.aclose()
+        raise HTTPException(
+            status_code=resp.status_code,
+            detail=f"vLLM server returned HTTP {resp.status_code}: {body}",
+        )
+
+    return StreamingResponse(
+        _vllm_token_stream(resp, question, hits, cache_key),
+        media_type="text/event-stream",
+        headers={**sse_headers, "X-Answer-Cache": "miss"},
+    )
 
 
 @app.get("/2d-topology-enhanced", response_class=HTMLResponse)
@@ -1529,10 +1915,11 @@ def _select_icon_model_for_type(device_type_str: str) -> Optional[str]:
 
 
 def _enhance_scene_with_models(scene: Dict[str, Any]) -> Dict[str, Any]:
-    from device_mac_matcher import DeviceModelMatcher
-    
-    matcher = DeviceModelMatcher()
+    matcher = _get_device_matcher()
+    match_time = 0.0
     enhanced_scene = scene.copy()
+    # Work on node copies so the (possibly cached) source scene is never mutated
+    enhanced_scene["nodes"] = [dict(node) for node in scene.get("nodes", [])]
     
     # Enhance nodes with device model and icon information
     for node in enhanced_scene.get("nodes", []):
@@ -1549,7 +1936,9 @@ def _enhance_scene_with_models(scene: Dict[str, Any]) -> Dict[str, Any]:
         # Add device model information if MAC is available
         if mac_address:
             try:
+                match_start = time.perf_counter()
                 device_info = matcher.match_mac_to_model(mac_address, {"hostname": node.get("hostname")})
+                match_time += time.perf_counter() - match_start
                 node.update({
                     "device_vendor": device_info.vendor,
                     "device_model": device_info.model_path,
@@ -1611,6 +2000,9 @@ def _enhance_scene_with_models(scene: Dict[str, Any]) -> Dict[str, Any]:
                 node["device_model"] = "/static/3d-models/network.obj"
             else:
                 node["device_model"] = "/static/3d-models/generic_device.obj"
+    # Per-node matcher calls are too fine-grained for their own spans; report the total.
+    PERF_RECORDER.record("device_match", match_time)
+    add_span("device_match", match_time)
     _apply_hierarchical_layout(enhanced_scene)
     return enhanced_scene
 
@@ -1632,7 +2024,8 @@ def _apply_hierarchical_layout(scene: Dict[str, Any], layout_type: str = "networ
         nodes = scene.get("nodes", [])
         links = scene.get("links", [])
         if nodes:
-            positioned_nodes = calculate_network_tree_layout(nodes, links)
+            with _profile_section("layout"):
+                positioned_nodes = calculate_network_tree_layout(nodes, links)
             # Update scene with positioned nodes
             scene["nodes"] = positioned_nodes
         return
@@ -1980,7 +2373,7 @@ class FortinetMCPClient:
 
     def __post_init__(self):
         verify = self.ca_path if self.ca_path else False
-        self.session = httpx.AsyncClient(base_url=self.url, verify=verify)
+        self.session = instrument_httpx_client(httpx.AsyncClient(base_url=self.url, verify=verify), "fortinet_mcp")
 
     async def close(self) -> None:
         await self.session.aclose()
@@ -2095,6 +2488,10 @@ async def _call_fortinet_tool_async(tool_name: str, extra_arguments: Optional[Di
     return await client.call(tool_name, extra_arguments)
 
 
+# Process-wide so matcher results and per-device nodes carry over between scene loads.
+_LIVE_DEVICE_MERGER = LiveDeviceMerger(matcher_factory=_get_device_matcher)
+
+
 def _fallback_topology_copy() -> Dict[str, Any]:
     data = orjson.loads(orjson.dumps(_FALLBACK_TOPOLOGY))
     metadata = data.setdefault("metadata", {})
@@ -2118,102 +2515,49 @@ async def _load_topology_raw_with_fallback() -> Dict[str, Any]:
     return _fallback_topology_copy()
 
 
+async def _enrich_scene_with_live_devices(scene: Dict[str, Any]) -> Dict[str, Any]:
+    """Attempt to enrich a file-backed scene with live connected devices from FortiGate.
+
+    Best effort: any collector failure leaves the scene untouched. The merge
+    itself is incremental (see LiveDeviceMerger) and runs off the event loop.
+    """
+    try:
+        # Collect credentials from environment
+        creds_dict = _fortinet_credentials()
+        # Convert dict to FortiGateCredentialsModel
+        creds = FortiGateCredentialsModel(
+            host=f"{creds_dict.get('device_ip', '192.168.0.254')}:10443",
+            username=creds_dict.get('username', 'admin'),
+            password=creds_dict.get('password'),  # May contain token
+        )
+        collector = _create_fortigate_collector(creds)
+        if collector:
+            logger.info("Fetching live connected devices from FortiGate...")
+            with _profile_section("collector_auth"):
+                authenticated = await collector.authenticate()
+            if authenticated:
+                with _profile_section("device_fetch"):
+                    live_devices = await collector.get_connected_devices()
+                if live_devices:
+                    logger.info(f"Found {len(live_devices)} connected devices")
+                    with _profile_section("merge_live_devices"):
+                        await asyncio.to_thread(_LIVE_DEVICE_MERGER.merge, scene, live_devices)
+    except Exception as e:
+        logger.warning(f"Failed to enrich topology with live devices: {e}")
+    return scene
+
+
 async def _load_scene_with_fallback() -> Dict[str, Any]:
     # 1. Try GraphML topology
     graphml_path = PROJECT_ROOT / "data/generated/combined_topology.graphml"
     if graphml_path.exists():
         try:
             logger.info(f"Loading topology from GraphML: {graphml_path}")
-            scene = await asyncio.to_thread(parse_graphml_topology, str(graphml_path))
+            with _profile_section("graphml_parse"):
+                scene = await asyncio.to_thread(parse_graphml_topology, str(graphml_path))
             if scene.get("nodes"):
                 scene.setdefault("metadata", {})["source"] = "graphml"
-                
-                # Attempt to enrich with live connected devices from FortiGate
-                try:
-                    # Collect credentials from environment
-                    creds_dict = _fortinet_credentials()
-                    # Convert dict to FortiGateCredentialsModel
-                    creds = FortiGateCredentialsModel(
-                        host=f"{creds_dict.get('device_ip', '192.168.0.254')}:10443",
-                        username=creds_dict.get('username', 'admin'),
-                        password=creds_dict.get('password'),  # May contain token
-                    )
-                    collector = _create_fortigate_collector(creds)
-                    if collector:
-                        logger.info("Fetching live connected devices from FortiGate...")
-                        if await collector.authenticate():
-                            live_devices = await collector.get_connected_devices()
-                            if live_devices:
-                                logger.info(f"Found {len(live_devices)} connected devices")
-                                # Merge live devices into scene
-                                nodes = scene.get("nodes", [])
-                                links = scene.get("links", [])
-                                
-                                # Find a suitable uplink (switch or firewall)
-                                uplink_id = None
-                                for n in nodes:
-                                    dtype = (n.get("type") or "").lower()
-                                    if "switch" in dtype:
-                                        uplink_id = n["id"]
-                                        break
-                                if not uplink_id:
-                                    for n in nodes:
-                                        dtype = (n.get("type") or "").lower()
-                                        if "fortigate" in dtype or "firewall" in dtype:
-                                            uplink_id = n["id"]
-                                            break
-                                
-                                if uplink_id:
-                                    # Initialize matcher
-                                    matcher = DeviceModelMatcher()
-                                    
-                                    for dev in live_devices:
-                                        dev_id = f"dev-{dev.get('mac', 'unknown').replace(':', '')}"
-                                        # Avoid duplicates
-                                        if any(n["id"] == dev_id for n in nodes):
-                                            continue
-                                            
-                                        # Match device to get type and model
-                                        mac = dev.get("mac", "")
-                                        host = dev.get("host") or dev.get("hostname") or dev.get("name") or ""
-                                        match_info = matcher.match_mac_to_model(mac, {"hostname": host})
-                                        
-                                        # Preserve all device fields, especially connection_type, ssid, ap_name, os
-                                        node_data = {
-                                            "id": dev_id,
-                                            "name": host or mac or "Unknown Device",
-                                            "type": match_info.device_type,
-                                            "ip": dev.get("ip"),
-                                            "mac": mac,
-                                            "vendor": match_info.vendor,
-                                            "os": dev.get("os") or dev.get("os_name") or dev.get("software_os"),
-                                            "status": dev.get("status", "online"),
-                                            "model_path": match_info.model_path,
-                                            "pos_system": match_info.pos_system,
-                                            # Preserve connection metadata
-                                            "connection_type": dev.get("connection_type"),
-                                            "ssid": dev.get("ssid"),
-                                            "ap_name": dev.get("ap_name"),
-                                            "ap_sn": dev.get("ap_sn") or dev.get("wtp_id"),
-                                            "switch_sn": dev.get("switch_sn"),
-                                            "port": dev.get("port"),
-                                            "vlan": dev.get("vlan"),
-                                        }
-                                        # Remove None values to keep the data clean
-                                        node_data = {k: v for k, v in node_data.items() if v is not None}
-                                        nodes.append(node_data)
-                                        links.append({
-                                            "from": uplink_id,
-                                            "to": dev_id,
-                                            "status": "active"
-                                        })
-                                        
-                                scene["nodes"] = nodes
-                                scene["links"] = links
-                except Exception as e:
-                    logger.warning(f"Failed to enrich topology with live devices: {e}")
-
-                return scene
+                return await _enrich_scene_with_live_devices(scene)
         except Exception as e:
             logger.error(f"Failed to load GraphML topology: {e}")
 
@@ -2222,102 +2566,18 @@ async def _load_scene_with_fallback() -> Dict[str, Any]:
     if json_path.exists():
         try:
             logger.info(f"Loading topology from JSON: {json_path}")
-            content = await asyncio.to_thread(json_path.read_text)
-            scene = orjson.loads(content)
+            with _profile_section("json_parse"):
+                content = await asyncio.to_thread(json_path.read_text)
+                scene = orjson.loads(content)
             if scene.get("nodes"):
                 scene.setdefault("metadata", {})["source"] = "json"
-                
-                # Attempt to enrich with live connected devices from FortiGate
-                try:
-                    # Collect credentials from environment
-                    creds_dict = _fortinet_credentials()
-                    # Convert dict to FortiGateCredentialsModel
-                    creds = FortiGateCredentialsModel(
-                        host=f"{creds_dict.get('device_ip', '192.168.0.254')}:10443",
-                        username=creds_dict.get('username', 'admin'),
-                        password=creds_dict.get('password'),  # May contain token
-                    )
-                    collector = _create_fortigate_collector(creds)
-                    if collector:
-                        logger.info("Fetching live connected devices from FortiGate...")
-                        if await collector.authenticate():
-                            live_devices = await collector.get_connected_devices()
-                            if live_devices:
-                                logger.info(f"Found {len(live_devices)} connected devices")
-                                # Merge live devices into scene
-                                nodes = scene.get("nodes", [])
-                                links = scene.get("links", [])
-                                
-                                # Find a suitable uplink (switch or firewall)
-                                uplink_id = None
-                                for n in nodes:
-                                    dtype = (n.get("type") or "").lower()
-                                    if "switch" in dtype:
-                                        uplink_id = n["id"]
-                                        break
-                                if not uplink_id:
-                                    for n in nodes:
-                                        dtype = (n.get("type") or "").lower()
-                                        if "fortigate" in dtype or "firewall" in dtype:
-                                            uplink_id = n["id"]
-                                            break
-                                
-                                if uplink_id:
-                                    # Initialize matcher
-                                    matcher = DeviceModelMatcher()
-                                    
-                                    for dev in live_devices:
-                                        dev_id = f"dev-{dev.get('mac', 'unknown').replace(':', '')}"
-                                        # Avoid duplicates
-                                        if any(n["id"] == dev_id for n in nodes):
-                                            continue
-                                            
-                                        # Match device to get type and model
-                                        mac = dev.get("mac", "")
-                                        host = dev.get("host") or dev.get("hostname") or dev.get("name") or ""
-                                        match_info = matcher.match_mac_to_model(mac, {"hostname": host})
-                                        
-                                        # Preserve all device fields, especially connection_type, ssid, ap_name, os
-                                        node_data = {
-                                            "id": dev_id,
-                                            "name": host or mac or "Unknown Device",
-                                            "type": match_info.device_type,
-                                            "ip": dev.get("ip"),
-                                            "mac": mac,
-                                            "vendor": match_info.vendor,
-                                            "os": dev.get("os") or dev.get("os_name") or dev.get("software_os"),
-                                            "status": dev.get("status", "online"),
-                                            "model_path": match_info.model_path,
-                                            "pos_system": match_info.pos_system,
-                                            # Preserve connection metadata
-                                            "connection_type": dev.get("connection_type"),
-                                            "ssid": dev.get("ssid"),
-                                            "ap_name": dev.get("ap_name"),
-                                            "ap_sn": dev.get("ap_sn") or dev.get("wtp_id"),
-                                            "switch_sn": dev.get("switch_sn"),
-                                            "port": dev.get("port"),
-                                            "vlan": dev.get("vlan"),
-                                        }
-                                        # Remove None values to keep the data clean
-                                        node_data = {k: v for k, v in node_data.items() if v is not None}
-                                        nodes.append(node_data)
-                                        links.append({
-                                            "from": uplink_id,
-                                            "to": dev_id,
-                                            "status": "active"
-                                        })
-                                        
-                                scene["nodes"] = nodes
-                                scene["links"] = links
-                except Exception as e:
-                    logger.warning(f"Failed to enrich topology with live devices: {e}")
-
-                return scene
+                return await _enrich_scene_with_live_devices(scene)
         except Exception as e:
             logger.error(f"Failed to load JSON topology: {e}")
 
     # 3. Fallback to discovery / sample
-    topology = await _load_topology_raw_with_fallback()
+    with _profile_section("mcp_discovery"):
+        topology = await _load_topology_raw_with_fallback()
     if (topology.get("metadata") or {}).get("source") == "fallback":
         scene = orjson.loads(orjson.dumps(_SAMPLE_SCENE))
         scene.setdefault("metadata", {})["source"] = "fallback"
@@ -2328,6 +2588,229 @@ async def _load_scene_with_fallback() -> Dict[str, Any]:
     return scene
 
 
+# Merged scene shared by /api/topology/scene, scene-enhanced and babylon-lab-format.
+# Concurrent viewers share one load; results live for TOPOLOGY_SCENE_CACHE_TTL seconds.
+_SCENE_FLIGHT = SingleFlightCache(ttl=_env_float("TOPOLOGY_SCENE_CACHE_TTL", 5.0))
+# Per-generation stream frames (signature, snapshot, delta) shared by every scene stream.
+# Kept longer than a load so viewers polling a few seconds apart still find them.
+_SCENE_STREAM_FLIGHT = SingleFlightCache(ttl=_env_float("TOPOLOGY_STREAM_FRAME_TTL", 300.0))
+_SCENE_GENERATION = 0
+
+
+async def _load_scene_versioned() -> Tuple[int, Dict[str, Any]]:
+    global _SCENE_GENERATION
+    with _profile_section("load_scene"):
+        scene = await _load_scene_with_fallback()
+    _SCENE_GENERATION += 1
+    return _SCENE_GENERATION, scene
+
+
+# Snapshots published by the background refresher (TOPOLOGY_AUTO_REFRESH=true, every
+# TOPOLOGY_REFRESH_INTERVAL seconds).
+# While it runs, topology handlers read only from _TOPOLOGY_STORE.
+_TOPOLOGY_STORE = SnapshotStore()
+_TOPOLOGY_REFRESHER: Optional[BackgroundRefresher] = None
+_SCENE_FORMS = ("scene", "enhanced", "lab")
+
+
+def _reject_fallback(key: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Fail a refresh that degraded to sample data, so the last good snapshot stays published.
+
+    The loaders fall back to sample data instead of raising when upstream is
+    down. Before the first publish that sample is still served.
+    """
+    if (payload.get("metadata") or {}).get("source") == "fallback" and _TOPOLOGY_STORE.get(key) is not None:
+        raise RuntimeError(f"{key} refresh fell back to sample data; keeping the previous snapshot")
+    return payload
+
+
+async def _refresh_topology_raw() -> Dict[str, Any]:
+    return _reject_fallback("topology_raw", await _load_topology_raw_with_fallback())
+
+
+async def _build_scene_snapshot() -> Dict[str, Any]:
+    """Load the scene and precompute every form and its JSON encoding for publishing."""
+    generation, scene = await _load_scene_versioned()
+    _reject_fallback("scene", scene)
+    forms: Dict[str, Any] = {"scene": scene}
+    with _profile_section("enhance_models"):
+        forms["enhanced"] = await asyncio.to_thread(_enhance_scene_with_models, scene)
+    with _profile_section("lab_format"):
+        forms["lab"] = await asyncio.to_thread(_scene_to_lab_format, forms["enhanced"])
+    payloads: Dict[str, bytes] = {}
+    with _profile_section("serialize"):
+        for form in _SCENE_FORMS:
+            payloads[form] = await asyncio.to_thread(
+                orjson.dumps, forms[form], default=_json_default, option=orjson.OPT_NON_STR_KEYS
+            )
+    return {"generation": generation, "forms": forms, "payloads": payloads}
+
+
+def _topology_refresher_active() -> bool:
+    return _TOPOLOGY_REFRESHER is not None and _TOPOLOGY_REFRESHER.running
+
+
+async def _topology_snapshot(key: str, refresh: bool = False) -> Snapshot:
+    """Current snapshot for ``key``; waits only for the very first publish (or an explicit refresh)."""
+    if refresh:
+        snapshot = await _TOPOLOGY_REFRESHER.refresh(key)
+        if snapshot is not None:
+            return snapshot
+    try:
+        return await _TOPOLOGY_STORE.wait(key, timeout=_env_float("TOPOLOGY_SNAPSHOT_WAIT", 60.0))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=f"Topology snapshot '{key}' is not available yet") from None
+
+
+def _snapshot_headers(snapshot: Optional[Snapshot]) -> Dict[str, str]:
+    if snapshot is None:
+        return {}
+    age = snapshot.age()
+    return {
+        "Age": str(int(age)),
+        "X-Snapshot-Age": f"{age:.3f}",
+        "X-Snapshot-Version": str(snapshot.version),
+    }
+
+
+async def _shared_scene(form: str, refresh: bool = False) -> Tuple[int, Dict[str, Any]]:
+    """Return ``(generation, scene)`` for ``form`` ("scene", "enhanced" or "lab").
+
+    All three forms derive from the same cached load (tagged by generation), so
+    enhancement and lab conversion each run once per load no matter how many
+    viewers ask concurrently. With the background refresher running, the
+    forms come from the published snapshot instead.
+    """
+    if _topology_refresher_active():
+        snapshot = await _topology_snapshot("scene", refresh=refresh)
+        return snapshot.value["generation"], snapshot.value["forms"][form]
+    if refresh:
+        _SCENE_FLIGHT.invalidate()
+    generation, scene = await _SCENE_FLIGHT.get("scene", _load_scene_versioned)
+    if form == "scene":
+        return generation, scene
+
+    async def _enhanced() -> Dict[str, Any]:
+        with _profile_section("enhance_models"):
+            return await asyncio.to_thread(_enhance_scene_with_models, scene)
+
+    enhanced = await _SCENE_FLIGHT.get(f"enhanced:{generation}", _enhanced)
+    if form == "enhanced":
+        return generation, enhanced
+
+    async def _lab() -> Dict[str, Any]:
+        with _profile_section("lab_format"):
+            return await asyncio.to_thread(_scene_to_lab_format, enhanced)
+
+    return generation, await _SCENE_FLIGHT.get(f"lab:{generation}", _lab)
+
+
+async def _shared_scene_payload(form: str, refresh: bool = False) -> bytes:
+    """Return the JSON-encoded scene for ``form``, encoded once per load."""
+    payload, _ = await _scene_payload_with_snapshot(form, refresh=refresh)
+    return payload
+
+
+async def _scene_payload_with_snapshot(form: str, refresh: bool = False) -> Tuple[bytes, Optional[Snapshot]]:
+    """Encoded scene for ``form`` plus the snapshot it came from (None when loaded on demand)."""
+    _, _, payload, snapshot = await _scene_with_payload(form, refresh=refresh)
+    return payload, snapshot
+
+
+async def _scene_with_payload(
+    form: str, refresh: bool = False
+) -> Tuple[int, Dict[str, Any], bytes, Optional[Snapshot]]:
+    """``(generation, scene, encoded scene, snapshot)`` for ``form``, all from the same load."""
+    if _topology_refresher_active():
+        snapshot = await _topology_snapshot("scene", refresh=refresh)
+        value = snapshot.value
+        return value["generation"], value["forms"][form], value["payloads"][form], snapshot
+    generation, scene = await _shared_scene(form, refresh=refresh)
+
+    async def _encode() -> bytes:
+        with _profile_section("serialize"):
+            return await asyncio.to_thread(
+                orjson.dumps, scene, default=_json_default, option=orjson.OPT_NON_STR_KEYS
+            )
+
+    return generation, scene, await _SCENE_FLIGHT.get(f"{form}:json:{generation}", _encode), None
+
+
+def _sse_event(event: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    body = orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return _sse_frame(event, body, event_id)
+
+
+def _sse_frame(event: str, body: bytes, event_id: Optional[str] = None) -> bytes:
+    prefix = f"id: {event_id}\n".encode() if event_id else b""
+    return prefix + f"event: {event}\ndata: ".encode() + body + b"\n\n"
+
+
+async def _scene_signature(form: str, generation: int, scene: Dict[str, Any]) -> str:
+    async def _sign() -> str:
+        return await asyncio.to_thread(_topology_signature, scene)
+
+    return await _SCENE_STREAM_FLIGHT.get(f"{form}:signature:{generation}", _sign)
+
+
+async def _scene_snapshot_frame(form: str, generation: int, signature: str, payload: bytes) -> bytes:
+    """``snapshot`` SSE frame for one generation, wrapped around the already encoded scene."""
+
+    async def _frame() -> bytes:
+        body = b'{"signature":"' + signature.encode() + b'","scene":' + payload + b"}"
+        return _sse_frame("snapshot", body, signature)
+
+    return await _SCENE_STREAM_FLIGHT.get(f"{form}:snapshot:{generation}", _frame)
+
+
+async def _scene_delta_frame(
+    form: str,
+    previous: Tuple[int, str, Dict[str, Any]],
+    current: Tuple[int, str, Dict[str, Any]],
+) -> bytes:
+    """``delta`` SSE frame between two generations, diffed and encoded once for every viewer."""
+    (previous_generation, previous_signature, previous_scene) = previous
+    (generation, signature, scene) = current
+
+    async def _frame() -> bytes:
+        with _profile_section("scene_stream_delta"):
+            ops = await asyncio.to_thread(scene_delta, previous_scene, scene)
+            return await asyncio.to_thread(
+                _sse_event, "delta", {"from": previous_signature, "to": signature, "ops": ops}, signature
+            )
+
+    return await _SCENE_STREAM_FLIGHT.get(f"{form}:delta:{previous_generation}:{generation}", _frame)
+
+
+async def _scene_event_stream(request: Request, form: str, interval: float):
+    """Yield SSE frames: one ``snapshot``, then ``delta`` events as the scene changes.
+
+    Every stream polls the shared single-flight scene, so N viewers still cost
+    one upstream load per TTL. The signature, the snapshot frame and each
+    delta are also computed once per generation and shared by all streams
+    (through ``_SCENE_STREAM_FLIGHT``); a stream only sends a delta when the new
+    generation's ``_topology_signature`` differs, otherwise a keep-alive
+    comment.
+    """
+    previous: Optional[Tuple[int, str, Dict[str, Any]]] = None
+    while not await request.is_disconnected():
+        frame = b": keep-alive\n\n"
+        try:
+            generation, scene, payload, _ = await _scene_with_payload(form)
+            if previous is None or generation != previous[0]:
+                signature = await _scene_signature(form, generation, scene)
+                if previous is None:
+                    frame = await _scene_snapshot_frame(form, generation, signature, payload)
+                elif signature != previous[1]:
+                    frame = await _scene_delta_frame(form, previous, (generation, signature, scene))
+                previous = (generation, signature, scene)
+        except Exception as exc:
+            logger.warning("Scene stream refresh failed: %s", exc)
+            frame = _sse_event("error", {"detail": str(exc)})
+        yield frame
+        await asyncio.sleep(interval)
+
+
 def _call_fortinet_tool(tool_name: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Synchronous helper primarily for legacy utilities and tests."""
     try:
@@ -2482,40 +2965,78 @@ def _scene_to_lab_format(scene: Dict[str, Any]) -> Dict[str, Any]:
 
 @app.get("/api/topology/raw")
 async def get_topology_raw():
-    """Return raw Fortinet topology JSON from discover_fortinet_topology tool."""
-    data = await _load_topology_raw_with_fallback()
-    return JSONResponse(data)
+    """Return raw Fortinet topology JSON from discover_fortinet_topology tool.
+
+    With the background refresher running this is the latest published
+    snapshot; ``metadata.snapshot`` then carries its version and age.
+    """
+    if not _topology_refresher_active():
+        return JSONResponse(await _load_topology_raw_with_fallback())
+    snapshot = await _topology_snapshot("topology_raw")
+    data = dict(snapshot.value)
+    data["metadata"] = {
+        **(data.get("metadata") or {}),
+        "snapshot": {
+            "version": snapshot.version,
+            "published_at": snapshot.published_at,
+            "age_seconds": round(snapshot.age(), 3),
+        },
+    }
+    return JSONResponse(data, headers=_snapshot_headers(snapshot))
 
 
 @app.get("/api/topology/scene")
-async def get_topology_scene():
+async def get_topology_scene(refresh: bool = False):
     """Return normalized 3D scene JSON sourced from the Fortinet MCP bridge."""
-    scene = await _load_scene_with_fallback()
-    return JSONResponse(scene)
+    payload, snapshot = await _scene_payload_with_snapshot("scene", refresh=refresh)
+    return Response(content=payload, media_type="application/json", headers=_snapshot_headers(snapshot))
+
+@app.get("/api/topology/snapshots")
+async def topology_snapshots():
+    """Background refresher status: per snapshot version, age, refresh count and last error."""
+    if _TOPOLOGY_REFRESHER is None:
+        return JSONResponse({"enabled": False, "snapshots": {}})
+    return JSONResponse({"enabled": _TOPOLOGY_REFRESHER.running, "snapshots": _TOPOLOGY_REFRESHER.status()})
+
+
+@app.get("/api/topology/scene/stream")
+async def stream_topology_scene(request: Request, form: str = "scene", interval: Optional[float] = None):
+    """Push the topology scene over Server-Sent Events.
+
+    Sends a full ``snapshot`` event first, then ``delta`` events carrying
+    add/remove/replace ops for added, removed and changed nodes and links.
+    Op paths address items by key, not array index (see scene_diff), so
+    clients apply them with ``apply_scene_delta`` or its port in
+    static/app.js rather than a generic JSON Patch library. ``form`` is ``scene`` or ``enhanced``; ``interval`` is the
+    poll period in seconds (TOPOLOGY_STREAM_INTERVAL, default 5, minimum 1).
+    """
+    if form not in {"scene", "enhanced"}:
+        raise HTTPException(status_code=400, detail="form must be 'scene' or 'enhanced'")
+    period = max(1.0, interval if interval is not None else _env_float("TOPOLOGY_STREAM_INTERVAL", 5.0))
+    return StreamingResponse(
+        _scene_event_stream(request, form, period),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/api/topology/scene-enhanced")
-async def get_topology_scene_enhanced():
+async def get_topology_scene_enhanced(refresh: bool = False):
     """Return enhanced 3D scene with device model matching and 3D model paths."""
-    scene = await _load_scene_with_fallback()
-
-    enhanced_scene = await asyncio.to_thread(_enhance_scene_with_models, scene)
-    return JSONResponse(enhanced_scene)
+    payload, snapshot = await _scene_payload_with_snapshot("enhanced", refresh=refresh)
+    return Response(content=payload, media_type="application/json", headers=_snapshot_headers(snapshot))
 
 @app.get("/api/topology/babylon-lab-format")
-async def get_topology_babylon_lab_format():
+async def get_topology_babylon_lab_format(refresh: bool = False):
     """Return topology in 3d-network-topology-lab JSON format (models/connections).
 
     This endpoint adapts the normalized scene used by the main Babylon viewer into the
     structure expected by the standalone 3D Network Topology Lab so that both tools can
     share the same discovery and MCP pipeline.
     """
-    scene = await _load_scene_with_fallback()
-
     # Reuse the same enhancement pipeline used by /api/topology/scene-enhanced so that
     # lab-format models have VSS-derived / matcher-derived 3D model paths.
-    enhanced_scene = await asyncio.to_thread(_enhance_scene_with_models, scene)
-    lab_payload = await asyncio.to_thread(_scene_to_lab_format, enhanced_scene)
-    return JSONResponse(lab_payload)
+    payload, snapshot = await _scene_payload_with_snapshot("lab", refresh=refresh)
+    return Response(content=payload, media_type="application/json", headers=_snapshot_headers(snapshot))
 
 
 @app.post("/api/fortigate/topology-direct")
@@ -2651,81 +3172,81 @@ async def fortigate_assets(request: FortiGateDirectRequest):
 
 @app.post("/api/fortigate/monitor/wifi/clients")
 async def fortigate_monitor_wifi_clients(request: FortiGateDirectRequest):
-    """Return WiFi clients from FortiGate using FortiGateMonitor."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.wifi_clients()
+    """Return WiFi clients from FortiGate using the pooled AsyncFortiGateMonitor."""
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("wifi_clients")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/wifi/ssids")
 async def fortigate_monitor_wifi_ssids(request: FortiGateDirectRequest):
     """Return WiFi SSIDs from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.wifi_ssids()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("wifi_ssids")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/switch/clients")
 async def fortigate_monitor_switch_clients(request: FortiGateDirectRequest):
     """Return switch clients from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.switch_clients()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("switch_clients")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/switch/status")
 async def fortigate_monitor_switch_status(request: FortiGateDirectRequest):
     """Return switch status from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.switch_status()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("switch_status")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/system/cpu")
 async def fortigate_monitor_cpu(request: FortiGateDirectRequest):
     """Return CPU usage from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.cpu()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("cpu")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/system/memory")
 async def fortigate_monitor_memory(request: FortiGateDirectRequest):
     """Return memory usage from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.memory()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("memory")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/system/sessions")
 async def fortigate_monitor_sessions(request: FortiGateDirectRequest):
     """Return active sessions from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.sessions()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("sessions")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/routing/arp")
 async def fortigate_monitor_arp(request: FortiGateDirectRequest):
     """Return ARP table from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.arp_table()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("arp_table")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/routing/dhcp")
 async def fortigate_monitor_dhcp(request: FortiGateDirectRequest):
     """Return DHCP leases from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.dhcp()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("dhcp")
     return JSONResponse(data)
 
 
 @app.post("/api/fortigate/monitor/interfaces")
 async def fortigate_monitor_interfaces(request: FortiGateDirectRequest):
     """Return system interfaces from FortiGate."""
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.interfaces()
+    monitor = await _get_async_fortigate_monitor(request.credentials)
+    data = await monitor.section("interfaces")
     return JSONResponse(data)
 
 
@@ -2734,28 +3255,31 @@ async def fortigate_monitor_full_dataset(request: FortiGateDirectRequest):
     """Return complete monitoring dataset from FortiGate.
     
     This endpoint collects data from all available monitoring endpoints
-    and returns a comprehensive snapshot. Use with caution as it may
-    take significant time to complete.
+    concurrently and returns a comprehensive snapshot. Sections that fail or
+    miss their deadline are reported as error entries (``partial`` is set)
+    and ``latency_ms`` shows how long each section took.
     """
-    monitor = _create_fortigate_monitor(request.credentials)
-    data = monitor.build_dataset()
+    data = await _build_monitor_dataset(request.credentials)
     return JSONResponse(data)
 
 
 @app.get("/api/dataset")
-async def get_dataset():
+async def get_dataset(refresh: bool = False):
     """Return complete FortiGate monitoring dataset for dashboard.
     
     Uses environment variables for authentication (no request body required).
     Returns data in format expected by dashboard pages.
     This is a convenience endpoint for dashboard consumption.
+
+    Responses come from a per-host snapshot cache with per-section TTLs; the
+    ``cache`` block reports each section's age and ``Age`` holds the oldest.
+    Pass ``refresh=true`` to wait for a fresh sweep.
     """
     try:
         # Use empty credentials to rely on environment variables
         creds = FortiGateCredentialsModel()
-        monitor = _create_fortigate_monitor(creds)
-        data = monitor.build_dataset()
-        return JSONResponse(data)
+        data = await _cached_monitor_dataset(creds, refresh=refresh)
+        return JSONResponse(data, headers=_dataset_cache_headers(data))
     except ValueError as e:
         # Token not available
         raise HTTPException(
@@ -2770,6 +3294,68 @@ async def get_dataset():
         )
 
 
+# Per-site snapshots written by the fleet collector; /api/fleet/* only reads them.
+_FLEET_STORE = SiteSnapshotStore(_path_from_env("FLEET_SNAPSHOT_DIR", PROJECT_ROOT / "data" / "fleet"))
+_FLEET_COLLECTOR: Optional[FleetCollector] = None
+_FLEET_TASK: Optional[asyncio.Task] = None
+
+
+def _create_fleet_collector() -> FleetCollector:
+    """Fleet collector for every FORTIGATE_HOSTS entry, tuned through FLEET_* variables."""
+    interval = _env_float("FLEET_INTERVAL", 300.0)
+    return FleetCollector(
+        sites_from_env(),
+        _FLEET_STORE,
+        interval=interval,
+        startup_spread=_env_float("FLEET_STARTUP_SPREAD", interval),
+        jitter=_env_float("FLEET_JITTER", 0.1),
+        max_concurrency=int(_env_float("FLEET_MAX_CONCURRENCY", 32)),
+        per_host_concurrency=int(_env_float("FLEET_PER_HOST_CONCURRENCY", 4)),
+        backoff_base=_env_float("FLEET_BACKOFF_BASE", 30.0),
+        backoff_max=_env_float("FLEET_BACKOFF_MAX", 1800.0),
+        section_timeout=_monitor_section_timeout(),
+    )
+
+
+@app.get("/api/fleet/sites")
+async def fleet_sites():
+    """Per-site snapshot summary (age, size) plus the collector schedule; never contacts devices."""
+    snapshots = await asyncio.to_thread(_FLEET_STORE.all)
+    return JSONResponse({
+        "sites": site_summaries(snapshots),
+        "schedule": _FLEET_COLLECTOR.status() if _FLEET_COLLECTOR else [],
+        "collector": _FLEET_COLLECTOR.stats() if _FLEET_COLLECTOR else None,
+    })
+
+
+@app.get("/api/fleet/topology")
+async def fleet_topology():
+    """Merged topology of every collected site, served from the stored snapshots."""
+    fleet = await asyncio.to_thread(lambda: merge_fleet(_FLEET_STORE.all()))
+    return JSONResponse(fleet)
+
+
+@app.get("/api/fleet/sites/{site_id}/topology")
+async def fleet_site_topology(site_id: str):
+    """Latest stored topology of one site."""
+    snapshot = await asyncio.to_thread(_FLEET_STORE.get, site_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No snapshot for site {site_id}")
+    return JSONResponse(snapshot)
+
+
+@app.post("/api/fleet/collect", status_code=202)
+async def fleet_collect():
+    """Schedule every site for collection now; returns immediately (poll /api/fleet/sites)."""
+    global _FLEET_COLLECTOR
+    if _FLEET_COLLECTOR is None:
+        _FLEET_COLLECTOR = _create_fleet_collector()
+    if not _FLEET_COLLECTOR.sites:
+        raise HTTPException(status_code=503, detail="No FortiGate sites configured. Set FORTIGATE_HOSTS and tokens.")
+    scheduled = _FLEET_COLLECTOR.trigger()
+    return JSONResponse({"scheduled": scheduled, "collector": _FLEET_COLLECTOR.stats()}, status_code=202)
+
+
 @app.post("/api/topology/drawio-xml", response_class=PlainTextResponse)
 async def topology_drawio_xml(request: AutomatedDiagramRequest):
     """Generate a DrawIO XML diagram for the current Fortinet topology.
@@ -2815,14 +3401,69 @@ async def intelligent_api_query(request: IntelligentAPIDocsQuery):
 
 @app.get("/api/performance/metrics")
 async def performance_metrics():
-    """Expose recent performance samples for monitoring and tests."""
-    return JSONResponse({"metrics": PERF_RECORDER.summary()})
+    """Expose recent performance samples and answer cache counters for monitoring and tests."""
+    return JSONResponse({"metrics": PERF_RECORDER.summary(), "caches": answer_cache_stats()})
+
+
+def _cache_metric_samples() -> List[Sample]:
+    """Hit/miss counters and hit ratio for every in-process cache, read at scrape time.
+
+    Stale and coalesced hits count as hits: the caller was served without
+    triggering its own upstream load.
+    """
+    caches: Dict[str, Dict[str, Any]] = {
+        "topology_scene": _SCENE_FLIGHT.stats(),
+        "topology_stream": _SCENE_STREAM_FLIGHT.stats(),
+        "fortigate_auth": FORTIGATE_AUTH_BROKER.stats(),
+    }
+    if _DATASET_CACHE is not None:
+        caches["fortigate_dataset"] = _DATASET_CACHE.stats()
+    if _get_device_matcher.cache_info().currsize:
+        caches["device_match"] = _get_device_matcher().cache_stats()
+    caches.update(answer_cache_stats())
+
+    samples: List[Sample] = []
+    for name, stats in caches.items():
+        hits = stats.get("hits", 0) + stats.get("stale_hits", 0) + stats.get("coalesced", 0)
+        misses = stats.get("misses", 0)
+        labels = {"cache": name}
+        samples.append(Sample(METRIC_PREFIX + "cache_hits", "counter", "Cache lookups served from cache", labels, hits))
+        samples.append(Sample(METRIC_PREFIX + "cache_misses", "counter", "Cache lookups that had to load", labels, misses))
+        samples.append(
+            Sample(
+                METRIC_PREFIX + "cache_hit_ratio",
+                "gauge",
+                "Cache hits / lookups since startup",
+                labels,
+                hits / (hits + misses) if hits + misses else 0.0,
+            )
+        )
+    return samples
+
+
+METRICS_REGISTRY.register_collector(_cache_metric_samples)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def openmetrics_exporter():
+    """Prometheus scrape target: route, section and upstream latency histograms plus cache counters."""
+    return Response(content=METRICS_REGISTRY.render(), media_type=OPENMETRICS_CONTENT_TYPE)
 
 
 @app.on_event("startup")
 async def startup_event() -> None:
-    """Kick off background initialization tasks (e.g., documentation warmup)."""
-    global _DOCS_INDEX_TASK
+    """Kick off background initialization tasks (e.g., documentation warmup, fleet collection)."""
+    global _DOCS_INDEX_TASK, _FLEET_COLLECTOR, _FLEET_TASK, _TOPOLOGY_REFRESHER
+    if _env_bool("TOPOLOGY_AUTO_REFRESH", False):
+        refresh_interval = max(1.0, _env_float("TOPOLOGY_REFRESH_INTERVAL", 30.0))
+        _TOPOLOGY_REFRESHER = BackgroundRefresher(_TOPOLOGY_STORE, interval=refresh_interval)
+        _TOPOLOGY_REFRESHER.register("scene", _build_scene_snapshot)
+        _TOPOLOGY_REFRESHER.register("topology_raw", _refresh_topology_raw)
+        _TOPOLOGY_REFRESHER.start()
+    if _env_bool("FLEET_COLLECTION", False):
+        _FLEET_COLLECTOR = _create_fleet_collector()
+        _FLEET_TASK = asyncio.create_task(_FLEET_COLLECTOR.run_forever())
+        logger.info("Fleet collection started for %d FortiGate sites", len(_FLEET_COLLECTOR.sites))
     root = _fortigate_docs_root()
     if not root.exists():
         return
@@ -2839,10 +3480,15 @@ async def startup_event() -> None:
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
     """Gracefully close pooled HTTP clients when FastAPI stops."""
-    global _FORTINET_CLIENT, _SERVICE_HTTP_CLIENT, _SERVICE_CLIENT_LOOP, _VLLM_CLIENT, _VLLM_CLIENT_BASE, _DOCS_INDEX_TASK
+    global _FORTINET_CLIENT, _SERVICE_HTTP_CLIENT, _SERVICE_CLIENT_LOOP, _VLLM_CLIENT, _VLLM_CLIENT_BASE, _DOCS_INDEX_TASK, _FLEET_TASK
     if _DOCS_INDEX_TASK and not _DOCS_INDEX_TASK.done():
         _DOCS_INDEX_TASK.cancel()
     _DOCS_INDEX_TASK = None
+    if _FLEET_TASK and not _FLEET_TASK.done():
+        _FLEET_TASK.cancel()
+    _FLEET_TASK = None
+    if _TOPOLOGY_REFRESHER is not None:
+        await _TOPOLOGY_REFRESHER.stop()
     if _FORTINET_CLIENT:
         try:
             await _FORTINET_CLIENT.close()
@@ -2866,6 +3512,11 @@ async def shutdown_event() -> None:
         finally:
             _VLLM_CLIENT = None
             _VLLM_CLIENT_BASE = None
+    await close_llm_client()
+    close_answer_caches()
+    await _close_monitor_pools()
+    if _get_device_matcher.cache_info().currsize and _get_device_matcher().store is not None:
+        _get_device_matcher().store.flush()
 
 
 def get_performance_metrics() -> Dict[str, Dict[str, float]]:
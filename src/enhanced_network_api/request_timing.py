@@ -0,0 +1,110 @@
+"""Per-request span collection reported through ``Server-Timing`` headers.
+
+``ServerTimingMiddleware`` gives every HTTP request a ``RequestTimer`` held in
+a context variable. Code wraps its phases in ``span(name)``; spans opened
+inside another span are reported with a dotted path (``load_scene.graphml_parse``),
+so browser devtools show where a slow request spent its time. Context
+variables are copied into ``asyncio.to_thread`` calls and new tasks, so work
+pushed to threads or shared single-flight loads is still attributed to the
+request that started it.
+
+The header is written when the response starts: spans that finish later
+(e.g. inside a streamed body) are not included.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MAX_ENTRIES = 32
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+
+class RequestTimer:
+    """Spans recorded while one request is handled, in completion order."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+
+    def add(self, path: str, duration: float) -> None:
+        self.spans.append((path, duration))
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Render the header value; repeated spans are summed and their count given as ``desc``."""
+        merged: Dict[str, List[float]] = {}
+        for path, duration in list(self.spans):
+            entry = merged.setdefault(_TOKEN_RE.sub("_", path), [0.0, 0])
+            entry[0] += duration
+            entry[1] += 1
+        parts = []
+        for name, (duration, count) in list(merged.items())[:MAX_ENTRIES]:
+            part = f"{name};dur={duration * 1000:.1f}"
+            if count > 1:
+                part += f';desc="x{count}"'
+            parts.append(part)
+        if total is None:
+            total = time.perf_counter() - self.started
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_TIMER: ContextVar[Optional[RequestTimer]] = ContextVar("request_timer", default=None)
+_SPAN_PATH: ContextVar[Tuple[str, ...]] = ContextVar("request_span_path", default=())
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _TIMER.get()
+
+
+def add_span(name: str, duration: float) -> None:
+    """Record an already-measured ``duration`` (seconds) as a span under the current one."""
+    timer = _TIMER.get()
+    if timer is not None:
+        timer.add(".".join(_SPAN_PATH.get() + (name,)), duration)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a phase of the current request (a no-op outside a request, apart from the timing)."""
+    path = _SPAN_PATH.get() + (name,)
+    token = _SPAN_PATH.set(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        _SPAN_PATH.reset(token)
+        timer = _TIMER.get()
+        if timer is not None:
+            timer.add(".".join(path), duration)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that collects spans per request and emits them as ``Server-Timing``."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timer = RequestTimer()
+        timer_token = _TIMER.set(timer)
+        path_token = _SPAN_PATH.set(())
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _SPAN_PATH.reset(path_token)
+            _TIMER.reset(timer_token)
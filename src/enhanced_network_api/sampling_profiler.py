@@ -0,0 +1,245 @@
+"""On-demand sampling profiler for individual API requests.
+
+A request carrying ``?profile=1`` (or ``profile=collapsed``/``profile=speedscope``)
+and an ``X-Profile-Token`` header matching ``PROFILE_TOKEN`` is handled normally
+while a background thread samples the Python stacks of every thread. The
+response body is then replaced by the profile:
+
+* ``collapsed``: one ``frame;frame;frame count`` line per stack, the input
+  format of ``flamegraph.pl`` / inferno / speedscope.
+* ``speedscope``: a speedscope JSON file with one sampled profile per thread.
+
+Sampling all threads matters because the heavy scene work
+(``_enhance_scene_with_models``, ``calculate_network_tree_layout``,
+``_scene_to_lab_format``) runs in ``asyncio.to_thread`` workers. Samples where a
+thread is merely idle (waiting on a lock, queue or selector) are dropped.
+Other requests that run concurrently show up in the profile too.
+
+When no profile is requested the middleware costs one substring check on the
+query string; without ``PROFILE_TOKEN`` profiling is disabled entirely.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+FORMATS = {"1": "collapsed", "true": "collapsed", "collapsed": "collapsed", "speedscope": "speedscope"}
+DEFAULT_INTERVAL = 0.005
+MAX_DEPTH = 128
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+# Leaf frames that mean "this thread is waiting", not doing work.
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+    ("socket.py", "accept"),
+    ("socketserver.py", "serve_forever"),
+}
+
+
+class StackSampler:
+    """Collects stack samples of all other threads every ``interval`` seconds."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = max(0.0005, interval)
+        self.samples: List[Tuple[str, Tuple[Frame, ...], float]] = []
+        self.started = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self.sample(exclude=own, weight=now - last)
+            last = now
+
+    def sample(self, exclude: Optional[int] = None, weight: Optional[float] = None) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        weight = self.interval if weight is None else weight
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            stack: List[Frame] = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if not stack or (os.path.basename(stack[0][1]), stack[0][0]) in _IDLE_LEAVES:
+                continue
+            stack.reverse()
+            self.samples.append((names.get(ident, str(ident)), tuple(stack), weight))
+
+    def collapsed(self) -> str:
+        counts: Counter = Counter()
+        for thread, stack, _ in self.samples:
+            counts[";".join([thread] + [_frame_label(frame) for frame in stack])] += 1
+        return "".join(f"{line} {count}\n" for line, count in sorted(counts.items()))
+
+    def speedscope(self, name: str = "request") -> Dict[str, Any]:
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Frame, int] = {}
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for thread, stack, weight in self.samples:
+            profile = profiles.setdefault(thread, {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": 0.0,
+                "samples": [],
+                "weights": [],
+            })
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                ids.append(index[frame])
+            profile["samples"].append(ids)
+            profile["weights"].append(weight)
+            profile["endValue"] += weight
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "enhanced_network_api.sampling_profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":").replace(" ", "_")
+
+
+def requested_format(query_string: bytes) -> Optional[str]:
+    """Profile format asked for in ``query_string`` (``None`` if not profiling, ``""`` if unknown)."""
+    if b"profile=" not in query_string:
+        return None
+    values = parse_qs(query_string.decode("latin-1")).get("profile")
+    if not values:
+        return None
+    value = values[-1].strip().lower()
+    if value in {"0", "false", ""}:
+        return None
+    return FORMATS.get(value, "")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that swaps a request's response for its sampling profile."""
+
+    def __init__(
+        self,
+        app: Any,
+        token: Optional[str] = None,
+        interval: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+    ) -> None:
+        self.app = app
+        self.token = token  # None: read PROFILE_TOKEN on each profiled request
+        self.interval = interval if interval is not None else float(os.getenv("PROFILE_INTERVAL", DEFAULT_INTERVAL))
+        self.max_seconds = max_seconds if max_seconds is not None else float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or b"profile=" not in scope.get("query_string", b""):
+            await self.app(scope, receive, send)
+            return
+        fmt = requested_format(scope["query_string"])
+        if fmt is None:
+            await self.app(scope, receive, send)
+            return
+        if not self._authorized(scope):
+            await _send_text(send, 403, "profiling requires PROFILE_TOKEN and a matching X-Profile-Token header")
+            return
+        if not fmt:
+            await _send_text(send, 400, "profile must be 1, collapsed or speedscope")
+            return
+        if not self._busy.acquire(blocking=False):
+            await _send_text(send, 409, "another request is being profiled")
+            return
+        try:
+            await self._profile(scope, receive, send, fmt)
+        finally:
+            self._busy.release()
+
+    def _authorized(self, scope: Dict[str, Any]) -> bool:
+        token = self.token if self.token is not None else os.getenv("PROFILE_TOKEN", "")
+        if not token:
+            return False
+        supplied = dict(scope.get("headers") or []).get(b"x-profile-token", b"")
+        return hmac.compare_digest(supplied, token.encode("utf-8"))
+
+    async def _profile(self, scope: Dict[str, Any], receive: Callable, send: Callable, fmt: str) -> None:
+        status = {"code": 500}
+
+        async def capture(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        sampler = StackSampler(self.interval).start()
+        try:
+            await asyncio.wait_for(self.app(scope, receive, capture), timeout=self.max_seconds)
+        except asyncio.TimeoutError:
+            status["code"] = 504
+        finally:
+            sampler.stop()
+
+        name = f"{scope['method']} {scope['path']}"
+        if fmt == "speedscope":
+            body = json.dumps(sampler.speedscope(name)).encode("utf-8")
+            content_type, filename = b"application/json", b"profile.speedscope.json"
+        else:
+            body = sampler.collapsed().encode("utf-8")
+            content_type, filename = b"text/plain; charset=utf-8", b"profile.collapsed.txt"
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+                (b"content-disposition", b'attachment; filename="' + filename + b'"'),
+                (b"x-profiled-status", str(status["code"]).encode()),
+                (b"x-profile-samples", str(len(sampler.samples)).encode()),
+                (b"x-profile-duration", f"{sampler.duration:.3f}".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def _send_text(send: Callable, status: int, text: str) -> None:
+    body = text.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
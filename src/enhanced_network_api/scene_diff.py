@@ -0,0 +1,92 @@
+"""
+Scene diffing for incremental topology updates.
+
+Produces JSON-Patch style operations (RFC 6902 op names) between two
+normalized scenes. Array indexes are not stable across snapshots, so paths
+address nodes and links by key instead: ``/nodes/<id>`` and
+``/links/<from>|<to>`` (or ``/links/<id>`` when the link carries an id),
+with RFC 6901 escaping of ``~`` and ``/``.
+"""
+
+from typing import Any, Dict, List
+
+Op = Dict[str, Any]
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def node_key(node: Dict[str, Any]) -> str:
+    return str(node.get("id") or node.get("name"))
+
+
+def link_key(link: Dict[str, Any]) -> str:
+    if link.get("id"):
+        return str(link["id"])
+    source = link.get("from") or link.get("source")
+    target = link.get("to") or link.get("target")
+    return f"{source}|{target}"
+
+
+def _index(items: List[Dict[str, Any]], key_fn) -> Dict[str, Dict[str, Any]]:
+    return {key_fn(item): item for item in items if isinstance(item, dict)}
+
+
+def _diff_collection(name: str, before: Dict[str, Any], after: Dict[str, Any]) -> List[Op]:
+    ops: List[Op] = []
+    for key in before.keys() - after.keys():
+        ops.append({"op": "remove", "path": f"/{name}/{_escape(key)}"})
+    for key, item in after.items():
+        previous = before.get(key)
+        if previous is None:
+            ops.append({"op": "add", "path": f"/{name}/{_escape(key)}", "value": item})
+        elif previous != item:
+            ops.append({"op": "replace", "path": f"/{name}/{_escape(key)}", "value": item})
+    return ops
+
+
+def scene_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> List[Op]:
+    """Return the operations that turn ``previous`` into ``current``."""
+    ops = _diff_collection(
+        "nodes",
+        _index(previous.get("nodes") or [], node_key),
+        _index(current.get("nodes") or [], node_key),
+    )
+    ops.extend(_diff_collection(
+        "links",
+        _index(previous.get("links") or [], link_key),
+        _index(current.get("links") or [], link_key),
+    ))
+    if previous.get("metadata") != current.get("metadata"):
+        ops.append({"op": "replace", "path": "/metadata", "value": current.get("metadata")})
+    return ops
+
+
+def apply_scene_delta(scene: Dict[str, Any], ops: List[Op]) -> Dict[str, Any]:
+    """Apply ``scene_delta`` operations to a scene (reference client implementation).
+
+    Returns a new scene; element order follows the original with additions appended.
+    """
+    nodes = _index(scene.get("nodes") or [], node_key)
+    links = _index(scene.get("links") or [], link_key)
+    result: Dict[str, Any] = {k: v for k, v in scene.items() if k not in ("nodes", "links")}
+    for op in ops:
+        path = op["path"]
+        if path == "/metadata":
+            result["metadata"] = op.get("value")
+            continue
+        _, collection, key = path.split("/", 2)
+        target = nodes if collection == "nodes" else links
+        key = _unescape(key)
+        if op["op"] == "remove":
+            target.pop(key, None)
+        else:
+            target[key] = op["value"]
+    result["nodes"] = list(nodes.values())
+    result["links"] = list(links.values())
+    return result
@@ -17,6 +17,12 @@ from mcp.types import Tool, TextContent
 
 # Import configuration management
 from .config_manager import config_manager
+from .meraki_collector import MerakiOrgCollector
+
+try:
+    from src.enhanced_network_api.openmetrics import instrument_httpx_client
+except ImportError:  # pragma: no cover - imported without the project root on sys.path
+    from openmetrics import instrument_httpx_client
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +35,9 @@ class BaseMCPManager(ABC):
     def __init__(self, name: str, timeout: float = 30.0):
         self.name = name
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout, verify=False)
+        self.client = instrument_httpx_client(
+            httpx.AsyncClient(timeout=timeout, verify=False), name.lower()
+        )
     
     async def __aenter__(self):
         return self
@@ -68,9 +76,9 @@ class FortiGateManager(BaseMCPManager):
         configs = config_manager.get_all_fortigate_configs()
         self.configs = configs
         
-        # Authenticate with all configured devices
-        for host, config in configs.items():
-            success = await self.authenticate(host, config.token)
+        # Authenticate with all configured devices concurrently
+        results = await asyncio.gather(*(self.authenticate(host, config.token) for host, config in configs.items()))
+        for host, success in zip(configs, results):
             if success:
                 logger.info(f"Authenticated with FortiGate {host}")
             else:
@@ -88,33 +96,31 @@ class FortiGateManager(BaseMCPManager):
             return False
     
     async def get_devices(self) -> List[Dict[str, Any]]:
-        """Get managed FortiGate devices from configuration"""
-        devices = []
-        
-        # Use configured devices
-        for host, config in self.configs.items():
+        """Get managed FortiGate devices from configuration (all hosts queried concurrently)"""
+
+        async def device(host: str, config) -> Dict[str, Any]:
             try:
                 status = await self.get_system_status(host, config.token)
-                devices.append({
+                return {
                     "id": f"fg-{host}",
                     "host": host,
                     "type": "fortigate",
                     "status": "online",
                     "name": config.name,
                     "info": status
-                })
+                }
             except Exception as e:
                 logger.warning(f"Failed to get status for {host}: {e}")
-                devices.append({
+                return {
                     "id": f"fg-{host}",
                     "host": host,
                     "type": "fortigate", 
                     "status": "offline",
                     "name": config.name,
                     "error": str(e)
-                })
-        
-        return devices
+                }
+
+        return list(await asyncio.gather(*(device(host, config) for host, config in self.configs.items())))
     
     async def get_device_status(self, device_id: str) -> Dict[str, Any]:
         """Get detailed status of FortiGate device"""
@@ -227,41 +233,34 @@ class MerakiManager(BaseMCPManager):
                 "Content-Type": "application/json"
             }
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.config.base_url}/organizations", headers=headers)
-                response.raise_for_status()
-                self.config.api_key = api_key
-                return True
+            response = await self.client.get(f"{self.config.base_url}/organizations", headers=headers)
+            response.raise_for_status()
+            self.config.api_key = api_key
+            return True
         except Exception as e:
             logger.error(f"Meraki auth failed: {e}")
             return False
     
     async def get_devices(self, organization_id: str = None, network_id: str = None) -> List[Dict[str, Any]]:
-        """Get Meraki devices"""
+        """Get Meraki devices of one network, or of a whole organization (paginated, rate limited)"""
         if not self.config:
             return []
         
         headers = {"X-Cisco-Meraki-API-Key": self.config.api_key}
+        organization_id = organization_id or self.config.organization_id
         
         try:
             if network_id:
                 # Get devices in specific network
-                url = f"{self.config.base_url}/networks/{network_id}/devices"
-            elif organization_id:
-                # Get all networks and their devices
-                url = f"{self.config.base_url}/organizations/{organization_id}/networks"
-                async with self.client.get(url, headers=headers) as response:
-                    networks = response.json()
-                    devices = []
-                    for network in networks:
-                        network_devices = await self.get_devices(organization_id, network["id"])
-                        devices.extend(network_devices)
-                    return devices
-            else:
-                return []
-            
-            async with self.client.get(url, headers=headers) as response:
+                response = await self.client.get(f"{self.config.base_url}/networks/{network_id}/devices", headers=headers)
+                response.raise_for_status()
                 return response.json()
+            if organization_id:
+                # One organization-wide listing instead of a request per network
+                collector = MerakiOrgCollector(self.config.api_key, organization_id,
+                                               base_url=self.config.base_url, client=self.client)
+                return await collector.get_devices()
+            return []
         except Exception as e:
             logger.error(f"Failed to get Meraki devices: {e}")
             return []
@@ -275,19 +274,20 @@ class MerakiManager(BaseMCPManager):
         
         try:
             url = f"{self.config.base_url}/devices/{device_serial}"
-            async with self.client.get(url, headers=headers) as response:
-                device_data = response.json()
-                return {
-                    "serial": device_data.get("serial"),
-                    "model": device_data.get("model"),
-                    "name": device_data.get("name"),
-                    "networkId": device_data.get("networkId"),
-                    "status": device_data.get("status", "offline"),
-                    "tags": device_data.get("tags", []),
-                    "lanIp": device_data.get("lanIp"),
-                    "wan1Ip": device_data.get("wan1Ip"),
-                    "wan2Ip": device_data.get("wan2Ip")
-                }
+            response = await self.client.get(url, headers=headers)
+            response.raise_for_status()
+            device_data = response.json()
+            return {
+                "serial": device_data.get("serial"),
+                "model": device_data.get("model"),
+                "name": device_data.get("name"),
+                "networkId": device_data.get("networkId"),
+                "status": device_data.get("status", "offline"),
+                "tags": device_data.get("tags", []),
+                "lanIp": device_data.get("lanIp"),
+                "wan1Ip": device_data.get("wan1Ip"),
+                "wan2Ip": device_data.get("wan2Ip")
+            }
         except Exception as e:
             logger.error(f"Failed to get Meraki device status: {e}")
             return {"status": "offline", "error": str(e)}
@@ -302,8 +302,9 @@ class MerakiManager(BaseMCPManager):
         try:
             # Get firewall rules
             url = f"{self.config.base_url}/networks/{network_id}/firewall/rules"
-            async with self.client.get(url, headers=headers) as response:
-                return {"policies": response.json()}
+            response = await self.client.get(url, headers=headers)
+            response.raise_for_status()
+            return {"policies": response.json()}
         except Exception as e:
             logger.error(f"Failed to get Meraki policies: {e}")
             return {"policies": [], "error": str(e)}
@@ -0,0 +1,237 @@
+"""Organization-wide Meraki Dashboard collection.
+
+``MerakiOrgCollector`` lists every network of an organization, reads the
+organization's devices and then fetches each network's link-layer topology
+concurrently. All calls for one organization share a ``TokenBucket`` sized to
+the Dashboard API budget (10 requests per second per organization, with a
+burst of 10), so fanning out over hundreds of networks does not trip the
+rate limit. ``org_bucket`` keeps that bucket process-wide, so concurrent
+collections of one organization (from any thread or event loop) share it. If the API still answers 429, the bucket is paused for the
+``Retry-After`` period, so every in-flight caller backs off together rather
+than retrying on its own.
+
+List endpoints are paginated by following the ``Link: <...>; rel=next``
+header, so the full device and network lists are read at ``per_page``
+entries per call.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    from src.enhanced_network_api.openmetrics import instrument_httpx_client
+except ImportError:  # pragma: no cover - imported without the project root on sys.path
+    from openmetrics import instrument_httpx_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.meraki.com/api/v1"
+# Dashboard API budget per organization
+ORG_RATE_LIMIT = 10.0
+ORG_BURST = 10
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, at most ``burst`` saved up.
+
+    Each caller reserves a token (the balance may go negative) and sleeps
+    until its turn, so waiters are served in arrival order. State is guarded
+    by a thread lock rather than an ``asyncio.Lock``, so one bucket can be
+    shared by event loops in different threads. ``pause`` empties the bucket
+    and blocks every caller until the given delay has passed (used for
+    Retry-After); callers already waiting then take a new reservation.
+    """
+
+    def __init__(self, rate: float = ORG_RATE_LIMIT, burst: int = ORG_BURST) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._pauses = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> Tuple[int, float]:
+        """Take a token; returns the pause generation and the delay before it may be used."""
+        with self._lock:
+            now = time.monotonic()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= 1
+            # ``updated`` lies in the future while paused
+            delay = max(0.0, self.updated - now) + max(0.0, -self.tokens / self.rate)
+            return self._pauses, delay
+
+    async def acquire(self) -> None:
+        while True:
+            pauses, delay = self._reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            with self._lock:
+                if pauses == self._pauses:
+                    return
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = self.paused_until
+            self._pauses += 1
+
+
+_ORG_BUCKETS: Dict[Tuple[str, str], TokenBucket] = {}
+_ORG_BUCKETS_LOCK = threading.Lock()
+
+
+def org_bucket(base_url: str, organization_id: str) -> TokenBucket:
+    """The process-wide rate limiter for one organization on one Dashboard API host."""
+    key = (base_url.rstrip("/"), str(organization_id))
+    with _ORG_BUCKETS_LOCK:
+        bucket = _ORG_BUCKETS.get(key)
+        if bucket is None:
+            bucket = _ORG_BUCKETS[key] = TokenBucket()
+        return bucket
+
+
+def retry_after_seconds(response: httpx.Response, default: float = 1.0) -> float:
+    """Delay requested by a 429 response (``Retry-After`` in seconds)."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", default)))
+    except ValueError:
+        return default
+
+
+class MerakiOrgCollector:
+    """Collect networks, devices and link-layer topology for one Meraki organization."""
+
+    def __init__(
+        self,
+        api_key: str,
+        organization_id: str,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = 30.0,
+        per_page: int = 1000,
+        max_concurrency: int = 10,
+        max_retries: int = 5,
+        bucket: Optional[TokenBucket] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """Initialize MerakiOrgCollector.
+
+        Args:
+            api_key: Dashboard API key
+            organization_id: Organization to collect
+            base_url: API root (a local stub in tests)
+            timeout: Per-request HTTP timeout in seconds
+            per_page: Page size for paginated list endpoints
+            max_concurrency: Networks fetched at the same time
+            max_retries: Attempts per request after a 429 before giving up
+            bucket: Rate limiter; defaults to the organization's shared ``org_bucket``
+            client: Optional shared AsyncClient (not closed by ``aclose``)
+        """
+        self.organization_id = organization_id
+        self.base_url = base_url.rstrip("/")
+        self.per_page = per_page
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_retries = max_retries
+        self.bucket = bucket or org_bucket(self.base_url, organization_id)
+        self.headers = {"Authorization": f"Bearer {api_key}", "Accept": "application/json"}
+        self._owns_client = client is None
+        self._client = client or instrument_httpx_client(httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency),
+        ), "meraki")
+        self.requests = 0
+        self.throttled = 0
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def __aenter__(self) -> "MerakiOrgCollector":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _request(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """GET under the rate limit; 429 pauses the bucket for Retry-After and retries."""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            self.requests += 1
+            response = await self._client.get(url, params=params, headers=self.headers)
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            self.throttled += 1
+            delay = retry_after_seconds(response)
+            logger.info("Meraki API throttled %s; retrying in %.2fs", url, delay)
+            self.bucket.pause(delay)
+        response.raise_for_status()
+        return response
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return (await self._request(f"{self.base_url}{path}", params)).json()
+
+    async def paginate(self, path: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Every item of a paginated list endpoint, following ``Link: rel=next``."""
+        items: List[Any] = []
+        url: Optional[str] = f"{self.base_url}{path}"
+        query: Optional[Dict[str, Any]] = {"perPage": self.per_page, **(params or {})}
+        while url:
+            response = await self._request(url, query)
+            page = response.json()
+            if isinstance(page, list):
+                items.extend(page)
+            # The next link carries the full query string (perPage, startingAfter...)
+            url = response.links.get("next", {}).get("url")
+            query = None
+        return items
+
+    async def get_networks(self) -> List[Dict[str, Any]]:
+        return await self.paginate(f"/organizations/{self.organization_id}/networks")
+
+    async def get_devices(self) -> List[Dict[str, Any]]:
+        return await self.paginate(f"/organizations/{self.organization_id}/devices")
+
+    async def get_link_layer(self, network_id: str) -> Optional[Dict[str, Any]]:
+        """Link-layer topology of one network (None if the network has none)."""
+        try:
+            return await self.get_json(f"/networks/{network_id}/topology/linkLayer")
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code in {400, 404}:
+                return None
+            raise
+
+    async def collect(self) -> Dict[str, Any]:
+        """Networks, devices and per-network link-layer payloads of the organization.
+
+        Returns ``{"networks": [...], "devices": [...], "link_layer": {network_id: payload}}``
+        with the raw Dashboard API objects; a network whose topology fetch
+        fails is logged and left out of ``link_layer``.
+        """
+        networks, devices = await asyncio.gather(self.get_networks(), self.get_devices())
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def link_layer(network_id: str) -> Any:
+            async with semaphore:
+                try:
+                    return await self.get_link_layer(network_id)
+                except httpx.HTTPError as exc:
+                    logger.warning("Meraki link-layer fetch failed for %s: %s", network_id, exc)
+                    return None
+
+        network_ids = [network["id"] for network in networks if isinstance(network, dict) and network.get("id")]
+        payloads = await asyncio.gather(*(link_layer(network_id) for network_id in network_ids))
+        return {
+            "networks": networks,
+            "devices": devices,
+            "link_layer": {nid: payload for nid, payload in zip(network_ids, payloads) if payload},
+        }
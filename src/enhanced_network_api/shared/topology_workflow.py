@@ -7,14 +7,19 @@ canonical topology artefacts.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse, quote_plus
 
+import httpx
 import requests
 
 try:
@@ -23,13 +28,18 @@ except ImportError:  # pragma: no cover
     FortiOSAPI = None
     NotLogged = Exception
 
+from src.enhanced_network_api.concurrency_limit import limit_for
 from src.enhanced_network_api.fortigate_topology_drawio import generate_drawio_xml_from_topology
+from src.enhanced_network_api.openmetrics import instrument_requests_session, requests_response_hook
+from src.enhanced_network_api.shared.meraki_collector import MerakiOrgCollector
 
 DEFAULT_OUTPUT_DIR = Path("data/generated")
 FORTIGATE_JSON_ENV = "FORTIGATE_JSON_PATH"
 FORTIMANAGER_JSON_ENV = "FORTIMANAGER_JSON_PATH"
 MERAKI_JSON_ENV = "MERAKI_JSON_PATH"
 _HTTP_TIMEOUT = float(os.getenv("TOPOLOGY_WORKFLOW_HTTP_TIMEOUT", "15"))
+# Upper bound on concurrent upstream requests made by one workflow run
+_MAX_WORKERS = max(1, int(os.getenv("TOPOLOGY_WORKFLOW_MAX_WORKERS", "8")))
 
 logger = logging.getLogger(__name__)
 
@@ -124,6 +134,8 @@ class TopologyInputs:
     meraki: Dict[str, Any]
     fortimanager_source: str
     meraki_source: str
+    # Wall time (ms) spent resolving each source, keyed fortigate/fortimanager/meraki
+    timings: Dict[str, float] = field(default_factory=dict)
 
 
 @dataclass
@@ -256,7 +268,7 @@ def _fetch_fortimanager_payload(
 
     login_url = f"https://{creds.host}/jsonrpc"
     try:
-        with requests.Session() as session:
+        with instrument_requests_session(requests.Session(), "fortimanager") as session:
             session.headers.update({"Content-Type": "application/json"})
             login_payload = {
                 "id": 1,
@@ -537,7 +549,7 @@ def _fortigate_api_session(
     except Exception as exc:  # pragma: no cover
         logger.debug("FortiGate API session unexpected error for %s: %s", base_url, exc)
         return None
-    return client._session
+    return instrument_requests_session(client._session, "fortigate")
 
 
 def _fetch_fortigate_payload(
@@ -551,7 +563,7 @@ def _fetch_fortigate_payload(
     if "://" not in base_url:
         base_url = f"https://{base_url}"
 
-    session = requests.Session()
+    session = instrument_requests_session(requests.Session(), "fortigate")
     session.verify = creds.verify_ssl
 
     headers: Dict[str, str] = {"Content-Type": "application/json"}
@@ -562,40 +574,43 @@ def _fetch_fortigate_payload(
         return None
 
     session_authenticated = False
+    auth_lock = threading.Lock()
 
     def _ensure_session_authenticated() -> bool:
         nonlocal session_authenticated, session, headers
-        if session_authenticated:
+        # Endpoints are fetched concurrently: log in once, not once per 401
+        with auth_lock:
+            if session_authenticated:
+                return True
+            api_session = _fortigate_api_session(base_url, creds)
+            if not api_session:
+                csrf = _fortigate_session_login(session, base_url, creds)
+                if not csrf:
+                    return False
+            else:
+                session = api_session
+                session.verify = creds.verify_ssl
+                csrf = session.headers.get("X-CSRFTOKEN")
+            session_authenticated = True
+            session.auth = None
+            headers.clear()
+            headers["Content-Type"] = "application/json"
+            if csrf:
+                headers["X-CSRFTOKEN"] = csrf
             return True
-        api_session = _fortigate_api_session(base_url, creds)
-        if not api_session:
-            csrf = _fortigate_session_login(session, base_url, creds)
-            if not csrf:
-                return False
-        else:
-            session = api_session
-            session.verify = creds.verify_ssl
-            csrf = session.headers.get("X-CSRFTOKEN")
-        session_authenticated = True
-        session.auth = None
-        headers.clear()
-        headers["Content-Type"] = "application/json"
-        if csrf:
-            headers["X-CSRFTOKEN"] = csrf
-        return True
 
     def _get_json(endpoint: str) -> Optional[Any]:
         try:
             url = f"{base_url}{endpoint}"
             response = session.get(
                 url,
-                headers=headers,
+                headers=dict(headers),
                 timeout=_HTTP_TIMEOUT,
             )
             if response.status_code == 401 and _ensure_session_authenticated():
                 response = session.get(
                     url,
-                    headers=headers,
+                    headers=dict(headers),
                     timeout=_HTTP_TIMEOUT,
                 )
             if (
@@ -624,7 +639,65 @@ def _fetch_fortigate_payload(
             logger.warning("Failed to fetch FortiGate endpoint %s: %s", endpoint, exc)
         return None
 
-    status_data = _get_json("/api/v2/monitor/system/status")
+    def _fetch_aps() -> List[Dict[str, Any]]:
+        aps_data = _get_json("/api/v2/monitor/wifi/managed-ap") or {}
+        aps = aps_data.get("results") or aps_data.get("data") or []
+        if isinstance(aps, dict):
+            aps = aps.get("entries", [])
+        if not isinstance(aps, list) or not aps:
+            wtp_data = _get_json("/api/v2/cmdb/wireless-controller/wtp") or {}
+            aps = wtp_data.get("results") or []
+        if (not isinstance(aps, list) or not aps) and credentials.wifi_host:
+            aps = _fetch_wifi_override(credentials)
+        return aps if isinstance(aps, list) else []
+
+    def _fetch_switch_clients() -> List[Tuple[Dict[str, Any], str, Any]]:
+        """Managed switches with the client payload of each.
+
+        Every switch is queried; the queries run concurrently under a limit
+        that adapts to FortiGate latency.
+        """
+        switch_status_data = _get_json("/api/v2/monitor/switch-controller/managed-switch/status")
+        if not switch_status_data:
+            return []
+        switches = switch_status_data.get("results") or switch_status_data.get("data") or []
+        if isinstance(switches, dict):
+            switches = switches.get("entries", [])
+        if not isinstance(switches, list):
+            return []
+        targets = [(switch, switch.get("switch-id") or switch.get("id") or switch.get("serial")) for switch in switches]
+        targets = [(switch, switch_id) for switch, switch_id in targets if switch_id]
+        payloads = limit_for(urlparse(base_url).netloc, max_limit=_MAX_WORKERS).map(
+            lambda switch_id: _get_json(
+                f"/api/v2/monitor/switch-controller/managed-switch/clients?switch_id={quote_plus(str(switch_id))}"
+            ),
+            [switch_id for _, switch_id in targets],
+        )
+        return [(switch, switch_id, payload) for (switch, switch_id), payload in zip(targets, payloads)]
+
+    if not creds.token:
+        # Session-only credentials: log in before fanning out so the
+        # concurrent requests below do not each start with a 401.
+        _ensure_session_authenticated()
+
+    # Independent endpoints are fetched concurrently; results are consumed
+    # below in the original order so device de-duplication is unchanged.
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="fortigate-fetch") as pool:
+        status_future = pool.submit(_get_json, "/api/v2/monitor/system/status")
+        interfaces_future = pool.submit(_get_json, "/api/v2/cmdb/system/interface")
+        switches_future = pool.submit(_get_json, "/api/v2/cmdb/switch-controller/managed-switch")
+        aps_future = pool.submit(_fetch_aps)
+        wifi_clients_future = pool.submit(_get_json, "/api/v2/monitor/wifi/client")
+        switch_clients_future = pool.submit(_fetch_switch_clients)
+        user_devices_future = pool.submit(_get_json, "/api/v2/monitor/user/device/select")
+        status_data = status_future.result()
+        interfaces_data = interfaces_future.result() or {}
+        switches_data = switches_future.result() or {}
+        aps = aps_future.result()
+        wifi_clients_data = wifi_clients_future.result()
+        switch_clients = switch_clients_future.result()
+        endpoint_devices_data = user_devices_future.result()
+
     if not status_data:
         logger.warning("FortiGate status endpoint unavailable for %s", creds.host)
         status_data = {}
@@ -665,7 +738,6 @@ def _fetch_fortigate_payload(
     ]
     links: List[Dict[str, Any]] = []
 
-    interfaces_data = _get_json("/api/v2/cmdb/system/interface") or {}
     interfaces = interfaces_data.get("results") or interfaces_data.get("data") or []
     if isinstance(interfaces, dict):
         interfaces = interfaces.get("entries", [])
@@ -695,7 +767,6 @@ def _fetch_fortigate_payload(
             }
         )
 
-    switches_data = _get_json("/api/v2/cmdb/switch-controller/managed-switch") or {}
     switches = switches_data.get("results") or switches_data.get("data") or []
     if isinstance(switches, dict):
         switches = switches.get("entries", [])
@@ -733,17 +804,6 @@ def _fetch_fortigate_payload(
             }
         )
 
-    aps_data = _get_json("/api/v2/monitor/wifi/managed-ap") or {}
-    aps = aps_data.get("results") or aps_data.get("data") or []
-    if isinstance(aps, dict):
-        aps = aps.get("entries", [])
-    if not isinstance(aps, list) or not aps:
-        wtp_data = _get_json("/api/v2/cmdb/wireless-controller/wtp") or {}
-        aps = wtp_data.get("results") or []
-    if (not isinstance(aps, list) or not aps) and credentials.wifi_host:
-        aps = _fetch_wifi_override(credentials)
-    if not isinstance(aps, list):
-        aps = []
     for ap in aps:
         name = (
             ap.get("name")
@@ -794,7 +854,6 @@ def _fetch_fortigate_payload(
     existing_macs = set()  # Track MACs to avoid duplicates
     
     # 1. Try wireless clients endpoint (matches the WiFi client table in web UI)
-    wifi_clients_data = _get_json("/api/v2/monitor/wifi/client")
     if wifi_clients_data:
         logger.info("✅ Successfully fetched from /api/v2/monitor/wifi/client")
         wifi_clients = wifi_clients_data.get("results") or wifi_clients_data.get("data") or []
@@ -821,47 +880,32 @@ def _fetch_fortigate_payload(
         logger.debug("❌ Failed to fetch from /api/v2/monitor/wifi/client")
     
     # 2. Try switch controller clients (for wired devices on FortiSwitch)
-    # First get managed switches
-    switch_status_data = _get_json("/api/v2/monitor/switch-controller/managed-switch/status")
-    if switch_status_data:
-        switches = switch_status_data.get("results") or switch_status_data.get("data") or []
-        if isinstance(switches, dict):
-            switches = switches.get("entries", [])
-        if isinstance(switches, list):
-            # Try to get clients for each switch
-            for switch in switches[:5]:  # Limit to first 5 switches
-                switch_id = switch.get("switch-id") or switch.get("id") or switch.get("serial")
-                if not switch_id:
-                    continue
-                
-                # Try switch clients endpoint
-                switch_clients_data = _get_json(f"/api/v2/monitor/switch-controller/managed-switch/clients?switch_id={switch_id}")
-                if switch_clients_data:
-                    clients = switch_clients_data.get("results") or switch_clients_data.get("data") or []
-                    if isinstance(clients, dict):
-                        clients = clients.get("entries", [])
-                    if isinstance(clients, list) and len(clients) > 0:
-                        logger.info(f"Found {len(clients)} wired clients on switch {switch_id}")
-                        for client in clients:
-                            mac = client.get("mac")
-                            if mac and mac not in existing_macs:
-                                endpoint_devices.append({
-                                    "name": client.get("device") or client.get("hostname") or mac,
-                                    "mac": mac,
-                                    "ip": client.get("ip") or client.get("address"),
-                                    "os": client.get("os") or client.get("software_os") or "Unknown",
-                                    "connection_type": "ethernet",
-                                    "switch_id": switch_id,
-                                    "switch_name": switch.get("name") or switch_id,
-                                    "port": client.get("port"),
-                                    "vlan": client.get("vlan"),
-                                    "status": client.get("status") or "online",
-                                })
-                                existing_macs.add(mac)
+    for switch, switch_id, switch_clients_data in switch_clients:
+        if switch_clients_data:
+            clients = switch_clients_data.get("results") or switch_clients_data.get("data") or []
+            if isinstance(clients, dict):
+                clients = clients.get("entries", [])
+            if isinstance(clients, list) and len(clients) > 0:
+                logger.info(f"Found {len(clients)} wired clients on switch {switch_id}")
+                for client in clients:
+                    mac = client.get("mac")
+                    if mac and mac not in existing_macs:
+                        endpoint_devices.append({
+                            "name": client.get("device") or client.get("hostname") or mac,
+                            "mac": mac,
+                            "ip": client.get("ip") or client.get("address"),
+                            "os": client.get("os") or client.get("software_os") or "Unknown",
+                            "connection_type": "ethernet",
+                            "switch_id": switch_id,
+                            "switch_name": switch.get("name") or switch_id,
+                            "port": client.get("port"),
+                            "vlan": client.get("vlan"),
+                            "status": client.get("status") or "online",
+                        })
+                        existing_macs.add(mac)
     
     # 3. Try user device endpoints (Assets dashboard endpoints)
     # Try first endpoint: /api/v2/monitor/user/device/select
-    endpoint_devices_data = _get_json("/api/v2/monitor/user/device/select")
     if endpoint_devices_data:
         logger.info("✅ Successfully fetched from /api/v2/monitor/user/device/select")
         user_devices = endpoint_devices_data.get("results") or endpoint_devices_data.get("data") or []
@@ -1089,7 +1133,7 @@ def _fetch_wifi_override(credentials: FortiGateCredentials) -> List[Dict[str, An
         return urlunparse(parsed._replace(query=urlencode(pairs, doseq=True)))
 
     def _request(url: str, token: Optional[str]) -> Optional[Any]:
-        session = requests.Session()
+        session = instrument_requests_session(requests.Session(), "fortigate")
         session.verify = credentials.verify_ssl
         headers = {"Content-Type": "application/json"}
         if token:
@@ -1209,7 +1253,8 @@ def _meraki_env_credentials(credentials: Optional[MerakiCredentials]) -> Optiona
         os.getenv("MERAKI_BASE_URL"),
         "https://api.meraki.com/api/v1",
     )
-    if not api_key or not network_id:
+    # A network id limits collection to that network; otherwise the whole organization is read
+    if not api_key or not (network_id or organization_id):
         return None
     return MerakiCredentials(
         api_key=api_key,
@@ -1233,12 +1278,104 @@ def _extract_link_endpoint(value: Any) -> Optional[str]:
     return None
 
 
+def _meraki_device_entry(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    node_id = _first_non_empty(
+        raw.get("serial"),
+        raw.get("mac"),
+        raw.get("name"),
+    )
+    if not node_id:
+        return None
+    device_entry = {
+        "id": node_id,
+        "name": raw.get("name") or raw.get("model") or node_id,
+        "model": raw.get("model"),
+        "lanIp": raw.get("lanIp"),
+        "serial": raw.get("serial"),
+        "tags": raw.get("tags", []),
+        "productType": raw.get("productType"),
+        "type": raw.get("productType") or raw.get("model"),
+        "networkId": raw.get("networkId"),
+    }
+    return {k: v for k, v in device_entry.items() if v not in (None, "", [])}
+
+
+def _meraki_link_entries(link_data: Any) -> List[Dict[str, Any]]:
+    """Links from a ``/networks/{id}/topology/linkLayer`` response."""
+    links: List[Dict[str, Any]] = []
+    raw_links = link_data.get("links") if isinstance(link_data, dict) else link_data
+    if not isinstance(raw_links, list):
+        return links
+    for entry in raw_links:
+        if not isinstance(entry, dict):
+            continue
+        source = _extract_link_endpoint(entry.get("source") or entry.get("src"))
+        target = _extract_link_endpoint(entry.get("target") or entry.get("dst"))
+        if not source or not target:
+            continue
+        interfaces: List[str] = []
+        for key in (
+            "interfaces",
+            "ports",
+            "sourcePort",
+            "targetPort",
+            "srcPort",
+            "dstPort",
+            "upstreamPort",
+            "downstreamPort",
+        ):
+            value = entry.get(key)
+            if isinstance(value, str):
+                interfaces.append(value)
+            elif isinstance(value, list):
+                interfaces.extend(str(v) for v in value if v)
+        links.append(
+            {
+                "source": source,
+                "target": target,
+                "type": entry.get("type") or "ethernet",
+                "interfaces": interfaces,
+            }
+        )
+    return links
+
+
+def _fetch_meraki_org_payload(creds: MerakiCredentials) -> Optional[Tuple[Dict[str, Any], str]]:
+    """Collect every network of ``creds.organization_id`` (see MerakiOrgCollector)."""
+
+    async def collect() -> Dict[str, Any]:
+        async with MerakiOrgCollector(
+            creds.api_key,
+            creds.organization_id,
+            base_url=creds.base_url,
+            timeout=_HTTP_TIMEOUT,
+            max_concurrency=_MAX_WORKERS,
+        ) as collector:
+            return await collector.collect()
+
+    try:
+        org = asyncio.run(collect())
+    except httpx.HTTPError as exc:
+        logger.warning("Failed to fetch Meraki organization %s: %s", creds.organization_id, exc)
+        return None
+
+    devices = [entry for entry in map(_meraki_device_entry, org["devices"]) if entry]
+    links = [link for payload in org["link_layer"].values() for link in _meraki_link_entries(payload)]
+    if not devices:
+        logger.warning("Meraki topology fetch returned no devices for organization %s", creds.organization_id)
+        return None
+    payload = {"devices": devices, "links": links}
+    return payload, f"live:org:{creds.organization_id}"
+
+
 def _fetch_meraki_payload(
     credentials: Optional[MerakiCredentials],
 ) -> Optional[Tuple[Dict[str, Any], str]]:
     creds = _meraki_env_credentials(credentials)
     if not creds:
         return None
+    if not creds.network_id:
+        return _fetch_meraki_org_payload(creds)
 
     base_url = creds.base_url.rstrip("/")
     headers = {
@@ -1252,6 +1389,7 @@ def _fetch_meraki_payload(
             f"{base_url}/networks/{creds.network_id}/devices",
             headers=headers,
             timeout=_HTTP_TIMEOUT,
+            hooks={"response": requests_response_hook("meraki")},
         )
         devices_resp.raise_for_status()
         devices_raw = devices_resp.json()
@@ -1261,25 +1399,7 @@ def _fetch_meraki_payload(
 
     devices: List[Dict[str, Any]] = []
     if isinstance(devices_raw, list):
-        for raw in devices_raw:
-            node_id = _first_non_empty(
-                raw.get("serial"),
-                raw.get("mac"),
-                raw.get("name"),
-            )
-            if not node_id:
-                continue
-            device_entry = {
-                "id": node_id,
-                "name": raw.get("name") or raw.get("model") or node_id,
-                "model": raw.get("model"),
-                "lanIp": raw.get("lanIp"),
-                "serial": raw.get("serial"),
-                "tags": raw.get("tags", []),
-                "productType": raw.get("productType"),
-                "type": raw.get("productType") or raw.get("model"),
-            }
-            devices.append({k: v for k, v in device_entry.items() if v not in (None, "", [])})
+        devices = [entry for entry in map(_meraki_device_entry, devices_raw) if entry]
 
     links: List[Dict[str, Any]] = []
     try:
@@ -1287,42 +1407,10 @@ def _fetch_meraki_payload(
             f"{base_url}/networks/{creds.network_id}/topology/linkLayer",
             headers=headers,
             timeout=_HTTP_TIMEOUT,
+            hooks={"response": requests_response_hook("meraki")},
         )
         if link_resp.status_code == 200:
-            link_data = link_resp.json() or {}
-            raw_links = link_data.get("links") if isinstance(link_data, dict) else link_data
-            if isinstance(raw_links, list):
-                for entry in raw_links:
-                    if not isinstance(entry, dict):
-                        continue
-                    source = _extract_link_endpoint(entry.get("source") or entry.get("src"))
-                    target = _extract_link_endpoint(entry.get("target") or entry.get("dst"))
-                    if not source or not target:
-                        continue
-                    interfaces: List[str] = []
-                    for key in (
-                        "interfaces",
-                        "ports",
-                        "sourcePort",
-                        "targetPort",
-                        "srcPort",
-                        "dstPort",
-                        "upstreamPort",
-                        "downstreamPort",
-                    ):
-                        value = entry.get(key)
-                        if isinstance(value, str):
-                            interfaces.append(value)
-                        elif isinstance(value, list):
-                            interfaces.extend(str(v) for v in value if v)
-                    links.append(
-                        {
-                            "source": source,
-                            "target": target,
-                            "type": entry.get("type") or "ethernet",
-                            "interfaces": interfaces,
-                        }
-                    )
+            links = _meraki_link_entries(link_resp.json() or {})
     except requests.exceptions.RequestException as exc:
         logger.debug("Meraki link-layer fetch failed for %s: %s", creds.network_id, exc)
 
@@ -1436,51 +1524,73 @@ def resolve_inputs(
     fortimanager_credentials: Optional[FortiManagerCredentials] = None,
     meraki_credentials: Optional[MerakiCredentials] = None,
 ) -> TopologyInputs:
-    """Resolve payloads from provided paths/env/sample data."""
+    """Resolve payloads from provided paths/env/sample data.
 
-    fortigate: Optional[Dict[str, Any]]
-    fortigate_src: str
-    try:
-        fortigate, fortigate_src = _resolve_payload(
+    The FortiGate, FortiManager and Meraki sources are independent and are
+    resolved concurrently; ``TopologyInputs.timings`` records how long each took.
+    """
+
+    timings: Dict[str, float] = {}
+
+    def _timed(name: str, resolve: Callable[[], Tuple[Dict[str, Any], str]]) -> Callable[[], Tuple[Dict[str, Any], str]]:
+        def run() -> Tuple[Dict[str, Any], str]:
+            started = time.perf_counter()
+            try:
+                return resolve()
+            finally:
+                timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+        return run
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="topology-source") as pool:
+        fortigate_future = pool.submit(_timed("fortigate", lambda: _resolve_payload(
             fortigate_json,
             FORTIGATE_JSON_ENV,
             SAMPLE_FORTIMANAGER_PAYLOAD,
             use_samples,
             fetcher=lambda: _fetch_fortigate_payload(fortigate_credentials),
-        )
-    except ValueError:
-        fortigate = None
-        fortigate_src = "fortigate:unavailable"
-
-    try:
-        fortimanager, fortinet_src = _resolve_payload(
+        )))
+        fortimanager_future = pool.submit(_timed("fortimanager", lambda: _resolve_payload(
             fortimanager_json,
             FORTIMANAGER_JSON_ENV,
             SAMPLE_FORTIMANAGER_PAYLOAD,
             use_samples,
             fetcher=lambda: _fetch_fortimanager_payload(fortimanager_credentials),
-        )
-    except ValueError:
-        if not fortigate:
-            raise
-        fortimanager = fortigate
-        fortinet_src = fortigate_src
-    try:
-        meraki, meraki_src = _resolve_payload(
+        )))
+        meraki_future = pool.submit(_timed("meraki", lambda: _resolve_payload(
             meraki_json,
             MERAKI_JSON_ENV,
             SAMPLE_MERAKI_PAYLOAD,
             use_samples,
             fetcher=lambda: _fetch_meraki_payload(meraki_credentials),
-        )
-    except ValueError:
-        meraki = {"devices": [], "links": []}
-        meraki_src = "meraki:unavailable"
+        )))
+
+        fortigate: Optional[Dict[str, Any]]
+        fortigate_src: str
+        try:
+            fortigate, fortigate_src = fortigate_future.result()
+        except ValueError:
+            fortigate = None
+            fortigate_src = "fortigate:unavailable"
+
+        try:
+            fortimanager, fortinet_src = fortimanager_future.result()
+        except ValueError:
+            if not fortigate:
+                raise
+            fortimanager = fortigate
+            fortinet_src = fortigate_src
+        try:
+            meraki, meraki_src = meraki_future.result()
+        except ValueError:
+            meraki = {"devices": [], "links": []}
+            meraki_src = "meraki:unavailable"
     return TopologyInputs(
         fortimanager=fortigate or fortimanager,
         meraki=meraki,
         fortimanager_source=fortigate_src if fortigate else fortinet_src,
         meraki_source=meraki_src,
+        timings=timings,
     )
 
 
@@ -1549,6 +1659,7 @@ def generate_artifacts(
 ) -> Dict[str, Any]:
     """Resolve inputs, combine topology, and optionally write artefacts."""
 
+    started = time.perf_counter()
     inputs = resolve_inputs(
         fortigate_json=fortigate_json,
         fortimanager_json=fortimanager_json,
@@ -1558,6 +1669,7 @@ def generate_artifacts(
         fortimanager_credentials=fortimanager_credentials,
         meraki_credentials=meraki_credentials,
     )
+    collection_ms = round((time.perf_counter() - started) * 1000, 1)
     topology = combine_topology(inputs)
 
     artifacts: Optional[Dict[str, Any]] = None
@@ -1590,6 +1702,8 @@ def generate_artifacts(
                 "source": inputs.meraki_source,
                 "device_count": len(inputs.meraki.get("devices", [])),
             },
+            # Sources are resolved concurrently, so total is roughly the slowest one
+            "timings_ms": {**inputs.timings, "total": collection_ms},
         },
     }
 
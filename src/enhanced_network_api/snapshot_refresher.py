@@ -0,0 +1,151 @@
+"""Background refresh of expensive snapshots, decoupled from request handling.
+
+``BackgroundRefresher`` runs one task per registered job. Each task calls its
+loader, publishes the result to a ``SnapshotStore`` and sleeps for the job's
+interval (jittered slightly so jobs do not align). A failed refresh keeps the
+previous snapshot and records the error; nothing is published partially.
+
+``SnapshotStore.publish`` swaps in a new immutable ``Snapshot`` (value,
+version, publish time), so readers always see one complete snapshot and never
+wait on a loader. The only exception is before the first publish, where
+``wait`` lets callers block until the first snapshot exists.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot(NamedTuple):
+    value: Any
+    version: int
+    published_at: float  # wall clock, for clients
+    published_monotonic: float
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.published_monotonic
+
+
+class SnapshotStore:
+    """Latest published value per key."""
+
+    def __init__(self) -> None:
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._published: Dict[str, asyncio.Event] = {}
+
+    def publish(self, key: str, value: Any) -> Snapshot:
+        previous = self._snapshots.get(key)
+        snapshot = Snapshot(value, previous.version + 1 if previous else 1, time.time(), time.monotonic())
+        # Copy-on-write: readers holding the old mapping are unaffected.
+        self._snapshots = {**self._snapshots, key: snapshot}
+        event = self._published.get(key)
+        if event is not None:
+            event.set()
+        return snapshot
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        return self._snapshots.get(key)
+
+    async def wait(self, key: str, timeout: Optional[float] = None) -> Snapshot:
+        """Return the snapshot for ``key``, waiting for its first publish if needed."""
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            return snapshot
+        event = self._published.setdefault(key, asyncio.Event())
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+        return self._snapshots[key]
+
+    def clear(self) -> None:
+        self._snapshots = {}
+        self._published.clear()
+
+
+class _Job(NamedTuple):
+    loader: Callable[[], Awaitable[Any]]
+    interval: float
+
+
+class BackgroundRefresher:
+    """Periodically refresh registered loaders into a ``SnapshotStore``."""
+
+    def __init__(self, store: SnapshotStore, interval: float = 30.0, jitter: float = 0.1) -> None:
+        self.store = store
+        self.interval = interval
+        self.jitter = max(0.0, min(1.0, jitter))
+        self._jobs: Dict[str, _Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, key: str, loader: Callable[[], Awaitable[Any]], interval: Optional[float] = None) -> None:
+        self._jobs[key] = _Job(loader, self.interval if interval is None else interval)
+        self._status[key] = {"refreshes": 0, "failures": 0, "last_error": None, "last_duration_ms": None}
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() and not task.get_loop().is_closed() for task in self._tasks.values())
+
+    def start(self) -> None:
+        for key in self._jobs:
+            if key not in self._tasks or self._tasks[key].done():
+                self._tasks[key] = asyncio.create_task(self._run(key), name=f"refresh:{key}")
+
+    async def stop(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Tasks left behind by an event loop that has since closed cannot be awaited.
+        tasks = [task for task in list(self._tasks.values()) + list(self._inflight.values())
+                 if task.get_loop() is loop]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._inflight.clear()
+
+    async def refresh(self, key: str) -> Optional[Snapshot]:
+        """Refresh ``key`` now; concurrent callers share one load. Returns None on failure."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _refresh(self, key: str) -> Optional[Snapshot]:
+        status = self._status[key]
+        start = time.perf_counter()
+        try:
+            value = await self._jobs[key].loader()
+        except Exception as exc:
+            status["failures"] += 1
+            status["last_error"] = str(exc)
+            logger.warning("Background refresh of %s failed: %s", key, exc)
+            return None
+        finally:
+            status["last_duration_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+        status["refreshes"] += 1
+        status["last_error"] = None
+        return self.store.publish(key, value)
+
+    async def _run(self, key: str) -> None:
+        interval = self._jobs[key].interval
+        while True:
+            await self.refresh(key)
+            await asyncio.sleep(interval * random.uniform(1.0 - self.jitter, 1.0 + self.jitter))
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-key refresh counters plus the current snapshot's version and age."""
+        result = {}
+        for key, job in self._jobs.items():
+            snapshot = self.store.get(key)
+            result[key] = {
+                **self._status[key],
+                "interval": job.interval,
+                "version": snapshot.version if snapshot else None,
+                "published_at": snapshot.published_at if snapshot else None,
+                "age_seconds": round(snapshot.age(), 3) if snapshot else None,
+            }
+        return result
@@ -896,11 +896,105 @@ window.initApp = function() {
     updateYAML();
   }
 
-  // 10. Fortinet topology loader (calls /api/topology/scene)
+  // 10. Fortinet topology loader (streams /api/topology/scene/stream, falls back to /api/topology/scene)
   const btnLoadFortinet = document.getElementById('btn-load-fortinet-topology');
   if (btnLoadFortinet) {
     btnLoadFortinet.addEventListener('click', () => {
-      loadFortinetTopologyScene();
+      if (window.EventSource) {
+        streamFortinetTopologyScene();
+      } else {
+        loadFortinetTopologyScene();
+      }
+    });
+  }
+
+  // Scene deltas address nodes and links by key (see scene_diff.py), not by array index:
+  // /nodes/<id>, /links/<id> or /links/<from>|<to>, with RFC 6901 escaping of ~ and /.
+  function sceneNodeKey(node) {
+    return String(node.id || node.name);
+  }
+
+  function sceneLinkKey(link) {
+    if (link.id) return String(link.id);
+    return `${link.from || link.source}|${link.to || link.target}`;
+  }
+
+  function indexSceneItems(items, keyFn) {
+    const index = new Map();
+    (items || []).forEach(item => {
+      if (item && typeof item === 'object') index.set(keyFn(item), item);
+    });
+    return index;
+  }
+
+  // Same semantics as scene_diff.apply_scene_delta: element order follows the
+  // original scene and additions are appended.
+  function applySceneDelta(scene, ops) {
+    const nodes = indexSceneItems(scene.nodes, sceneNodeKey);
+    const links = indexSceneItems(scene.links, sceneLinkKey);
+    const result = { ...scene };
+    ops.forEach(op => {
+      if (op.path === '/metadata') {
+        result.metadata = op.value;
+        return;
+      }
+      const [, collection, ...rest] = op.path.split('/');
+      const key = rest.join('/').replace(/~1/g, '/').replace(/~0/g, '~');
+      const target = collection === 'nodes' ? nodes : links;
+      if (op.op === 'remove') {
+        target.delete(key);
+      } else {
+        target.set(key, op.value);
+      }
+    });
+    result.nodes = Array.from(nodes.values());
+    result.links = Array.from(links.values());
+    return result;
+  }
+
+  let sceneStream = null;
+
+  function streamFortinetTopologyScene() {
+    if (sceneStream) sceneStream.close();
+    let current = null;
+    let signature = null;
+    let rendering = Promise.resolve();
+    const stream = new EventSource('/api/topology/scene/stream');
+    sceneStream = stream;
+
+    // Render one scene at a time so a delta never races the previous rebuild
+    const render = (data, frame) => {
+      rendering = rendering.then(() => renderFortinetScene(data, { frame })).catch(err => {
+        console.error('Failed to render Fortinet topology scene:', err);
+      });
+    };
+
+    stream.addEventListener('snapshot', event => {
+      const message = JSON.parse(event.data);
+      const first = current === null;
+      current = message.scene;
+      signature = message.signature;
+      render(current, first);
+    });
+
+    stream.addEventListener('delta', event => {
+      const message = JSON.parse(event.data);
+      if (current === null || message.from !== signature) {
+        // Missed an update; reconnecting starts again from a full snapshot
+        streamFortinetTopologyScene();
+        return;
+      }
+      current = applySceneDelta(current, message.ops);
+      signature = message.to;
+      render(current, false);
+    });
+
+    stream.addEventListener('error', event => {
+      if (event.data) {
+        console.warn('Topology stream refresh failed:', JSON.parse(event.data).detail);
+      } else if (stream.readyState === EventSource.CLOSED && current === null) {
+        loadFortinetTopologyScene();
+      }
     });
   }
 
@@ -935,98 +1029,103 @@ window.initApp = function() {
       if (!resp.ok) {
         throw new Error(`HTTP ${resp.status}`);
       }
-      const data = await resp.json();
+      await renderFortinetScene(await resp.json(), { frame: true });
+    } catch (err) {
+      console.error('Failed to load Fortinet topology scene:', err);
+      alert('Failed to load Fortinet topology from /api/topology/scene');
+    }
+  }
 
-      clearScene();
+  async function renderFortinetScene(data, { frame = true } = {}) {
+    clearScene();
 
-      const nodesData = data.nodes || [];
-      const linksData = data.links || [];
+    const nodesData = data.nodes || [];
+    const linksData = data.links || [];
 
-      // Reset topology metadata cache
-      Object.keys(window.topologyNodeMeta).forEach(k => delete window.topologyNodeMeta[k]);
+    // Reset topology metadata cache
+    Object.keys(window.topologyNodeMeta).forEach(k => delete window.topologyNodeMeta[k]);
 
-      // Index nodes by id/name
-      nodesData.forEach((n, idx) => {
-        const name = n.id || n.name || `node_${idx}`;
-        window.topologyNodeMeta[name] = n;
-      });
+    // Index nodes by id/name
+    nodesData.forEach((n, idx) => {
+      const name = n.id || n.name || `node_${idx}`;
+      window.topologyNodeMeta[name] = n;
+    });
 
-      const typeMap = {
-        fortigate: 'firewall',
-        fortiswitch: 'switch',
-        fortiap: 'access_point'
-      };
+    const typeMap = {
+      fortigate: 'firewall',
+      fortiswitch: 'switch',
+      fortiap: 'access_point'
+    };
 
-      // Partition nodes by type for hierarchical layout
-      const gateways = [];
-      const switches = [];
-      const aps = [];
+    // Partition nodes by type for hierarchical layout
+    const gateways = [];
+    const switches = [];
+    const aps = [];
 
-      Object.entries(window.topologyNodeMeta).forEach(([name, n]) => {
-        if (n.type === 'fortigate') gateways.push({ name, node: n });
-        else if (n.type === 'fortiswitch') switches.push({ name, node: n });
-        else if (n.type === 'fortiap') aps.push({ name, node: n });
-      });
+    Object.entries(window.topologyNodeMeta).forEach(([name, n]) => {
+      if (n.type === 'fortigate') gateways.push({ name, node: n });
+      else if (n.type === 'fortiswitch') switches.push({ name, node: n });
+      else if (n.type === 'fortiap') aps.push({ name, node: n });
+    });
 
-      // Precreate meshes for all nodes with Fortinet icons
-      const meshByName = {};
-
-      async function createFortinetMesh(name, n) {
-        const devType = typeMap[n.type] || 'router';
-        const iconUrl = getFortinetIconUrl(n);
-
-        let mesh;
-        if (iconUrl) {
-          // Billboard from SVG icon
-          mesh = await makeBillboard(iconUrl, devType);
-          mesh.userData.type = devType;
-          mesh.userData.name = name;
-          mesh.userData.draggable = true;
-          mesh.userData.id = name;
-          mesh.name = name;
-          registerMesh(name, mesh);
-        } else {
-          mesh = await createDeviceMesh(devType, name);
-        }
+    // Precreate meshes for all nodes with Fortinet icons
+    const meshByName = {};
 
-        // Attach original topology metadata for details panel
-        mesh.userData.topology = n;
+    async function createFortinetMesh(name, n) {
+      const devType = typeMap[n.type] || 'router';
+      const iconUrl = getFortinetIconUrl(n);
 
-        window.scene.add(mesh);
-        meshByName[name] = mesh;
-        return mesh;
+      let mesh;
+      if (iconUrl) {
+        // Billboard from SVG icon
+        mesh = await makeBillboard(iconUrl, devType);
+        mesh.userData.type = devType;
+        mesh.userData.name = name;
+        mesh.userData.draggable = true;
+        mesh.userData.id = name;
+        mesh.name = name;
+        registerMesh(name, mesh);
+      } else {
+        mesh = await createDeviceMesh(devType, name);
       }
 
-      // Create all meshes
-      for (const { name, node } of gateways) {
-        await createFortinetMesh(name, node);
-      }
-      for (const { name, node } of switches) {
-        await createFortinetMesh(name, node);
-      }
-      for (const { name, node } of aps) {
-        await createFortinetMesh(name, node);
-      }
+      // Attach original topology metadata for details panel
+      mesh.userData.topology = n;
 
-      // Hierarchical layout: gateways back, switches middle, APs front
-      layoutHierarchical(gateways, switches, aps, meshByName, linksData);
-      frameSceneToMeshes(meshByName);
+      window.scene.add(mesh);
+      meshByName[name] = mesh;
+      return mesh;
+    }
 
-      // Create connections based on links
-      linksData.forEach(link => {
-        const from = link.from;
-        const to = link.to;
-        const linkType = link.type || 'ethernet';
-        if (from && to) {
-          createConnection(from, to, linkType);
-        }
-      });
+    // Create all meshes
+    for (const { name, node } of gateways) {
+      await createFortinetMesh(name, node);
+    }
+    for (const { name, node } of switches) {
+      await createFortinetMesh(name, node);
+    }
+    for (const { name, node } of aps) {
+      await createFortinetMesh(name, node);
+    }
 
-      updateYAML();
-    } catch (err) {
-      console.error('Failed to load Fortinet topology scene:', err);
-      alert('Failed to load Fortinet topology from /api/topology/scene');
+    // Hierarchical layout: gateways back, switches middle, APs front
+    layoutHierarchical(gateways, switches, aps, meshByName, linksData);
+    if (frame) {
+      // Keep the user's camera when a streamed update rebuilds the scene
+      frameSceneToMeshes(meshByName);
     }
+
+    // Create connections based on links
+    linksData.forEach(link => {
+      const from = link.from;
+      const to = link.to;
+      const linkType = link.type || 'ethernet';
+      if (from && to) {
+        createConnection(from, to, linkType);
+      }
+    });
+
+    updateYAML();
   }
   
   function clearScene() {
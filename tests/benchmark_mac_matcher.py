@@ -0,0 +1,67 @@
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src and project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(project_root / "src"))
+
+from enhanced_network_api.device_mac_matcher import DeviceModelMatcher
+
+# Built-in OUIs only so the benchmark never falls through to the internet vendor APIs
+OUIS = ["00:0C:F1", "00:1D:6A", "AC:BC:32", "44:38:39", "B8:27:EB", "00:0D:93", "28:CF:E9", "90:6C:AC", "E8:9F:6D"]
+HOSTNAMES = ["till", "kds", "iphone", "laptop", "printer", "pos", ""]
+
+
+def generate_devices(count=50000, unique=5000):
+    pool = []
+    for i in range(unique):
+        mac = f"{random.choice(OUIS)}:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}"
+        pool.append((mac, {"hostname": f"{random.choice(HOSTNAMES)}-{i % 50}"}))
+    return [random.choice(pool) for _ in range(count)]
+
+
+def run(matcher, devices):
+    start = time.time()
+    for mac, context in devices:
+        matcher.match_mac_to_model(mac, context)
+    return time.time() - start
+
+
+def benchmark():
+    logging.getLogger("enhanced_network_api.device_mac_matcher").setLevel(logging.ERROR)
+    devices = generate_devices()
+    print(f"Benchmarking {len(devices)} MAC classifications...")
+
+    uncached = DeviceModelMatcher(cache_size=0)
+    print(f"uncached: {run(uncached, devices):.4f} seconds")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = str(Path(tmp) / "matches.db")
+        cold = DeviceModelMatcher(cache_path=db)
+        print(f"cold (LRU + SQLite writes): {run(cold, devices):.4f} seconds {cold.cache_stats()}")
+        print(f"warm (LRU): {run(cold, devices):.4f} seconds {cold.cache_stats()}")
+        cold.store.close()
+
+        restarted = DeviceModelMatcher(cache_path=db)
+        print(f"restart (SQLite -> LRU): {run(restarted, devices):.4f} seconds {restarted.cache_stats()}")
+        restarted.store.close()
+
+    macs = [mac for mac, _ in devices[:20000]]
+    looped = DeviceModelMatcher(cache_size=0)
+    start = time.time()
+    for mac in macs:
+        looped.match_mac_to_model(mac)
+    print(f"20k loop (uncached): {time.time() - start:.4f} seconds")
+
+    start = time.time()
+    DeviceModelMatcher(cache_size=0).bulk_match(macs)
+    print(f"20k bulk_match (grouped by OUI): {time.time() - start:.4f} seconds")
+
+
+if __name__ == "__main__":
+    benchmark()
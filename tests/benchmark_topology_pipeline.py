@@ -0,0 +1,302 @@
+"""Benchmark suite for the topology pipeline stages at 100 to 100k nodes.
+
+Each benchmark times one stage on a synthetic FortiGate/FortiSwitch/FortiAP
+fabric of the requested size. Cases run ``--repeat`` times, with a fresh setup
+before every run; the median is the reported figure. Results can be saved as a
+JSON baseline and later runs compared against it:
+
+    python tests/benchmark_topology_pipeline.py --save tests/benchmark_baselines/topology_pipeline.json
+    python tests/benchmark_topology_pipeline.py --compare tests/benchmark_baselines/topology_pipeline.json
+
+``--compare`` exits with status 1 when a case's median regresses by more than
+the threshold: ``--threshold``, or the baseline's ``thresholds`` block, which
+may override it per benchmark. Differences below ``--floor`` seconds are
+treated as noise. Baselines record the machine and commit they were taken
+on; compare only against a baseline from the same kind of machine.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(project_root / "src"))
+
+SIZES = (100, 1_000, 10_000, 100_000)
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_FLOOR = 0.002
+
+# Built-in OUIs only so the matcher never falls through to the internet vendor APIs
+OUIS = ["00:0C:F1", "00:1D:6A", "AC:BC:32", "44:38:39", "B8:27:EB", "00:0D:93", "28:CF:E9", "90:6C:AC", "E8:9F:6D"]
+
+
+def generate_fabric(size: int, seed: int = 0) -> Dict[str, Any]:
+    """Collector-style ``{"devices", "links"}`` payload with ``size`` devices.
+
+    One FortiGate per 2000 devices, a FortiSwitch and a FortiAP per 40, and
+    clients for the rest, wired FortiGate -> switch -> AP/client.
+    """
+    rng = random.Random(seed)
+    gates = max(1, size // 2000)
+    switches = max(1, size // 40)
+    aps = max(1, size // 40)
+    clients = max(0, size - gates - switches - aps)
+
+    devices: List[Dict[str, Any]] = []
+    links: List[Dict[str, Any]] = []
+    for i in range(gates):
+        devices.append({"id": f"fgt-{i}", "name": f"FGT-{i}", "type": "fortigate", "ip": f"10.0.{i % 256}.1",
+                        "model": "FortiGate-600E", "serial": f"FG6H0E{i:08d}", "status": "online"})
+    for i in range(switches):
+        devices.append({"id": f"fsw-{i}", "name": f"FSW-{i}", "type": "fortiswitch", "ip": f"10.1.{i // 256 % 256}.{i % 256}",
+                        "model": "FortiSwitch-148E", "serial": f"S148EN{i:08d}", "status": "online"})
+        links.append({"source": f"fgt-{i % gates}", "target": f"fsw-{i}", "type": "ethernet", "interfaces": [f"port{i % 48 + 1}"]})
+    for i in range(aps):
+        devices.append({"id": f"fap-{i}", "name": f"FAP-{i}", "type": "fortiap", "ip": f"10.2.{i // 256 % 256}.{i % 256}",
+                        "model": "FortiAP-432F", "serial": f"FP432F{i:08d}", "status": "online"})
+        links.append({"source": f"fsw-{i % switches}", "target": f"fap-{i}", "type": "ethernet", "interfaces": ["port47"]})
+    for i in range(clients):
+        wireless = rng.random() < 0.5
+        devices.append({
+            "id": f"client-{i}",
+            "name": f"client-{i}",
+            "type": "client",
+            "hostname": f"{rng.choice(['till', 'kds', 'iphone', 'laptop', 'printer'])}-{i}",
+            "mac": f"{rng.choice(OUIS)}:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}",
+            "ip": f"10.{16 + i // 65536 % 200}.{i // 256 % 256}.{i % 256}",
+            "connection_type": "wifi" if wireless else "ethernet",
+            "status": "online",
+        })
+        parent = f"fap-{i % aps}" if wireless else f"fsw-{i % switches}"
+        links.append({"source": parent, "target": f"client-{i}", "type": "wifi" if wireless else "ethernet"})
+    return {"devices": devices, "links": links}
+
+
+def _combine_inputs(fabric: Dict[str, Any]) -> Any:
+    """Split the fabric into FortiManager and Meraki payloads (clients alternate)."""
+    from src.enhanced_network_api.shared.topology_workflow import TopologyInputs
+
+    meraki_ids = {d["id"] for i, d in enumerate(fabric["devices"]) if d["type"] == "client" and i % 2}
+    fortinet = [d for d in fabric["devices"] if d["id"] not in meraki_ids]
+    meraki = [{**d, "productType": "switch"} for d in fabric["devices"] if d["id"] in meraki_ids]
+    fortinet_links = [link for link in fabric["links"] if link["target"] not in meraki_ids]
+    meraki_links = [link for link in fabric["links"] if link["target"] in meraki_ids]
+    return TopologyInputs(
+        fortimanager={"fabric_devices": fortinet, "fabric_links": fortinet_links},
+        meraki={"devices": meraki, "links": meraki_links},
+        fortimanager_source="benchmark",
+        meraki_source="benchmark",
+    )
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[Dict[str, Any], Path], Any]  # (shared fixtures, tmp dir) -> run argument
+    run: Callable[[Any], Any]
+
+
+def _benchmarks() -> List[Benchmark]:
+    import src.enhanced_network_api.platform_web_api_fastapi as api
+    from src.enhanced_network_api.fortigate_topology_drawio import generate_drawio_xml_from_topology
+    from src.enhanced_network_api.graphml_parser import parse_graphml_topology
+    from src.enhanced_network_api.layout_network_tree import calculate_network_tree_layout
+    from src.enhanced_network_api.shared.topology_workflow import _write_graphml, combine_topology
+
+    def normalize_setup(fixtures, tmp):
+        api._SCENE_CACHE.clear()
+        return fixtures["fabric"]
+
+    def layout_setup(fixtures, tmp):
+        scene = fixtures["scene"]
+        return [dict(node) for node in scene["nodes"]], scene["links"]
+
+    def hierarchical_setup(fixtures, tmp):
+        scene = fixtures["scene"]
+        return {**scene, "nodes": [dict(node) for node in scene["nodes"]]}
+
+    def graphml_setup(fixtures, tmp):
+        return fixtures["combined"], tmp / "write.graphml"
+
+    def drawio_setup(fixtures, tmp):
+        # The draw.io generator takes source/target links and annotates nodes in place.
+        combined = fixtures["combined"]
+        return {
+            "nodes": copy.deepcopy(combined["nodes"]),
+            "links": [{**link, "source": link["from"], "target": link["to"]} for link in combined["links"]],
+        }
+
+    return [
+        Benchmark("normalize_scene", normalize_setup, api._normalize_scene),
+        Benchmark("enhance_scene_with_models", lambda fixtures, tmp: fixtures["scene"], api._enhance_scene_with_models),
+        Benchmark("calculate_network_tree_layout", layout_setup, lambda args: calculate_network_tree_layout(*args)),
+        Benchmark("apply_hierarchical_layout", hierarchical_setup, api._apply_hierarchical_layout),
+        Benchmark("combine_topology", lambda fixtures, tmp: fixtures["inputs"], combine_topology),
+        Benchmark("write_graphml", graphml_setup, lambda args: _write_graphml(*args)),
+        Benchmark("parse_graphml_topology", lambda fixtures, tmp: str(fixtures["graphml"]), parse_graphml_topology),
+        Benchmark("generate_drawio_xml", drawio_setup, generate_drawio_xml_from_topology),
+    ]
+
+
+def _fixtures(size: int, tmp: Path) -> Dict[str, Any]:
+    import src.enhanced_network_api.platform_web_api_fastapi as api
+    from src.enhanced_network_api.shared.topology_workflow import _write_graphml, combine_topology
+
+    fabric = generate_fabric(size)
+    inputs = _combine_inputs(fabric)
+    combined = combine_topology(inputs)
+    graphml = tmp / f"fabric-{size}.graphml"
+    _write_graphml(combined, graphml)
+    return {
+        "fabric": fabric,
+        "scene": api._normalize_scene_compute(fabric),
+        "inputs": inputs,
+        "combined": combined,
+        "graphml": graphml,
+    }
+
+
+def run_suite(
+    sizes: Iterable[int] = SIZES,
+    repeat: int = 5,
+    budget: float = 30.0,
+    only: Optional[Iterable[str]] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Dict[str, Any]]:
+    """Time every benchmark at every size; stop repeating a case once it used up ``budget`` seconds."""
+    selected = set(only or [])
+    benchmarks = [b for b in _benchmarks() if not selected or b.name in selected]
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        for size in sizes:
+            fixtures = _fixtures(size, tmp)
+            for bench in benchmarks:
+                timings: List[float] = []
+                while len(timings) < repeat and sum(timings) < budget:
+                    argument = bench.setup(fixtures, tmp)
+                    start = time.perf_counter()
+                    bench.run(argument)
+                    timings.append(time.perf_counter() - start)
+                key = f"{bench.name}[{size}]"
+                results[key] = {
+                    "median": statistics.median(timings),
+                    "min": min(timings),
+                    "max": max(timings),
+                    "runs": len(timings),
+                }
+                log(f"{key:<42} median {results[key]['median'] * 1000:10.2f} ms  ({len(timings)} runs)")
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def results_document(results: Dict[str, Dict[str, Any]], thresholds: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "thresholds": thresholds or {"default": DEFAULT_THRESHOLD, "per_benchmark": {}},
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    threshold: Optional[float] = None,
+    floor: float = DEFAULT_FLOOR,
+) -> Tuple[List[Tuple[str, Optional[float], float, Optional[float], str]], bool]:
+    """Compare medians against a baseline document.
+
+    Returns ``(rows, regressed)`` where each row is ``(case, baseline median,
+    current median, ratio, status)`` and status is ``ok``, ``faster``,
+    ``REGRESSION`` or ``new``.
+    """
+    limits = baseline.get("thresholds") or {}
+    default = threshold if threshold is not None else limits.get("default", DEFAULT_THRESHOLD)
+    per_benchmark = limits.get("per_benchmark") or {}
+    base_results = baseline.get("results") or {}
+    rows = []
+    regressed = False
+    for case, result in current.items():
+        now = result["median"]
+        previous = (base_results.get(case) or {}).get("median")
+        if previous is None:
+            rows.append((case, None, now, None, "new"))
+            continue
+        limit = per_benchmark.get(case.split("[", 1)[0], default)
+        ratio = now / previous if previous else float("inf")
+        if now - previous > floor and ratio > 1 + limit:
+            status = "REGRESSION"
+            regressed = True
+        elif previous - now > floor and ratio < 1 / (1 + limit):
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((case, previous, now, ratio, status))
+    return rows, regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES), help="comma-separated node counts")
+    parser.add_argument("--only", action="append", help="benchmark name to run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (default 5)")
+    parser.add_argument("--budget", type=float, default=30.0, help="stop repeating a case after this many seconds")
+    parser.add_argument("--save", type=Path, help="write results as a baseline JSON file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, help="allowed slowdown ratio, e.g. 0.25 for +25%%")
+    parser.add_argument("--floor", type=float, default=DEFAULT_FLOOR, help="ignore differences below this many seconds")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = run_suite(sizes, repeat=args.repeat, budget=args.budget, only=args.only)
+
+    status = 0
+    thresholds = None
+    if args.compare:
+        if not args.compare.exists():
+            print(f"No baseline at {args.compare}; run with --save to create one.")
+        else:
+            baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+            thresholds = baseline.get("thresholds")
+            rows, regressed = compare(results, baseline, args.threshold, args.floor)
+            print(f"\nBaseline {args.compare} (commit {baseline.get('meta', {}).get('commit')})")
+            for case, previous, now, ratio, verdict in rows:
+                before = f"{previous * 1000:10.2f}" if previous is not None else " " * 10
+                change = f"{(ratio - 1) * 100:+7.1f}%" if ratio is not None else " " * 8
+                print(f"{case:<42} {before} -> {now * 1000:10.2f} ms {change}  {verdict}")
+            status = 1 if regressed else 0
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(results_document(results, thresholds), indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Saved {len(results)} results to {args.save}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,426 @@
+"""
+Local FortiGate REST API emulator for load tests.
+
+Serves the ``/api/v2/monitor/*`` and ``/api/v2/cmdb/*`` endpoints that
+``FortiGateTopologyCollector`` and ``FortiGateMonitor`` call, backed by a
+synthetic fabric whose size is configurable (FortiSwitches and FortiAPs at
+one per 40 devices, clients for the rest). Responses use the FortiOS
+envelope (``results``, ``status``, ``http_status``, ``serial``...).
+
+Authentication accepts the API token as ``Authorization: Bearer``,
+``X-API-Key`` or ``access_token`` query parameter, or a session cookie from
+``POST /api/v2/authentication``. Latency and errors can be injected globally
+(``latency``, ``jitter``, ``error_rate``, ``error_status``) or per path prefix
+through ``faults``; all of them may be changed while the server runs.
+
+The API talks HTTPS to FortiGates, so ``tls=True`` (the CLI default) serves
+TLS with a throwaway self-signed certificate made by the ``openssl`` CLI; the
+platform does not verify FortiGate certificates unless FORTIGATE_VERIFY_SSL
+is set.
+
+Run standalone with ``python tests/fortigate_emulator.py --port 10443 --size 5000``
+and point the API at it with ``FORTIGATE_HOST=127.0.0.1:10443 FORTIGATE_TOKEN=emulator-token``.
+"""
+
+import argparse
+import json
+import random
+import secrets
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_TOKEN = "emulator-token"
+SERIAL = "FG6H0ETB20900001"
+VERSION = "v7.4.3"
+BUILD = 2573
+
+
+class Fault(NamedTuple):
+    """Injected behaviour for paths starting with a prefix (relative to ``/api/v2/``)."""
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    status: int = 500
+
+
+def build_fabric(size: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """Synthetic managed switches, APs and clients for a FortiGate with ``size`` devices."""
+    rng = random.Random(seed)
+    switch_count = max(1, size // 40)
+    ap_count = max(1, size // 40)
+    client_count = max(0, size - 1 - switch_count - ap_count)
+    switches = [
+        {
+            "switch-id": f"S148EN{i:010d}",
+            "serial": f"S148EN{i:010d}",
+            "name": f"FSW-{i}",
+            "status": "Connected",
+            "state": "Authorized",
+            "connecting_from": f"10.255.{i // 256 % 256}.{i % 256}",
+            "os_version": "S148EN-v7.4.3-build0862",
+            "fgt_peer_intf_name": "fortilink",
+            "ports": [{"interface": f"port{p}", "status": "up", "speed": 1000} for p in range(1, 49)],
+        }
+        for i in range(switch_count)
+    ]
+    aps = [
+        {
+            "wtp_id": f"FP432FTF{i:08d}",
+            "serial": f"FP432FTF{i:08d}",
+            "name": f"FAP-{i}",
+            "status": "connected",
+            "state": "authorized",
+            "os_version": "FP432F-v7.4.3-build0652",
+            "connecting_from": f"10.254.{i // 256 % 256}.{i % 256}",
+            "clients": 0,
+        }
+        for i in range(ap_count)
+    ]
+    hostnames = ["till", "kds", "iphone", "laptop", "printer", "pos"]
+    wifi_clients: List[Dict[str, Any]] = []
+    wired_clients: List[Dict[str, Any]] = []
+    for i in range(client_count):
+        mac = f"00:09:0f:{i >> 16 & 0xFF:02x}:{i >> 8 & 0xFF:02x}:{i & 0xFF:02x}"
+        ip = f"10.{16 + i // 65536 % 200}.{i // 256 % 256}.{i % 256}"
+        hostname = f"{rng.choice(hostnames)}-{i}"
+        if rng.random() < 0.5:
+            ap = aps[i % ap_count]
+            ap["clients"] += 1
+            wifi_clients.append({
+                "mac": mac, "ip": ip, "hostname": hostname, "os": rng.choice(["iOS", "Android", "Windows"]),
+                "ssid": rng.choice(["Corp", "Guest", "POS"]), "wtp_id": ap["wtp_id"], "wtp_name": ap["name"],
+                "signal": -rng.randint(40, 80), "band": rng.choice(["2.4GHz", "5GHz"]),
+            })
+        else:
+            switch = switches[i % switch_count]
+            wired_clients.append({
+                "mac": mac, "ip": ip, "device": hostname, "os": "Windows",
+                "switch_id": switch["switch-id"], "port": f"port{i % 47 + 1}", "vlan": 10 + i % 4,
+            })
+    return {"switches": switches, "aps": aps, "wifi_clients": wifi_clients, "wired_clients": wired_clients}
+
+
+def _generic(count: int, make: Callable[[int], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [make(i) for i in range(count)]
+
+
+def build_results(fabric: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Map of endpoint path (relative to ``/api/v2/``) to its ``results`` payload."""
+    switches, aps = fabric["switches"], fabric["aps"]
+    wifi, wired = fabric["wifi_clients"], fabric["wired_clients"]
+    clients = wifi + wired
+    interfaces = [
+        {"name": name, "ip": f"10.0.{i}.1 255.255.255.0", "subnet": "255.255.255.0", "status": "up",
+         "speed": "1000full", "mtu": 1500, "type": "physical", "alias": ""}
+        for i, name in enumerate(["wan1", "wan2", "internal", "fortilink", "dmz"])
+    ]
+    devices = [
+        {"mac": c["mac"], "ipv4_address": c["ip"], "ip": c["ip"], "hostname": c.get("hostname") or c.get("device"),
+         "os_name": c.get("os"), "is_online": True, "ssid": c.get("ssid"), "ap_sn": c.get("wtp_id"),
+         "switch_sn": c.get("switch_id"), "port": c.get("port")}
+        for c in clients
+    ]
+    return {
+        "monitor/system/status": {"hostname": "FGT-EMULATOR", "model_name": "FortiGate", "model_number": "600E",
+                                  "serial": SERIAL, "version": VERSION, "build": BUILD, "log_disk_status": "available"},
+        "monitor/system/resource/usage": {"cpu": [{"current": 12}], "mem": [{"current": 41}],
+                                          "session": [{"current": len(clients) * 4}], "disk": [{"current": 7}]},
+        "monitor/system/resource/cpu": {"cpu": 12, "cores": [{"id": i, "usage": 10 + i} for i in range(8)]},
+        "monitor/system/resource/memory": {"total": 16 * 1024 ** 3, "used": 7 * 1024 ** 3},
+        "monitor/system/performance": {"cpu": {"idle": 88}, "mem": {"used": 41}},
+        "monitor/system/disk": [{"name": "internal", "total": 240 * 1024 ** 3, "used": 17 * 1024 ** 3}],
+        "monitor/system/lograte": {"rate": 120},
+        "monitor/system/session": {"count": len(clients) * 4},
+        "monitor/system/arp": [{"ip": c["ip"], "mac": c["mac"], "interface": "internal"} for c in clients],
+        "monitor/system/interface": {i["name"]: {"name": i["name"], "link": True, "speed": 1000} for i in interfaces},
+        "monitor/system/diagnose": {"output": "5 packets transmitted, 5 received"},
+        "monitor/wifi/client": wifi,
+        "monitor/wifi/ssid": [{"name": name, "vap": name.lower()} for name in ("Corp", "Guest", "POS")],
+        "monitor/wifi/radio": [{"wtp_id": ap["wtp_id"], "radio_id": r, "channel": 36 if r else 6} for ap in aps for r in (0, 1)],
+        "monitor/wifi/neighbor": _generic(min(50, len(aps) * 2), lambda i: {"ssid": f"nearby-{i}", "bssid": f"02:00:00:00:00:{i:02x}"}),
+        "monitor/wifi/manufacturer": [{"oui": "00:09:0F", "name": "Fortinet"}],
+        "monitor/wifi/reputation": [],
+        "monitor/wifi/channel": [{"channel": ch, "utilization": 20 + ch % 30} for ch in (1, 6, 11, 36, 40, 44, 48)],
+        "monitor/wifi/managed_ap": aps,
+        "monitor/switch-controller/managed-switch/status": switches,
+        "monitor/switch-controller/managed-switch/clients": wired,
+        "monitor/switch-controller/managed-switch/ports": [
+            {"switch_id": s["switch-id"], "ports": s["ports"]} for s in switches
+        ],
+        "monitor/switch-controller/managed-switch/vlan": [{"switch_id": s["switch-id"], "vlans": [10, 11, 12, 13]} for s in switches],
+        "monitor/switch-controller/managed-switch/poe": [{"switch_id": s["switch-id"], "power_budget": 370} for s in switches],
+        "monitor/router/dhcp/lease": [{"ip": c["ip"], "mac": c["mac"], "hostname": c.get("hostname") or c.get("device")} for c in clients],
+        "monitor/router/ipv4": _generic(16, lambda i: {"ip_mask": f"10.{i}.0.0/16", "gateway": "10.0.0.254", "interface": "internal"}),
+        "monitor/router/neighbor": [],
+        "monitor/router/ospf": [],
+        "monitor/router/bgp": [],
+        "monitor/router/nexthop": [],
+        "monitor/router/firewall-policy-hitcount": _generic(40, lambda i: {"policyid": i + 1, "hit_count": i * 97}),
+        "monitor/router/firewall": [],
+        "monitor/router/multicast": [],
+        "monitor/lldp/neighbor": [{"port": f"port{i + 1}", "system_name": s["name"]} for i, s in enumerate(switches[:48])],
+        "monitor/log/event": _generic(100, lambda i: {"logid": f"01000{i:05d}", "msg": "emulated event"}),
+        "monitor/log/traffic": _generic(100, lambda i: {"srcip": f"10.16.0.{i}", "dstport": 443}),
+        "monitor/user/device/query": devices,
+        "monitor/user/device/select": devices,
+        "monitor/endpoint-control/registered_ems": [],
+        "cmdb/system/interface": interfaces,
+        "cmdb/firewall/vip": _generic(8, lambda i: {"name": f"vip-{i}", "extip": f"203.0.113.{i}", "mappedip": [{"range": f"10.0.2.{i}"}]}),
+        "cmdb/firewall/policy": _generic(40, lambda i: {"policyid": i + 1, "name": f"policy-{i + 1}", "action": "accept"}),
+    }
+
+
+def _envelope(path: str, results: Any) -> bytes:
+    return json.dumps({
+        "http_method": "GET",
+        "results": results,
+        "vdom": "root",
+        "path": path.split("/", 1)[-1].rsplit("/", 1)[0],
+        "name": path.rsplit("/", 1)[-1],
+        "status": "success",
+        "http_status": 200,
+        "serial": SERIAL,
+        "version": VERSION,
+        "build": BUILD,
+    }).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FortiGateEmulator"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _send(self, status: int, body: bytes, headers: Optional[List[Tuple[str, str]]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers or []:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, path: str) -> None:
+        self._send(status, json.dumps({"http_method": self.command, "status": "error", "http_status": status,
+                                       "path": path, "serial": SERIAL, "version": VERSION}).encode())
+
+    def _authorized(self, query: Dict[str, List[str]]) -> bool:
+        token = self.server.token
+        authorization = self.headers.get("Authorization", "")
+        if authorization in (f"Bearer {token}", f"Bearer FG_API_KEY={token}"):
+            return True
+        if self.headers.get("X-API-Key") == token or query.get("access_token", [None])[-1] == token:
+            return True
+        cookie = self.headers.get("Cookie", "")
+        return any(part.strip() == f"APSCOOKIE_emulator={session}" for part in cookie.split(";")
+                   for session in self.server.sessions)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/login":
+            self._send(200, b"{}")
+            return
+        if not url.path.startswith("/api/v2/"):
+            self._error(404, url.path)
+            return
+        path = url.path[len("/api/v2/"):].strip("/")
+        query = parse_qs(url.query)
+        if not self._authorized(query):
+            self.server.record(path, 401)
+            self._error(401, path)
+            return
+        status = self.server.inject(path)
+        if status:
+            self.server.record(path, status)
+            self._error(status, path)
+            return
+        body = self.server.body(path, query)
+        if body is None:
+            self.server.record(path, 404)
+            self._error(404, path)
+            return
+        self.server.record(path, 200)
+        self._send(200, body)
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if url.path != "/api/v2/authentication":
+            self._error(404, url.path)
+            return
+        if payload.get("username") != self.server.username or payload.get("password") != self.server.password:
+            self.server.record("authentication", 401)
+            self._error(401, "authentication")
+            return
+        session, csrf = secrets.token_hex(16), secrets.token_hex(16)
+        self.server.sessions.add(session)
+        self.server.record("authentication", 200)
+        self._send(200, json.dumps({"status_code": 5, "status_message": "LOGIN_SUCCESS"}).encode(), [
+            ("Set-Cookie", f"APSCOOKIE_emulator={session}; Path=/"),
+            ("Set-Cookie", f'ccsrftoken_emulator="{csrf}"; Path=/'),
+        ])
+
+
+class FortiGateEmulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        size: int = 500,
+        token: str = DEFAULT_TOKEN,
+        username: str = "admin",
+        password: str = "emulator",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        tls: bool = False,
+        seed: int = 0,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.token = token
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.faults: Dict[str, Fault] = {}
+        self.sessions: set = set()
+        self.counts: Counter = Counter()
+        self.tls = tls
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._certdir: Optional[tempfile.TemporaryDirectory] = None
+        self.resize(size, seed)
+        if tls:
+            self._certdir = tempfile.TemporaryDirectory(prefix="fgt-emulator-")
+            certfile, keyfile = self_signed_cert(Path(self._certdir.name))
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            # Handshake in the request thread (finish_request), not in the accept loop.
+            self.socket = context.wrap_socket(self.socket, server_side=True, do_handshake_on_connect=False)
+
+    def finish_request(self, request: Any, client_address: Any) -> None:
+        if self.tls:
+            try:
+                request.do_handshake()
+            except (ssl.SSLError, OSError):
+                return
+        super().finish_request(request, client_address)
+
+    def resize(self, size: int, seed: int = 0) -> None:
+        """Regenerate the fabric with ``size`` devices (pre-encoding every response)."""
+        fabric = build_fabric(size, seed)
+        bodies = {path: _envelope(path, results) for path, results in build_results(fabric).items()}
+        by_switch: Dict[str, List[Dict[str, Any]]] = {}
+        for client in fabric["wired_clients"]:
+            by_switch.setdefault(client["switch_id"], []).append(client)
+        switch_bodies = {
+            switch_id: _envelope("monitor/switch-controller/managed-switch/clients", clients)
+            for switch_id, clients in by_switch.items()
+        }
+        with self._lock:
+            self.size = size
+            self.fabric = fabric
+            self._bodies = bodies
+            self._switch_bodies = switch_bodies
+
+    def body(self, path: str, query: Dict[str, List[str]]) -> Optional[bytes]:
+        if path == "monitor/switch-controller/managed-switch/clients" and "switch_id" in query:
+            return self._switch_bodies.get(query["switch_id"][-1]) or _envelope(path, [])
+        return self._bodies.get(path)
+
+    def inject(self, path: str) -> int:
+        """Sleep for the configured latency; return an error status to send instead, or 0."""
+        fault = next((f for prefix, f in self.faults.items() if path.startswith(prefix)), None)
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            error_roll = self._rng.random()
+        error_rate, status = self.error_rate, self.error_status
+        if fault is not None:
+            delay += fault.latency
+            error_rate, status = max(error_rate, fault.error_rate), fault.status
+        if delay > 0:
+            time.sleep(delay)
+        return status if error_roll < error_rate else 0
+
+    def record(self, path: str, status: int) -> None:
+        with self._lock:
+            self.counts[(path, status)] += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{'https' if self.tls else 'http'}://{host}:{port}"
+
+    @property
+    def host_port(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "FortiGateEmulator":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._certdir is not None:
+            self._certdir.cleanup()
+
+
+def self_signed_cert(directory: Path) -> Tuple[str, str]:
+    """Create a localhost certificate/key pair in ``directory`` with the ``openssl`` CLI."""
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl is required for tls=True")
+    certfile, keyfile = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+         "-subj", "/CN=localhost", "-keyout", str(keyfile), "-out", str(certfile)],
+        check=True, capture_output=True,
+    )
+    return str(certfile), str(keyfile)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=10443)
+    parser.add_argument("--size", type=int, default=500, help="devices behind the emulated FortiGate")
+    parser.add_argument("--token", default=DEFAULT_TOKEN)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--no-tls", action="store_true", help="serve plain HTTP")
+    args = parser.parse_args()
+    server = FortiGateEmulator(
+        args.host, args.port, size=args.size, token=args.token, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, tls=not args.no_tls,
+    )
+    print(f"FortiGate emulator on {server.base_url} ({args.size} devices)")
+    print(f"  FORTIGATE_HOST={server.host_port} FORTIGATE_TOKEN={args.token}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Local stub LLM server for streaming tests.
+
+Speaks just enough of two wire protocols to exercise the LLM proxies without a
+GPU: the OpenAI-compatible ``/v1/chat/completions`` served by vLLM (JSON or
+``text/event-stream`` chunks) and Ollama's ``/api/generate`` (JSON or NDJSON).
+Every request is recorded on ``server.requests`` so tests can assert on the
+payloads the API sent upstream.
+
+Run standalone with ``python tests/llm_stub_server.py --port 8001``.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+DEFAULT_TOKENS = ["Check ", "the ", "FortiLink ", "status."]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StubLLMServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests.append({"path": self.path, "json": payload})
+        return payload
+
+    def _send_json(self, body: Dict[str, Any], status: int = 200) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content_type: str, frames: List[bytes]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+        for index, frame in enumerate(frames):
+            if index:
+                time.sleep(self.server.token_delay)
+            self.wfile.write(frame)
+            self.wfile.flush()
+
+    def do_GET(self) -> None:
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": self.server.model}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self) -> None:
+        payload = self._read_json()
+        if self.server.fail_status:
+            self._send_json({"error": "stub failure"}, status=self.server.fail_status)
+        elif self.path.endswith("/chat/completions"):
+            self._chat_completions(payload)
+        elif self.path == "/api/generate":
+            self._generate(payload)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _chat_completions(self, payload: Dict[str, Any]) -> None:
+        tokens = self.server.tokens
+        if not payload.get("stream"):
+            message = {"role": "assistant", "content": "".join(tokens)}
+            self._send_json({"choices": [{"index": 0, "message": message}]})
+            return
+        frames = [
+            b"data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": token}}]}).encode() + b"\n\n"
+            for token in tokens
+        ]
+        frames.append(b"data: [DONE]\n\n")
+        self._send_stream("text/event-stream", frames)
+
+    def _generate(self, payload: Dict[str, Any]) -> None:
+        tokens = self.server.tokens
+        if not payload.get("stream"):
+            self._send_json({"model": payload.get("model"), "response": "".join(tokens), "done": True})
+            return
+        frames = [json.dumps({"response": token, "done": False}).encode() + b"\n" for token in tokens]
+        frames.append(json.dumps({"response": "", "done": True}).encode() + b"\n")
+        self._send_stream("application/x-ndjson", frames)
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, tokens: List[str] = DEFAULT_TOKENS,
+                 token_delay: float = 0.0, model: str = "fortinet-custom") -> None:
+        super().__init__((host, port), _Handler)
+        self.tokens = list(tokens)
+        self.token_delay = token_delay
+        self.model = model
+        self.fail_status = 0
+        self.requests: List[Dict[str, Any]] = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    server = StubLLMServer(args.host, args.port, token_delay=args.token_delay)
+    print(f"Stub LLM server on {server.base_url} (vLLM: {server.base_url}/v1, Ollama: {server.base_url})")
+    server.serve_forever()
@@ -0,0 +1,213 @@
+"""
+Async HTTP load driver for platform_web_api_fastapi.
+
+Virtual users replay the polling done by the browser clients: the dashboard
+pages poll ``/api/dataset`` (plus health/metrics), the 3D viewers poll the
+scene, enhanced scene and lab-format endpoints. Each user picks the next
+request from its mix by weight, sends it, then waits ``think`` seconds.
+The report gives throughput plus p50/p95/p99 latency per route.
+
+Against a running API:
+
+    python tests/load_driver.py --base-url http://127.0.0.1:11111 --mix mixed --users 20 --duration 60
+
+Fully local, with a FortiGate emulator (tests/fortigate_emulator.py) and the
+API started in-process on uvicorn:
+
+    python tests/load_driver.py --spawn --size 5000 --latency 0.02 --users 20 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import httpx
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(project_root / "src"))
+
+# (weight, path) pairs per client type; weights follow the relative polling rates of the pages.
+MIXES: Dict[str, List[Tuple[int, str]]] = {
+    "dashboard": [
+        (6, "/api/dataset"),
+        (2, "/api/topology/scene"),
+        (1, "/api/performance/metrics"),
+        (1, "/health"),
+    ],
+    "viewer3d": [
+        (4, "/api/topology/scene-enhanced"),
+        (3, "/api/topology/babylon-lab-format"),
+        (2, "/api/topology/scene"),
+        (1, "/health"),
+    ],
+}
+MIXES["mixed"] = MIXES["dashboard"] + MIXES["viewer3d"]
+
+
+class Sample(NamedTuple):
+    path: str
+    status: int  # 0 for transport errors
+    seconds: float
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    # Nearest-rank percentile
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: Sequence[Sample], elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds), overall and per route."""
+
+    def stats(group: Sequence[Sample]) -> Dict[str, Any]:
+        ordered = sorted(sample.seconds for sample in group)
+        errors = sum(1 for sample in group if not 200 <= sample.status < 400)
+        return {
+            "requests": len(group),
+            "errors": errors,
+            "rps": len(group) / elapsed if elapsed > 0 else 0.0,
+            "p50_ms": _percentile(ordered, 0.50) * 1000,
+            "p95_ms": _percentile(ordered, 0.95) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+        }
+
+    routes: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        routes.setdefault(sample.path, []).append(sample)
+    return {
+        "elapsed_s": elapsed,
+        "total": stats(samples),
+        "routes": {path: stats(group) for path, group in sorted(routes.items())},
+    }
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    mix: List[Tuple[int, str]],
+    deadline: float,
+    think: float,
+    rng: random.Random,
+    samples: List[Sample],
+) -> None:
+    weights = [weight for weight, _ in mix]
+    paths = [path for _, path in mix]
+    while time.perf_counter() < deadline:
+        path = rng.choices(paths, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        samples.append(Sample(path, status, time.perf_counter() - start))
+        if think > 0:
+            await asyncio.sleep(rng.uniform(0.5 * think, 1.5 * think))
+
+
+async def run_load(
+    base_url: str,
+    mix: str = "mixed",
+    users: int = 10,
+    duration: float = 30.0,
+    think: float = 0.0,
+    seed: int = 0,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    timeout: float = 60.0,
+) -> Dict[str, Any]:
+    """Run ``users`` closed-loop virtual users for ``duration`` seconds and summarize."""
+    samples: List[Sample] = []
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            _virtual_user(client, MIXES[mix], deadline, think, random.Random(seed + index), samples)
+            for index in range(users)
+        ))
+        elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'route':<36} {'reqs':>7} {'errs':>6} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for path, row in rows:
+        lines.append(
+            f"{path:<36} {row['requests']:>7} {row['errors']:>6} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {row['max_ms']:>7.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+def _spawn(args: argparse.Namespace) -> Tuple[str, List[Any]]:
+    """Start the FortiGate emulator and the API (uvicorn, in-process); return the API URL and handles."""
+    import uvicorn
+
+    from tests.fortigate_emulator import FortiGateEmulator
+
+    emulator = FortiGateEmulator(size=args.size, latency=args.latency, jitter=args.jitter,
+                                 error_rate=args.error_rate, tls=True).start()
+    os.environ["FORTIGATE_HOST"] = emulator.host_port
+    os.environ["FORTIGATE_TOKEN"] = emulator.token
+    os.environ.setdefault("FORTIGATE_VERIFY_SSL", "false")
+
+    config = uvicorn.Config("src.enhanced_network_api.platform_web_api_fastapi:app",
+                            host="127.0.0.1", port=args.api_port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    print(f"Emulator {emulator.base_url} ({args.size} devices), API http://127.0.0.1:{args.api_port}")
+    return f"http://127.0.0.1:{args.api_port}", [emulator, server]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:11111")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between a user's requests")
+    parser.add_argument("--json", type=Path, help="also write the report as JSON")
+    spawn = parser.add_argument_group("local stack (--spawn)")
+    spawn.add_argument("--spawn", action="store_true", help="start a FortiGate emulator and the API in-process")
+    spawn.add_argument("--api-port", type=int, default=11199)
+    spawn.add_argument("--size", type=int, default=1000, help="emulated devices")
+    spawn.add_argument("--latency", type=float, default=0.0, help="emulated FortiGate latency (seconds)")
+    spawn.add_argument("--jitter", type=float, default=0.0)
+    spawn.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    handles: List[Any] = []
+    base_url = args.base_url
+    if args.spawn:
+        base_url, handles = _spawn(args)
+    try:
+        report = asyncio.run(run_load(base_url, args.mix, args.users, args.duration, args.think))
+    finally:
+        for handle in handles:
+            if hasattr(handle, "should_exit"):
+                handle.should_exit = True
+            else:
+                handle.stop()
+    print(f"\n{args.mix} mix, {args.users} users, {report['elapsed_s']:.1f}s against {base_url}")
+    print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Local Meraki Dashboard API stub for collector tests.
+
+Serves the ``/api/v1`` endpoints that ``MerakiOrgCollector`` and the topology
+workflow call for one synthetic organization: networks, organization devices
+(both paginated with ``perPage`` / ``startingAfter`` and a ``Link`` header),
+per-network devices and link-layer topology. Each network has one MX, one MS
+and ``aps_per_network`` MR access points.
+
+Like the real API, requests are rate limited per organization with a token
+bucket (``rate`` per second, ``burst`` saved up); over-limit requests get
+429 with ``Retry-After``. ``throttle_next`` forces the next N requests to be
+throttled regardless of the bucket.
+
+Run standalone with ``python tests/meraki_stub.py --port 8089 --networks 200`` and
+point the workflow at it with ``MERAKI_BASE_URL=http://127.0.0.1:8089/api/v1
+MERAKI_API_KEY=stub-key MERAKI_ORG_ID=org-1``.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+DEFAULT_API_KEY = "stub-key"
+DEFAULT_ORG = "org-1"
+
+
+def build_org(networks: int, aps_per_network: int = 2) -> Dict[str, List[Dict[str, Any]]]:
+    """Synthetic networks, devices and link-layer topologies for one organization."""
+    nets: List[Dict[str, Any]] = []
+    devices: List[Dict[str, Any]] = []
+    links: Dict[str, Dict[str, Any]] = {}
+    for n in range(networks):
+        network_id = f"N_{n:06d}"
+        nets.append({"id": network_id, "organizationId": DEFAULT_ORG, "name": f"Restaurant {n}",
+                     "productTypes": ["appliance", "switch", "wireless"], "timeZone": "America/Chicago"})
+        mx = {"serial": f"Q2MX-{n:04d}-0001", "name": f"MX-{n}", "model": "MX68", "productType": "appliance"}
+        ms = {"serial": f"Q2MS-{n:04d}-0001", "name": f"MS-{n}", "model": "MS120-8", "productType": "switch"}
+        mrs = [{"serial": f"Q2MR-{n:04d}-{a:04d}", "name": f"MR-{n}-{a}", "model": "MR36", "productType": "wireless"}
+               for a in range(aps_per_network)]
+        for index, device in enumerate([mx, ms] + mrs):
+            device.update({"networkId": network_id, "mac": f"e0:55:3d:{n >> 8 & 0xFF:02x}:{n & 0xFF:02x}:{index:02x}",
+                           "lanIp": f"10.{n // 256 % 256}.{n % 256}.{index + 1}", "tags": []})
+            devices.append(device)
+        links[network_id] = {
+            "nodes": [{"derivedId": d["serial"], "type": "device", "device": {"serial": d["serial"]}} for d in [mx, ms] + mrs],
+            "links": [{"ends": [], "source": {"serial": mx["serial"]}, "target": {"serial": ms["serial"]},
+                       "sourcePort": "port3", "targetPort": "port1"}]
+                     + [{"source": {"serial": ms["serial"]}, "target": {"serial": mr["serial"]},
+                         "sourcePort": f"port{a + 2}", "targetPort": "wired0"} for a, mr in enumerate(mrs)],
+        }
+    return {"networks": nets, "devices": devices, "link_layer": links}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MerakiStub"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _send(self, status: int, payload: Any, headers: Optional[List[Tuple[str, str]]] = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers or []:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        key = self.server.api_key
+        return (self.headers.get("Authorization") == f"Bearer {key}"
+                or self.headers.get("X-Cisco-Meraki-API-Key") == key)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if not url.path.startswith("/api/v1/"):
+            self._send(404, {"errors": ["Not found"]})
+            return
+        path = url.path[len("/api/v1/"):].strip("/")
+        kind = self.server.kind(path)
+        if not self._authorized():
+            self.server.record(kind, 401)
+            self._send(401, {"errors": ["Invalid API key"]})
+            return
+        if not self.server.admit():
+            self.server.record(kind, 429)
+            self._send(429, {"errors": ["API rate limit exceeded for organization"]},
+                       [("Retry-After", str(self.server.retry_after))])
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status, payload, headers = self.server.respond(path, parse_qs(url.query))
+        self.server.record(kind, status)
+        self._send(status, payload, headers)
+
+
+class MerakiStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        networks: int = 20,
+        aps_per_network: int = 2,
+        api_key: str = DEFAULT_API_KEY,
+        rate: float = 10.0,
+        burst: int = 10,
+        retry_after: float = 1,
+        latency: float = 0.0,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.api_key = api_key
+        self.rate = rate
+        self.burst = burst
+        self.retry_after = retry_after
+        self.latency = latency
+        self.throttle_next = 0
+        self.org = build_org(networks, aps_per_network)
+        self.counts: Counter = Counter()
+        self.admitted: List[float] = []
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def admit(self) -> bool:
+        """Take a token from the organization's bucket; False means answer 429."""
+        with self._lock:
+            now = time.monotonic()
+            if self.throttle_next > 0:
+                self.throttle_next -= 1
+                return False
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.admitted.append(now)
+            return True
+
+    def record(self, kind: str, status: int) -> None:
+        with self._lock:
+            self.counts[(kind, status)] += 1
+
+    @staticmethod
+    def kind(path: str) -> str:
+        """Path with ids replaced, e.g. ``networks/{id}/topology/linkLayer``."""
+        parts = path.split("/")
+        return "/".join("{id}" if index % 2 else part for index, part in enumerate(parts))
+
+    def peak_rate(self, window: float = 1.0) -> int:
+        """Most requests admitted within any ``window`` seconds."""
+        times, peak, start = sorted(self.admitted), 0, 0
+        for end, stamp in enumerate(times):
+            while stamp - times[start] >= window:
+                start += 1
+            peak = max(peak, end - start + 1)
+        return peak
+
+    def _page(self, path: str, items: List[Dict[str, Any]], key: str,
+              query: Dict[str, List[str]]) -> Tuple[int, Any, List[Tuple[str, str]]]:
+        per_page = int(query.get("perPage", ["1000"])[-1])
+        after = query.get("startingAfter", [None])[-1]
+        start = 0
+        if after is not None:
+            start = next((i + 1 for i, item in enumerate(items) if item[key] == after), len(items))
+        page = items[start:start + per_page]
+        links = [f'<{self.base_url}/{path}?{urlencode({"perPage": per_page})}>; rel=first']
+        if start + per_page < len(items):
+            next_query = urlencode({"perPage": per_page, "startingAfter": page[-1][key]})
+            links.append(f"<{self.base_url}/{path}?{next_query}>; rel=next")
+        return 200, page, [("Link", ", ".join(links))]
+
+    def respond(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Any, List[Tuple[str, str]]]:
+        parts = path.split("/")
+        org_path = ["organizations", DEFAULT_ORG]
+        if parts == ["organizations"]:
+            return 200, [{"id": DEFAULT_ORG, "name": "Restaurant Group"}], []
+        if parts == org_path + ["networks"]:
+            return self._page(path, self.org["networks"], "id", query)
+        if parts == org_path + ["devices"]:
+            return self._page(path, self.org["devices"], "serial", query)
+        if len(parts) >= 3 and parts[0] == "networks" and parts[1] in self.org["link_layer"]:
+            if parts[2:] == ["devices"]:
+                return 200, [d for d in self.org["devices"] if d["networkId"] == parts[1]], []
+            if parts[2:] == ["topology", "linkLayer"]:
+                return 200, self.org["link_layer"][parts[1]], []
+        return 404, {"errors": ["Not found"]}, []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def start(self) -> "MerakiStub":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--networks", type=int, default=20)
+    parser.add_argument("--aps-per-network", type=int, default=2)
+    parser.add_argument("--api-key", default=DEFAULT_API_KEY)
+    parser.add_argument("--rate", type=float, default=10.0, help="requests per second per organization")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+    server = MerakiStub(args.host, args.port, networks=args.networks, aps_per_network=args.aps_per_network,
+                        api_key=args.api_key, rate=args.rate, latency=args.latency)
+    print(f"Meraki stub on {server.base_url} ({args.networks} networks)")
+    print(f"  MERAKI_BASE_URL={server.base_url} MERAKI_API_KEY={args.api_key} MERAKI_ORG_ID={DEFAULT_ORG}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from src.enhanced_network_api import answer_cache
+from src.enhanced_network_api.answer_cache import AnswerCache, answer_cache_key, normalize_question
+
+
+def test_key_normalizes_question_and_source_order():
+    key = answer_cache_key("What is the FortiLink status?", ["b", "a"], "m1", "1")
+    assert normalize_question("What is the FortiLink status?") == "what is the fortilink status"
+    assert answer_cache_key("what is  the fortilink STATUS", ["a", "b", "a"], "m1", "1") == key
+    assert answer_cache_key("what is the fortilink status", ["a"], "m1", "1") != key
+    assert answer_cache_key("what is the fortilink status", ["a", "b"], "m2", "1") != key
+    assert answer_cache_key("what is the fortilink status", ["a", "b"], "m1", "2") != key
+    assert normalize_question("What is it?") == "what is it"
+    assert normalize_question("?!") == "?!"
+
+
+def test_question_words_are_part_of_the_key():
+    how = answer_cache_key("How does FortiLink fail over?", ["a"], "m1", "1")
+    when = answer_cache_key("When does FortiLink fail over?", ["a"], "m1", "1")
+    assert how != when
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now[0])
+    cache = AnswerCache(ttl=10, max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 1, "size": 1, "hit_ratio": 1 / 3}
+
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "answers" / "docs_qa.sqlite3"
+    cache = AnswerCache(ttl=60, path=str(path))
+    cache.put("k", {"response": "ok"})
+    cache.close()
+
+    restarted = AnswerCache(ttl=60, path=str(path))
+    assert restarted.get("k") == {"response": "ok"}
+    restarted.clear()
+    assert AnswerCache(ttl=60, path=str(path)).get("k") is None
+
+
+def test_named_caches_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("ANSWER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("ANSWER_CACHE_MAX_ENTRIES", "3")
+    answer_cache.close_answer_caches()
+    try:
+        cache = answer_cache.get_answer_cache("docs_qa")
+        assert answer_cache.get_answer_cache("docs_qa") is cache
+        assert cache.max_entries == 3
+        cache.put("k", "v")
+        assert (tmp_path / "docs_qa.sqlite3").exists()
+        assert answer_cache.answer_cache_stats()["docs_qa"]["size"] == 1
+    finally:
+        answer_cache.close_answer_caches()
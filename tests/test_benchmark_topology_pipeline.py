@@ -0,0 +1,48 @@
+import pytest
+
+from tests.benchmark_topology_pipeline import SIZES, compare, generate_fabric, results_document, run_suite
+
+
+def test_generate_fabric_sizes_and_links():
+    fabric = generate_fabric(1_000)
+    ids = {device["id"] for device in fabric["devices"]}
+    assert len(ids) == len(fabric["devices"]) == 1_000
+    assert all(link["source"] in ids and link["target"] in ids for link in fabric["links"])
+    assert generate_fabric(1_000) == fabric
+    assert SIZES == (100, 1_000, 10_000, 100_000)
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = results_document(
+        {"layout[100]": {"median": 0.010}, "parse[100]": {"median": 0.010}, "tiny[100]": {"median": 0.0001}},
+        thresholds={"default": 0.25, "per_benchmark": {"parse": 1.0}},
+    )
+    current = {
+        "layout[100]": {"median": 0.014},
+        "parse[100]": {"median": 0.014},
+        "tiny[100]": {"median": 0.0009},
+        "new[100]": {"median": 0.5},
+    }
+    rows, regressed = compare(current, baseline)
+    statuses = {case: status for case, _, _, _, status in rows}
+    assert regressed
+    assert statuses == {"layout[100]": "REGRESSION", "parse[100]": "ok", "tiny[100]": "ok", "new[100]": "new"}
+
+    rows, regressed = compare({"layout[100]": {"median": 0.005}}, baseline)
+    assert not regressed and rows[0][-1] == "faster"
+
+
+@pytest.mark.performance
+def test_pipeline_suite_runs_at_smallest_size():
+    results = run_suite(sizes=[100], repeat=1, log=lambda line: None)
+    assert {case.split("[")[0] for case in results} == {
+        "normalize_scene",
+        "enhance_scene_with_models",
+        "calculate_network_tree_layout",
+        "apply_hierarchical_layout",
+        "combine_topology",
+        "write_graphml",
+        "parse_graphml_topology",
+        "generate_drawio_xml",
+    }
+    assert all(result["runs"] == 1 and result["median"] >= 0 for result in results.values())
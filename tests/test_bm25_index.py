@@ -0,0 +1,133 @@
+import os
+
+from src.enhanced_network_api import fortigate_docs_search as docs_search
+from src.enhanced_network_api.bm25_index import BM25Index, build_bm25_bytes, tokenize, write_bm25_index
+
+DOCS = [
+    "Configure a firewall policy to allow traffic between interfaces.",
+    "FortiLink manages FortiSwitch units from the FortiGate. FortiLink FortiLink.",
+    "Firewall address objects are referenced by a firewall policy with NAT enabled.",
+    "System interface settings: VLAN, IP address and administrative access.",
+]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("How do I configure the FortiLink/VLAN-10 interface?") == [
+        "configure", "fortilink", "vlan", "10", "interface",
+    ]
+
+
+def test_ranks_multi_term_queries(tmp_path):
+    index = BM25Index(build_bm25_bytes(DOCS))
+    assert len(index) == 4
+    ranked = index.search("firewall policy nat")
+    assert [doc_id for doc_id, _ in ranked] == [2, 0]
+    assert ranked[0][1] > ranked[1][1] > 0
+    assert index.search("fortilink")[0][0] == 1
+    assert index.search("nonexistent") == []
+    assert index.postings("vlan") == [(3, 1)]
+
+    path = tmp_path / "docs.idx"
+    write_bm25_index(DOCS, path, source_id="abc123")
+    mapped = BM25Index.open(path)
+    assert mapped.source_id == "abc123"
+    assert mapped.search("firewall policy nat") == ranked
+
+
+def test_search_docs_uses_bm25(tmp_path):
+    root = tmp_path / "fortigate-api"
+    root.mkdir()
+    for i, text in enumerate(DOCS):
+        (root / f"page_{i}.html").write_text(f"<html><body><main>{text}</main></body></html>", encoding="utf-8")
+    docs_search.warm_index(root)
+    assert (root / ".cache" / "fortigate_docs_bm25.idx").exists()
+
+    results = docs_search.search_docs(root, "How do I add a firewall policy with NAT?", limit=2)
+    assert [r["title"] for r in results] == ["page 2", "page 0"]
+    assert "firewall" in results[0]["snippet"].lower()
+    assert results[0]["score"] > results[1]["score"]
+
+    # Stopword-only queries fall back to substring matching.
+    assert docs_search.search_docs(root, "from the", limit=5)[0]["title"] == "page 1"
+
+
+def _write_pages(root, pages):
+    for name, text in pages.items():
+        (root / f"{name}.html").write_text(f"<html><body><main>{text}</main></body></html>", encoding="utf-8")
+
+
+def _count_parses(monkeypatch):
+    parsed = []
+    original = docs_search._html_to_text
+
+    def counting(content):
+        parsed.append(content)
+        return original(content)
+
+    monkeypatch.setattr(docs_search, "_html_to_text", counting)
+    monkeypatch.setenv("DOCS_INDEX_PROCESSES", "1")
+    return parsed
+
+
+def _refresh(root):
+    docs_search._TREE_STATE_CACHE.clear()
+    docs_search._cached_index.cache_clear()
+    docs_search._cached_bm25.cache_clear()
+
+
+def test_incremental_rebuild_only_reparses_changed_pages(tmp_path, monkeypatch):
+    root = tmp_path / "fortigate-api"
+    (root / "sub").mkdir(parents=True)
+    _write_pages(root, {"alpha": "FortiLink basics", "beta": "VLAN interfaces", "gamma": "SD-WAN rules"})
+    _write_pages(root / "sub", {"delta": "BGP neighbors"})
+    parsed = _count_parses(monkeypatch)
+
+    docs_search.warm_index(root)
+    assert len(parsed) == 4
+
+    # Content change: only that page is parsed again.
+    _refresh(root)
+    (root / "beta.html").write_text("<html><body><main>VLAN trunk ports</main></body></html>", encoding="utf-8")
+    assert docs_search.search_docs(root, "trunk")[0]["title"] == "beta"
+    assert len(parsed) == 5
+
+    # mtime-only change: hashed, but not re-parsed.
+    _refresh(root)
+    stat = (root / "alpha.html").stat()
+    os.utime(root / "alpha.html", (stat.st_atime, stat.st_mtime + 10))
+    assert docs_search.search_docs(root, "FortiLink")[0]["title"] == "alpha"
+    assert len(parsed) == 5
+
+    # Deleted pages drop out of the index.
+    _refresh(root)
+    (root / "sub" / "delta.html").unlink()
+    assert docs_search.search_docs(root, "BGP neighbors") == []
+    assert len(parsed) == 5
+    manifest = docs_search._read_persisted_payload(root)["files"]
+    assert sorted(manifest) == ["alpha.html", "beta.html", "gamma.html"]
+    assert len(manifest["beta.html"]["sha256"]) == 64
+
+
+def test_cold_build_parses_on_process_pool(tmp_path, monkeypatch):
+    root = tmp_path / "fortigate-api"
+    root.mkdir()
+    _write_pages(root, {f"page_{i}": f"topic{i} firewall" for i in range(6)})
+    monkeypatch.setenv("DOCS_INDEX_PROCESSES", "2")
+    monkeypatch.setattr(docs_search, "_PARALLEL_PARSE_MIN_FILES", 2)
+    calls = []
+    original = docs_search._parse_pages
+    monkeypatch.setattr(docs_search, "_parse_pages", lambda jobs: calls.append(len(jobs)) or original(jobs))
+    start_methods = []
+
+    class RecordingPool(docs_search.ProcessPoolExecutor):
+        def __init__(self, *args, mp_context=None, **kwargs):
+            start_methods.append(mp_context.get_start_method() if mp_context else None)
+            super().__init__(*args, mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(docs_search, "ProcessPoolExecutor", RecordingPool)
+
+    docs_search.warm_index(root)
+    assert calls == [6]
+    # Never forked from the (multithreaded) server process
+    assert start_methods == ["spawn"]
+    assert docs_search.search_docs(root, "topic3")[0]["title"] == "page 3"
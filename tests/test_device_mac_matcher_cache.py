@@ -0,0 +1,228 @@
+import logging
+import sqlite3
+
+import pytest
+
+from src.enhanced_network_api import device_mac_matcher
+from src.enhanced_network_api.device_mac_matcher import DeviceModelMatcher, MatchCacheStore, OUILookup, OUIResolver
+
+# Built-in OUIs only, so no lookup falls through to the internet vendor APIs.
+_MACS = ["00:0C:F1:00:00:01", "AC:BC:32:00:00:02", "90:6C:AC:00:00:03", "E8:9F:6D:00:00:04"]
+
+
+@pytest.fixture(autouse=True)
+def quiet_matcher(monkeypatch, caplog):
+    monkeypatch.delenv("DEVICE_MATCH_CACHE_DB", raising=False)
+    caplog.set_level(logging.ERROR, logger=device_mac_matcher.__name__)
+
+
+def test_match_results_are_cached_by_mac_and_hostname(monkeypatch):
+    matcher = DeviceModelMatcher(cache_size=2)
+    calls = []
+    original = matcher._match_uncached
+
+    def counting(mac, context=None):
+        calls.append(mac)
+        return original(mac, context)
+
+    monkeypatch.setattr(matcher, "_match_uncached", counting)
+
+    first = matcher.match_mac_to_model(_MACS[0], {"hostname": "till-1"})
+    again = matcher.match_mac_to_model(_MACS[0].lower().replace(":", "-"), {"hostname": "till-1"})
+    assert calls == [_MACS[0]]
+    assert again.vendor == first.vendor
+    assert again.mac_address == _MACS[0].lower().replace(":", "-")
+
+    # A different hostname for the same MAC is classified separately.
+    matcher.match_mac_to_model(_MACS[0], {"hostname": "kds-1"})
+    assert len(calls) == 2
+
+    # LRU evicts the least recently used entry.
+    matcher.match_mac_to_model(_MACS[1], {"hostname": "till-1"})
+    matcher.match_mac_to_model(_MACS[0], {"hostname": "till-1"})
+    assert len(calls) == 4
+    assert matcher.cache_stats() == {"hits": 1, "misses": 4, "size": 2}
+
+
+def test_disabled_cache_always_classifies():
+    matcher = DeviceModelMatcher(cache_size=0)
+    matcher.match_mac_to_model(_MACS[2])
+    matcher.match_mac_to_model(_MACS[2])
+    assert matcher.cache_stats() == {"hits": 0, "misses": 0, "size": 0}
+
+
+@pytest.mark.parametrize("cache_size", [0, 16])
+def test_mac_notation_does_not_change_classification(cache_size):
+    dashed = _MACS[0].replace(":", "-")
+    first, second = DeviceModelMatcher(cache_size=cache_size), DeviceModelMatcher(cache_size=cache_size)
+    colon_first = [first.match_mac_to_model(mac).device_type for mac in (_MACS[0], dashed)]
+    dash_first = [second.match_mac_to_model(mac).device_type for mac in (dashed, _MACS[0].lower())]
+    assert set(colon_first) == set(dash_first) == {"POS Register/Cash Terminal"}
+
+
+def test_persistent_store_survives_restart(tmp_path):
+    db = tmp_path / "matches.db"
+    warm = DeviceModelMatcher(cache_path=str(db))
+    expected = [warm.match_mac_to_model(mac, {"hostname": f"h{i}"}) for i, mac in enumerate(_MACS)]
+    warm.store.close()
+
+    restarted = DeviceModelMatcher(cache_path=str(db))
+    restarted._match_uncached = lambda *args: pytest.fail("should be served from the store")
+    results = [restarted.match_mac_to_model(mac, {"hostname": f"h{i}"}) for i, mac in enumerate(_MACS)]
+    assert results == expected
+    assert len(restarted.store) == len(_MACS)
+
+
+def test_persistent_store_discarded_when_fingerprint_changes(tmp_path, monkeypatch):
+    db = tmp_path / "matches.db"
+    matcher = DeviceModelMatcher(cache_path=str(db))
+    matcher.match_mac_to_model(_MACS[0])
+    matcher.store.close()
+
+    monkeypatch.setattr(device_mac_matcher, "MATCHER_RULES_VERSION", device_mac_matcher.MATCHER_RULES_VERSION + 1)
+    bumped = DeviceModelMatcher(cache_path=str(db))
+    assert bumped.fingerprint != matcher.fingerprint
+    assert len(bumped.store) == 0
+
+    assert len(MatchCacheStore(str(db), matcher.fingerprint)) == 0
+
+
+def test_locked_store_degrades_to_a_miss(tmp_path):
+    db = tmp_path / "matches.db"
+    matcher = DeviceModelMatcher(cache_path=str(db))
+    matcher.store = MatchCacheStore(str(db), matcher.fingerprint, batch_size=1, busy_timeout=0.05)
+    blocker = sqlite3.connect(str(db))
+    blocker.execute("BEGIN EXCLUSIVE")  # another worker holds the file
+
+    info = matcher.match_mac_to_model(_MACS[0], {"hostname": "till"})
+    assert info.vendor
+    assert matcher.store._pending == []
+
+    blocker.rollback()
+    blocker.close()
+    matcher.store.put(("mac", "host", "model"), info)
+    assert len(matcher.store) == 1
+    assert matcher.store.get(("mac", "host", "model")) == info
+    matcher.store.close()
+
+
+def test_cache_path_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEVICE_MATCH_CACHE_DB", str(tmp_path / "env.db"))
+    matcher = DeviceModelMatcher()
+    assert matcher.store is not None
+    assert matcher.store.path == str(tmp_path / "env.db")
+    matcher.store.close()
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(round(seconds, 3))
+        self.now += seconds
+
+
+def test_resolver_rate_limits_dedupes_and_negative_caches():
+    clock = _FakeClock()
+    resolved = {}
+    answers = {"AA:00:01": "Acme", "AA:00:02": "Unknown"}
+    seen = []
+
+    def resolve(mac):
+        seen.append(mac)
+        return {"vendor": answers[mac[:8]], "address": ""}
+
+    resolver = OUIResolver(
+        resolve, on_resolved=resolved.__setitem__, rate=2.0, negative_ttl=60,
+        background=False, clock=clock, sleep=clock.sleep,
+    )
+    assert resolver.submit("AA:00:01", "AA:00:01:00:00:01")
+    assert not resolver.submit("AA:00:01", "AA:00:01:00:00:02")
+    assert resolver.submit("AA:00:02", "AA:00:02:00:00:01")
+    assert resolver.resolve_pending() == 2
+
+    assert seen == ["AA:00:01:00:00:01", "AA:00:02:00:00:01"]
+    assert clock.slept == [0.5]
+    assert resolved == {"AA:00:01": {"vendor": "Acme", "address": ""}}
+
+    # Unknown OUIs are not retried until the negative TTL expires.
+    assert not resolver.submit("AA:00:02", "AA:00:02:00:00:09")
+    clock.now += 61
+    assert resolver.submit("AA:00:02", "AA:00:02:00:00:09")
+    assert resolver.stats == {"queued": 3, "resolved": 1, "negative": 1, "dropped": 0}
+
+
+def test_offline_lookup_never_touches_the_network(monkeypatch):
+    monkeypatch.setattr(device_mac_matcher.requests, "get", lambda *a, **k: pytest.fail("network call"))
+    lookup = OUILookup(mode="offline")
+    assert lookup.resolver is None
+    assert lookup.lookup("12:34:56:00:00:01") == {"vendor": "Unknown", "address": ""}
+    assert lookup.lookup("00:0C:F1:00:00:01")["vendor"] == "Ingenico"
+
+
+def test_unknown_oui_is_backfilled_into_matcher_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(device_mac_matcher.requests, "get", lambda *a, **k: pytest.fail("network call"))
+    monkeypatch.setenv("OUI_LOOKUP_MODE", "background")
+    db = str(tmp_path / "matches.db")
+    matcher = DeviceModelMatcher(cache_path=db)
+    resolver = matcher.oui_lookup.resolver
+    resolver.background = False
+    resolver.rate = 0
+    resolver._resolve = lambda mac: {"vendor": "Fortinet", "address": "Sunnyvale, CA"}
+
+    assert matcher.match_mac_to_model("04:D5:90:00:00:01").vendor == "Unknown"
+    # Randomized MACs are never queued.
+    matcher.match_mac_to_model("DA:A1:19:00:00:01")
+    assert resolver.pending() == ["04:D5:90"]
+
+    resolver.resolve_pending()
+    assert matcher.match_mac_to_model("04:D5:90:00:00:01").vendor == "Fortinet"
+    assert matcher.store.load_ouis() == {"04:D5:90": {"vendor": "Fortinet", "address": "Sunnyvale, CA"}}
+    matcher.store.close()
+
+    restarted = DeviceModelMatcher(cache_path=db)
+    assert restarted.match_mac_to_model("04:D5:90:00:00:02").vendor == "Fortinet"
+    assert restarted.oui_lookup.resolver.pending() == []
+    restarted.store.close()
+
+
+def test_bulk_match_classifies_each_assignment_once(monkeypatch):
+    matcher = DeviceModelMatcher(cache_size=0)
+    calls = []
+    original = matcher._match_uncached
+
+    def counting(mac, context=None):
+        calls.append(mac)
+        return original(mac, context)
+
+    monkeypatch.setattr(matcher, "_match_uncached", counting)
+    macs = [f"{oui}:00:{i // 256:02x}:{i % 256:02x}" for oui in ("00:0C:F1", "ac-bc-32") for i in range(500)]
+    macs.append("not-a-mac")
+    context = {macs[0]: {"hostname": "kds-1"}, macs[1]: {"hostname": "KDS-1"}}
+
+    results = matcher.bulk_match(macs, context)
+    assert [r.mac_address for r in results] == macs
+    # ingenico (kds-1 / KDS-1), ingenico (no hostname), square, invalid
+    assert len(calls) == 4
+    assert results[0].device_type == results[1].device_type
+    assert results[2].vendor == "Ingenico" and results[600].vendor == "Square (Block)"
+    assert results[2].details is not results[3].details
+
+    singles = [matcher.match_mac_to_model(mac) for mac in ("00:0C:F1:00:00:05", "AC:BC:32:00:00:07")]
+    assert (results[5].device_type, results[507].device_type) == tuple(s.device_type for s in singles)
+
+
+def test_bulk_match_on_process_pool(monkeypatch):
+    matcher = DeviceModelMatcher()
+    monkeypatch.setattr(matcher, "_match_uncached", lambda *a: pytest.fail("should run in the pool"))
+    macs = [f"{oui}:00:00:01" for oui in ("00:0C:F1", "AC:BC:32", "90:6C:AC", "E8:9F:6D")]
+    results = matcher.bulk_match(macs * 3, processes=2, pool_threshold=2)
+    assert [r.vendor for r in results[:4]] == ["Ingenico", "Square (Block)", "Fortinet", "Toast"]
+    assert [r.vendor for r in results[4:8]] == [r.vendor for r in results[:4]]
+    # Pool results are cached in the parent.
+    assert matcher.match_mac_to_model(macs[2]).vendor == "Fortinet"
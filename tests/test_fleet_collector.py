@@ -0,0 +1,214 @@
+import asyncio
+import json
+import random
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.enhanced_network_api.platform_web_api_fastapi as api
+from src.enhanced_network_api import openmetrics
+from src.enhanced_network_api.fleet_collector import (
+    FleetCollector,
+    FleetSite,
+    SiteSnapshotStore,
+    merge_fleet,
+    site_id_for,
+    site_topology,
+    sites_from_env,
+)
+from tests.fortigate_emulator import FortiGateEmulator
+
+
+@pytest.fixture
+def fleet():
+    servers = [FortiGateEmulator(size=size, latency=0.05, tls=True, seed=index).start()
+               for index, size in enumerate((80, 120, 160))]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def _site(server, token=None, name=None):
+    host, port = server.server_address[:2]
+    return FleetSite(site_id_for(host, port), host, token or server.token, port, name)
+
+
+def test_sites_from_env_uses_per_host_settings():
+    env = {
+        "FORTIGATE_HOSTS": "10.1.0.1, 10.2.0.1:8443,10.3.0.1,10.1.0.1",
+        "FORTIGATE_10_1_0_1_TOKEN": "site-one",
+        "FORTIGATE_10_1_0_1_NAME": "Store 1",
+        "FORTIGATE_10_3_0_1_PORT": "4443",
+        "FORTIGATE_DEFAULT_TOKEN": "fleet-default",
+    }
+    sites = sites_from_env(env)
+    assert [(s.host, s.port, s.token, s.label) for s in sites] == [
+        ("10.1.0.1", 10443, "site-one", "Store 1"),
+        ("10.2.0.1", 8443, "fleet-default", "10.2.0.1_8443"),
+        ("10.3.0.1", 4443, "fleet-default", "10.3.0.1_4443"),
+    ]
+    assert sites_from_env({"FORTIGATE_HOSTS": "10.9.0.1"}) == []
+
+
+def test_snapshot_store_persists_atomically(tmp_path):
+    store = SiteSnapshotStore(tmp_path)
+    store.save("site-a", {"collected_at": 1.0, "topology": {"devices": [], "links": []}})
+    assert [path.name for path in tmp_path.iterdir()] == ["site-a.json"]
+    assert json.loads((tmp_path / "site-a.json").read_text())["collected_at"] == 1.0
+    assert SiteSnapshotStore(tmp_path).all() == store.all()
+
+
+def test_first_collections_are_spread_over_the_interval(tmp_path):
+    sites = [FleetSite(f"site-{i}", f"10.0.{i}.1", "token") for i in range(200)]
+    start = time.time()
+    collector = FleetCollector(sites, SiteSnapshotStore(tmp_path), interval=300, rng=random.Random(0))
+    offsets = sorted(entry["next_due"] - start for entry in collector.status())
+    assert 0 <= offsets[0] and offsets[-1] <= 301
+    assert len(collector.due(start + 30)) < 40
+    assert len(collector.due(start + 301)) == len(sites)
+
+
+def test_site_topology_reads_fortios_status_envelope_and_dedupes_clients():
+    site = FleetSite("store-1", "10.1.0.1", "token")
+    dataset = {
+        "system_status": {"serial": "FG100FTK00000001", "version": "v7.4.3",
+                          "results": {"hostname": "store-1-fg", "model_number": "100F"}},
+        "switch_status": {"results": []},
+        "switch_clients": {"results": [
+            {"mac": "aa:bb:cc:00:00:01", "switch_id": "S1", "port": "port5"},
+            {"mac": "AA:BB:CC:00:00:02", "switch_id": "S1", "port": "port7"},
+            {"mac": "aa:bb:cc:00:00:01", "switch_id": "S1", "port": "port5"},
+        ]},
+        "wifi_clients": {"results": [{"mac": "aa:bb:cc:00:00:02", "wtp_id": "FP1", "ssid": "bridged"}]},
+    }
+    topology = site_topology(site, dataset)
+    fortigate = topology["devices"][0]
+    assert (fortigate["id"], fortigate["serial"], fortigate["version"]) == ("FG100FTK00000001", "FG100FTK00000001", "v7.4.3")
+    clients = [device for device in topology["devices"] if device["type"] == "client"]
+    assert [(client["id"].lower(), client["connection_type"]) for client in clients] == [
+        ("aa:bb:cc:00:00:01", "wired"), ("aa:bb:cc:00:00:02", "wifi"),
+    ]
+    assert len({device["id"] for device in topology["devices"]}) == len(topology["devices"])
+    assert len(topology["links"]) == 3  # the FortiAP, one wired and one wireless client
+
+
+def test_merge_fleet_prefixes_ids_per_site():
+    topology = {"devices": [{"id": "fg"}, {"id": "sw"}], "links": [{"source": "fg", "target": "sw"}]}
+    fleet = merge_fleet({
+        "a": {"name": "Store A", "collected_at": 90.0, "topology": topology},
+        "b": {"name": "Store B", "collected_at": 95.0, "topology": topology},
+    }, now=100.0)
+    assert [device["id"] for device in fleet["devices"]] == ["a/fg", "a/sw", "b/fg", "b/sw"]
+    assert fleet["links"][1]["source"] == "b/fg"
+    assert [(site["name"], site["age_seconds"]) for site in fleet["sites"]] == [("Store A", 10.0), ("Store B", 5.0)]
+
+
+async def test_fleet_collects_sites_concurrently_and_backs_off(fleet, tmp_path):
+    good = [_site(server, name=f"Store {index}") for index, server in enumerate(fleet[:2])]
+    bad = _site(fleet[2], token="revoked")
+    store = SiteSnapshotStore(tmp_path)
+    collector = FleetCollector(good + [bad], store, interval=60, max_concurrency=8, per_host_concurrency=2,
+                               backoff_base=10, rng=random.Random(0), startup_spread=0)
+
+    start = time.perf_counter()
+    results = await collector.run_once()
+    elapsed = time.perf_counter() - start
+
+    assert results == {good[0].site_id: True, good[1].site_id: True, bad.site_id: False}
+    assert collector.peak_in_flight == 3
+    # 5 sections per site at 50 ms, 2 at a time per host, all sites in parallel
+    assert elapsed < 3 * 5 * 0.05
+    for site, server in zip(good, fleet):
+        topology = store.get(site.site_id)["topology"]
+        fabric = server.fabric
+        macs = {device["mac"] for device in topology["devices"] if device["type"] == "client"}
+        assert macs == {client["mac"] for client in fabric["wifi_clients"] + fabric["wired_clients"]}
+        assert sum(device["type"] == "fortiswitch" for device in topology["devices"]) == len(fabric["switches"])
+
+    schedule = {entry["site_id"]: entry for entry in collector.status()}
+    now = time.time()
+    assert 54 <= schedule[good[0].site_id]["next_due"] - now <= 66
+    assert schedule[bad.site_id]["failures"] == 1
+    assert 8 <= schedule[bad.site_id]["next_due"] - now <= 11
+    assert collector.due() == []
+
+    # Nothing is due, so a second pass touches no device.
+    before = sum(sum(server.counts.values()) for server in fleet)
+    assert await collector.run_once() == {}
+    assert sum(sum(server.counts.values()) for server in fleet) == before
+
+    await collector.run_once(force=True)
+    assert collector._schedule[bad.site_id].failures == 2
+    assert 16 <= collector._schedule[bad.site_id].next_due - time.time() <= 22
+
+
+def test_fleet_endpoints_serve_stored_snapshots(fleet, tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "_FLEET_STORE", SiteSnapshotStore(tmp_path))
+    monkeypatch.setattr(api, "_FLEET_COLLECTOR", None)
+    monkeypatch.setattr(api, "_fortigate_docs_root", lambda: tmp_path / "no-docs")
+    monkeypatch.setenv("TOPOLOGY_AUTO_REFRESH", "false")
+    monkeypatch.setenv("FORTIGATE_HOSTS", ",".join(server.host_port for server in fleet[:2]))
+    monkeypatch.setenv("FORTIGATE_TOKEN", fleet[0].token)
+
+    with TestClient(api.app) as client:
+        assert client.get("/api/fleet/topology").json()["devices"] == []
+        response = client.post("/api/fleet/collect")
+        assert response.status_code == 202
+        assert len(response.json()["scheduled"]) == 2
+        # A second trigger while the first pass runs does not collect the sites again.
+        assert client.post("/api/fleet/collect").status_code == 202
+        deadline = time.monotonic() + 10
+        while api._FLEET_COLLECTOR.stats()["collections"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert api._FLEET_COLLECTOR.stats()["collections"] == 2
+
+        requests_made = sum(sum(server.counts.values()) for server in fleet)
+        fleet_view = client.get("/api/fleet/topology").json()
+        sites = client.get("/api/fleet/sites").json()
+        assert sum(sum(server.counts.values()) for server in fleet) == requests_made
+        assert len(fleet_view["sites"]) == 2
+        assert fleet_view["total_devices"] == sum(site["devices"] for site in sites["sites"])
+        site_id = sites["sites"][0]["site_id"]
+        assert client.get(f"/api/fleet/sites/{site_id}/topology").json()["site_id"] == site_id
+        assert client.get("/api/fleet/sites/missing/topology").status_code == 404
+
+
+async def test_concurrent_collections_of_a_site_share_one_pass(fleet, tmp_path):
+    site = _site(fleet[0])
+    collector = FleetCollector([site], SiteSnapshotStore(tmp_path), interval=60)
+    first, second = await asyncio.gather(collector.collect_site(site), collector.collect_site(site))
+    assert first is second
+    assert collector.stats()["collections"] == 1
+    assert fleet[0].counts[("monitor/system/status", 200)] == 1
+
+
+async def test_fleet_requests_are_recorded_as_upstream_latency(fleet, tmp_path):
+    openmetrics.UPSTREAM_LATENCY.clear()
+    site = _site(fleet[0])
+    collector = FleetCollector([site], SiteSnapshotStore(tmp_path), startup_spread=0)
+    assert await collector.run_once() == {site.site_id: True}
+    histogram = openmetrics.UPSTREAM_LATENCY.get(
+        upstream="fortigate", method="GET", endpoint="/api/v2/monitor/system/status", status=200
+    )
+    assert histogram is not None and histogram.count == 1
+
+
+async def test_trigger_wakes_the_scheduler(fleet, tmp_path):
+    site = _site(fleet[0])
+    collector = FleetCollector([site], SiteSnapshotStore(tmp_path), interval=600, startup_spread=0)
+    stop = asyncio.Event()
+    task = asyncio.create_task(collector.run_forever(stop, max_sleep=60))
+    try:
+        while collector.stats()["collections"] < 1:
+            await asyncio.sleep(0.02)
+        assert collector.trigger() == [site.site_id]
+        await asyncio.wait_for(_until(lambda: collector.stats()["collections"] == 2), timeout=5)
+    finally:
+        stop.set()
+        await asyncio.wait_for(task, timeout=5)
+
+
+async def _until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.02)
@@ -0,0 +1,230 @@
+import threading
+import time
+
+import pytest
+
+import src.enhanced_network_api.platform_web_api_fastapi as api
+from mcp_servers.drawio_fortinet_meraki.fortigate_collector import AUTH_BROKER, FortiGateTopologyCollector
+from src.enhanced_network_api.concurrency_limit import AdaptiveConcurrencyLimit, limit_for
+from src.enhanced_network_api.fortigate_monitor import DATASET_SECTIONS, AsyncFortiGateMonitor
+from src.enhanced_network_api.shared import topology_workflow
+from tests.fortigate_emulator import FortiGateEmulator, Fault
+from tests.load_driver import Sample, run_load, summarize
+
+
+@pytest.fixture
+def emulator():
+    AUTH_BROKER.reset()
+    server = FortiGateEmulator(size=200, tls=True).start()
+    yield server
+    server.stop()
+    AUTH_BROKER.reset()
+
+
+def _host_port(server):
+    host, port = server.server_address[:2]
+    return host, port
+
+
+async def test_emulator_serves_every_monitor_dataset_section(emulator):
+    host, port = _host_port(emulator)
+    async with AsyncFortiGateMonitor(host, emulator.token, port=port) as monitor:
+        dataset = await monitor.build_dataset()
+    failed = [name for name in DATASET_SECTIONS if "error" in dataset[name]]
+    assert failed == []
+    assert len(dataset["wifi_clients"]["results"]) == len(emulator.fabric["wifi_clients"])
+    assert dataset["partial"] is False
+
+
+async def test_emulator_injects_latency_and_errors(emulator):
+    host, port = _host_port(emulator)
+    emulator.faults["monitor/wifi/"] = Fault(latency=0.05, error_rate=1.0, status=503)
+    async with AsyncFortiGateMonitor(host, emulator.token, port=port) as monitor:
+        dataset = await monitor.build_dataset(sections=["wifi_clients", "system_status"])
+        assert "error" in dataset["wifi_clients"]
+        assert dataset["latency_ms"]["wifi_clients"] >= 50
+        assert "error" not in dataset["system_status"]
+
+        wrong = AsyncFortiGateMonitor(host, "wrong-token", port=port, client=monitor._client)
+        assert "error" in await wrong.section("system_status")
+    assert emulator.counts[("monitor/wifi/client", 503)] == 1
+    assert emulator.counts[("monitor/system/status", 401)] == 1
+
+
+@pytest.mark.parametrize("auth", [{"token": "emulator-token"}, {"password": "emulator"}])
+async def test_collector_reads_connected_devices_from_emulator(emulator, auth):
+    host, port = _host_port(emulator)
+    collector = FortiGateTopologyCollector(host=host, username="admin", port=port, **auth)
+    devices = await collector.get_connected_devices()
+    macs = {device["mac"] for device in devices}
+    fabric = emulator.fabric
+    assert macs == {client["mac"] for client in fabric["wifi_clients"] + fabric["wired_clients"]}
+    assert (await collector.get_system_status())["serial"] == "FG6H0ETB20900001"
+    assert len(await collector.get_interfaces()) == 5
+
+
+async def test_collectors_share_authenticated_session(emulator):
+    host, port = _host_port(emulator)
+    first = FortiGateTopologyCollector(host=host, username="admin", password="emulator", port=port)
+    assert await first.authenticate()
+    second = FortiGateTopologyCollector(host=host, username="admin", password="emulator", port=port)
+    assert second.session is first.session
+    assert await second.authenticate()
+    assert (await second.get_system_status())["serial"] == "FG6H0ETB20900001"
+    assert emulator.counts[("authentication", 200)] == 1
+    assert AUTH_BROKER.stats()["hits"] == 1
+
+    emulator.sessions.clear()  # the FortiGate expired the login
+    assert (await second.get_system_status())["serial"] == "FG6H0ETB20900001"
+    assert emulator.counts[("authentication", 200)] == 2
+    assert AUTH_BROKER.stats()["reauths"] == 1
+
+    other = FortiGateTopologyCollector(host=host, username="admin", token="emulator-token", port=port)
+    assert other.session is not first.session
+
+
+def test_concurrent_reauthentication_logs_in_once(emulator):
+    import asyncio
+
+    host, port = _host_port(emulator)
+    collectors = [
+        FortiGateTopologyCollector(host=host, username="admin", password="emulator", port=port)
+        for _ in range(6)
+    ]
+    assert asyncio.run(collectors[0].authenticate())
+    emulator.sessions.clear()  # every collector now holds an expired login
+
+    barrier = threading.Barrier(len(collectors))
+    results = []
+
+    def status(collector):
+        barrier.wait()
+        results.append(asyncio.run(collector.get_system_status()))
+
+    threads = [threading.Thread(target=status, args=(collector,)) for collector in collectors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [result["serial"] for result in results] == ["FG6H0ETB20900001"] * len(collectors)
+    assert emulator.counts[("authentication", 200)] == 2
+    assert AUTH_BROKER.stats()["reauths"] == 1
+
+
+async def test_reauthentication_drops_stale_auth_headers(emulator):
+    host, port = _host_port(emulator)
+    collector = FortiGateTopologyCollector(host=host, username="admin", password="emulator", port=port)
+    collector.session.headers["Authorization"] = "Bearer revoked-token"
+    collector.session.headers["X-API-Key"] = "revoked-token"
+    assert await collector.authenticate(force=True)
+    assert "Authorization" not in collector.session.headers
+    assert "X-API-Key" not in collector.session.headers
+    assert collector._auth_method == "session"
+
+
+async def test_collector_reads_clients_from_every_switch():
+    server = FortiGateEmulator(size=1600, latency=0.02, tls=True).start()
+    try:
+        host, port = _host_port(server)
+        collector = FortiGateTopologyCollector(host=host, username="admin", token=server.token, port=port)
+        devices = await collector.get_connected_devices()
+    finally:
+        server.stop()
+    switches = server.fabric["switches"]
+    assert len(switches) == 40
+    assert server.counts[("monitor/switch-controller/managed-switch/clients", 200)] == len(switches)
+    wired = {device["mac"] for device in devices if device.get("connection_type") == "ethernet"}
+    assert wired == {client["mac"] for client in server.fabric["wired_clients"]}
+
+
+def test_adaptive_limit_backs_off_when_latency_climbs():
+    lock = threading.Lock()
+    state = {"in_flight": 0}
+
+    def congested(item):
+        # Latency grows with concurrency, like a saturated management plane
+        with lock:
+            state["in_flight"] += 1
+            delay = 0.005 * state["in_flight"]
+        time.sleep(delay)
+        with lock:
+            state["in_flight"] -= 1
+        return item * 2
+
+    limit = AdaptiveConcurrencyLimit(initial=8, max_limit=16)
+    assert limit.map(congested, range(60)) == [item * 2 for item in range(60)]
+    assert limit.limit < 8
+
+    fast = AdaptiveConcurrencyLimit(initial=2, max_limit=8)
+    fast.map(lambda item: time.sleep(0.01) or item, range(40))
+    assert fast.limit == 8
+    assert fast.peak > 2
+
+
+def test_adaptive_limit_treats_swallowed_errors_as_overload():
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    failures = [None, ConnectionError("refused"), Response(503), Response(429)]
+    limit = AdaptiveConcurrencyLimit(initial=4, max_limit=8)
+    limit.map(lambda item: failures[item % len(failures)], range(40))
+    assert limit.limit == 1
+    assert limit.min_latency is None
+
+    with pytest.raises(ValueError):
+        limit.call(lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert limit.min_latency is None
+
+
+def test_limit_for_keeps_one_limit_per_host():
+    first = limit_for("fg-test.example:10443", max_limit=4)
+    first.limit = 3
+    assert limit_for("fg-test.example:10443") is first
+    assert limit_for("fg-test.example:10443").limit == 3
+    assert limit_for("other.example:10443") is not first
+
+
+def test_workflow_fetches_fortigate_endpoints_concurrently():
+    server = FortiGateEmulator(size=400, latency=0.1).start()
+    try:
+        creds = topology_workflow.FortiGateCredentials(host=server.base_url, token=server.token)
+        started = time.perf_counter()
+        payload, source = topology_workflow._fetch_fortigate_payload(creds)
+        elapsed = time.perf_counter() - started
+    finally:
+        server.stop()
+    requests_made = sum(server.counts.values())
+    # Serially this is one emulated round-trip per request
+    assert requests_made >= 10
+    assert elapsed < requests_made * 0.1 * 0.5
+    macs = {device.get("mac") for device in payload["fabric_devices"]}
+    assert {client["mac"] for client in server.fabric["wifi_clients"] + server.fabric["wired_clients"]} <= macs
+    assert source == f"fortigate:{server.base_url}"
+
+
+def test_summarize_percentiles():
+    samples = [Sample("/a", 200, ms / 1000) for ms in range(1, 101)] + [Sample("/b", 500, 0.2)]
+    report = summarize(samples, elapsed=2.0)
+    assert report["total"]["requests"] == 101
+    assert report["total"]["rps"] == pytest.approx(50.5)
+    assert report["routes"]["/a"]["p50_ms"] == pytest.approx(50)
+    assert report["routes"]["/a"]["p99_ms"] == pytest.approx(99)
+    assert report["routes"]["/b"]["errors"] == 1
+
+
+async def test_load_driver_against_api_and_emulator(emulator, monkeypatch):
+    import httpx
+
+    monkeypatch.setenv("FORTIGATE_HOST", emulator.host_port)
+    monkeypatch.setenv("FORTIGATE_TOKEN", emulator.token)
+    await api._close_monitor_pools()
+    api._DATASET_CACHE.clear()
+    report = await run_load(
+        "http://api", mix="dashboard", users=3, duration=1.0, transport=httpx.ASGITransport(app=api.app)
+    )
+    dataset = report["routes"]["/api/dataset"]
+    assert dataset["requests"] > 0
+    assert dataset["errors"] == 0
+    assert emulator.counts[("monitor/wifi/client", 200)] >= 1
+    await api._close_monitor_pools()
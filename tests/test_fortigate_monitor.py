@@ -0,0 +1,187 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.enhanced_network_api import fortigate_monitor
+from src.enhanced_network_api.fortigate_monitor import (
+    DATASET_SECTIONS,
+    AsyncFortiGateMonitor,
+    DatasetSnapshotCache,
+    FortiGateMonitor,
+)
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_sync_build_dataset_covers_all_sections(monkeypatch):
+    seen = []
+
+    def fake_get(self, path, params=None):
+        seen.append(path)
+        return {"results": [], "path": path}
+
+    monkeypatch.setattr(FortiGateMonitor, "_get", fake_get)
+    dataset = FortiGateMonitor("fgt", "token").build_dataset()
+
+    assert list(dataset)[1:] == list(DATASET_SECTIONS)
+    assert seen == list(DATASET_SECTIONS.values())
+    assert dataset["multicast"]["path"] == "monitor/router/multicast"
+
+
+@pytest.mark.asyncio
+async def test_async_build_dataset_runs_concurrently():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        assert request.headers["Authorization"] == "Bearer token"
+        return httpx.Response(200, json={"results": [], "path": request.url.path})
+
+    client = _mock_client(handler)
+    monitor = AsyncFortiGateMonitor("fgt", "token", max_concurrency=4, client=client)
+    dataset = await monitor.build_dataset()
+    await client.aclose()
+
+    assert peak == 4
+    assert dataset["partial"] is False
+    assert set(dataset["latency_ms"]) == set(DATASET_SECTIONS)
+    assert dataset["cpu"]["path"] == "/api/v2/monitor/system/resource/cpu"
+    assert isinstance(dataset["timestamp"], int)
+
+
+@pytest.mark.asyncio
+async def test_async_build_dataset_returns_partial_results_on_deadline():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/monitor/log/traffic"):
+            await asyncio.sleep(1)
+        if request.url.path.endswith("/monitor/router/bgp"):
+            return httpx.Response(500, json={"status": "error"})
+        return httpx.Response(200, json={"results": []})
+
+    client = _mock_client(handler)
+    monitor = AsyncFortiGateMonitor("fgt", "token", client=client)
+    dataset = await monitor.build_dataset(
+        sections=["cpu", "bgp", "traffic_logs"], section_timeout=0.05
+    )
+    await client.aclose()
+
+    assert dataset["partial"] is True
+    assert dataset["cpu"] == {"results": []}
+    assert dataset["bgp"]["endpoint"] == "monitor/router/bgp"
+    assert "timed out" in dataset["traffic_logs"]["error"]
+    assert dataset["latency_ms"]["traffic_logs"] < 1000
+    assert "wifi_clients" not in dataset
+
+
+@pytest.mark.asyncio
+async def test_async_monitor_section_and_owned_client():
+    monitor = AsyncFortiGateMonitor("fgt", "token", port=443)
+    assert monitor.base == "https://fgt:443/api/v2"
+    with pytest.raises(ValueError):
+        await monitor.section("nope")
+    await monitor.aclose()
+    assert monitor._client.is_closed
+    assert fortigate_monitor.DATASET_SECTIONS["dhcp"] == "monitor/router/dhcp/lease"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _counting_fetch(calls, delay=0.0, fail=()):
+    async def fetch(sections):
+        calls.append(list(sections))
+        if delay:
+            await asyncio.sleep(delay)
+        data = {}
+        for name in sections:
+            if name in fail:
+                data[name] = {"error": "boom", "endpoint": name}
+            else:
+                data[name] = {"results": [len(calls)]}
+        data["latency_ms"] = {name: 1.5 for name in sections}
+        return data
+
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_serves_fresh_then_stale_while_revalidating():
+    clock = _Clock()
+    cache = DatasetSnapshotCache(clock=clock)
+    calls = []
+    fetch = _counting_fetch(calls)
+
+    first = await cache.get("fgt:443", fetch, sections=["cpu", "dhcp"])
+    assert first["cpu"] == {"results": [1]}
+    assert first["cache"]["ages"] == {"cpu": 0.0, "dhcp": 0.0}
+    assert first["latency_ms"]["dhcp"] == 1.5
+
+    clock.now += 10  # cpu (5s TTL) expired, dhcp (60s TTL) still fresh
+    second = await cache.get("fgt:443", fetch, sections=["cpu", "dhcp"])
+    assert second["cpu"] == {"results": [1]}
+    assert second["cache"]["stale"] == ["cpu"]
+    assert second["cache"]["refreshing"] == ["cpu"]
+    assert second["cache"]["ages"]["cpu"] == 10.0
+
+    await asyncio.sleep(0)
+    third = await cache.get("fgt:443", fetch, sections=["cpu", "dhcp"])
+    assert third["cpu"] == {"results": [2]}
+    assert third["cache"]["ages"] == {"cpu": 0.0, "dhcp": 10.0}
+    assert calls == [["cpu", "dhcp"], ["cpu"]]
+    assert cache.stats() == {"hits": 3, "stale_hits": 1, "misses": 2}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_collapses_concurrent_refreshes():
+    cache = DatasetSnapshotCache()
+    calls = []
+    fetch = _counting_fetch(calls, delay=0.02)
+
+    results = await asyncio.gather(*(cache.get("fgt", fetch, sections=["cpu", "memory"]) for _ in range(10)))
+    assert len(calls) == 1
+    assert all(r["memory"] == {"results": [1]} for r in results)
+
+    forced = await cache.get("fgt", fetch, sections=["cpu"], force=True)
+    assert forced["cpu"] == {"results": [2]}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_keeps_good_value_on_failed_refresh():
+    clock = _Clock()
+    cache = DatasetSnapshotCache(clock=clock)
+    calls = []
+    await cache.get("fgt", _counting_fetch(calls), sections=["cpu"])
+
+    clock.now += 6
+    await cache.get("fgt", _counting_fetch(calls, fail={"cpu"}), sections=["cpu"])
+    await asyncio.sleep(0)
+    result = await cache.get("fgt", _counting_fetch(calls), sections=["cpu"])
+    assert result["cpu"] == {"results": [1]}
+    assert result["partial"] is False
+    # Still expired, so another background refresh is underway.
+    assert result["cache"]["stale"] == ["cpu"]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_propagates_first_fetch_failure():
+    cache = DatasetSnapshotCache()
+
+    async def broken(sections):
+        raise RuntimeError("unreachable")
+
+    with pytest.raises(RuntimeError):
+        await cache.get("fgt", broken, sections=["cpu"])
+    assert cache._inflight == {}
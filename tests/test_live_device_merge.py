@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.enhanced_network_api.live_device_merge import LiveDeviceMerger, select_uplink
+
+
+class CountingMatcher:
+    def __init__(self):
+        self.calls = []
+
+    def match_mac_to_model(self, mac, context=None):
+        self.calls.append((mac, (context or {}).get("hostname")))
+        return SimpleNamespace(
+            device_type="Laptop",
+            vendor="Acme",
+            model_path="/models/laptop.obj",
+            pos_system=None,
+        )
+
+
+def _scene():
+    return {
+        "nodes": [
+            {"id": "fg", "type": "fortigate"},
+            {"id": "sw", "type": "fortiswitch"},
+            {"id": "dev-aabbcc000001", "type": "server"},
+        ],
+        "links": [{"from": "fg", "to": "sw"}],
+    }
+
+
+def _devices(count, start=2, **extra):
+    return [
+        {"mac": f"aa:bb:cc:00:{i // 256:02x}:{i % 256:02x}", "hostname": f"host-{i}", "ip": f"10.0.0.{i % 250}", **extra}
+        for i in range(start, start + count)
+    ]
+
+
+def test_select_uplink_prefers_switch():
+    assert select_uplink(_scene()["nodes"]) == "sw"
+    assert select_uplink([{"id": "fw", "type": "Firewall"}]) == "fw"
+    assert select_uplink([{"id": "x", "type": "client"}]) is None
+
+
+def test_merge_builds_nodes_and_links():
+    matcher = CountingMatcher()
+    merger = LiveDeviceMerger(matcher_factory=lambda: matcher)
+    devices = [
+        {"mac": "aa:bb:cc:00:00:01", "hostname": "existing"},
+        {"mac": "aa:bb:cc:00:00:02", "hostname": "till-1", "ssid": "pos", "wtp_id": "FP1", "os": None},
+        {"mac": "aa:bb:cc:00:00:02", "hostname": "dupe"},
+    ]
+    scene = merger.merge(_scene(), devices)
+
+    added = scene["nodes"][3:]
+    assert [n["id"] for n in added] == ["dev-aabbcc000002"]
+    assert added[0] == {
+        "id": "dev-aabbcc000002",
+        "name": "till-1",
+        "type": "Laptop",
+        "mac": "aa:bb:cc:00:00:02",
+        "vendor": "Acme",
+        "status": "online",
+        "model_path": "/models/laptop.obj",
+        "ssid": "pos",
+        "ap_sn": "FP1",
+    }
+    assert scene["links"][-1] == {"from": "sw", "to": "dev-aabbcc000002", "status": "active"}
+    assert merger.last_stats == {"devices": 3, "added": 1, "reused": 0, "classified": 1}
+
+
+def test_merge_reuses_unchanged_devices_across_snapshots():
+    matcher = CountingMatcher()
+    merger = LiveDeviceMerger(matcher_factory=lambda: matcher)
+    devices = _devices(2000)
+
+    merger.merge(_scene(), devices)
+    assert len(matcher.calls) == 2000
+
+    changed = [dict(d) for d in devices]
+    changed[0]["ip"] = "10.9.9.9"
+    changed.append({"mac": "de:ad:be:ef:00:01", "hostname": "new"})
+    scene = merger.merge(_scene(), changed)
+
+    # Only the changed and the brand-new device go back to the matcher.
+    assert matcher.calls[2000:] == [("aa:bb:cc:00:00:02", "host-2"), ("de:ad:be:ef:00:01", "new")]
+    assert merger.last_stats == {"devices": 2001, "added": 2001, "reused": 1999, "classified": 2}
+    assert scene["nodes"][3]["ip"] == "10.9.9.9"
+    # Returned nodes are copies, not the merger's cached objects.
+    scene["nodes"][4]["ip"] = "mutated"
+    again = merger.merge(_scene(), changed)
+    assert again["nodes"][4]["ip"] != "mutated"
+
+
+def test_merge_without_uplink_is_noop():
+    merger = LiveDeviceMerger(matcher_factory=CountingMatcher)
+    scene = {"nodes": [{"id": "c", "type": "client"}], "links": []}
+    assert merger.merge(scene, _devices(3)) == {"nodes": [{"id": "c", "type": "client"}], "links": []}
+
+
+def test_backfilled_oui_reclassifies_cached_devices(monkeypatch, tmp_path):
+    from src.enhanced_network_api import device_mac_matcher
+
+    monkeypatch.setattr(device_mac_matcher.requests, "get", lambda *a, **k: pytest.fail("network call"))
+    monkeypatch.setenv("OUI_LOOKUP_MODE", "background")
+    monkeypatch.delenv("DEVICE_MATCH_CACHE_DB", raising=False)
+    matcher = device_mac_matcher.DeviceModelMatcher(cache_path=str(tmp_path / "matches.db"))
+    resolver = matcher.oui_lookup.resolver
+    resolver.background = False
+    resolver.rate = 0
+    resolver._resolve = lambda mac: {"vendor": "Fortinet", "address": "Sunnyvale, CA"}
+    merger = LiveDeviceMerger(matcher_factory=lambda: matcher)
+    devices = [{"mac": "04:d5:90:00:00:01", "hostname": "ap-1"}, {"mac": "aa:bb:cc:00:00:09", "hostname": "pc"}]
+
+    first = merger.merge(_scene(), devices)
+    assert first["nodes"][3]["vendor"] == "Unknown"
+
+    resolver.resolve_pending()
+    again = merger.merge(_scene(), devices)
+    assert again["nodes"][3]["vendor"] == "Fortinet"
+    assert merger.last_stats == {"devices": 2, "added": 2, "reused": 1, "classified": 1}
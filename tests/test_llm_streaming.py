@@ -0,0 +1,147 @@
+import importlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.enhanced_network_api.platform_web_api_fastapi as api
+from tests.llm_stub_server import StubLLMServer
+
+fortinet_llm = importlib.import_module("api.endpoints.fortinet_llm")
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    server = StubLLMServer().start()
+    monkeypatch.setenv("VLLM_BASE_URL", f"{server.base_url}/v1")
+    monkeypatch.setitem(fortinet_llm.FORTINET_LLM_CONFIG, "base_url", server.base_url)
+    # TestClient runs each request on a fresh loop, so drop clients pooled on an old one.
+    api._VLLM_CLIENT = None
+    api._VLLM_CLIENT_BASE = None
+    api.close_answer_caches()
+    yield server
+    api._VLLM_CLIENT = None
+    api._VLLM_CLIENT_BASE = None
+    api.close_answer_caches()
+    server.stop()
+
+
+@pytest.fixture
+def docs_hits(monkeypatch, tmp_path):
+    monkeypatch.setattr(api, "_fortigate_docs_root", lambda: tmp_path)
+    monkeypatch.setattr(
+        api,
+        "search_docs",
+        lambda root, query, limit=5: [{"title": "Doc", "path": "doc1", "snippet": "desc"}],
+    )
+
+
+def _read_events(response):
+    events = []
+    for frame in response.text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_docs_qa_stream_relays_vllm_tokens(stub_llm, docs_hits):
+    client = TestClient(api.app)
+    with client.stream("POST", "/docs/qa/stream", json={"question": "FortiLink status?"}) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        resp.read()
+    events = _read_events(resp)
+
+    assert events[0] == ("sources", {"question": "FortiLink status?", "sources": [{"title": "Doc", "path": "doc1", "snippet": "desc"}]})
+    assert [data["text"] for name, data in events if name == "token"] == stub_llm.tokens
+    assert events[-1] == ("done", {"answer": "Check the FortiLink status."})
+    assert stub_llm.requests[-1]["path"] == "/v1/chat/completions"
+    assert stub_llm.requests[-1]["json"]["stream"] is True
+
+
+def test_docs_qa_stream_upstream_error_is_http_error(stub_llm, docs_hits):
+    stub_llm.fail_status = 503
+    client = TestClient(api.app)
+    resp = client.post("/docs/qa/stream", json={"question": "status"})
+    assert resp.status_code == 503
+    assert "stub failure" in resp.json()["detail"]
+
+
+def test_docs_qa_non_streaming_still_matches(stub_llm, docs_hits):
+    client = TestClient(api.app)
+    resp = client.post("/docs/qa", json={"question": "status"})
+    assert resp.status_code == 200
+    assert resp.json()["answer"] == "Check the FortiLink status."
+
+
+def test_fortinet_llm_chat_stream(stub_llm):
+    client = TestClient(api.app)
+    with client.stream("POST", "/api/fortinet-llm/chat/stream", json={"prompt": "FortiLink down"}) as resp:
+        assert resp.status_code == 200
+        resp.read()
+    events = _read_events(resp)
+
+    assert [data["text"] for name, data in events if name == "token"] == stub_llm.tokens
+    name, done = events[-1]
+    assert name == "done"
+    assert done["response"] == "Check the FortiLink status."
+    assert done["model"] == fortinet_llm.FORTINET_LLM_CONFIG["model"]
+    assert stub_llm.requests[-1]["json"]["stream"] is True
+
+    # The non-streaming route returns the same body in one piece.
+    resp = client.post("/api/fortinet-llm/chat", json={"prompt": "FortiLink down"})
+    assert resp.status_code == 200
+    assert resp.json()["response"] == done["response"]
+    assert stub_llm.requests[-1]["json"]["stream"] is False
+
+
+def test_fortinet_llm_chat_stream_unavailable(stub_llm):
+    stub_llm.fail_status = 500
+    client = TestClient(api.app)
+    resp = client.post("/api/fortinet-llm/chat/stream", json={"prompt": "hi"})
+    assert resp.status_code == 503
+
+
+async def test_fortinet_llm_client_is_pooled(stub_llm):
+    first = await fortinet_llm._get_llm_client()
+    assert await fortinet_llm._get_llm_client() is first
+    fortinet_llm.FORTINET_LLM_CONFIG["base_url"] = stub_llm.base_url + "/"
+    second = await fortinet_llm._get_llm_client()
+    assert second is not first
+    assert first.is_closed
+    await fortinet_llm.close_llm_client()
+    assert second.is_closed
+
+
+def test_docs_qa_answers_are_cached_across_variants(stub_llm, docs_hits):
+    client = TestClient(api.app)
+    first = client.post("/docs/qa", json={"question": "What is the FortiLink status?"})
+    assert first.headers["X-Answer-Cache"] == "miss"
+    upstream_calls = len(stub_llm.requests)
+
+    again = client.post("/docs/qa", json={"question": "  what is the FortiLink   status"})
+    assert again.headers["X-Answer-Cache"] == "hit"
+    assert again.json()["answer"] == first.json()["answer"]
+    with client.stream("POST", "/docs/qa/stream", json={"question": "WHAT IS THE FORTILINK STATUS?!"}) as resp:
+        assert resp.headers["X-Answer-Cache"] == "hit"
+        resp.read()
+    assert _read_events(resp)[-1] == ("done", {"answer": "Check the FortiLink status."})
+    assert len(stub_llm.requests) == upstream_calls
+
+    metrics = client.get("/api/performance/metrics").json()
+    assert metrics["caches"]["docs_qa"]["hits"] == 2
+    assert metrics["caches"]["docs_qa"]["misses"] == 1
+
+
+def test_troubleshoot_answers_are_cached(stub_llm):
+    client = TestClient(api.app)
+    body = {"device_id": "sw1", "device_type": "fortiswitch", "issue": "Port 5 flapping", "device_data": {"port": 5}}
+    first = client.post("/api/fortinet-llm/troubleshoot", json=body)
+    assert first.status_code == 200
+    assert client.post("/api/fortinet-llm/troubleshoot", json={**body, "issue": "port 5 flapping!"}).json() == first.json()
+    assert len(stub_llm.requests) == 1
+
+    # Different device data is a different source set.
+    client.post("/api/fortinet-llm/troubleshoot", json={**body, "device_data": {"port": 6}})
+    assert len(stub_llm.requests) == 2
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+
+from src.enhanced_network_api.shared import topology_workflow
+from src.enhanced_network_api.shared.config_manager import MerakiConfig
+from src.enhanced_network_api.shared.mcp_base import MerakiManager
+from src.enhanced_network_api.shared.meraki_collector import MerakiOrgCollector, TokenBucket
+from tests.meraki_stub import DEFAULT_API_KEY, DEFAULT_ORG, MerakiStub
+
+
+@pytest.fixture
+def stub():
+    server = MerakiStub(networks=24, aps_per_network=2).start()
+    yield server
+    server.stop()
+
+
+async def test_collector_pages_and_fans_out_within_org_rate_limit(stub):
+    start = time.perf_counter()
+    async with MerakiOrgCollector(DEFAULT_API_KEY, DEFAULT_ORG, base_url=stub.base_url, per_page=10) as collector:
+        org = await collector.collect()
+    elapsed = time.perf_counter() - start
+
+    assert [n["id"] for n in org["networks"]] == [n["id"] for n in stub.org["networks"]]
+    assert [d["serial"] for d in org["devices"]] == [d["serial"] for d in stub.org["devices"]]
+    assert set(org["link_layer"]) == set(stub.org["link_layer"])
+    assert stub.counts[("organizations/{id}/networks", 200)] == 3
+    assert stub.counts[("organizations/{id}/devices", 200)] == 10
+    # 37 requests at 10/s after a burst of 10
+    assert collector.requests - collector.throttled == 37
+    assert elapsed >= 2.4
+    assert stub.peak_rate() <= 20
+
+
+async def test_collector_honors_retry_after(stub):
+    stub.retry_after = 0.4
+    stub.throttle_next = 3
+    bucket = TokenBucket(rate=100, burst=100)
+    start = time.perf_counter()
+    async with MerakiOrgCollector(DEFAULT_API_KEY, DEFAULT_ORG, base_url=stub.base_url, bucket=bucket) as collector:
+        networks = await collector.get_networks()
+    assert len(networks) == 24
+    assert collector.throttled == 3
+    assert stub.counts[("organizations/{id}/networks", 429)] == 3
+    assert time.perf_counter() - start >= 3 * 0.4
+
+
+async def test_concurrent_collectors_share_the_org_rate_limit():
+    # A little headroom over our 10/s for timing jitter; two separate budgets would still trip it
+    server = MerakiStub(networks=6, aps_per_network=2, rate=12, burst=12).start()
+
+    async def collect():
+        async with MerakiOrgCollector(DEFAULT_API_KEY, DEFAULT_ORG, base_url=server.base_url, per_page=5) as collector:
+            await collector.collect()
+            return collector
+
+    try:
+        # One collector on this loop, one on another thread's loop (as the workflow runs it)
+        local, threaded = await asyncio.gather(collect(), asyncio.to_thread(asyncio.run, collect()))
+    finally:
+        server.stop()
+    assert local.bucket is threaded.bucket
+    assert local.requests + threaded.requests == 26
+    assert local.throttled == threaded.throttled == 0
+    assert sum(count for (_, status), count in server.counts.items() if status == 429) == 0
+
+
+def test_workflow_collects_whole_organization(stub, monkeypatch):
+    monkeypatch.delenv("MERAKI_NETWORK_ID", raising=False)
+    monkeypatch.setenv("MERAKI_API_KEY", DEFAULT_API_KEY)
+    monkeypatch.setenv("MERAKI_ORG_ID", DEFAULT_ORG)
+    monkeypatch.setenv("MERAKI_BASE_URL", stub.base_url)
+    stub.rate, stub.burst = 1000, 1000
+
+    payload, source = topology_workflow._fetch_meraki_payload(None)
+    assert source == f"live:org:{DEFAULT_ORG}"
+    assert len(payload["devices"]) == len(stub.org["devices"])
+    assert {device["networkId"] for device in payload["devices"]} == set(stub.org["link_layer"])
+    assert len(payload["links"]) == 24 * 3
+    assert payload["links"][0]["interfaces"] == ["port3", "port1"]
+
+
+async def test_meraki_manager_reads_organization_devices(stub):
+    manager = MerakiManager()
+    manager.config = MerakiConfig(api_key=DEFAULT_API_KEY, organization_id=DEFAULT_ORG, base_url=stub.base_url)
+    async with manager:
+        devices = await manager.get_devices()
+        network_devices = await manager.get_devices(network_id="N_000003")
+    assert len(devices) == len(stub.org["devices"])
+    assert {device["serial"] for device in network_devices} == {"Q2MX-0003-0001", "Q2MS-0003-0001",
+                                                               "Q2MR-0003-0000", "Q2MR-0003-0001"}
+    assert stub.counts[("organizations/{id}/networks", 200)] == 0
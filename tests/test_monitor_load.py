@@ -0,0 +1,83 @@
+"""Concurrency/load checks for the pooled FortiGate monitor endpoints."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import src.enhanced_network_api.platform_web_api_fastapi as api
+
+UPSTREAM_DELAY = 0.25
+
+
+@pytest.fixture
+def slow_fortigate(monkeypatch):
+    """Route every monitor pool to a FortiGate that takes UPSTREAM_DELAY per call."""
+    created = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(UPSTREAM_DELAY)
+        return httpx.Response(200, json={"results": [], "path": request.url.path})
+
+    def fake_pool(ca_bundle):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        created.append(client)
+        return client
+
+    monkeypatch.setenv("FORTIGATE_HOST", "10.0.0.1")
+    monkeypatch.setenv("FORTIGATE_TOKEN", "secret")
+    monkeypatch.setenv("FORTIGATE_MONITOR_CONCURRENCY", "16")
+    monkeypatch.setattr(api, "_create_monitor_http_client", fake_pool)
+    api._MONITOR_POOLS.clear()
+    api._MONITOR_POOL_LOOP = None
+    api._DATASET_CACHE.clear()
+    yield created
+    api._DATASET_CACHE.clear()
+    api._MONITOR_POOLS.clear()
+    api._MONITOR_POOL_LOOP = None
+
+
+@pytest.mark.asyncio
+async def test_dashboard_polling_does_not_block_health(slow_fortigate):
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        polls = [
+            client.post(f"/api/fortigate/monitor/{path}", json={})
+            for path in ("wifi/clients", "switch/status", "system/cpu", "system/memory") * 5
+        ]
+        polls.append(client.get("/api/dataset"))
+        poll_task = asyncio.gather(*polls)
+
+        await asyncio.sleep(0.02)
+        health_latencies = []
+        for _ in range(5):
+            start = time.perf_counter()
+            response = await client.get("/health")
+            health_latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+        poll_done_before_health = poll_task.done()
+        responses = await poll_task
+        await api._close_monitor_pools()
+
+    assert not poll_done_before_health
+    assert max(health_latencies) < UPSTREAM_DELAY
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[2].json()["path"] == "/api/v2/monitor/system/resource/cpu"
+    # All requests for the same FortiGate share one keep-alive pool.
+    assert len(slow_fortigate) == 1
+    assert slow_fortigate[0].is_closed
+
+
+@pytest.mark.asyncio
+async def test_monitor_pool_per_host(slow_fortigate):
+    first = await api._get_async_fortigate_monitor(api.FortiGateCredentialsModel(host="10.0.0.1", token="a"))
+    second = await api._get_async_fortigate_monitor(api.FortiGateCredentialsModel(host="10.0.0.1", token="b"))
+    other = await api._get_async_fortigate_monitor(api.FortiGateCredentialsModel(host="10.0.0.2", token="a"))
+    assert first._client is second._client
+    assert first.headers != second.headers
+    assert other._client is not first._client
+    assert len(slow_fortigate) == 2
+    await api._close_monitor_pools()
+    assert api._MONITOR_POOLS == {}
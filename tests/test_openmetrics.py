@@ -0,0 +1,97 @@
+import httpx
+import pytest
+
+from src.enhanced_network_api import openmetrics
+from src.enhanced_network_api.openmetrics import (
+    BUCKET_BOUNDS,
+    LatencyHistogram,
+    MetricsRegistry,
+    Sample,
+    endpoint_label,
+    httpx_event_hooks,
+    instrument_httpx_client,
+    instrument_requests_session,
+)
+
+
+def test_histogram_buckets_are_log_linear():
+    # Each bucket is at most 1/SUB_BUCKETS wider than its lower bound.
+    for lower, upper in zip(BUCKET_BOUNDS, BUCKET_BOUNDS[1:]):
+        assert upper / lower <= 1 + 1 / openmetrics.SUB_BUCKETS + 1e-9
+
+    histogram = LatencyHistogram()
+    for value in [0.010] * 98 + [0.5, 200.0]:
+        histogram.observe(value)
+    assert histogram.count == 100
+    assert 0.010 <= histogram.quantile(0.5) <= 0.0125
+    assert histogram.quantile(0.99) == pytest.approx(0.5, rel=0.25)
+    assert histogram.quantile(1.0) == 200.0
+
+    buckets = histogram.cumulative_buckets()
+    assert buckets[-1] == ("+Inf", 100)
+    assert [count for _, count in buckets] == sorted(count for _, count in buckets)
+    assert float(buckets[0][0]) >= 0.010  # rendering starts at the first used bucket
+
+
+def test_registry_renders_openmetrics():
+    registry = MetricsRegistry()
+    family = registry.histogram("demo_duration_seconds", "Demo latency", ("route",))
+    family.observe(0.002, route='/a"b')
+    registry.register_collector(
+        lambda: [
+            Sample("demo_cache_hits", "counter", "Hits", {"cache": "x"}, 3),
+            Sample("demo_cache_hit_ratio", "gauge", "Ratio", {"cache": "x"}, 0.75),
+        ]
+    )
+    text = registry.render()
+    lines = text.splitlines()
+    assert "# TYPE demo_duration_seconds histogram" in lines
+    assert "# UNIT demo_duration_seconds seconds" in lines
+    assert 'demo_duration_seconds_bucket{route="/a\\"b",le="+Inf"} 1' in lines
+    assert 'demo_duration_seconds_count{route="/a\\"b"} 1' in lines
+    assert 'demo_cache_hits_total{cache="x"} 3' in lines
+    assert 'demo_cache_hit_ratio{cache="x"} 0.75' in lines
+    assert text.endswith("# EOF\n")
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label("/api/v2/monitor/system/status") == "/api/v2/monitor/system/status"
+    assert endpoint_label("/api/v1/networks/L_1234/clients") == "/api/v1/networks/{id}/clients"
+    assert endpoint_label("/api/v1/organizations/5678/devices/statuses?perPage=10") == (
+        "/api/v1/organizations/{id}/devices/statuses"
+    )
+    assert endpoint_label("/api/v1/devices/Q2XX-ABCD-1234/lldpCdp") == "/api/v1/devices/{id}/lldpCdp"
+    assert endpoint_label("/api/v2/cmdb/firewall/policy/12") == "/api/v2/cmdb/firewall/policy/{id}"
+
+
+async def test_httpx_hooks_record_upstream_latency():
+    openmetrics.UPSTREAM_LATENCY.clear()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+    async with httpx.AsyncClient(transport=transport, event_hooks=httpx_event_hooks("fortigate")) as client:
+        await client.get("https://fg.example/api/v2/monitor/system/status")
+        await client.get("https://fg.example/api/v2/monitor/system/status")
+    histogram = openmetrics.UPSTREAM_LATENCY.get(
+        upstream="fortigate", method="GET", endpoint="/api/v2/monitor/system/status", status=200
+    )
+    assert histogram is not None and histogram.count == 2
+
+
+async def test_instrument_httpx_client_adds_hooks_to_existing_client():
+    openmetrics.UPSTREAM_LATENCY.clear()
+    transport = httpx.MockTransport(lambda request: httpx.Response(204))
+    async with instrument_httpx_client(httpx.AsyncClient(transport=transport), "vllm") as client:
+        await client.get("http://vllm.local/v1/models")
+    histogram = openmetrics.UPSTREAM_LATENCY.get(upstream="vllm", method="GET", endpoint="/v1/models", status=204)
+    assert histogram is not None and histogram.count == 1
+    assert instrument_httpx_client(object(), "vllm") is not None
+
+
+def test_instrument_requests_session_is_idempotent():
+    class Session:
+        hooks = {"response": []}
+
+    session = Session()
+    instrument_requests_session(session, "fortigate")
+    instrument_requests_session(session, "fortigate")
+    instrument_requests_session(session, "fortimanager")
+    assert [hook.upstream for hook in session.hooks["response"]] == ["fortigate", "fortimanager"]
@@ -0,0 +1,73 @@
+import multiprocessing
+
+import pytest
+
+from src.enhanced_network_api.device_mac_matcher import DeviceModelMatcher, OUILookup
+from src.enhanced_network_api.oui_index import OUIIndex, build_oui_index
+
+ENTRIES = [
+    ("00-11-22", "Big Vendor", "1 Main St"),
+    ("0011223", "Medium Block Co", "2 Side St"),      # MA-M, 28-bit
+    ("001122334", "Small Block LLC", "3 Back St"),    # MA-S, 36-bit
+    ("90:6C:AC", "Fortinet, Inc.", "Sunnyvale CA"),
+    ("A4C12D", "Big Vendor", "1 Main St"),
+    ("ZZ", "ignored", ""),
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = tmp_path / "oui.idx"
+    assert build_oui_index(ENTRIES, path) == 5
+    return path
+
+
+def test_longest_prefix_match(index_path):
+    index = OUIIndex(index_path)
+    try:
+        assert index.counts == {24: 3, 28: 1, 36: 1}
+        assert index.lookup("00:11:22:33:44:55") == {"vendor": "Small Block LLC", "address": "3 Back St", "block": "MA-S"}
+        assert index.lookup("00:11:22:3F:00:00")["vendor"] == "Medium Block Co"
+        assert index.lookup("00:11:22:40:00:00") == {"vendor": "Big Vendor", "address": "1 Main St", "block": "MA-L"}
+        assert index.lookup("906cac000001")["vendor"] == "Fortinet, Inc."
+        assert index.lookup("A4-C1-2D-00-00-01")["vendor"] == "Big Vendor"
+        assert index.lookup("FF:FF:FF:00:00:00") is None
+        assert index.lookup("00:11") is None
+    finally:
+        index.close()
+
+
+def test_rejects_non_index_files(tmp_path):
+    bogus = tmp_path / "bogus.idx"
+    bogus.write_bytes(b"{}" * 32)
+    with pytest.raises(ValueError):
+        OUIIndex(bogus)
+
+
+def _lookup_in_child(path, queue):
+    queue.put(OUIIndex(path).lookup("00:11:22:33:44:55")["vendor"])
+
+
+def test_index_is_readable_from_another_process(index_path):
+    queue = multiprocessing.get_context("spawn").Queue()
+    process = multiprocessing.get_context("spawn").Process(target=_lookup_in_child, args=(str(index_path), queue))
+    process.start()
+    process.join(30)
+    assert queue.get(timeout=5) == "Small Block LLC"
+
+
+def test_oui_lookup_uses_index(index_path, monkeypatch):
+    monkeypatch.setenv("OUI_LOOKUP_MODE", "offline")
+    lookup = OUILookup(str(index_path))
+    assert lookup.index is not None
+    assert lookup.oui_dict == {}
+    assert lookup.lookup("00:11:22:33:44:01")["vendor"] == "Small Block LLC"
+    assert lookup.lookup("00:0C:F1:00:00:01")["vendor"] == "Unknown"
+
+    monkeypatch.setenv("OUI_INDEX_PATH", str(index_path))
+    shared = OUILookup()
+    assert shared.index is lookup.index
+
+    matcher = DeviceModelMatcher(oui_database_path=str(index_path), cache_size=0)
+    assert matcher.oui_dict == {}
+    assert matcher.match_mac_to_model("90:6C:AC:00:00:01").vendor == "Fortinet, Inc."
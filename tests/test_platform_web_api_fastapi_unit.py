@@ -1,6 +1,7 @@
 import asyncio
 import importlib
 import json
+import time
 from collections import deque
 from pathlib import Path
 from typing import Any, Dict
@@ -26,6 +27,10 @@ def restore_static_dir(monkeypatch, tmp_path):
     api._SERVICE_HTTP_CLIENT = None
     api._SERVICE_CLIENT_LOOP = None
     api.PERF_RECORDER.reset()
+    api._SCENE_FLIGHT.invalidate()
+    api._SCENE_STREAM_FLIGHT.invalidate()
+    api.close_answer_caches()
+    monkeypatch.setenv("TOPOLOGY_AUTO_REFRESH", "false")
     monkeypatch.setattr(api, "STATIC_DIR", tmp_path)
     monkeypatch.setattr(
         topology_workflow,
@@ -53,6 +58,9 @@ def restore_static_dir(monkeypatch, tmp_path):
     api._SERVICE_HTTP_CLIENT = None
     api._SERVICE_CLIENT_LOOP = None
     api.PERF_RECORDER.reset()
+    api._SCENE_FLIGHT.invalidate()
+    api._SCENE_STREAM_FLIGHT.invalidate()
+    api.close_answer_caches()
     monkeypatch.setattr(api, "STATIC_DIR", original_static)
 
 
@@ -397,7 +405,7 @@ def test_fortigate_docs_search_uses_persisted_index(tmp_path, monkeypatch):
     (root / "doc.html").write_text("<html><body>FortiLink docs</body></html>", encoding="utf-8")
     docs_search.warm_index(root)
     docs_search._cached_index.cache_clear()
-    docs_search._TREE_MTIME_CACHE.clear()
+    docs_search._TREE_STATE_CACHE.clear()
 
     def boom(*args, **kwargs):
         raise AssertionError("Should not rebuild index when persisted cache available")
@@ -1863,6 +1871,73 @@ def test_performance_metrics_endpoint():
     assert "unit-test" in payload["metrics"]
 
 
+def test_openmetrics_endpoint_reports_routes_sections_and_caches():
+    api.PERF_RECORDER.reset()
+    with api._profile_section("unit-test"):
+        pass
+    client = TestClient(api.app)
+    assert client.get("/health").status_code in {200, 503}
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/openmetrics-text")
+    lines = response.text.splitlines()
+    assert response.text.endswith("# EOF\n")
+    assert any(
+        line.startswith('enhanced_network_api_http_request_duration_seconds_count{method="GET",route="/health"')
+        for line in lines
+    )
+    assert 'enhanced_network_api_section_duration_seconds_count{section="unit-test"} 1' in lines
+    assert any(line.startswith('enhanced_network_api_cache_hit_ratio{cache="topology_scene"} ') for line in lines)
+
+    summary = api.get_performance_metrics()["unit-test"]
+    assert summary["total"] == 1
+    assert summary["p50"] <= summary["p99"]
+
+
+@pytest.mark.asyncio
+async def test_scene_enhanced_reports_server_timing_spans(monkeypatch):
+    async def load():
+        return {"nodes": [{"id": "fg", "type": "fortigate", "mac": "00:09:0f:aa:bb:cc"}], "links": []}
+
+    monkeypatch.setattr(api, "_load_scene_with_fallback", load)
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        response = await client.get("/api/topology/scene-enhanced")
+    assert response.status_code == 200
+    names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert {"enhance_models.device_match", "enhance_models.layout", "enhance_models", "serialize"} <= set(names)
+    assert names[-1] == "total"
+    assert api.get_performance_metrics()["layout"]["count"] == 1
+
+
+def test_scene_profile_returns_collapsed_stacks(monkeypatch):
+    async def load():
+        return {"nodes": [{"id": "fg", "type": "fortigate"}], "links": []}
+
+    original_layout = api.calculate_network_tree_layout
+
+    def slow_layout(nodes, links):
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+        return original_layout(nodes, links)
+
+    monkeypatch.setattr(api, "_load_scene_with_fallback", load)
+    monkeypatch.setattr(api, "calculate_network_tree_layout", slow_layout)
+    client = TestClient(api.app)
+    url = "/api/topology/scene-enhanced?refresh=true&profile=1"
+
+    monkeypatch.delenv("PROFILE_TOKEN", raising=False)
+    assert client.get(url).status_code == 403
+
+    monkeypatch.setenv("PROFILE_TOKEN", "secret")
+    response = client.get(url, headers={"X-Profile-Token": "secret"})
+    assert response.status_code == 200
+    assert response.headers["x-profiled-status"] == "200"
+    assert "_enhance_scene_with_models" in response.text
+    assert client.get("/api/topology/scene-enhanced").json()["nodes"][0]["id"] == "fg"
+
+
 def test_get_performance_metrics_helper():
     api.PERF_RECORDER.reset()
     with api._profile_section("helper"):
@@ -2185,6 +2260,42 @@ def test_generate_artifacts_with_fortigate_payload(monkeypatch):
     assert result["topology"]["metadata"]["node_count"] > 0
 
 
+def test_generate_artifacts_fetches_sources_concurrently(monkeypatch):
+    def slow(payload):
+        def fetch(creds):
+            time.sleep(0.2)
+            return payload
+
+        return fetch
+
+    monkeypatch.setattr(
+        topology_workflow,
+        "_fetch_fortigate_payload",
+        slow(({"fabric_devices": [{"id": "fg1", "type": "fortigate"}], "fabric_links": []}, "fortigate:lab")),
+    )
+    monkeypatch.setattr(
+        topology_workflow,
+        "_fetch_fortimanager_payload",
+        slow(({"fabric_devices": [], "fabric_links": []}, "fortimanager:lab")),
+    )
+    monkeypatch.setattr(
+        topology_workflow,
+        "_fetch_meraki_payload",
+        slow(({"devices": [{"id": "mx1", "type": "appliance"}], "links": []}, "meraki:lab")),
+    )
+    started = time.perf_counter()
+    result = topology_workflow.generate_artifacts(
+        fortigate_credentials=topology_workflow.FortiGateCredentials(host="fg", token="tok"),
+        use_samples=False,
+    )
+    assert time.perf_counter() - started < 0.5
+    timings = result["sources"]["timings_ms"]
+    assert set(timings) == {"fortigate", "fortimanager", "meraki", "total"}
+    assert all(timings[name] >= 200 for name in ("fortigate", "fortimanager", "meraki"))
+    assert timings["total"] < 500
+    assert result["topology"]["metadata"]["node_count"] == 2
+
+
 def test_resolve_inputs_fortimanager_missing(monkeypatch):
     fortigate_payload = (
         {"fabric_devices": [{"id": "fg1", "name": "FG", "type": "fortigate"}], "fabric_links": []},
@@ -2247,3 +2358,316 @@ def test_resolve_inputs_meraki_missing(monkeypatch):
     )
     assert inputs.meraki["devices"] == []
     assert inputs.meraki_source == "meraki:unavailable"
+
+
+def test_get_dataset_uses_concurrent_monitor(monkeypatch):
+    monkeypatch.setenv("FORTIGATE_HOST", "fgt.example:8443")
+    monkeypatch.setenv("FORTIGATE_TOKEN", "secret")
+    monkeypatch.setenv("FORTIGATE_MONITOR_CONCURRENCY", "3")
+    captured: Dict[str, Any] = {}
+
+    async def fake_build(self, sections=None, section_timeout=10.0, semaphore=None):
+        captured.update(host=self.host, port=self.port, limit=self.max_concurrency)
+        captured["calls"] = captured.get("calls", 0) + 1
+        data = {name: {"results": []} for name in sections}
+        data["latency_ms"] = {name: 1.0 for name in sections}
+        return data
+
+    monkeypatch.setattr(api.AsyncFortiGateMonitor, "build_dataset", fake_build)
+    api._DATASET_CACHE.clear()
+    client = TestClient(api.app)
+    response = client.get("/api/dataset")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["latency_ms"]["cpu"] == 1.0
+    assert set(payload["cache"]["ages"]) == set(payload["latency_ms"])
+    assert response.headers["Age"] == "0"
+    assert captured["host"] == "fgt.example"
+    assert captured["port"] == 8443
+    assert captured["limit"] == 3
+    assert "fortigate_monitor_dataset" in api.get_performance_metrics()
+
+    # Second poll is served from the snapshot cache.
+    assert client.get("/api/dataset").status_code == 200
+    assert captured["calls"] == 1
+    client.get("/api/dataset", params={"refresh": "true"})
+    assert captured["calls"] == 2
+    api._DATASET_CACHE.clear()
+
+
+def test_get_dataset_cache_disabled(monkeypatch):
+    monkeypatch.setenv("FORTIGATE_TOKEN", "secret")
+    monkeypatch.setenv("FORTIGATE_DATASET_CACHE", "0")
+    calls = []
+
+    async def fake_build(self, sections=None, section_timeout=10.0, semaphore=None):
+        calls.append(sections)
+        return {"timestamp": 1, "cpu": {"results": []}, "latency_ms": {"cpu": 1.0}, "partial": False}
+
+    monkeypatch.setattr(api.AsyncFortiGateMonitor, "build_dataset", fake_build)
+    client = TestClient(api.app)
+    client.get("/api/dataset")
+    response = client.get("/api/dataset")
+    assert "cache" not in response.json()
+    assert calls == [None, None]
+
+
+def test_get_dataset_without_token(monkeypatch):
+    for var in ("FORTIGATE_TOKEN", "FORTIGATE_API_TOKEN", "FORTIGATE_192_168_0_254_TOKEN"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.delenv("FORTIGATE_HOST", raising=False)
+    monkeypatch.delenv("FORTIGATE_HOSTS", raising=False)
+    client = TestClient(api.app)
+    response = client.get("/api/dataset")
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_scene_endpoints_share_single_flight_load(monkeypatch):
+    calls = []
+
+    async def slow_load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {
+            "nodes": [
+                {"id": "fg", "type": "fortigate"},
+                {"id": "sw", "type": "fortiswitch"},
+            ],
+            "links": [{"from": "fg", "to": "sw"}],
+        }
+
+    monkeypatch.setattr(api, "_load_scene_with_fallback", slow_load)
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        paths = ["/api/topology/scene", "/api/topology/scene-enhanced", "/api/topology/babylon-lab-format"] * 4
+        responses = await asyncio.gather(*(client.get(path) for path in paths))
+        assert len(calls) == 1
+        assert all(r.status_code == 200 for r in responses)
+        scene, enhanced, lab = (r.json() for r in responses[:3])
+        assert "position" not in scene["nodes"][0]
+        assert "position" in enhanced["nodes"][0]
+        assert {m["id"] for m in lab["models"]} == {"fg", "sw"}
+
+        await client.get("/api/topology/scene")
+        assert len(calls) == 1
+        await client.get("/api/topology/scene", params={"refresh": "true"})
+        assert len(calls) == 2
+    assert api._SCENE_FLIGHT.stats()["coalesced"] > 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cache_does_not_cache_failures():
+    cache = api.SingleFlightCache(ttl=60)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    results = await asyncio.gather(*(cache.get("k", flaky) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert await cache.get("k", flaky) == "ok"
+    assert await cache.get("k", flaky) == "ok"
+    assert len(attempts) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "coalesced": 2}
+
+
+def test_enhance_scene_does_not_mutate_source(monkeypatch):
+    scene = {"nodes": [{"id": "fg", "type": "fortigate"}], "links": []}
+    enhanced = api._enhance_scene_with_models(scene)
+    assert "device_model" in enhanced["nodes"][0]
+    assert scene["nodes"][0] == {"id": "fg", "type": "fortigate"}
+
+
+@pytest.mark.asyncio
+async def test_load_scene_json_enriched_with_live_devices(monkeypatch, tmp_path):
+    generated = tmp_path / "data" / "generated"
+    generated.mkdir(parents=True)
+    (generated / "combined_topology.json").write_text(
+        json.dumps({"nodes": [{"id": "fg", "type": "fortigate"}], "links": []}),
+        encoding="utf-8",
+    )
+
+    class StubCollector:
+        async def authenticate(self):
+            return True
+
+        async def get_connected_devices(self):
+            return [{"mac": "00:11:22:33:44:55", "hostname": "till", "connection_type": "wifi"}]
+
+    monkeypatch.setattr(api, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(api, "_create_fortigate_collector", lambda creds: StubCollector())
+    scene = await api._load_scene_with_fallback()
+
+    assert scene["metadata"]["source"] == "json"
+    assert [n["id"] for n in scene["nodes"]] == ["fg", "dev-001122334455"]
+    assert scene["nodes"][1]["connection_type"] == "wifi"
+    assert scene["links"] == [{"from": "fg", "to": "dev-001122334455", "status": "active"}]
+    assert "merge_live_devices" in api.get_performance_metrics()
+
+
+@pytest.mark.asyncio
+async def test_scene_event_stream_snapshot_then_deltas(monkeypatch):
+    scenes = [
+        {"nodes": [{"id": "fg", "type": "fortigate"}], "links": []},
+        {"nodes": [{"id": "fg", "type": "fortigate"}], "links": []},
+        {"nodes": [{"id": "fg", "type": "fortigate"}, {"id": "c1"}], "links": [{"from": "fg", "to": "c1"}]},
+    ]
+
+    async def next_scene():
+        return scenes.pop(0) if len(scenes) > 1 else scenes[0]
+
+    class FakeRequest:
+        def __init__(self, frames):
+            self.remaining = frames
+
+        async def is_disconnected(self):
+            self.remaining -= 1
+            return self.remaining < 0
+
+    monkeypatch.setattr(api, "_load_scene_with_fallback", next_scene)
+    monkeypatch.setattr(api, "_SCENE_FLIGHT", api.SingleFlightCache(ttl=0))
+    frames = [frame async for frame in api._scene_event_stream(FakeRequest(4), "scene", 0)]
+
+    assert frames[0].startswith(b"id: ")
+    snapshot = json.loads(frames[0].split(b"data: ", 1)[1])
+    assert snapshot["scene"]["nodes"][0]["id"] == "fg"
+    assert frames[1] == b": keep-alive\n\n"
+    delta = json.loads(frames[2].split(b"data: ", 1)[1])
+    assert b"event: delta" in frames[2]
+    assert delta["from"] == snapshot["signature"]
+    assert {op["path"] for op in delta["ops"]} == {"/nodes/c1", "/links/fg|c1"}
+    assert frames[3] == b": keep-alive\n\n"
+
+
+@pytest.mark.asyncio
+async def test_scene_streams_share_one_delta_per_generation(monkeypatch):
+    current = {"generation": 101, "scene": {"nodes": [{"id": "fg"}], "links": []}}
+    calls = {"delta": 0, "signature": 0}
+    real_delta, real_signature = api.scene_delta, api._topology_signature
+
+    async def shared_scene(form, refresh=False):
+        return current["generation"], current["scene"]
+
+    def counted_delta(previous, scene):
+        calls["delta"] += 1
+        return real_delta(previous, scene)
+
+    def counted_signature(scene):
+        calls["signature"] += 1
+        return real_signature(scene)
+
+    class OpenRequest:
+        async def is_disconnected(self):
+            return False
+
+    monkeypatch.setattr(api, "_shared_scene", shared_scene)
+    monkeypatch.setattr(api, "scene_delta", counted_delta)
+    monkeypatch.setattr(api, "_topology_signature", counted_signature)
+    streams = [api._scene_event_stream(OpenRequest(), "scene", 0) for _ in range(5)]
+    snapshots = [await stream.__anext__() for stream in streams]
+    current["generation"] = 102
+    current["scene"] = {"nodes": [{"id": "fg"}, {"id": "c1"}], "links": [{"from": "fg", "to": "c1"}]}
+    deltas = [await stream.__anext__() for stream in streams]
+    for stream in streams:
+        await stream.aclose()
+
+    assert all(frame is snapshots[0] for frame in snapshots)
+    assert all(frame is deltas[0] for frame in deltas)
+    assert json.loads(snapshots[0].split(b"data: ", 1)[1])["scene"]["nodes"] == [{"id": "fg"}]
+    assert b"event: delta" in deltas[0]
+    assert calls == {"delta": 1, "signature": 2}
+
+
+def test_scene_stream_rejects_unknown_form():
+    client = TestClient(api.app)
+    assert client.get("/api/topology/scene/stream", params={"form": "lab"}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_background_refresher_serves_topology_from_snapshots(monkeypatch):
+    calls = []
+
+    async def slow_load():
+        calls.append(1)
+        await asyncio.sleep(0.5)
+        return {"nodes": [{"id": "fg", "type": "fortigate"}, {"id": f"c{len(calls)}"}], "links": []}
+
+    async def raw_load():
+        return {"devices": [{"id": "fg"}], "metadata": {"source": "mcp"}}
+
+    monkeypatch.setattr(api, "_load_scene_with_fallback", slow_load)
+    monkeypatch.setattr(api, "_load_topology_raw_with_fallback", raw_load)
+    monkeypatch.setattr(api, "_TOPOLOGY_STORE", api.SnapshotStore())
+    monkeypatch.setenv("TOPOLOGY_AUTO_REFRESH", "true")
+    monkeypatch.setenv("TOPOLOGY_REFRESH_INTERVAL", "1")
+    monkeypatch.setattr(api, "_fortigate_docs_root", lambda: Path("/nonexistent-docs"))
+    await api.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            first = await client.get("/api/topology/scene")  # waits for the first publish only
+            assert first.status_code == 200
+            assert first.json()["nodes"][1]["id"] == "c1"
+
+            # The next refresh is in flight; reads are served from the published snapshot.
+            await asyncio.sleep(1.15)
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.get(path) for path in
+                ["/api/topology/scene", "/api/topology/scene-enhanced", "/api/topology/babylon-lab-format"] * 5
+            ))
+            assert time.perf_counter() - start < 0.2
+            assert len(calls) == 2
+            assert {r.headers["X-Snapshot-Version"] for r in responses} == {"1"}
+            assert all(float(r.headers["X-Snapshot-Age"]) >= 1.1 for r in responses)
+            assert {m["id"] for m in responses[2].json()["models"]} == {"fg", "c1"}
+
+            raw = (await client.get("/api/topology/raw")).json()
+            assert raw["metadata"]["source"] == "mcp"
+            assert raw["metadata"]["snapshot"]["version"] >= 1
+
+            refreshed = await client.get("/api/topology/scene", params={"refresh": "true"})
+            assert int(refreshed.headers["X-Snapshot-Version"]) >= 2
+
+            status = (await client.get("/api/topology/snapshots")).json()
+            assert status["enabled"] is True
+            assert status["snapshots"]["scene"]["refreshes"] >= 2
+    finally:
+        await api.shutdown_event()
+        monkeypatch.setattr(api, "_TOPOLOGY_REFRESHER", None)
+
+
+async def test_background_refresh_keeps_last_good_snapshot_when_mcp_fails(monkeypatch, tmp_path):
+    outage = False
+
+    async def discover(tool_name, extra_arguments=None):
+        if outage:
+            raise HTTPException(status_code=503, detail="MCP bridge unavailable")
+        return {"devices": [{"id": "fg-live", "type": "fortigate"}], "links": [], "metadata": {"source": "mcp"}}
+
+    monkeypatch.setattr(api, "PROJECT_ROOT", tmp_path)  # no GraphML/JSON exports: scene comes from discovery
+    monkeypatch.setattr(api, "_call_fortinet_tool_async", discover)
+    monkeypatch.setattr(api, "_TOPOLOGY_STORE", api.SnapshotStore())
+    refresher = api.BackgroundRefresher(api._TOPOLOGY_STORE)
+    refresher.register("scene", api._build_scene_snapshot)
+    refresher.register("topology_raw", api._refresh_topology_raw)
+
+    assert (await refresher.refresh("scene")).version == 1
+    assert (await refresher.refresh("topology_raw")).version == 1
+
+    outage = True
+    assert await refresher.refresh("scene") is None
+    assert await refresher.refresh("topology_raw") is None
+
+    scene = api._TOPOLOGY_STORE.get("scene")
+    raw = api._TOPOLOGY_STORE.get("topology_raw")
+    assert scene.version == 1 and [n["id"] for n in scene.value["forms"]["scene"]["nodes"]] == ["fg-live"]
+    assert raw.version == 1 and raw.value["metadata"]["source"] == "mcp"
+    status = refresher.status()
+    assert status["scene"]["failures"] == 1 and "fell back" in status["scene"]["last_error"]
+    assert status["topology_raw"]["failures"] == 1
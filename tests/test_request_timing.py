@@ -0,0 +1,59 @@
+import asyncio
+
+from src.enhanced_network_api.request_timing import (
+    RequestTimer,
+    ServerTimingMiddleware,
+    add_span,
+    current_timer,
+    span,
+)
+
+
+def test_server_timing_merges_repeated_spans():
+    timer = RequestTimer()
+    timer.add("load scene", 0.010)
+    timer.add("serialize", 0.002)
+    timer.add("serialize", 0.003)
+    header = timer.server_timing(total=0.020)
+    assert header == 'load_scene;dur=10.0, serialize;dur=5.0;desc="x2", total;dur=20.0'
+
+
+def test_spans_outside_a_request_are_harmless():
+    with span("orphan"):
+        add_span("inner", 0.1)
+    assert current_timer() is None
+
+
+def _run(app, path="/"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    asyncio.run(ServerTimingMiddleware(app)(scope, receive, send))
+    return messages
+
+
+def _parse():
+    with span("parse"):
+        return "parsed"
+
+
+def test_middleware_reports_nested_spans_from_threads():
+    async def app(scope, receive, send):
+        with span("load"):
+            assert await asyncio.to_thread(_parse) == "parsed"
+            add_span("match", 0.004)
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    start = _run(app)[0]
+    headers = dict(start["headers"])
+    assert headers[b"content-type"] == b"text/plain"
+    entries = [entry.split(";")[0] for entry in headers[b"server-timing"].decode().split(", ")]
+    assert entries == ["load.parse", "load.match", "load", "total"]
+    assert current_timer() is None
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+
+from src.enhanced_network_api.sampling_profiler import ProfilingMiddleware, StackSampler, requested_format
+
+
+def _busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+async def _app(scope, receive, send):
+    await asyncio.to_thread(_busy_work, 0.1)
+    await send({"type": "http.response.start", "status": 201, "headers": []})
+    await send({"type": "http.response.body", "body": b"original"})
+
+
+def _call(middleware, query, headers=()):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/scene", "query_string": query, "headers": list(headers)}
+    asyncio.run(middleware(scope, receive, send))
+    start, body = messages[0], b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], dict(start["headers"]), body
+
+
+def test_requested_format():
+    assert requested_format(b"refresh=true") is None
+    assert requested_format(b"profile=0") is None
+    assert requested_format(b"profile=1") == "collapsed"
+    assert requested_format(b"refresh=1&profile=speedscope") == "speedscope"
+    assert requested_format(b"profile=pprof") == ""
+
+
+def test_unprofiled_requests_pass_through():
+    status, _, body = _call(ProfilingMiddleware(_app, token="secret"), b"")
+    assert (status, body) == (201, b"original")
+
+
+def test_profiling_requires_matching_token():
+    assert _call(ProfilingMiddleware(_app, token=""), b"profile=1")[0] == 403
+    assert _call(ProfilingMiddleware(_app, token="secret"), b"profile=1", [(b"x-profile-token", b"nope")])[0] == 403
+
+
+def test_collapsed_profile_covers_worker_threads():
+    middleware = ProfilingMiddleware(_app, token="secret", interval=0.002)
+    status, headers, body = _call(middleware, b"profile=1", [(b"x-profile-token", b"secret")])
+    assert status == 200
+    assert headers[b"x-profiled-status"] == b"201"
+    lines = body.decode().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_busy_work" in line for line in lines)
+
+
+def test_speedscope_profile_shape():
+    middleware = ProfilingMiddleware(_app, token="secret", interval=0.002)
+    status, headers, body = _call(middleware, b"profile=speedscope", [(b"x-profile-token", b"secret")])
+    assert status == 200
+    assert headers[b"content-type"] == b"application/json"
+    document = json.loads(body)
+    frames = document["shared"]["frames"]
+    assert any(frame["name"] == "_busy_work" for frame in frames)
+    for profile in document["profiles"]:
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert all(0 <= index < len(frames) for sample in profile["samples"] for index in sample)
+
+
+def test_sampler_skips_idle_threads():
+    sampler = StackSampler(interval=0.001)
+    sampler.sample()
+    assert all(stack[-1][0] != "wait" for _, stack, _ in sampler.samples)
@@ -0,0 +1,44 @@
+from src.enhanced_network_api.scene_diff import apply_scene_delta, scene_delta
+
+
+def _scene(nodes, links, **extra):
+    return {"nodes": nodes, "links": links, **extra}
+
+
+def test_scene_delta_add_remove_replace():
+    before = _scene(
+        [{"id": "fg", "type": "fortigate"}, {"id": "c1", "status": "online"}, {"id": "c/2"}],
+        [{"from": "fg", "to": "c1"}, {"from": "fg", "to": "c/2"}],
+    )
+    after = _scene(
+        [{"id": "fg", "type": "fortigate"}, {"id": "c1", "status": "offline"}, {"id": "c3"}],
+        [{"from": "fg", "to": "c1"}, {"from": "fg", "to": "c3"}],
+        metadata={"source": "graphml"},
+    )
+    ops = scene_delta(before, after)
+
+    by_path = {op["path"]: op for op in ops}
+    assert by_path["/nodes/c~12"]["op"] == "remove"
+    assert by_path["/nodes/c1"] == {"op": "replace", "path": "/nodes/c1", "value": {"id": "c1", "status": "offline"}}
+    assert by_path["/nodes/c3"]["op"] == "add"
+    assert by_path["/links/fg|c~12"]["op"] == "remove"
+    assert by_path["/links/fg|c3"]["op"] == "add"
+    assert by_path["/metadata"]["value"] == {"source": "graphml"}
+    assert "/nodes/fg" not in by_path and "/links/fg|c1" not in by_path
+
+
+def test_apply_scene_delta_round_trip():
+    before = _scene([{"id": f"n{i}"} for i in range(50)], [{"id": "l1", "from": "n0", "to": "n1"}])
+    after = _scene(
+        [{"id": f"n{i}", "status": "up" if i == 7 else None} for i in range(1, 52)],
+        [{"id": "l1", "from": "n1", "to": "n2"}],
+    )
+    patched = apply_scene_delta(before, scene_delta(before, after))
+    key = lambda item: str(item)
+    assert sorted(patched["nodes"], key=key) == sorted(after["nodes"], key=key)
+    assert patched["links"] == after["links"]
+
+
+def test_scene_delta_identical_is_empty():
+    scene = _scene([{"id": "a"}], [{"from": "a", "to": "b"}])
+    assert scene_delta(scene, dict(scene)) == []
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from src.enhanced_network_api.snapshot_refresher import BackgroundRefresher, SnapshotStore
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_published_snapshot():
+    store = SnapshotStore()
+    outcomes = [{"nodes": 1}, RuntimeError("device timeout"), {"nodes": 3}]
+
+    async def loader():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    refresher = BackgroundRefresher(store, interval=60)
+    refresher.register("scene", loader)
+    assert (await refresher.refresh("scene")).version == 1
+    assert await refresher.refresh("scene") is None
+    assert store.get("scene").value == {"nodes": 1}
+    assert refresher.status()["scene"]["last_error"] == "device timeout"
+
+    snapshot = await refresher.refresh("scene")
+    assert (snapshot.version, snapshot.value) == (2, {"nodes": 3})
+    assert refresher.status()["scene"]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresher_publishes_on_interval_and_coalesces_refreshes():
+    store = SnapshotStore()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return len(calls)
+
+    refresher = BackgroundRefresher(store, interval=0.05, jitter=0)
+    refresher.register("raw", loader)
+    waiter = asyncio.ensure_future(store.wait("raw", timeout=1))
+    refresher.start()
+    assert (await waiter).value == 1
+    await asyncio.sleep(0.2)
+    assert store.get("raw").version >= 3
+    await refresher.stop()
+    assert not refresher.running
+
+    before = len(calls)
+    snapshots = await asyncio.gather(*(refresher.refresh("raw") for _ in range(5)))
+    assert len(calls) == before + 1
+    assert len({snapshot.version for snapshot in snapshots}) == 1